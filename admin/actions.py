@@ -3,9 +3,31 @@ from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 from users.models import User
-from orders.models import Order
+from orders.models import Order, archive_old_orders, ARCHIVE_AFTER_DAYS
+from orders.export import export_orders, default_export_path
 from reviews.models import Review
+from reviews.moderation import scan_reviews_for_spam, get_moderation_queue, dismiss_from_queue
+from reviews.sentiment import backfill_review_sentiment, get_restaurant_sentiment
+from reviews.bulk_actions import bulk_moderate_reviews, count_matching_reviews, has_review_filters
 from restaurants.models import Restaurant, MenuItem
+from analytics.rollups import (
+    refresh_sales_rollups, get_sales_summary, get_revenue_by_restaurant,
+    get_top_items, get_orders_by_hour_of_day
+)
+from analytics import engine as analytics_engine
+from restaurants.rating_trends import (
+    find_slipping_restaurants, get_rating_trend, sparkline,
+    RATING_TREND_WEEKS, SLIPPING_RECENT_WEEKS, SLIPPING_BASELINE_WEEKS
+)
+from users.auth_pool import calibrate_bcrypt_cost, BCRYPT_ROUNDS, AUTH_POOL_KIND, AUTH_POOL_WORKERS
+from utils.metrics import get_metrics_snapshot
+from users.cache import user_cache
+from users.bulk_import import bulk_import_users, IMPORT_WORKERS
+from users.bulk_actions import bulk_update_users
+from users.throttle import (
+    get_login_throttle, LOGIN_THROTTLE_ENABLED, LOGIN_WINDOW_SECONDS,
+    LOGIN_MAX_FAILURES_PER_USER, LOGIN_MAX_FAILURES_PER_CLIENT
+)
 from utils.logger import log
 from utils.validation import get_validated_input
 
@@ -26,6 +48,7 @@ def view_all_users(admin_user):
     table.add_column("Username")
     table.add_column("Address")
     table.add_column("Is Admin", justify="center")
+    table.add_column("Active", justify="center")
     table.add_column("Created At")
 
     for user in users:
@@ -34,11 +57,92 @@ def view_all_users(admin_user):
             user.username,
             user.address if user.address else "N/A",
             "Yes" if user.is_admin else "No",
+            "Yes" if user.is_active else "No",
             str(user.created_at)
         )
     console.print(table)
     log(f"Admin '{admin_user.username}' viewed all users.")
 
+def bulk_import_users_admin(admin_user):
+    """Imports users from a CSV or JSONL file, hashing passwords in parallel."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    console.print("[dim]CSV needs a header row. Fields: username, password (or password_hash for existing bcrypt hashes), address, is_admin.[/dim]")
+    path = get_validated_input(prompt="Path to CSV or JSONL file: ", validation_type="not_empty")
+    with console.status(f"[cyan]Importing users ({IMPORT_WORKERS} hashing processes)...[/cyan]") as status:
+        report = bulk_import_users(path, progress_callback=lambda r: status.update(
+            f"[cyan]Importing users... {r['imported']} imported, {r['total']} read[/cyan]"))
+
+    console.print(f"[green]Imported {report['imported']} of {report['total']} record(s).[/green]")
+    duplicates = report['duplicates_in_file'] + report['duplicates_existing']
+    if duplicates or report['invalid'] or report['failed']:
+        table = Table(title="Skipped Records", show_header=True, header_style="bold magenta")
+        table.add_column("Line", justify="right", style="dim")
+        table.add_column("Reason")
+        for line, username in report['duplicates_in_file']:
+            table.add_row(str(line), f"'{username}' appears earlier in the file")
+        for line, username in report['duplicates_existing']:
+            table.add_row(str(line), f"'{username}' already exists")
+        for line, reason in report['invalid']:
+            table.add_row(str(line), reason)
+        for line, username, error in report['failed']:
+            table.add_row(str(line), f"'{username}': {error}")
+        console.print(table)
+    log(f"Admin '{admin_user.username}' bulk-imported {report['imported']} user(s) from {path}.")
+
+def bulk_manage_users_admin(admin_user):
+    """Deletes, deactivates or reactivates every user matching a search, or a list of ids, in chunks."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    console.print("\n[bold cyan]Bulk Delete / Deactivate Users[/bold cyan]")
+    selection = get_validated_input(prompt="Select users by (1) search filter or (2) comma-separated IDs: ",
+                                    validation_type="choice", options={"choices": ['1', '2']})
+    if selection == '1':
+        term = get_validated_input(prompt="Search term (ID, username or address; blank for all): ",
+                                   validation_type="not_empty", optional=True, default_value="")
+        admin_filter = {"1": "All", "2": "Admin", "3": "Non-Admin"}[get_validated_input(
+            prompt="Admin filter (1) All (2) Admin (3) Non-Admin [3]: ", validation_type="choice",
+            options={"choices": ['1', '2', '3']}, optional=True, default_value='3')]
+        user_ids = User.search_ids(term, admin_filter)
+    else:
+        raw_ids = get_validated_input(prompt="User IDs: ", validation_type="regex",
+                                      options={"pattern": r"^\s*\d+(\s*,\s*\d+)*\s*$"},
+                                      custom_error_message="Enter numeric IDs separated by commas.")
+        user_ids = [int(part) for part in raw_ids.split(",")]
+
+    if not user_ids:
+        console.print("[yellow]No users match.[/yellow]")
+        return
+    mode = {"1": "deactivate", "2": "delete", "3": "reactivate"}[get_validated_input(
+        prompt="Action: (1) Deactivate (2) Delete (3) Reactivate: ", validation_type="choice",
+        options={"choices": ['1', '2', '3']})]
+    delete_reviews = False  # Only asked for deactivate; deleting users always removes their reviews
+    if mode == "deactivate":
+        delete_reviews = get_validated_input(prompt="Also delete their reviews? (yes/no): ", validation_type="yes_no") in ['yes', 'y']
+
+    preview = ", ".join(str(user_id) for user_id in user_ids[:10]) + (", ..." if len(user_ids) > 10 else "")
+    console.print(f"{len(user_ids)} user(s) selected: {preview}")
+    if admin_user.user_id in user_ids:
+        console.print("[yellow]Your own account is in the selection and will be skipped.[/yellow]")
+    if get_validated_input(prompt=f"{mode.capitalize()} {len(user_ids)} user(s)? (yes/no): ", validation_type="yes_no") not in ['yes', 'y']:
+        console.print("[yellow]Cancelled.[/yellow]")
+        return
+
+    with console.status(f"[cyan]Applying {mode}...[/cyan]") as status:
+        report = bulk_update_users(user_ids, mode=mode, delete_reviews=delete_reviews,
+                                   protected_user_ids=[admin_user.user_id],
+                                   progress_callback=lambda r: status.update(
+                                       f"[cyan]Applying {mode}... {r['processed']}/{r['requested']} user(s)[/cyan]"))
+
+    console.print(f"[green]{report['changed']} user(s) {mode}d, {report['reviews_deleted']} review(s) deleted.[/green]")
+    for first_id, last_id, error in report['failed']:
+        console.print(f"[red]User IDs {first_id}-{last_id} failed: {error}[/red]")
+    log(f"Admin '{admin_user.username}' bulk-{mode}d {report['changed']} user(s).")
+
 def view_all_orders(admin_user):
     if not admin_user or not admin_user.is_admin:
         console.print("[red]Permission denied. Admin access required.[/red]")
@@ -135,6 +239,349 @@ def update_order_status_admin():
     else:
         console.print(f"[red]Failed to update status for order {order_id}.[/red]")
 
+def archive_orders_admin(admin_user):
+    """Moves old Delivered/Cancelled orders into the archive database."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    console.print("\n[bold cyan]Archive Old Orders[/bold cyan]")
+    days_str = get_validated_input(
+        prompt=f"Archive Delivered/Cancelled orders older than how many days? (default {ARCHIVE_AFTER_DAYS}): ",
+        validation_type="integer",
+        options={"min_val": 0},
+        optional=True,
+        default_value=str(ARCHIVE_AFTER_DAYS)
+    )
+    older_than_days = int(days_str)
+
+    confirm = get_validated_input(
+        prompt=f"Move finished orders older than {older_than_days} days to the archive? (yes/no): ",
+        validation_type="yes_no"
+    )
+    if confirm not in ['yes', 'y']:
+        console.print("[yellow]Archival cancelled.[/yellow]")
+        return
+
+    archived_count = archive_old_orders(older_than_days=older_than_days)
+    console.print(f"[green]{archived_count} order(s) archived.[/green]")
+    log(f"Admin '{admin_user.username}' archived {archived_count} orders older than {older_than_days} days.")
+
+def rating_trends_admin(admin_user):
+    """Lists restaurants whose recent weekly ratings have dropped, with a sparkline of each one's trend."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    min_drop = float(get_validated_input(prompt="Minimum rating drop to report [0.3]: ", validation_type="float_positive",
+                                         optional=True, default_value="0.3"))
+    with console.status("[cyan]Comparing weekly ratings...[/cyan]"):
+        slipping = find_slipping_restaurants(min_drop=min_drop)
+    if not slipping:
+        console.print(f"[green]No restaurant's rating over the last {SLIPPING_RECENT_WEEKS} weeks is {min_drop:.2f}+ below "
+                      f"the {SLIPPING_BASELINE_WEEKS} weeks before.[/green]")
+        return
+
+    table = Table(title=f"Slipping Restaurants (last {SLIPPING_RECENT_WEEKS} weeks vs the {SLIPPING_BASELINE_WEEKS} before)")
+    table.add_column("Restaurant")
+    table.add_column("Before", justify="right")
+    table.add_column("Recent", justify="right")
+    table.add_column("Drop", justify="right", style="red")
+    table.add_column(f"Weekly Avg ({RATING_TREND_WEEKS + SLIPPING_RECENT_WEEKS}w)")
+    for entry in slipping:
+        trend = get_rating_trend(entry['restaurant_id'], weeks=RATING_TREND_WEEKS + SLIPPING_RECENT_WEEKS)
+        table.add_row(entry['restaurant_name'] or str(entry['restaurant_id']),
+                      f"{entry['baseline_average']:.2f} ({entry['baseline_reviews']})",
+                      f"{entry['recent_average']:.2f} ({entry['recent_reviews']})",
+                      f"-{entry['drop']:.2f}",
+                      sparkline([week['average_rating'] for week in trend]))
+    console.print(table)
+
+def export_orders_admin(admin_user):
+    """Streams orders with their line items for a date range to a CSV or JSONL file."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    date_pattern = r"\d{4}-\d{2}-\d{2}"
+    start_date = get_validated_input(
+        prompt="Start date (YYYY-MM-DD, press Enter for the first order): ",
+        validation_type="regex",
+        options={"pattern": date_pattern},
+        optional=True,
+        default_value=None,
+        custom_error_message="[red]Please enter a date as YYYY-MM-DD.[/red]"
+    )
+    end_date = get_validated_input(
+        prompt="End date (YYYY-MM-DD, inclusive, press Enter for today): ",
+        validation_type="regex",
+        options={"pattern": date_pattern},
+        optional=True,
+        default_value=None,
+        custom_error_message="[red]Please enter a date as YYYY-MM-DD.[/red]"
+    )
+    try:
+        for value in (start_date, end_date):
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        console.print("[red]Invalid date. Export cancelled.[/red]")
+        return
+    if start_date and end_date and start_date > end_date:
+        console.print("[red]Start date is after end date. Export cancelled.[/red]")
+        return
+
+    fmt = get_validated_input(
+        prompt="Format - (1) CSV or (2) JSONL: ",
+        validation_type="choice",
+        options={"choices": ['1', '2']}
+    )
+    fmt = "csv" if fmt == '1' else "jsonl"
+    compress = get_validated_input(prompt="Compress with gzip? (yes/no): ", validation_type="yes_no") in ['yes', 'y']
+    suggested_path = default_export_path(start_date, end_date, fmt, compress)
+    path = get_validated_input(
+        prompt=f"Output file (press Enter for {suggested_path}): ",
+        validation_type="not_empty",
+        optional=True,
+        default_value=suggested_path
+    )
+
+    with console.status("[cyan]Exporting orders...[/cyan]") as status:
+        result = export_orders(path, start_date, end_date, fmt=fmt, compress=compress,
+                               progress_callback=lambda rows: status.update(f"[cyan]Exporting orders... {rows} rows written[/cyan]"))
+    if result is None:
+        console.print("[red]Export failed. Check logs for details.[/red]")
+        return
+    orders_exported, rows_written = result
+    console.print(f"[green]Exported {orders_exported} order(s) ({rows_written} line(s)) to {path}.[/green]")
+    log(f"Admin '{admin_user.username}' exported {orders_exported} orders to {path}.")
+
+def view_sales_report_admin(admin_user):
+    """Prints a sales report from the precomputed rollup tables."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    days_str = get_validated_input(
+        prompt="Report period in days (press Enter for all time): ",
+        validation_type="integer",
+        options={"min_val": 1},
+        optional=True,
+        default_value=None
+    )
+    days = int(days_str) if days_str else None
+    period_label = f"Last {days} Days" if days else "All Time"
+
+    new_orders = refresh_sales_rollups()
+    if new_orders:
+        console.print(f"[dim]Rollups updated with {new_orders} new order(s).[/dim]")
+
+    summary = get_sales_summary(days)
+    console.print(f"\n[bold cyan]Sales Report ({period_label})[/bold cyan]")
+    console.print(f"Orders: [bold]{summary['orders']}[/bold]  |  Revenue: [bold green]₹{summary['revenue']:.2f}[/bold green]  |  "
+                  f"Avg Basket: ₹{summary['avg_basket_value']:.2f}  |  Avg Items/Order: {summary['avg_items_per_order']:.2f}")
+
+    restaurant_table = Table(title="Top Restaurants by Revenue", show_header=True, header_style="bold magenta")
+    restaurant_table.add_column("Restaurant", min_width=20)
+    restaurant_table.add_column("Orders", justify="right")
+    restaurant_table.add_column("Revenue (₹)", justify="right")
+    restaurant_table.add_column("Avg Basket (₹)", justify="right")
+    for row in get_revenue_by_restaurant(days):
+        restaurant_table.add_row(row['restaurant_name'] or str(row['restaurant_id']), str(row['orders']),
+                                 f"{row['revenue']:.2f}", f"{row['avg_basket_value']:.2f}")
+    console.print(restaurant_table)
+
+    items_table = Table(title="Best-Selling Items (All Time)", show_header=True, header_style="bold magenta")
+    items_table.add_column("Item", min_width=20)
+    items_table.add_column("Restaurant")
+    items_table.add_column("Units Sold", justify="right")
+    items_table.add_column("Revenue (₹)", justify="right")
+    for row in get_top_items(limit=10):
+        items_table.add_row(row['name'], row['restaurant_name'] or "N/A", str(row['units_sold']), f"{row['revenue']:.2f}")
+    console.print(items_table)
+
+    hours_table = Table(title="Orders by Hour of Day", show_header=True, header_style="bold magenta")
+    hours_table.add_column("Hour")
+    hours_table.add_column("Orders", justify="right")
+    hours_table.add_column("Revenue (₹)", justify="right")
+    for row in get_orders_by_hour_of_day(days):
+        if row['orders']:
+            hours_table.add_row(f"{row['hour_of_day']:02d}:00", str(row['orders']), f"{row['revenue']:.2f}")
+    console.print(hours_table)
+    log(f"Admin '{admin_user.username}' viewed the sales report ({period_label}).")
+
+def order_analytics_admin(admin_user):
+    """Ad-hoc order analytics computed in memory by the vectorized engine (analytics.engine)."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    console.print("\n[bold cyan]Order Analytics[/bold cyan]")
+    console.print("1. Top Items by Units Sold")
+    console.print("2. Order Value Percentiles per Restaurant")
+    console.print("3. Items Frequently Bought Together")
+    console.print("4. Customer Cohort Repeat Rates")
+    console.print("5. Benchmark Against SQL")
+    choice = get_validated_input(
+        prompt="Choose an analysis: ",
+        validation_type="choice",
+        options={"choices": ['1', '2', '3', '4', '5']}
+    )
+
+    if choice == '5':
+        with console.status("[cyan]Running benchmark...[/cyan]"):
+            results = analytics_engine.benchmark_against_sql()
+        if not results:
+            console.print("[red]Benchmark failed. Check logs for details.[/red]")
+            return
+        table = Table(title="NumPy Engine vs SQL (best of 3)", show_header=True, header_style="bold magenta")
+        table.add_column("Analysis", min_width=30)
+        table.add_column("NumPy (ms)", justify="right")
+        table.add_column("SQL (ms)", justify="right")
+        for row in results:
+            table.add_row(row['analysis'], f"{row['numpy_ms']:.1f}", "-" if row['sql_ms'] is None else f"{row['sql_ms']:.1f}")
+        console.print(table)
+        console.print("[dim]NumPy timings exclude the one-off array load shown in the first row.[/dim]")
+        return
+
+    days_str = get_validated_input(
+        prompt="Only include orders from the last N days (press Enter for all): ",
+        validation_type="integer",
+        options={"min_val": 1},
+        optional=True,
+        default_value=None
+    )
+    with console.status("[cyan]Loading orders...[/cyan]"):
+        data = analytics_engine.load_order_arrays(int(days_str) if days_str else None)
+    if data is None:
+        console.print("[red]Could not load order data. Check logs for details.[/red]")
+        return
+    if data.order_count == 0:
+        console.print("[yellow]No orders in the selected period.[/yellow]")
+        return
+
+    if choice == '1':
+        table = Table(title="Top Items by Units Sold", show_header=True, header_style="bold magenta")
+        table.add_column("Item ID", style="dim")
+        table.add_column("Item", min_width=20)
+        table.add_column("Units Sold", justify="right")
+        table.add_column("Revenue (₹)", justify="right")
+        for row in analytics_engine.top_items(data, limit=15):
+            table.add_row(str(row['item_id']), row['name'], str(row['units_sold']), f"{row['revenue']:.2f}")
+    elif choice == '2':
+        restaurant_names = {r.restaurant_id: r.name for r in Restaurant.get_all()}
+        table = Table(title="Order Value Percentiles per Restaurant", show_header=True, header_style="bold magenta")
+        table.add_column("Restaurant", min_width=20)
+        table.add_column("Orders", justify="right")
+        table.add_column("Mean (₹)", justify="right")
+        table.add_column("P50 (₹)", justify="right")
+        table.add_column("P90 (₹)", justify="right")
+        table.add_column("P99 (₹)", justify="right")
+        for row in analytics_engine.revenue_percentiles_by_restaurant(data):
+            table.add_row(restaurant_names.get(row['restaurant_id'], str(row['restaurant_id'])), str(row['orders']),
+                          f"{row['mean']:.2f}", f"{row['p50']:.2f}", f"{row['p90']:.2f}", f"{row['p99']:.2f}")
+    elif choice == '3':
+        table = Table(title="Items Frequently Bought Together", show_header=True, header_style="bold magenta")
+        table.add_column("Item A", min_width=20)
+        table.add_column("Item B", min_width=20)
+        table.add_column("Orders Together", justify="right")
+        for row in analytics_engine.item_cooccurrence(data):
+            table.add_row(row['name_a'], row['name_b'], str(row['orders_together']))
+    else:
+        table = Table(title="Customer Cohort Repeat Rates", show_header=True, header_style="bold magenta")
+        table.add_column("First Order Month")
+        table.add_column("Customers", justify="right")
+        table.add_column("Ever Repeated", justify="right")
+        table.add_column("Month +1", justify="right")
+        table.add_column("Month +2", justify="right")
+        table.add_column("Month +3", justify="right")
+        for row in analytics_engine.cohort_repeat_rates(data):
+            table.add_row(row['cohort'], str(row['customers']), f"{row['repeat_rate']:.0%}",
+                          f"{row['month_1']:.0%}", f"{row['month_2']:.0%}", f"{row['month_3']:.0%}")
+    console.print(table)
+    console.print(f"[dim]Computed over {data.order_count} orders and {data.item_row_count} order lines.[/dim]")
+
+def view_system_metrics_admin(admin_user):
+    """Shows in-process timers (with percentiles) and counters recorded since startup."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    cache_stats = user_cache.stats()  # Also refreshes the user_cache.* gauges in the snapshot
+    snapshot = get_metrics_snapshot()
+    console.print(f"\n[bold cyan]System Metrics[/bold cyan]  [dim](bcrypt cost {BCRYPT_ROUNDS}, auth pool: {AUTH_POOL_KIND} x{AUTH_POOL_WORKERS})[/dim]")
+    if LOGIN_THROTTLE_ENABLED:
+        throttle_stats = get_login_throttle().stats()
+        console.print(f"[dim]Login throttle: {LOGIN_MAX_FAILURES_PER_USER} failures/user, {LOGIN_MAX_FAILURES_PER_CLIENT} failures/client "
+                      f"per {LOGIN_WINDOW_SECONDS}s; tracking {throttle_stats['tracked_keys']} key(s), "
+                      f"{throttle_stats['blocked_keys']} currently blocked.[/dim]")
+    else:
+        console.print("[dim]Login throttle: disabled.[/dim]")
+    console.print(f"[dim]User cache: {cache_stats['entries']} user(s), {cache_stats['negative_entries']} cached miss(es); "
+                  f"hit rate {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} hits, {cache_stats['negative_hits']} negative hits, "
+                  f"{cache_stats['misses']} misses, {cache_stats['evictions']} evictions, {cache_stats['invalidations']} invalidations).[/dim]")
+    if not snapshot["timers"] and not snapshot["counters"]:
+        console.print("[yellow]No metrics recorded yet in this session.[/yellow]")
+        return
+
+    if snapshot["timers"]:
+        timers_table = Table(title="Timings", show_header=True, header_style="bold magenta")
+        timers_table.add_column("Metric", min_width=24)
+        timers_table.add_column("Count", justify="right")
+        timers_table.add_column("Avg (ms)", justify="right")
+        timers_table.add_column("P50 (ms)", justify="right")
+        timers_table.add_column("P95 (ms)", justify="right")
+        timers_table.add_column("P99 (ms)", justify="right")
+        timers_table.add_column("Total (ms)", justify="right")
+        for name, stats in snapshot["timers"].items():
+            timers_table.add_row(name, str(stats['count']), f"{stats['avg_ms']:.1f}", f"{stats['p50_ms']:.1f}",
+                                 f"{stats['p95_ms']:.1f}", f"{stats['p99_ms']:.1f}", f"{stats['total_ms']:.1f}")
+        console.print(timers_table)
+
+    if snapshot["counters"]:
+        counters_table = Table(title="Counters", show_header=True, header_style="bold magenta")
+        counters_table.add_column("Metric", min_width=24)
+        counters_table.add_column("Value", justify="right")
+        for name, value in snapshot["counters"].items():
+            counters_table.add_row(name, str(value))
+        console.print(counters_table)
+
+def calibrate_bcrypt_cost_admin(admin_user):
+    """Measures bcrypt cost on this machine and recommends a SWIGATO_BCRYPT_ROUNDS value."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    target_str = get_validated_input(
+        prompt="Target hash time per login in ms (press Enter for 250): ",
+        validation_type="integer",
+        options={"min_val": 10, "max_val": 5000},
+        optional=True,
+        default_value="250"
+    )
+    target_ms = int(target_str)
+    with console.status("[cyan]Measuring bcrypt cost on this machine...[/cyan]"):
+        measurements, recommended = calibrate_bcrypt_cost(target_ms=target_ms)
+
+    table = Table(title=f"bcrypt Hash Time (target {target_ms} ms)", show_header=True, header_style="bold magenta")
+    table.add_column("Cost", justify="right")
+    table.add_column("Median (ms)", justify="right")
+    table.add_column("", justify="left")
+    for rounds, median_ms in measurements:
+        notes = []
+        if rounds == recommended:
+            notes.append("[green]recommended[/green]")
+        if rounds == BCRYPT_ROUNDS:
+            notes.append("[cyan]current[/cyan]")
+        table.add_row(str(rounds), f"{median_ms:.1f}", ", ".join(notes))
+    console.print(table)
+    if recommended == BCRYPT_ROUNDS:
+        console.print(f"[green]The configured cost ({BCRYPT_ROUNDS}) already matches the target.[/green]")
+    else:
+        console.print(f"[yellow]Set SWIGATO_BCRYPT_ROUNDS={recommended} and restart. Existing passwords are rehashed "
+                      f"to the new cost as users log in.[/yellow]")
+    log(f"Admin '{admin_user.username}' ran bcrypt calibration: recommended cost {recommended} (current {BCRYPT_ROUNDS}).")
+
 def delete_review_admin():
     """Allows admin to delete a review."""
     console.print("\n[bold cyan]Delete a Review[/bold cyan]")
@@ -191,6 +638,169 @@ def delete_review_admin():
     else:
         console.print("[yellow]Review deletion cancelled.[/yellow]")
 
+def review_moderation_queue_admin(admin_user):
+    """Runs the near-duplicate/burst spam scan and works through the ranked moderation queue."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    console.print("\n[bold cyan]Review Moderation Queue[/bold cyan]")
+    if get_validated_input(prompt="Run a spam scan first? (yes/no): ", validation_type="yes_no") in ['yes', 'y']:
+        with console.status("[cyan]Scanning reviews...[/cyan]") as status:
+            summary = scan_reviews_for_spam(progress_callback=lambda read: status.update(f"[cyan]Scanning reviews... {read} read[/cyan]"))
+        if summary is None:
+            console.print("[red]Spam scan failed. Check logs.[/red]")
+            return
+        console.print(f"[green]Scanned {summary['reviews']} review(s) in {summary['seconds']:.1f}s: "
+                      f"{summary['groups']} near-duplicate group(s), {summary['burst_reviews']} burst review(s), "
+                      f"{summary['flagged']} queued.[/green]")
+        log(f"Admin '{admin_user.username}' ran a review spam scan: {summary['flagged']} review(s) queued.")
+
+    while True:
+        entries = get_moderation_queue(limit=25)
+        if not entries:
+            console.print("[yellow]The moderation queue is empty.[/yellow]")
+            return
+        table = Table(title="Moderation Queue (highest score first)")
+        table.add_column("Review ID", style="dim")
+        table.add_column("Score", justify="right")
+        table.add_column("Group")
+        table.add_column("User")
+        table.add_column("Restaurant")
+        table.add_column("Rating")
+        table.add_column("Comment")
+        table.add_column("Reason")
+        for entry in entries:
+            table.add_row(str(entry['review_id']), f"{entry['score']:.0f}",
+                          str(entry['cluster_id']) if entry['cluster_id'] is not None else "-",
+                          entry['username'], entry['restaurant_name'] or "-", str(entry['rating']),
+                          entry['comment'] or "", entry['reason'])
+        console.print(table)
+
+        action = get_validated_input(prompt="(1) Delete reviews (2) Dismiss reviews (0) Done: ",
+                                     validation_type="choice", options={"choices": ['1', '2', '0']})
+        if action == '0':
+            return
+        raw_ids = get_validated_input(prompt="Review IDs (comma-separated): ", validation_type="regex",
+                                      options={"pattern": r"^\s*\d+(\s*,\s*\d+)*\s*$"},
+                                      custom_error_message="Enter numeric IDs separated by commas.")
+        review_ids = [int(part) for part in raw_ids.split(",")]
+        if action == '1':
+            if get_validated_input(prompt=f"Delete {len(review_ids)} review(s)? (yes/no): ", validation_type="yes_no") not in ['yes', 'y']:
+                console.print("[yellow]Cancelled.[/yellow]")
+                continue
+            deleted = sum(1 for review_id in review_ids if Review.delete_review(review_id))
+            console.print(f"[green]{deleted} review(s) deleted.[/green]")
+            log(f"Admin '{admin_user.username}' deleted {deleted} review(s) from the moderation queue.")
+        else:
+            dismissed = dismiss_from_queue(review_ids)
+            console.print(f"[green]{dismissed} review(s) dismissed.[/green]")
+
+def review_sentiment_admin(admin_user):
+    """Scores unscored reviews, then shows sentiment per restaurant and 5-star reviews with negative text."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    console.print("\n[bold cyan]Review Sentiment[/bold cyan]")
+    if get_validated_input(prompt="Score reviews that have no sentiment yet? (yes/no): ", validation_type="yes_no") in ['yes', 'y']:
+        rescore = get_validated_input(prompt="Re-score every review instead (e.g. after a lexicon change)? (yes/no): ",
+                                      validation_type="yes_no") in ['yes', 'y']
+        with console.status("[cyan]Scoring reviews...[/cyan]") as status:
+            report = backfill_review_sentiment(rescore=rescore, progress_callback=lambda r: status.update(
+                f"[cyan]Scoring reviews... {r['scored']} scored[/cyan]"))
+        console.print(f"[green]Scored {report['scored']} review(s) in {report['seconds']:.2f}s "
+                      f"({report['reviews_per_second']:.0f} reviews/s).[/green]")
+
+    restaurants = get_restaurant_sentiment()
+    if not restaurants:
+        console.print("[yellow]No scored reviews yet.[/yellow]")
+        return
+    table = Table(title="Sentiment by Restaurant (most negative first)")
+    table.add_column("Restaurant")
+    table.add_column("Scored Reviews", justify="right")
+    table.add_column("Avg Sentiment", justify="right")
+    table.add_column("Negative", justify="right")
+    for row in restaurants:
+        table.add_row(row['restaurant_name'] or str(row['restaurant_id']), str(row['scored_count']),
+                      f"{row['average_sentiment']:+.3f}", f"{row['negative_count']} ({row['negative_count'] / row['scored_count']:.0%})")
+    console.print(table)
+
+    mismatches, _ = Review.get_rating_mismatches(limit=20)
+    if not mismatches:
+        console.print("[green]No 5-star reviews with negative text.[/green]")
+        return
+    table = Table(title="5-Star Reviews with Negative Text")
+    table.add_column("Review ID", style="dim")
+    table.add_column("Restaurant")
+    table.add_column("User")
+    table.add_column("Sentiment", justify="right")
+    table.add_column("Comment")
+    for review in mismatches:
+        table.add_row(str(review.review_id), review.restaurant_name, review.username, f"{review.sentiment:+.2f}", review.comment or "")
+    console.print(table)
+
+def bulk_moderate_reviews_admin(admin_user):
+    """Hides, unhides or deletes every review matching a filter, after a dry-run count."""
+    if not admin_user or not admin_user.is_admin:
+        console.print("[red]Permission denied. Admin access required.[/red]")
+        return
+
+    console.print("\n[bold cyan]Bulk Review Moderation[/bold cyan]")
+    console.print("Press Enter to skip any filter.")
+    date_pattern = r"\d{4}-\d{2}-\d{2}"
+    filters = {
+        "username": get_validated_input(prompt="Username: ", validation_type="not_empty", optional=True),
+        "restaurant_id": get_validated_input(prompt="Restaurant ID: ", validation_type="integer", options={"min_val": 1}, optional=True),
+        "start_date": get_validated_input(prompt="From date (YYYY-MM-DD): ", validation_type="regex", options={"pattern": date_pattern},
+                                          optional=True, custom_error_message="[red]Please enter a date as YYYY-MM-DD.[/red]"),
+        "end_date": get_validated_input(prompt="To date (YYYY-MM-DD, inclusive): ", validation_type="regex", options={"pattern": date_pattern},
+                                        optional=True, custom_error_message="[red]Please enter a date as YYYY-MM-DD.[/red]"),
+        "min_rating": get_validated_input(prompt="Min rating (1-5): ", validation_type="integer", options={"min_val": 1, "max_val": 5}, optional=True),
+        "max_rating": get_validated_input(prompt="Max rating (1-5): ", validation_type="integer", options={"min_val": 1, "max_val": 5}, optional=True),
+        "text": get_validated_input(prompt="Comment contains: ", validation_type="not_empty", optional=True),
+        "hidden": {"1": None, "2": False, "3": True}[get_validated_input(
+            prompt="Include (1) visible and hidden (2) visible only (3) hidden only [1]: ", validation_type="choice",
+            options={"choices": ['1', '2', '3']}, optional=True, default_value='1')],
+    }
+    if filters["restaurant_id"]:
+        filters["restaurant_id"] = int(filters["restaurant_id"])
+
+    all_reviews = not has_review_filters(filters)
+    if all_reviews:
+        console.print("[bold yellow]No filters set: this would act on EVERY review.[/bold yellow]")
+        if get_validated_input(prompt="Select all reviews? (yes/no): ", validation_type="yes_no") not in ['yes', 'y']:
+            console.print("[yellow]Cancelled.[/yellow]")
+            return
+    counts = count_matching_reviews(filters, all_reviews=all_reviews)
+    if counts is None:
+        console.print("[red]Invalid filters. Check the dates.[/red]")
+        return
+    console.print(f"Dry run: [bold]{counts['matching']}[/bold] review(s) match across {counts['restaurants']} restaurant(s); "
+                  f"{counts['hidden']} already hidden.")
+    if counts['matching'] == 0:
+        return
+    mode = {"1": "hide", "2": "delete", "3": "unhide", "0": None}[get_validated_input(
+        prompt="Action: (1) Hide (2) Delete (3) Unhide (0) Cancel: ", validation_type="choice",
+        options={"choices": ['1', '2', '3', '0']})]
+    if mode is None:
+        console.print("[yellow]Cancelled.[/yellow]")
+        return
+    if get_validated_input(prompt=f"{mode.capitalize()} {counts['matching']} review(s)? (yes/no): ", validation_type="yes_no") not in ['yes', 'y']:
+        console.print("[yellow]Cancelled.[/yellow]")
+        return
+
+    with console.status(f"[cyan]Applying {mode}...[/cyan]") as status:
+        report = bulk_moderate_reviews(filters, mode=mode, all_reviews=all_reviews, progress_callback=lambda r: status.update(
+            f"[cyan]Applying {mode}... {r['processed']}/{r['matching']} review(s)[/cyan]"))
+    if report is None:
+        console.print("[red]Bulk moderation failed. Check logs.[/red]")
+        return
+    console.print(f"[green]{report['changed']} of {report['matching']} matching review(s) changed ({mode}).[/green]")
+    for first_id, last_id, error in report['failed']:
+        console.print(f"[red]Review IDs {first_id}-{last_id} failed: {error}[/red]")
+    log(f"Admin '{admin_user.username}' bulk-{mode} {report['changed']} review(s) with filters {filters}.")
+
 def delete_user_by_admin(admin_user, username_to_delete):
     if not admin_user or not admin_user.is_admin:
         console.print("[red]Permission denied. Admin access required.[/red]")
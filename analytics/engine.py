@@ -0,0 +1,320 @@
+import datetime
+import time
+from utils.logger import log
+from utils.database import get_db_connection, attach_archive_database, archive_database_exists
+import numpy as np
+
+# Rows pulled per fetchmany() call while loading columns into arrays
+ENGINE_CHUNK_ROWS = 50000
+
+def _fetch_columns(cursor, query, params, dtypes, chunk_size=ENGINE_CHUNK_ROWS):
+    """
+    Runs `query` and returns one NumPy array per selected column, each built directly in its own
+    dtype (nothing detours through float64, so int64 ids and paise stay exact).
+    Rows are read in fetchmany() chunks and converted chunk by chunk, so the full result never
+    sits in memory as Python tuples.
+    """
+    cursor.execute(query, params)
+    chunks = [[] for _ in dtypes]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for column_chunks, values, dtype in zip(chunks, zip(*rows), dtypes):
+            column_chunks.append(np.array(values, dtype=dtype))
+    return [np.concatenate(column_chunks) if column_chunks else np.empty(0, dtype=dtype)
+            for column_chunks, dtype in zip(chunks, dtypes)]
+
+def _rupees(paise):
+    return int(paise) / 100
+
+class OrderArrays:
+    """Column arrays for orders and their line items, loaded once and shared by the analyses below."""
+    def __init__(self, order_id, user_id, restaurant_id, total_paise, month_idx,
+                 item_order_id, item_id, quantity, price_paise, item_names):
+        # Orders (one entry per order)
+        self.order_id = order_id
+        self.user_id = user_id            # -1 for guest orders
+        self.restaurant_id = restaurant_id
+        self.total_paise = total_paise    # Money is kept in integer paise so sums and percentiles are exact
+        self.month_idx = month_idx        # year * 12 + (month - 1)
+        # Line items (one entry per order_items row)
+        self.item_order_id = item_order_id
+        self.item_id = item_id            # 0 where the menu item id was not recorded
+        self.quantity = quantity
+        self.price_paise = price_paise
+        self.item_names = item_names      # {item_id: name}
+
+    @property
+    def order_count(self):
+        return len(self.order_id)
+
+    @property
+    def item_row_count(self):
+        return len(self.item_id)
+
+def load_order_arrays(days=None, include_archived=True, chunk_size=ENGINE_CHUNK_ROWS):
+    """
+    Loads order and order_items columns for orders placed in the last `days` days (all orders if None)
+    into NumPy arrays. Archived orders are read from the cold-storage archive too when it exists
+    (archive_old_orders moves the oldest history there, which cohorts and percentiles need).
+    Returns an OrderArrays instance, or None if loading fails.
+    """
+    since = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S") if days else "0000-00-00"
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        schemas = ["main"]
+        if include_archived and archive_database_exists():
+            attach_archive_database(conn)
+            schemas.append("archive")
+        # Archiving moves rows, so the schemas never share an order_id and UNION ALL is exact
+        order_id, user_id, restaurant_id, total_paise, month_idx = _fetch_columns(cursor, " UNION ALL ".join(f"""
+            SELECT order_id, COALESCE(user_id, -1), restaurant_id, CAST(ROUND(total_amount * 100) AS INTEGER),
+                   CAST(SUBSTR(order_date, 1, 4) AS INTEGER) * 12 + CAST(SUBSTR(order_date, 6, 2) AS INTEGER) - 1
+            FROM {schema}.orders
+            WHERE order_date >= ?
+        """ for schema in schemas) + " ORDER BY 1", (since,) * len(schemas),
+            (np.int64, np.int64, np.int64, np.int64, np.int64), chunk_size)
+
+        item_order_id, item_id, quantity, price_paise = _fetch_columns(cursor, " UNION ALL ".join(f"""
+            SELECT oi.order_id, COALESCE(oi.item_id, 0), oi.quantity, CAST(ROUND(oi.price * 100) AS INTEGER)
+            FROM {schema}.order_items oi
+            JOIN {schema}.orders o ON o.order_id = oi.order_id
+            WHERE o.order_date >= ?
+        """ for schema in schemas) + " ORDER BY 1", (since,) * len(schemas),
+            (np.int64, np.int64, np.int64, np.int64), chunk_size)
+
+        cursor.execute("SELECT item_id, MAX(name) AS name FROM ("
+                       + " UNION ALL ".join(f"SELECT COALESCE(item_id, 0) AS item_id, MAX(name) AS name FROM {schema}.order_items GROUP BY COALESCE(item_id, 0)" for schema in schemas)
+                       + ") GROUP BY item_id")
+        item_names = {row['item_id']: row['name'] for row in cursor.fetchall()}
+
+        return OrderArrays(order_id, user_id, restaurant_id, total_paise, month_idx,
+                           item_order_id, item_id, quantity, price_paise, item_names)
+    except Exception as e:
+        log(f"Error loading order arrays for analytics: {e}")
+        return None
+    finally:
+        conn.close()
+
+def top_items(data, limit=10):
+    """Top items by units sold, grouped with np.unique/np.bincount. Returns a list of dicts."""
+    if data is None or data.item_row_count == 0:
+        return []
+    keys, inverse = np.unique(data.item_id, return_inverse=True)
+    units = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(units, inverse, data.quantity)
+    revenue = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(revenue, inverse, data.quantity * data.price_paise)
+    order = np.argsort(-units, kind="stable")[:limit]
+    return [{"item_id": int(keys[i]), "name": data.item_names.get(int(keys[i]), "Unknown"),
+             "units_sold": int(units[i]), "revenue": _rupees(revenue[i])} for i in order]
+
+def revenue_percentiles_by_restaurant(data, percentiles=(50, 90, 99)):
+    """
+    Per-restaurant order-value percentiles. Orders are sorted once by (restaurant, amount) and each
+    restaurant's slice is indexed directly, so no per-group sort is needed.
+
+    Percentiles are nearest-rank (the value at rank ceil(p/100 * n), NumPy's "inverted_cdf"), the
+    same definition _sql_revenue_percentiles uses, so every pN is an actual order value.
+    """
+    if data is None or data.order_count == 0:
+        return []
+    order = np.lexsort((data.total_paise, data.restaurant_id))
+    rest_sorted = data.restaurant_id[order]
+    amount_sorted = data.total_paise[order]
+    keys, starts, counts = np.unique(rest_sorted, return_index=True, return_counts=True)
+    sums = np.add.reduceat(amount_sorted, starts)
+    results = []
+    for key, start, count, total in zip(keys, starts, counts, sums):
+        group = amount_sorted[start:start + count]
+        values = np.percentile(group, percentiles, method="inverted_cdf")
+        row = {"restaurant_id": int(key), "orders": int(count), "revenue": _rupees(total), "mean": int(total) / int(count) / 100}
+        for p, v in zip(percentiles, values):
+            row[f"p{p}"] = _rupees(v)
+        results.append(row)
+    results.sort(key=lambda r: r["revenue"], reverse=True)
+    return results
+
+def item_cooccurrence(data, limit=20, min_count=2):
+    """
+    Most frequent item pairs bought together in one order (combo candidates).
+
+    Builds the sparse item x item co-occurrence matrix in coordinate form: for every order the
+    distinct items are expanded into all (a, b) pairs with a < b using np.repeat, each pair is
+    encoded as a single integer key, and np.unique counts the non-zero cells.
+    """
+    if data is None or data.item_row_count == 0:
+        return []
+    # One entry per distinct (order, item) so quantities don't inflate pair counts
+    item_keys, item_codes = np.unique(data.item_id, return_inverse=True)
+    n_items = len(item_keys)
+    pair_key = np.unique(data.item_order_id * n_items + item_codes)
+    orders = pair_key // n_items
+    codes = pair_key % n_items
+
+    # Position of the last entry of each entry's order; entries after i in the same order pair with i
+    _, order_starts, order_sizes = np.unique(orders, return_index=True, return_counts=True)
+    group_end = np.repeat(order_starts + order_sizes, order_sizes)
+    positions = np.arange(len(codes))
+    partners = group_end - positions - 1
+    total_pairs = int(partners.sum())
+    if total_pairs == 0:
+        return []
+    left = np.repeat(positions, partners)
+    offsets = np.arange(total_pairs) - np.repeat(np.cumsum(partners) - partners, partners)
+    right = left + 1 + offsets
+
+    cells, counts = np.unique(codes[left] * n_items + codes[right], return_counts=True)
+    keep = counts >= min_count
+    cells, counts = cells[keep], counts[keep]
+    top = np.argsort(-counts, kind="stable")[:limit]
+    results = []
+    for i in top:
+        a, b = item_keys[cells[i] // n_items], item_keys[cells[i] % n_items]
+        results.append({"item_a": int(a), "name_a": data.item_names.get(int(a), "Unknown"),
+                        "item_b": int(b), "name_b": data.item_names.get(int(b), "Unknown"),
+                        "orders_together": int(counts[i])})
+    return results
+
+def cohort_repeat_rates(data, horizon_months=3):
+    """
+    Groups registered customers by the month of their first order and reports, per cohort, the share
+    who ordered again in any later month and in each of the next `horizon_months` months.
+    """
+    if data is None or data.order_count == 0:
+        return []
+    registered = data.user_id >= 0
+    users, user_codes = np.unique(data.user_id[registered], return_inverse=True)
+    if len(users) == 0:
+        return []
+    months = data.month_idx[registered]
+    first_month = np.full(len(users), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first_month, user_codes, months)
+    offsets = months - first_month[user_codes]
+
+    # Distinct (user, month offset) activity so several orders in one month count once
+    span = int(offsets.max()) + 1
+    active = np.unique(user_codes * span + offsets)
+    active_users = active // span
+    active_offsets = active % span
+
+    cohorts, cohort_of_user = np.unique(first_month, return_inverse=True)
+    cohort_sizes = np.bincount(cohort_of_user, minlength=len(cohorts))
+    repeat_users = np.unique(active_users[active_offsets > 0])
+    repeat_counts = np.bincount(cohort_of_user[repeat_users], minlength=len(cohorts))
+    by_offset = []
+    for m in range(1, horizon_months + 1):
+        hit_users = active_users[active_offsets == m]
+        by_offset.append(np.bincount(cohort_of_user[hit_users], minlength=len(cohorts)))
+
+    results = []
+    for i, cohort in enumerate(cohorts):
+        size = int(cohort_sizes[i])
+        row = {"cohort": f"{cohort // 12:04d}-{cohort % 12 + 1:02d}", "customers": size,
+               "repeat_rate": float(repeat_counts[i]) / size if size else 0.0}
+        for m, counts in enumerate(by_offset, start=1):
+            row[f"month_{m}"] = float(counts[i]) / size if size else 0.0
+        results.append(row)
+    return results
+
+# --- SQL equivalents, used to benchmark and cross-check the vectorized versions ---
+
+def _sql_top_items(cursor, limit=10):
+    cursor.execute("""
+        SELECT COALESCE(item_id, 0) AS item_id, MAX(name) AS name,
+               SUM(quantity) AS units_sold, SUM(quantity * CAST(ROUND(price * 100) AS INTEGER)) / 100.0 AS revenue
+        FROM order_items GROUP BY COALESCE(item_id, 0)
+        ORDER BY units_sold DESC LIMIT ?
+    """, (limit,))
+    return cursor.fetchall()
+
+def _sql_revenue_percentiles(cursor):
+    # Nearest-rank p50/p90/p99 (rank ceil(p/100 * n), in integer arithmetic) via window functions, in paise
+    cursor.execute("""
+        WITH ranked AS (
+            SELECT restaurant_id, CAST(ROUND(total_amount * 100) AS INTEGER) AS paise,
+                   ROW_NUMBER() OVER (PARTITION BY restaurant_id ORDER BY total_amount) AS rn,
+                   COUNT(*) OVER (PARTITION BY restaurant_id) AS n
+            FROM orders
+        )
+        SELECT restaurant_id, MAX(n) AS orders, SUM(paise) / 100.0 AS revenue,
+               MAX(CASE WHEN rn = (n + 1) / 2 THEN paise END) / 100.0 AS p50,
+               MAX(CASE WHEN rn = (9 * n + 9) / 10 THEN paise END) / 100.0 AS p90,
+               MAX(CASE WHEN rn = (99 * n + 99) / 100 THEN paise END) / 100.0 AS p99
+        FROM ranked GROUP BY restaurant_id ORDER BY revenue DESC
+    """)
+    return cursor.fetchall()
+
+def _sql_item_cooccurrence(cursor, limit=20, min_count=2):
+    cursor.execute("""
+        WITH distinct_items AS (SELECT DISTINCT order_id, COALESCE(item_id, 0) AS item_id FROM order_items)
+        SELECT a.item_id AS item_a, b.item_id AS item_b, COUNT(*) AS orders_together
+        FROM distinct_items a
+        JOIN distinct_items b ON a.order_id = b.order_id AND a.item_id < b.item_id
+        GROUP BY a.item_id, b.item_id
+        HAVING COUNT(*) >= ?
+        ORDER BY orders_together DESC LIMIT ?
+    """, (min_count, limit))
+    return cursor.fetchall()
+
+def _sql_cohort_repeat_rates(cursor):
+    cursor.execute("""
+        WITH user_months AS (
+            SELECT DISTINCT user_id,
+                   CAST(SUBSTR(order_date, 1, 4) AS INTEGER) * 12 + CAST(SUBSTR(order_date, 6, 2) AS INTEGER) - 1 AS m
+            FROM orders WHERE user_id IS NOT NULL
+        ),
+        firsts AS (SELECT user_id, MIN(m) AS first_m FROM user_months GROUP BY user_id)
+        SELECT f.first_m AS cohort, COUNT(DISTINCT f.user_id) AS customers,
+               COUNT(DISTINCT CASE WHEN um.m > f.first_m THEN f.user_id END) AS repeaters
+        FROM firsts f JOIN user_months um ON um.user_id = f.user_id
+        GROUP BY f.first_m ORDER BY f.first_m
+    """)
+    return cursor.fetchall()
+
+def benchmark_against_sql(repeats=3):
+    """
+    Times each vectorized analysis against its SQL equivalent over all orders.
+    Returns a list of {"analysis", "numpy_ms", "sql_ms"} dicts plus a "load" row for the array load,
+    or [] if loading fails. Each timing is the best of `repeats` runs.
+    """
+
+    def best_of(fn):
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    data = None
+    def load():
+        nonlocal data
+        data = load_order_arrays(include_archived=False)  # The SQL side reads the live tables only
+    load_ms = best_of(load)
+    if data is None:
+        return []
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        pairs = [
+            ("Top items", lambda: top_items(data), lambda: _sql_top_items(cursor)),
+            ("Revenue percentiles per restaurant", lambda: revenue_percentiles_by_restaurant(data), lambda: _sql_revenue_percentiles(cursor)),
+            ("Item co-occurrence", lambda: item_cooccurrence(data), lambda: _sql_item_cooccurrence(cursor)),
+            ("Cohort repeat rates", lambda: cohort_repeat_rates(data), lambda: _sql_cohort_repeat_rates(cursor)),
+        ]
+        results = [{"analysis": "Load arrays", "numpy_ms": load_ms, "sql_ms": None}]
+        for name, numpy_fn, sql_fn in pairs:
+            results.append({"analysis": name, "numpy_ms": best_of(numpy_fn), "sql_ms": best_of(sql_fn)})
+        log(f"Analytics benchmark over {data.order_count} orders / {data.item_row_count} items: "
+            + ", ".join(f"{r['analysis']} numpy={r['numpy_ms']:.1f}ms sql={r['sql_ms'] if r['sql_ms'] is None else round(r['sql_ms'], 1)}ms" for r in results))
+        return results
+    except Exception as e:
+        log(f"Error benchmarking analytics engine: {e}")
+        return []
+    finally:
+        conn.close()
@@ -0,0 +1,282 @@
+import datetime
+from utils.logger import log
+from utils.database import get_db_connection, ROLLUP_EXCLUDED_STATUSES
+
+# Orders folded into the rollups per transaction; keeps each refresh step short even on a large backlog
+ROLLUP_BATCH_ORDERS = 10000
+SALES_WATERMARK = "sales"
+
+_EXCLUDED_PLACEHOLDERS = ", ".join("?" for _ in ROLLUP_EXCLUDED_STATUSES)
+# Net adjustment per already-folded order: the queued signs alternate, so a round trip nets to zero
+_ADJUSTMENTS_CTE = """
+    WITH adj AS (
+        SELECT order_id, SUM(sign) AS delta FROM sales_rollup_adjustments
+        WHERE order_id <= ? GROUP BY order_id HAVING SUM(sign) <> 0
+    )
+"""
+
+def _apply_status_adjustments(cursor, watermark):
+    """
+    Applies the queued status adjustments for orders at or below `watermark` (already folded in)
+    to all three rollup tables and clears them. Returns the number of orders adjusted.
+    """
+    cursor.execute(_ADJUSTMENTS_CTE + """
+        INSERT INTO sales_daily_restaurant (day, restaurant_id, restaurant_name, order_count, revenue, items_sold)
+        SELECT SUBSTR(o.order_date, 1, 10), o.restaurant_id, MAX(o.restaurant_name),
+               SUM(adj.delta), SUM(adj.delta * o.total_amount), COALESCE(SUM(adj.delta * oi.units), 0)
+        FROM adj
+        JOIN orders o ON o.order_id = adj.order_id
+        LEFT JOIN (
+            SELECT order_id, SUM(quantity) AS units FROM order_items
+            WHERE order_id IN (SELECT order_id FROM adj)
+            GROUP BY order_id
+        ) oi ON oi.order_id = o.order_id
+        GROUP BY SUBSTR(o.order_date, 1, 10), o.restaurant_id
+        ON CONFLICT (day, restaurant_id) DO UPDATE SET
+            order_count = order_count + excluded.order_count,
+            revenue = revenue + excluded.revenue,
+            items_sold = items_sold + excluded.items_sold
+    """, (watermark,))
+    cursor.execute(_ADJUSTMENTS_CTE + """
+        INSERT INTO sales_hourly (hour, order_count, revenue)
+        SELECT SUBSTR(o.order_date, 1, 13), SUM(adj.delta), SUM(adj.delta * o.total_amount)
+        FROM adj
+        JOIN orders o ON o.order_id = adj.order_id
+        GROUP BY SUBSTR(o.order_date, 1, 13)
+        ON CONFLICT (hour) DO UPDATE SET
+            order_count = order_count + excluded.order_count,
+            revenue = revenue + excluded.revenue
+    """, (watermark,))
+    cursor.execute(_ADJUSTMENTS_CTE + """
+        INSERT INTO sales_item_units (restaurant_id, item_id, name, units_sold, revenue)
+        SELECT o.restaurant_id, COALESCE(oi.item_id, 0), oi.name,
+               SUM(adj.delta * oi.quantity), SUM(adj.delta * oi.quantity * oi.price)
+        FROM adj
+        JOIN orders o ON o.order_id = adj.order_id
+        JOIN order_items oi ON oi.order_id = adj.order_id
+        GROUP BY o.restaurant_id, COALESCE(oi.item_id, 0), oi.name
+        ON CONFLICT (restaurant_id, item_id, name) DO UPDATE SET
+            units_sold = units_sold + excluded.units_sold,
+            revenue = revenue + excluded.revenue
+    """, (watermark,))
+    cursor.execute(_ADJUSTMENTS_CTE + "SELECT COUNT(*) FROM adj", (watermark,))
+    adjusted = cursor.fetchone()[0]
+    cursor.execute("DELETE FROM sales_rollup_adjustments WHERE order_id <= ?", (watermark,))
+    return adjusted
+
+def refresh_sales_rollups(batch_size=ROLLUP_BATCH_ORDERS):
+    """
+    Folds orders placed since the last refresh into the sales rollup tables.
+
+    Orders are consumed in order_id ranges above the 'sales' watermark. Each range is added to
+    sales_daily_restaurant, sales_hourly and sales_item_units with upserts and the watermark is
+    advanced in the same transaction, so every order is counted exactly once even if a refresh is
+    interrupted. Orders in ROLLUP_EXCLUDED_STATUSES (Cancelled, Failed) are left out. Orders
+    already folded in that have since moved into or out of those statuses are queued by trigger
+    in sales_rollup_adjustments; that queue is applied first, so a cancellation takes the order's
+    revenue, hour and items back out and an un-cancellation puts them back.
+    Returns the number of orders folded in.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    processed = 0
+    try:
+        cursor.execute("INSERT OR IGNORE INTO rollup_watermarks (name, last_order_id) VALUES (?, 0)", (SALES_WATERMARK,))
+        conn.commit()
+
+        # Writers are held off while a step runs, so a status change lands either before it (and is
+        # read here) or after it (and is queued for the next refresh), never in between
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT last_order_id FROM rollup_watermarks WHERE name = ?", (SALES_WATERMARK,))
+        watermark = cursor.fetchone()['last_order_id']
+        adjusted = _apply_status_adjustments(cursor, watermark)
+        conn.commit()
+        if adjusted:
+            log(f"Sales rollups adjusted for {adjusted} order(s) whose status moved into or out of {', '.join(ROLLUP_EXCLUDED_STATUSES)}.")
+
+        cursor.execute("SELECT MAX(order_id) FROM orders")
+        row = cursor.fetchone()
+        high_water = row[0] if row and row[0] is not None else 0
+
+        while watermark < high_water:
+            upper = min(watermark + batch_size, high_water)
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"""
+                INSERT INTO sales_daily_restaurant (day, restaurant_id, restaurant_name, order_count, revenue, items_sold)
+                SELECT SUBSTR(o.order_date, 1, 10), o.restaurant_id, MAX(o.restaurant_name),
+                       COUNT(*), SUM(o.total_amount), COALESCE(SUM(oi.units), 0)
+                FROM orders o
+                LEFT JOIN (
+                    SELECT order_id, SUM(quantity) AS units FROM order_items
+                    WHERE order_id > ? AND order_id <= ?
+                    GROUP BY order_id
+                ) oi ON oi.order_id = o.order_id
+                WHERE o.order_id > ? AND o.order_id <= ? AND COALESCE(o.status, '') NOT IN ({_EXCLUDED_PLACEHOLDERS})
+                GROUP BY SUBSTR(o.order_date, 1, 10), o.restaurant_id
+                ON CONFLICT (day, restaurant_id) DO UPDATE SET
+                    restaurant_name = excluded.restaurant_name,
+                    order_count = order_count + excluded.order_count,
+                    revenue = revenue + excluded.revenue,
+                    items_sold = items_sold + excluded.items_sold
+            """, (watermark, upper, watermark, upper, *ROLLUP_EXCLUDED_STATUSES))
+            cursor.execute(f"""
+                INSERT INTO sales_hourly (hour, order_count, revenue)
+                SELECT SUBSTR(order_date, 1, 13), COUNT(*), SUM(total_amount)
+                FROM orders
+                WHERE order_id > ? AND order_id <= ? AND COALESCE(status, '') NOT IN ({_EXCLUDED_PLACEHOLDERS})
+                GROUP BY SUBSTR(order_date, 1, 13)
+                ON CONFLICT (hour) DO UPDATE SET
+                    order_count = order_count + excluded.order_count,
+                    revenue = revenue + excluded.revenue
+            """, (watermark, upper, *ROLLUP_EXCLUDED_STATUSES))
+            cursor.execute(f"""
+                INSERT INTO sales_item_units (restaurant_id, item_id, name, units_sold, revenue)
+                SELECT o.restaurant_id, COALESCE(oi.item_id, 0), oi.name, SUM(oi.quantity), SUM(oi.quantity * oi.price)
+                FROM order_items oi
+                JOIN orders o ON o.order_id = oi.order_id
+                WHERE oi.order_id > ? AND oi.order_id <= ? AND COALESCE(o.status, '') NOT IN ({_EXCLUDED_PLACEHOLDERS})
+                GROUP BY o.restaurant_id, COALESCE(oi.item_id, 0), oi.name
+                ON CONFLICT (restaurant_id, item_id, name) DO UPDATE SET
+                    units_sold = units_sold + excluded.units_sold,
+                    revenue = revenue + excluded.revenue
+            """, (watermark, upper, *ROLLUP_EXCLUDED_STATUSES))
+            # Status changes queued for this range are already reflected in the statuses just read
+            cursor.execute("DELETE FROM sales_rollup_adjustments WHERE order_id > ? AND order_id <= ?", (watermark, upper))
+            cursor.execute("SELECT COUNT(*) FROM orders WHERE order_id > ? AND order_id <= ?", (watermark, upper))
+            processed += cursor.fetchone()[0]
+            cursor.execute("UPDATE rollup_watermarks SET last_order_id = ?, updated_at = ? WHERE name = ?",
+                           (upper, datetime.datetime.now(), SALES_WATERMARK))
+            conn.commit()
+            watermark = upper
+
+        if processed:
+            log(f"Sales rollups refreshed: {processed} new order(s) folded in up to order_id {watermark}.")
+        return processed
+    except Exception as e:
+        log(f"Error refreshing sales rollups: {e}")
+        conn.rollback()
+        return processed
+    finally:
+        conn.close()
+
+def _since_day(days):
+    if days is None:
+        return "0000-00-00"
+    return (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+
+def get_sales_summary(days=None):
+    """Returns total orders, revenue, average basket value and average items per order over the last `days` days (all time if None)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT COALESCE(SUM(order_count), 0) AS orders, COALESCE(SUM(revenue), 0) AS revenue,
+                   COALESCE(SUM(items_sold), 0) AS items
+            FROM sales_daily_restaurant WHERE day >= ?
+        """, (_since_day(days),))
+        row = cursor.fetchone()
+        orders = row['orders']
+        return {
+            "orders": orders,
+            "revenue": row['revenue'],
+            "items": row['items'],
+            "avg_basket_value": row['revenue'] / orders if orders else 0.0,
+            "avg_items_per_order": row['items'] / orders if orders else 0.0,
+        }
+    except Exception as e:
+        log(f"Error reading sales summary: {e}")
+        return {"orders": 0, "revenue": 0.0, "items": 0, "avg_basket_value": 0.0, "avg_items_per_order": 0.0}
+    finally:
+        conn.close()
+
+def get_revenue_by_restaurant(days=None, limit=10):
+    """Returns the top restaurants by revenue over the last `days` days, with order counts and average basket value."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT restaurant_id, MAX(restaurant_name) AS restaurant_name,
+                   SUM(order_count) AS orders, SUM(revenue) AS revenue,
+                   SUM(revenue) / SUM(order_count) AS avg_basket_value
+            FROM sales_daily_restaurant
+            WHERE day >= ?
+            GROUP BY restaurant_id
+            ORDER BY revenue DESC
+            LIMIT ?
+        """, (_since_day(days), limit))
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log(f"Error reading revenue by restaurant: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_daily_revenue(days=30, restaurant_id=None):
+    """Returns (day, orders, revenue) rows for the last `days` days, optionally for a single restaurant."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if restaurant_id is None:
+            cursor.execute("""
+                SELECT day, SUM(order_count) AS orders, SUM(revenue) AS revenue
+                FROM sales_daily_restaurant WHERE day >= ?
+                GROUP BY day ORDER BY day ASC
+            """, (_since_day(days),))
+        else:
+            cursor.execute("""
+                SELECT day, order_count AS orders, revenue
+                FROM sales_daily_restaurant WHERE restaurant_id = ? AND day >= ?
+                ORDER BY day ASC
+            """, (restaurant_id, _since_day(days)))
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log(f"Error reading daily revenue: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_orders_by_hour_of_day(days=None):
+    """Returns 24 rows (hour 0-23) with order counts and revenue summed over the last `days` days."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT CAST(SUBSTR(hour, 12, 2) AS INTEGER) AS hour_of_day,
+                   SUM(order_count) AS orders, SUM(revenue) AS revenue
+            FROM sales_hourly WHERE hour >= ?
+            GROUP BY hour_of_day
+        """, (_since_day(days),))
+        by_hour = {row['hour_of_day']: dict(row) for row in cursor.fetchall()}
+        return [by_hour.get(h, {"hour_of_day": h, "orders": 0, "revenue": 0.0}) for h in range(24)]
+    except Exception as e:
+        log(f"Error reading orders by hour: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_top_items(limit=10, restaurant_id=None):
+    """Returns the best-selling items by units sold (all time), optionally for one restaurant."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if restaurant_id is None:
+            cursor.execute("""
+                SELECT s.restaurant_id, r.name AS restaurant_name, s.item_id, s.name, s.units_sold, s.revenue
+                FROM sales_item_units s
+                LEFT JOIN restaurants r ON r.restaurant_id = s.restaurant_id
+                ORDER BY s.units_sold DESC LIMIT ?
+            """, (limit,))
+        else:
+            cursor.execute("""
+                SELECT s.restaurant_id, r.name AS restaurant_name, s.item_id, s.name, s.units_sold, s.revenue
+                FROM sales_item_units s
+                LEFT JOIN restaurants r ON r.restaurant_id = s.restaurant_id
+                WHERE s.restaurant_id = ?
+                ORDER BY s.units_sold DESC LIMIT ?
+            """, (restaurant_id, limit))
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log(f"Error reading top items: {e}")
+        return []
+    finally:
+        conn.close()
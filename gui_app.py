@@ -13,14 +13,18 @@ from gui_components.main_app_screen import MainAppScreen
 from gui_components.menu_screen import MenuScreen
 from gui_components.cart_screen import CartScreen
 from gui_components.admin_dashboard import AdminDashboard  # Import AdminDashboard
+from gui_components.screen_cache import ScreenCache
 from cart.models import Cart
 from users.auth import User
 from users.models import User  # Ensure User is imported
+from users.auth_pool import shutdown_auth_pool
+from users.auth import log_out
 from orders.models import create_order
 
 # Import for DB setup
 from utils.database import initialize_database
 from restaurants.models import populate_sample_restaurant_data
+from utils.thumbnails import start_thumbnail_warmup
 
 # Import logger
 from utils.logger import log
@@ -51,7 +55,10 @@ class App(ctk.CTk):
         self.cart: Cart | None = None
 
         self.current_screen_frame = None
+        self.current_screen_key = None  # ScreenCache key of current_screen_frame; None for uncached screens
         self.admin_dashboard_instance = None  # Initialize admin_dashboard_instance attribute
+        # Screens already built this session are hidden rather than destroyed when navigating away
+        self.screen_cache = ScreenCache("app")
 
         # Master list for user data, to be managed by the App instance
         self.master_users_data = [
@@ -70,6 +77,8 @@ class App(ctk.CTk):
         # Initialize database and populate sample data
         initialize_database()
         populate_sample_restaurant_data()
+        # Pre-resize asset images in the background so screens never decode full-size photos
+        start_thumbnail_warmup(self.project_root)
 
         self.app_callbacks = {
             "show_signup_screen": self.show_signup_screen,
@@ -140,24 +149,26 @@ class App(ctk.CTk):
             self.admin_dashboard_instance.loggedInUser = user 
         return self.admin_dashboard_instance
 
-    def _switch_screen(self, screen_factory_method, *factory_args, title, width, height):
-        if self.current_screen_frame:
-            self.current_screen_frame.destroy()
+    def _switch_screen(self, screen_factory_method, *factory_args, title, width, height, cache_key=None):
+        # Screens with a cache_key are kept in self.screen_cache when hidden, and reused (refreshed only
+        # if their data changed) when navigated back to; the rest are destroyed and rebuilt as before.
+        if self.current_screen_frame and (cache_key is None or cache_key != self.current_screen_key):
+            if self.current_screen_key is not None:
+                self.current_screen_frame.pack_forget()
+                self.screen_cache.release(self.current_screen_key)
+            else:
+                self.current_screen_frame.destroy()
             self.current_screen_frame = None
 
-        self.current_screen_frame = screen_factory_method(*factory_args)
-        
+        if cache_key is None:
+            self.current_screen_frame = screen_factory_method(*factory_args)
+        else:
+            self.current_screen_frame = self.screen_cache.acquire(cache_key, lambda: screen_factory_method(*factory_args))
+        self.current_screen_key = cache_key
+
         self.current_screen_frame.pack(fill="both", expand=True)
         self._set_window_properties(title, width, height)
 
-        # If the current screen is AdminDashboard, and it has refresh_data, call it.
-        if isinstance(self.current_screen_frame, AdminDashboard):
-            if hasattr(self.current_screen_frame, 'refresh_data') and callable(getattr(self.current_screen_frame, 'refresh_data')):
-                log("INFO: AdminDashboard is packed and current. Calling refresh_data().")
-                self.current_screen_frame.refresh_data()
-            else:
-                log("WARNING: AdminDashboard instance does not have a callable refresh_data method.")
-
     def _post_login_navigation(self, user: User):
         log(f"INFO: _post_login_navigation called for user: {user.username if user else 'None'}. Admin status: {user.is_admin if user else 'N/A'}")
         self.current_user = user
@@ -212,7 +223,8 @@ class App(ctk.CTk):
             self.cart = Cart(user_id=user.user_id)
             log(f"INFO: Cart initialized/updated for user {user.user_id} in show_main_app_screen.")
 
-        self._switch_screen(self._create_main_app_screen, title="Swigato - Home", width=900, height=700)
+        self._switch_screen(self._create_main_app_screen, title="Swigato - Home", width=900, height=700,
+                            cache_key=("main", user.user_id))
 
     def show_menu_screen(self, restaurant):
         if not self.current_user:
@@ -220,7 +232,8 @@ class App(ctk.CTk):
             self.show_login_screen()
             return
         self.current_restaurant = restaurant
-        self._switch_screen(self._create_menu_screen, restaurant, title=f"Swigato - {restaurant.name}", width=900, height=750)
+        self._switch_screen(self._create_menu_screen, restaurant, title=f"Swigato - {restaurant.name}", width=900, height=750,
+                            cache_key=("menu", self.current_user.user_id, restaurant.restaurant_id))
 
     def show_menu_screen_from_cart(self, restaurant):
         self.show_menu_screen(restaurant)
@@ -235,8 +248,10 @@ class App(ctk.CTk):
             self.show_main_app_screen()
             return
 
-        self._switch_screen(self._create_cart_screen, title=f"Swigato - {self.current_user.username}'s Cart", width=800, height=600)
+        self._switch_screen(self._create_cart_screen, title=f"Swigato - {self.current_user.username}'s Cart", width=800, height=600,
+                            cache_key=("cart", self.current_user.user_id))
         if self.current_screen_frame and hasattr(self.current_screen_frame, 'load_cart_items'):
+            self.current_screen_frame.cart = self.cart  # A cached CartScreen may predate the current Cart
             self.current_screen_frame.load_cart_items()
 
     def show_admin_screen(self, user):
@@ -255,7 +270,8 @@ class App(ctk.CTk):
             return self._get_or_create_admin_screen_for_switch_factory(user)
 
         log(f"INFO: Switching to Admin Dashboard for user {user.username}")
-        self._switch_screen(_get_or_create_admin_screen_for_switch_factory, title="Swigato - Admin Panel", width=1000, height=700)
+        self._switch_screen(_get_or_create_admin_screen_for_switch_factory, title="Swigato - Admin Panel", width=1000, height=700,
+                            cache_key=("admin", user.user_id))
 
     def handle_review_submitted(self, restaurant_id):
         if isinstance(self.current_screen_frame, MenuScreen) and self.current_screen_frame.restaurant.id == restaurant_id:
@@ -322,17 +338,23 @@ class App(ctk.CTk):
 
     def logout(self):
         log(f"INFO: User {self.current_user.username if self.current_user else 'Unknown'} logging out.")
+        log_out(getattr(self.current_user, 'session_token', None))
         self.current_user = None
         self.current_restaurant = None
         self.cart = None
-        if self.admin_dashboard_instance:
-            self.admin_dashboard_instance.destroy()
-            self.admin_dashboard_instance = None
+        # Cached screens belong to the user who built them
+        self.screen_cache.clear()
+        self.current_screen_frame = None
+        self.current_screen_key = None
+        self.admin_dashboard_instance = None
         self.show_login_screen()
         log(f"INFO: Logout complete. Showing login screen.")
 
     def run(self):
-        self.mainloop()
+        try:
+            self.mainloop()
+        finally:
+            shutdown_auth_pool()
 
 
 if __name__ == "__main__":
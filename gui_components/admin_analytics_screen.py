@@ -0,0 +1,160 @@
+import customtkinter as ctk
+from CTkTable import CTkTable
+import logging
+from gui_constants import (
+    FONT_FAMILY, BODY_FONT_SIZE, HEADING_FONT_SIZE, BUTTON_FONT_SIZE,
+    ADMIN_BACKGROUND_COLOR, ADMIN_FRAME_FG_COLOR, ADMIN_TEXT_COLOR,
+    ADMIN_PRIMARY_ACCENT_COLOR, ADMIN_PRIMARY_COLOR,
+    ADMIN_TABLE_HEADER_BG_COLOR, ADMIN_TABLE_ROW_LIGHT_COLOR, ADMIN_TABLE_ROW_DARK_COLOR,
+    ADMIN_TABLE_BORDER_COLOR, ADMIN_TABLE_TEXT_COLOR,
+    ADMIN_BUTTON_FG_COLOR, ADMIN_BUTTON_HOVER_COLOR, ADMIN_BUTTON_TEXT_COLOR
+)
+from analytics.rollups import (
+    refresh_sales_rollups, get_sales_summary, get_revenue_by_restaurant,
+    get_top_items, get_orders_by_hour_of_day
+)
+from utils.metrics import get_metrics_snapshot
+from users.throttle import get_login_throttle
+from users.cache import user_cache
+from utils.image_loader import image_cache
+from gui_components.screen_loader import ScreenLoader
+
+logger = logging.getLogger("swigato_app.admin_analytics_screen")
+
+PERIOD_OPTIONS = {"Last 7 days": 7, "Last 30 days": 30, "All time": None}
+
+class AdminAnalyticsScreen(ctk.CTkFrame):
+    """Sales analytics read from the precomputed rollup tables (see analytics.rollups)."""
+    DATA_TABLES = ("orders", "order_items")
+
+    def __init__(self, master, app_callbacks, user, **kwargs):
+        super().__init__(master, fg_color=ADMIN_BACKGROUND_COLOR, **kwargs)
+        self.app_callbacks = app_callbacks
+        self.loggedInUser = user
+        self.loader = ScreenLoader(self, spinner_color=ADMIN_TEXT_COLOR)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=0)
+        self.grid_rowconfigure(1, weight=0)
+        self.grid_rowconfigure(2, weight=1)
+
+        header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        header_frame.grid(row=0, column=0, padx=20, pady=(10, 10), sticky="ew")
+        header_frame.grid_columnconfigure(0, weight=1)
+
+        title_label = ctk.CTkLabel(header_frame, text="Sales Analytics",
+                                   font=ctk.CTkFont(family=FONT_FAMILY, size=HEADING_FONT_SIZE, weight="bold"),
+                                   text_color=ADMIN_TEXT_COLOR)
+        title_label.grid(row=0, column=0, sticky="w")
+
+        self.period_var = ctk.StringVar(value="Last 30 days")
+        period_menu = ctk.CTkOptionMenu(header_frame, variable=self.period_var, values=list(PERIOD_OPTIONS.keys()),
+                                        command=lambda choice: self._load_and_display_analytics(),
+                                        font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
+                                        fg_color=ADMIN_BUTTON_FG_COLOR, button_color=ADMIN_BUTTON_FG_COLOR,
+                                        button_hover_color=ADMIN_BUTTON_HOVER_COLOR)
+        period_menu.grid(row=0, column=1, padx=(0, 10), sticky="e")
+
+        refresh_button = ctk.CTkButton(header_frame, text="Refresh", command=self.refresh_data,
+                                       fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR,
+                                       text_color=ADMIN_BUTTON_TEXT_COLOR,
+                                       font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE),
+                                       corner_radius=8, width=100)
+        refresh_button.grid(row=0, column=2, sticky="e")
+
+        self.summary_frame = ctk.CTkFrame(self, fg_color=ADMIN_BACKGROUND_COLOR)
+        self.summary_frame.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="ew")
+        self.summary_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
+        self.summary_labels = {}
+        for i, key in enumerate(("Orders", "Revenue (₹)", "Avg Basket (₹)", "Avg Items/Order")):
+            label = ctk.CTkLabel(self.summary_frame, text=f"{key}\n-", justify="center",
+                                 font=ctk.CTkFont(family=FONT_FAMILY, size=HEADING_FONT_SIZE, weight="bold"),
+                                 text_color=ADMIN_PRIMARY_COLOR)
+            label.grid(row=0, column=i, padx=10, pady=5, sticky="nsew")
+            self.summary_labels[key] = label
+
+        self.tables_frame = ctk.CTkScrollableFrame(self, fg_color=ADMIN_FRAME_FG_COLOR, corner_radius=10)
+        self.tables_frame.grid(row=2, column=0, padx=20, pady=(0, 20), sticky="nsew")
+        self.tables_frame.grid_columnconfigure(0, weight=1)
+
+        self.refresh_data()
+        logger.info("AdminAnalyticsScreen initialized.")
+
+    def refresh_data(self):
+        """Folds any new orders into the rollups, then redraws from them."""
+        self._load_and_display_analytics(refresh_rollups=True)
+
+    def _load_and_display_analytics(self, refresh_rollups=False):
+        days = PERIOD_OPTIONS.get(self.period_var.get())
+
+        def fetch():
+            # The rollup refresh can fold in a large backlog, so it runs on the worker with the queries
+            if refresh_rollups:
+                refresh_sales_rollups()
+            return (get_sales_summary(days), get_revenue_by_restaurant(days),
+                    get_top_items(limit=10), get_orders_by_hour_of_day(days))
+
+        self.loader.load("analytics", fetch, lambda result: self._display_analytics(*result),
+                         spinner_parent=self.tables_frame, spinner_text="Loading analytics...")
+
+    def _display_analytics(self, summary, revenue_by_restaurant, top_items, orders_by_hour):
+        self.summary_labels["Orders"].configure(text=f"Orders\n{summary['orders']}")
+        self.summary_labels["Revenue (₹)"].configure(text=f"Revenue (₹)\n{summary['revenue']:.2f}")
+        self.summary_labels["Avg Basket (₹)"].configure(text=f"Avg Basket (₹)\n{summary['avg_basket_value']:.2f}")
+        self.summary_labels["Avg Items/Order"].configure(text=f"Avg Items/Order\n{summary['avg_items_per_order']:.2f}")
+
+        for widget in self.tables_frame.winfo_children():
+            widget.destroy()
+
+        restaurant_rows = [["Restaurant", "Orders", "Revenue (₹)", "Avg Basket (₹)"]]
+        for row in revenue_by_restaurant:
+            restaurant_rows.append([row['restaurant_name'], row['orders'], f"{row['revenue']:.2f}", f"{row['avg_basket_value']:.2f}"])
+        self._add_section("Top Restaurants by Revenue", restaurant_rows, 0)
+
+        item_rows = [["Item", "Restaurant", "Units Sold", "Revenue (₹)"]]
+        for row in top_items:
+            item_rows.append([row['name'], row['restaurant_name'] or "N/A", row['units_sold'], f"{row['revenue']:.2f}"])
+        self._add_section("Best-Selling Items (All Time)", item_rows, 2)
+
+        hour_rows = [["Hour", "Orders", "Revenue (₹)"]]
+        for row in orders_by_hour:
+            if row['orders']:
+                hour_rows.append([f"{row['hour_of_day']:02d}:00", row['orders'], f"{row['revenue']:.2f}"])
+        self._add_section("Orders by Hour of Day", hour_rows, 4)
+
+        # In-process metrics (login latency, bcrypt CPU, counters) recorded since the app started
+        user_cache.stats()  # Refreshes the user_cache.* gauges
+        image_cache.stats()  # ...and the image_cache.* ones
+        snapshot = get_metrics_snapshot()
+        metric_rows = [["Metric", "Count / Value", "Avg (ms)", "P99 (ms)"]]
+        for name, stats in snapshot["timers"].items():
+            metric_rows.append([name, stats['count'], f"{stats['avg_ms']:.1f}", f"{stats['p99_ms']:.1f}"])
+        for name, value in snapshot["counters"].items():
+            metric_rows.append([name, value, "-", "-"])
+        throttle_stats = get_login_throttle().stats()
+        metric_rows.append(["login throttle: tracked keys", throttle_stats['tracked_keys'], "-", "-"])
+        metric_rows.append(["login throttle: blocked keys", throttle_stats['blocked_keys'], "-", "-"])
+        self._add_section("System Metrics (this session)", metric_rows, 6)
+
+    def _add_section(self, title, table_values, grid_row):
+        ctk.CTkLabel(self.tables_frame, text=title,
+                     font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE + 1, weight="bold"),
+                     text_color=ADMIN_TEXT_COLOR).grid(row=grid_row, column=0, padx=10, pady=(10, 0), sticky="w")
+        if len(table_values) == 1:
+            ctk.CTkLabel(self.tables_frame, text="No sales data yet.",
+                         font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
+                         text_color=ADMIN_TEXT_COLOR).grid(row=grid_row + 1, column=0, padx=10, pady=5, sticky="w")
+            return
+        table = CTkTable(
+            master=self.tables_frame,
+            values=table_values,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE - 1),
+            header_color=ADMIN_TABLE_HEADER_BG_COLOR,
+            text_color=ADMIN_TABLE_TEXT_COLOR,
+            hover_color=ADMIN_PRIMARY_ACCENT_COLOR,
+            colors=[ADMIN_TABLE_ROW_LIGHT_COLOR, ADMIN_TABLE_ROW_DARK_COLOR],
+            corner_radius=8,
+            border_width=1,
+            border_color=ADMIN_TABLE_BORDER_COLOR
+        )
+        table.grid(row=grid_row + 1, column=0, padx=10, pady=(5, 10), sticky="ew")
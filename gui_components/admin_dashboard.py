@@ -7,6 +7,9 @@ from gui_components.admin_users_screen import AdminUsersScreen # Renamed from Ad
 from gui_components.admin_orders_screen import AdminOrdersScreen
 from gui_components.admin_restaurants_screen import AdminRestaurantsScreen
 from gui_components.admin_reviews_screen import AdminReviewsScreen
+from gui_components.admin_analytics_screen import AdminAnalyticsScreen
+from gui_components.screen_cache import ScreenCache
+from gui_components.screen_loader import ScreenLoader
 from users.models import User
 from restaurants.models import Restaurant
 from orders.models import Order
@@ -15,11 +18,18 @@ from reviews.models import Review
 logger = logging.getLogger("swigato_app.admin_dashboard")
 
 class AdminDashboard(ctk.CTkFrame):
+    # Tables behind the summary stats
+    DATA_TABLES = ("users", "restaurants", "orders", "reviews")
+
     def __init__(self, master, app_callbacks, user, **kwargs):
         super().__init__(master, fg_color=ADMIN_BACKGROUND_COLOR, **kwargs)
         self.app_callbacks = app_callbacks
         self.loggedInUser = user
         self.current_screen_frame = None
+        self.current_screen_class = None
+        # Sub-screens are kept (hidden) once built, so switching back and forth in the sidebar is instant
+        self.screen_cache = ScreenCache("admin")
+        self.loader = ScreenLoader(self, spinner_color=ADMIN_TEXT_COLOR)
         self.sidebar_buttons_widgets = [] # To store button widgets
 
         self.grid_columnconfigure(0, weight=0) # Sidebar - give it fixed width influence initially
@@ -58,7 +68,8 @@ class AdminDashboard(ctk.CTkFrame):
             ("Orders", AdminOrdersScreen, "Orders Management"),
             ("Restaurants", AdminRestaurantsScreen, "Restaurants Management"),
             ("Order History", None, "Order History"),
-            ("Reviews", AdminReviewsScreen, "Reviews Management")
+            ("Reviews", AdminReviewsScreen, "Reviews Management"),
+            ("Analytics", AdminAnalyticsScreen, "Sales Analytics")
         ]
 
         for i, (text, screen_class, screen_title) in enumerate(sidebar_button_definitions):
@@ -94,23 +105,14 @@ class AdminDashboard(ctk.CTkFrame):
         stats_frame.grid(row=1, column=1, padx=(10,20), pady=(0,0), sticky="new")
         stats_frame.grid_columnconfigure((0,1,2,3), weight=1)
 
-        # Fetch stats
-        user_count = len(User.get_all_users())
-        restaurant_count = len(Restaurant.get_all())
-        order_count = len(Order.get_all_orders())
-        review_count = len(Review.get_all_reviews())
-
-        stat_labels = [
-            ("Users", user_count),
-            ("Restaurants", restaurant_count),
-            ("Orders", order_count),
-            ("Reviews", review_count)
-        ]
-        for i, (label, count) in enumerate(stat_labels):
-            stat = ctk.CTkLabel(stats_frame, text=f"{label}\n{count}", justify="center",
+        self.stat_labels = {}
+        for i, label in enumerate(("Users", "Restaurants", "Orders", "Reviews")):
+            stat = ctk.CTkLabel(stats_frame, text=f"{label}\n-", justify="center",
                                 font=ctk.CTkFont(family=FONT_FAMILY, size=HEADING_FONT_SIZE, weight="bold"),
                                 text_color=ADMIN_PRIMARY_ACCENT_COLOR)
             stat.grid(row=0, column=i, padx=20, pady=10, sticky="nsew")
+            self.stat_labels[label] = stat
+        self._refresh_stats()
 
         # Content Frame
         self.content_frame = ctk.CTkFrame(self, fg_color=ADMIN_BACKGROUND_COLOR, corner_radius=10) # Adjusted fg_color
@@ -150,12 +152,50 @@ class AdminDashboard(ctk.CTkFrame):
             else:
                 btn.configure(fg_color=default_color)
 
-        if self.current_screen_frame:
-            self.current_screen_frame.destroy()
-        
-        self.current_screen_frame = screen_class(self.content_frame, self.app_callbacks, self.loggedInUser)
+        if self.current_screen_frame and screen_class is not self.current_screen_class:
+            self.current_screen_frame.grid_forget()
+            self.screen_cache.release(self.current_screen_class)
+
+        self.current_screen_frame = self.screen_cache.acquire(
+            screen_class, lambda: screen_class(self.content_frame, self.app_callbacks, self.loggedInUser))
+        self.current_screen_class = screen_class
         self.current_screen_frame.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
 
+    def _refresh_stats(self):
+        # COUNT(*) queries on a worker; the Orders count includes archived orders so it doesn't drop after an archive run
+        def fetch():
+            return {
+                "Users": User.count_users(),
+                "Restaurants": Restaurant.count_restaurants(),
+                "Orders": Order.count_orders(include_archived=True),
+                "Reviews": Review.count_reviews()
+            }
+
+        def render(counts):
+            for label, count in counts.items():
+                self.stat_labels[label].configure(text=f"{label}\n{count}")
+
+        self.loader.load("stats", fetch, render)
+
+    def refresh_data(self):
+        logger.info("AdminDashboard: data changed while hidden, refreshing stats.")
+        self._refresh_stats()
+
+    def on_screen_shown(self):
+        # The sub-screen on display was hidden along with the dashboard; bring it up to date too
+        if self.current_screen_class is not None:
+            self.screen_cache.refresh_if_stale(self.current_screen_class)
+            if hasattr(self.current_screen_frame, 'on_screen_shown'):
+                self.current_screen_frame.on_screen_shown()
+
+    def on_screen_hidden(self):
+        if hasattr(self.current_screen_frame, 'on_screen_hidden'):
+            self.current_screen_frame.on_screen_hidden()
+
+    def destroy(self):
+        self.screen_cache.clear()
+        super().destroy()
+
     def show_order_history(self):
         # Only show order history if AdminOrdersScreen is loaded
         if not isinstance(self.current_screen_frame, AdminOrdersScreen):
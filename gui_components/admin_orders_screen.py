@@ -1,6 +1,10 @@
 import customtkinter as ctk
 from CTkTable import CTkTable
+import datetime
 import logging
+import os
+import threading
+from tkinter import filedialog
 from gui_constants import (
     FONT_FAMILY, BODY_FONT_SIZE, HEADING_FONT_SIZE,
     ADMIN_BACKGROUND_COLOR, ADMIN_FRAME_FG_COLOR, ADMIN_TEXT_COLOR,
@@ -8,26 +12,57 @@ from gui_constants import (
     ADMIN_TABLE_HEADER_BG_COLOR, ADMIN_TABLE_ROW_LIGHT_COLOR, ADMIN_TABLE_ROW_DARK_COLOR,
     ADMIN_TABLE_BORDER_COLOR, ADMIN_TABLE_TEXT_COLOR, ERROR_COLOR, ADMIN_PRIMARY_COLOR, ADMIN_BUTTON_TEXT_COLOR, ADMIN_BUTTON_HOVER_COLOR
 )
-from orders.models import Order
+from orders.models import Order, get_order_items_for_orders
+from orders.export import export_orders, default_export_path
+from gui_components.screen_loader import ScreenLoader
 
 logger = logging.getLogger("swigato_app.admin_orders_screen")
 
+ACTIVE_ORDER_STATUSES = ("Pending Confirmation", "Preparing", "Out for Delivery", "Confirmed")
+ORDER_FEED_POLL_MS = 3000  # How often the live board asks the change feed for new/updated orders
+
 class AdminOrdersScreen(ctk.CTkFrame):
+    DATA_TABLES = ("orders",)
+
     def __init__(self, master, app_callbacks, user, **kwargs):
         super().__init__(master, fg_color=ADMIN_BACKGROUND_COLOR, **kwargs)
         self.app_callbacks = app_callbacks
         self.loggedInUser = user
         self.current_orders = []
         self.current_view = "orders"  # 'orders' or 'history'
+        self.last_change_seq = 0  # Last orders change_seq applied to the table
+        self._poll_job = None
+        self._hidden = False  # Set while the screen cache holds this screen off display
+        self.loader = ScreenLoader(self, spinner_color=ADMIN_TEXT_COLOR)
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=0)
         self.grid_rowconfigure(1, weight=1)
 
-        title_label = ctk.CTkLabel(self, text="Orders Management",
+        header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        header_frame.grid(row=0, column=0, padx=20, pady=(10, 10), sticky="ew")
+        header_frame.grid_columnconfigure(0, weight=1)
+
+        title_label = ctk.CTkLabel(header_frame, text="Orders Management",
                                    font=ctk.CTkFont(family=FONT_FAMILY, size=HEADING_FONT_SIZE, weight="bold"),
                                    text_color=ADMIN_TEXT_COLOR)
-        title_label.grid(row=0, column=0, padx=20, pady=(10, 10), sticky="nw")
+        title_label.grid(row=0, column=0, sticky="w")
+
+        # Only meaningful for the history view; archived orders live in the cold-storage database
+        self.include_archived_var = ctk.BooleanVar(value=False)
+        self.include_archived_checkbox = ctk.CTkCheckBox(header_frame, text="Include archived orders",
+                                                         variable=self.include_archived_var,
+                                                         command=self._on_include_archived_toggled,
+                                                         font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
+                                                         text_color=ADMIN_TEXT_COLOR,
+                                                         fg_color=ADMIN_PRIMARY_COLOR,
+                                                         hover_color=ADMIN_BUTTON_HOVER_COLOR)
+
+        export_button = ctk.CTkButton(header_frame, text="Export...", command=self._open_export_dialog,
+                                      fg_color=ADMIN_PRIMARY_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR,
+                                      text_color=ADMIN_BUTTON_TEXT_COLOR,
+                                      font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE), width=100)
+        export_button.grid(row=0, column=2, sticky="e")
 
         self.table_frame = ctk.CTkFrame(self, fg_color=ADMIN_FRAME_FG_COLOR, corner_radius=10)
         self.table_frame.grid(row=1, column=0, padx=20, pady=(0,20), sticky="nsew")
@@ -36,34 +71,80 @@ class AdminOrdersScreen(ctk.CTkFrame):
 
         self.orders_table = None
         self.show_orders()  # Default view
+        self._schedule_poll()
         logger.info("AdminOrdersScreen initialized and orders loaded.")
 
+    def destroy(self):
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        super().destroy()
+
+    def refresh_data(self):
+        """Catches up through the change feed on orders that changed while the screen was hidden."""
+        if self.loader.is_loading("orders"):
+            return  # The reload will carry its own feed position
+        try:
+            self._apply_pending_changes()
+        except Exception as e:
+            logger.error(f"Error applying order changes: {e}")
+
+    def on_screen_hidden(self):
+        # No point polling the change feed for a board nobody can see
+        self._hidden = True
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+
+    def on_screen_shown(self):
+        self._hidden = False
+        self._schedule_poll()
+
     def show_orders(self):
         self.current_view = "orders"
+        self.include_archived_checkbox.grid_remove()
         self._load_and_display_orders(active_only=True)
 
     def show_order_history(self):
         self.current_view = "history"
+        self.include_archived_checkbox.grid(row=0, column=1, padx=(0, 15), sticky="e")
         self._load_and_display_orders(active_only=False)
 
+    def _on_include_archived_toggled(self):
+        if self.current_view == "history":
+            self._load_and_display_orders(active_only=False)
+
     def _load_and_display_orders(self, active_only=True):
-        for widget in self.table_frame.winfo_children():
-            widget.destroy()
+        include_archived = not active_only and self.include_archived_var.get()
+        self.loader.load("orders", lambda: self._fetch_orders(active_only, include_archived),
+                         lambda result: self._display_orders(*result, active_only=active_only),
+                         spinner_parent=self.table_frame, spinner_text="Loading orders...")
 
-        all_orders = Order.get_all_orders()
+    def _fetch_orders(self, active_only, include_archived):
+        # Worker thread: database reads only, no widgets
+        # Read the feed position before the snapshot so nothing committed in between is missed;
+        # re-applying a change that is already in the snapshot is harmless.
+        change_seq = Order.current_change_seq()
+        all_orders = Order.get_all_orders(include_archived=include_archived)
         if active_only:
-            active_statuses = ("Pending Confirmation", "Preparing", "Out for Delivery", "Confirmed")
-            orders = [o for o in all_orders if o.status in active_statuses]
+            orders = [o for o in all_orders if o.status in ACTIVE_ORDER_STATUSES]
             orders.sort(key=lambda o: o.order_date, reverse=True)
         else:
             orders = list(all_orders)
             orders.sort(key=lambda o: o.order_date)
 
-        from orders.models import get_order_items_for_order
-        for o in orders:
-            if not hasattr(o, 'items') or not o.items:
-                o.items = get_order_items_for_order(o.order_id)
+        # Archived orders arrive with their items already loaded from the archive database
+        hot_orders = [o for o in orders if not getattr(o, 'archived', False)]
+        items_by_order = get_order_items_for_orders([o.order_id for o in hot_orders])
+        for o in hot_orders:
+            o.items = items_by_order.get(o.order_id, [])
+        return orders, change_seq
 
+    def _display_orders(self, orders, change_seq, active_only=True):
+        for widget in self.table_frame.winfo_children():
+            widget.destroy()
+        self.orders_table = None
+        self.last_change_seq = change_seq
         self.current_orders = orders
 
         # Add 'Actions' column only for active orders
@@ -73,27 +154,7 @@ class AdminOrdersScreen(ctk.CTkFrame):
             headers = ["Order ID", "User", "Restaurant", "Date", "Total (₹)", "Status", "Address", "Items"]
         table_data = [headers]
         for order in orders:
-            user_display = order.customer_username if hasattr(order, 'customer_username') else str(order.user_id)
-            date_str = order.order_date.strftime('%Y-%m-%d %H:%M') if hasattr(order.order_date, 'strftime') else str(order.order_date)
-            items_str = ", ".join([f"{item.name} x{item.quantity}" for item in getattr(order, 'items', [])])
-            if len(items_str) > 60:
-                items_str = items_str[:57] + "..."
-            address_str = order.delivery_address or "N/A"
-            if len(address_str) > 30:
-                address_str = address_str[:27] + "..."
-            row = [
-                order.order_id,
-                user_display,
-                order.restaurant_name,
-                date_str,
-                f"{order.total_amount:.2f}",
-                order.status,
-                address_str,
-                items_str
-            ]
-            if active_only:
-                row.append("Change Status")
-            table_data.append(row)
+            table_data.append(self._order_row_values(order, active_only))
 
         if len(table_data) == 1:
             ctk.CTkLabel(self.table_frame, text="No orders found.",
@@ -127,6 +188,98 @@ class AdminOrdersScreen(ctk.CTkFrame):
         if active_only:
             self.actions_column_index = 8
 
+    def _order_row_values(self, order, active_only):
+        user_display = order.customer_username if hasattr(order, 'customer_username') else str(order.user_id)
+        date_str = order.order_date.strftime('%Y-%m-%d %H:%M') if hasattr(order.order_date, 'strftime') else str(order.order_date)
+        items_str = ", ".join([f"{item.name} x{item.quantity}" for item in getattr(order, 'items', [])])
+        if len(items_str) > 60:
+            items_str = items_str[:57] + "..."
+        address_str = order.delivery_address or "N/A"
+        if len(address_str) > 30:
+            address_str = address_str[:27] + "..."
+        row = [
+            order.order_id,
+            user_display,
+            order.restaurant_name,
+            date_str,
+            f"{order.total_amount:.2f}",
+            f"{order.status} (archived)" if getattr(order, 'archived', False) else order.status,
+            address_str,
+            items_str
+        ]
+        if active_only:
+            row.append("Change Status")
+        return row
+
+    def _schedule_poll(self):
+        # Callbacks that land after on_screen_hidden (a loader render, a poll already running) must not restart it
+        if self._hidden or self._poll_job is not None:
+            return
+        self._poll_job = self.after(ORDER_FEED_POLL_MS, self._poll_order_changes)
+
+    def _poll_order_changes(self):
+        self._poll_job = None
+        if not self.winfo_exists():
+            return
+        if self.loader.is_loading("orders"):
+            self._schedule_poll()  # The reload will carry its own feed position
+            return
+        try:
+            self._apply_pending_changes()
+        except Exception as e:
+            logger.error(f"Error applying order changes: {e}")
+        self._schedule_poll()
+
+    def _apply_pending_changes(self):
+        """Pulls orders changed since the last applied sequence and patches only those rows."""
+        changed_orders, deleted_ids, new_seq = Order.changes_since(self.last_change_seq)
+        if not changed_orders and not deleted_ids:
+            return
+        self.last_change_seq = new_seq
+        active_only = self.current_view == "orders"
+        if not active_only and self.include_archived_var.get():
+            deleted_ids = []  # Removed orders were moved to the archive, which this view also shows
+
+        if self.orders_table is None:
+            # The "No orders found" placeholder is showing; there is no table to patch yet.
+            self._load_and_display_orders(active_only=active_only)
+            return
+
+        displayed_ids = {o.order_id: o for o in self.current_orders}
+        for order in changed_orders:
+            belongs_in_view = not active_only or order.status in ACTIVE_ORDER_STATUSES
+            existing = displayed_ids.get(order.order_id)
+            if existing is not None:
+                row_index = self.current_orders.index(existing)
+                if belongs_in_view:
+                    self.current_orders[row_index] = order
+                    for column, value in enumerate(self._order_row_values(order, active_only)):
+                        self.orders_table.insert(row_index + 1, column, value)
+                else:
+                    self.orders_table.delete_row(row_index + 1)
+                    del self.current_orders[row_index]
+                    del displayed_ids[order.order_id]
+            elif belongs_in_view:
+                if active_only:
+                    # Active board is newest first
+                    self.orders_table.add_row(self._order_row_values(order, active_only), index=1)
+                    self.current_orders.insert(0, order)
+                else:
+                    self.orders_table.add_row(self._order_row_values(order, active_only))
+                    self.current_orders.append(order)
+                displayed_ids[order.order_id] = order
+
+        for order_id in deleted_ids:
+            existing = displayed_ids.pop(order_id, None)
+            if existing is not None:
+                row_index = self.current_orders.index(existing)
+                self.orders_table.delete_row(row_index + 1)
+                del self.current_orders[row_index]
+
+        if not self.current_orders:
+            self._load_and_display_orders(active_only=active_only)
+        logger.info(f"Applied {len(changed_orders)} order change(s) and {len(deleted_ids)} removal(s) up to seq {self.last_change_seq}.")
+
     def _on_cell_click(self, event_data):
         row_clicked = event_data["row"]
         column_clicked = event_data["column"]
@@ -162,7 +315,7 @@ class AdminOrdersScreen(ctk.CTkFrame):
             if OrderModel.update_status(order.order_id, new_status):
                 status_label.configure(text="Status updated!", text_color="#43A047")
                 dialog.after(700, dialog.destroy)
-                self._load_and_display_orders(active_only=True)
+                self._apply_pending_changes()
             else:
                 status_label.configure(text="Failed to update status.", text_color=ERROR_COLOR)
         btn_frame = ctk.CTkFrame(dialog, fg_color="transparent")
@@ -171,3 +324,81 @@ class AdminOrdersScreen(ctk.CTkFrame):
         save_btn.pack(side="left", padx=10)
         cancel_btn = ctk.CTkButton(btn_frame, text="Cancel", command=dialog.destroy, fg_color=ADMIN_SECONDARY_ACCENT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, text_color=ADMIN_TEXT_COLOR, font=ctk.CTkFont(family=FONT_FAMILY, size=14), width=110)
         cancel_btn.pack(side="left", padx=10)
+
+    def _open_export_dialog(self):
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Export Orders")
+        dialog.geometry("420x360")
+        dialog.configure(fg_color=ADMIN_BACKGROUND_COLOR)
+        dialog.grab_set()
+        label_font = ctk.CTkFont(family=FONT_FAMILY, size=14)
+        today = datetime.date.today()
+
+        ctk.CTkLabel(dialog, text="Export Orders for Accounting", font=ctk.CTkFont(family=FONT_FAMILY, size=18, weight="bold"), text_color=ADMIN_PRIMARY_COLOR, fg_color="transparent").pack(pady=(20, 10))
+        form = ctk.CTkFrame(dialog, fg_color="transparent")
+        form.pack(pady=5)
+        ctk.CTkLabel(form, text="Start date (YYYY-MM-DD):", font=label_font, text_color=ADMIN_TEXT_COLOR).grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        start_entry = ctk.CTkEntry(form, width=140, font=label_font)
+        start_entry.insert(0, today.replace(day=1).isoformat())
+        start_entry.grid(row=0, column=1, padx=5, pady=5)
+        ctk.CTkLabel(form, text="End date (YYYY-MM-DD):", font=label_font, text_color=ADMIN_TEXT_COLOR).grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        end_entry = ctk.CTkEntry(form, width=140, font=label_font)
+        end_entry.insert(0, today.isoformat())
+        end_entry.grid(row=1, column=1, padx=5, pady=5)
+        ctk.CTkLabel(form, text="Format:", font=label_font, text_color=ADMIN_TEXT_COLOR).grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        format_var = ctk.StringVar(value="CSV")
+        ctk.CTkOptionMenu(form, variable=format_var, values=["CSV", "JSONL"], font=label_font, fg_color=ADMIN_PRIMARY_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR, width=140).grid(row=2, column=1, padx=5, pady=5)
+        gzip_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(form, text="Compress (gzip)", variable=gzip_var, font=label_font, text_color=ADMIN_TEXT_COLOR, fg_color=ADMIN_PRIMARY_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR).grid(row=3, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+
+        status_label = ctk.CTkLabel(dialog, text="", font=ctk.CTkFont(family=FONT_FAMILY, size=13), text_color=ERROR_COLOR, fg_color="transparent", wraplength=380)
+        status_label.pack(pady=5)
+
+        def start_export():
+            start_date = start_entry.get().strip() or None
+            end_date = end_entry.get().strip() or None
+            try:
+                for value in (start_date, end_date):
+                    if value:
+                        datetime.date.fromisoformat(value)
+            except ValueError:
+                status_label.configure(text="Dates must be YYYY-MM-DD.", text_color=ERROR_COLOR)
+                return
+            fmt = format_var.get().lower()
+            compress = gzip_var.get()
+            suggested = default_export_path(start_date, end_date, fmt, compress)
+            path = filedialog.asksaveasfilename(parent=dialog, title="Save Order Export",
+                                                initialdir=os.path.dirname(suggested),
+                                                initialfile=os.path.basename(suggested),
+                                                defaultextension=f".{fmt}.gz" if compress else f".{fmt}")
+            if not path:
+                return
+            export_btn.configure(state="disabled")
+            status_label.configure(text="Exporting...", text_color=ADMIN_TEXT_COLOR)
+            # The export streams from its own connection, so it can run off the Tk thread;
+            # the result is handed back through a list and picked up by polling with after().
+            outcome = []
+            worker = threading.Thread(target=lambda: outcome.append(export_orders(path, start_date, end_date, fmt=fmt, compress=compress)), daemon=True)
+            worker.start()
+
+            def check_done():
+                if not dialog.winfo_exists():
+                    return
+                if worker.is_alive():
+                    dialog.after(200, check_done)
+                    return
+                export_btn.configure(state="normal")
+                result = outcome[0] if outcome else None
+                if result is None:
+                    status_label.configure(text="Export failed. Check logs for details.", text_color=ERROR_COLOR)
+                else:
+                    status_label.configure(text=f"Exported {result[0]} order(s), {result[1]} line(s).", text_color="#43A047")
+                    logger.info(f"Exported {result[0]} orders to {path}.")
+            dialog.after(200, check_done)
+
+        btn_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        btn_frame.pack(pady=12)
+        export_btn = ctk.CTkButton(btn_frame, text="Export", command=start_export, fg_color=ADMIN_PRIMARY_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR, font=ctk.CTkFont(family=FONT_FAMILY, size=14), width=110)
+        export_btn.pack(side="left", padx=10)
+        close_btn = ctk.CTkButton(btn_frame, text="Close", command=dialog.destroy, fg_color=ADMIN_SECONDARY_ACCENT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, text_color=ADMIN_TEXT_COLOR, font=ctk.CTkFont(family=FONT_FAMILY, size=14), width=110)
+        close_btn.pack(side="left", padx=10)
@@ -18,6 +18,8 @@ from .restaurant_management_screen import RestaurantManagementScreen
 logger = logging.getLogger("swigato_app.admin_restaurants_screen")
 
 class AdminRestaurantsScreen(ctk.CTkFrame):
+    DATA_TABLES = ("restaurants",)
+
     def __init__(self, master, app_callbacks, user, **kwargs):
         super().__init__(master, fg_color=ADMIN_BACKGROUND_COLOR, **kwargs)
         self.app_callbacks = app_callbacks
@@ -179,6 +181,9 @@ class AdminRestaurantsScreen(ctk.CTkFrame):
         self.management_window.grab_set()
         self.management_window.focus()
 
+    def refresh_data(self):
+        self.refresh_restaurants()
+
     def refresh_restaurants(self):
         logger.info("Refreshing restaurants list.")
         self._load_and_display_restaurants()
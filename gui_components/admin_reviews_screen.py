@@ -1,51 +1,206 @@
 import customtkinter as ctk
 from CTkTable import CTkTable
 import logging
+import threading
 from tkinter import messagebox
 from gui_constants import (
-    FONT_FAMILY, BODY_FONT_SIZE, HEADING_FONT_SIZE,
+    FONT_FAMILY, BODY_FONT_SIZE, HEADING_FONT_SIZE, BUTTON_FONT_SIZE,
     ADMIN_BACKGROUND_COLOR, ADMIN_FRAME_FG_COLOR, ADMIN_TEXT_COLOR,
     ADMIN_PRIMARY_ACCENT_COLOR, ADMIN_SECONDARY_ACCENT_COLOR,
     ADMIN_TABLE_HEADER_BG_COLOR, ADMIN_TABLE_ROW_LIGHT_COLOR, ADMIN_TABLE_ROW_DARK_COLOR,
-    ADMIN_TABLE_BORDER_COLOR, ADMIN_TABLE_TEXT_COLOR, ERROR_COLOR
+    ADMIN_TABLE_BORDER_COLOR, ADMIN_TABLE_TEXT_COLOR, ERROR_COLOR,
+    ADMIN_BUTTON_FG_COLOR, ADMIN_BUTTON_HOVER_COLOR, ADMIN_BUTTON_TEXT_COLOR,
+    set_swigato_icon, safe_focus, center_window
 )
 from reviews.models import Review
+from reviews.bulk_actions import bulk_moderate_reviews, count_matching_reviews, has_review_filters
+from restaurants.models import Restaurant
+from reviews.moderation import scan_reviews_for_spam, get_moderation_queue, dismiss_from_queue
+from reviews.sentiment import backfill_review_sentiment
+from gui_components.screen_loader import ScreenLoader
 
 logger = logging.getLogger("swigato_app.admin_reviews_screen")
 
+# Highest-scoring queue entries shown at once
+MODERATION_QUEUE_DISPLAY_LIMIT = 200
+# Orderings of the All Reviews view; every one but "Review ID" only lists reviews that have a sentiment score
+REVIEW_SORT_OPTIONS = ["Review ID", "Most Negative", "Most Positive", "5-Star, Negative Text"]
+# Bulk moderation dialog choices -> bulk_moderate_reviews mode / "hidden" filter value
+BULK_REVIEW_ACTIONS = {"Hide": "hide", "Delete": "delete", "Unhide": "unhide"}
+BULK_REVIEW_VISIBILITY = {"Visible and hidden": None, "Visible only": False, "Hidden only": True}
+
 class AdminReviewsScreen(ctk.CTkFrame):
+    DATA_TABLES = ("reviews",)
+
     def __init__(self, master, app_callbacks, user, **kwargs):
         super().__init__(master, fg_color=ADMIN_BACKGROUND_COLOR, **kwargs)
         self.app_callbacks = app_callbacks
         self.loggedInUser = user
         self.current_reviews = []
+        self.queue_entries = []
+        self.view_mode = "all" # "all" or "queue"
+        # Sentiment sorts are paged (keyset on (sentiment, review_id)); the last cursor is the current page
+        self.sentiment_page_cursors = [None]
+        self.sentiment_next_cursor = None
+        self.loader = ScreenLoader(self, spinner_color=ADMIN_TEXT_COLOR) # Both views load into the "table" slot
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=0)
-        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(1, weight=0)
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(3, weight=0)
 
         title_label = ctk.CTkLabel(self, text="Global Reviews Moderation",
                                    font=ctk.CTkFont(family=FONT_FAMILY, size=HEADING_FONT_SIZE, weight="bold"),
                                    text_color=ADMIN_TEXT_COLOR)
         title_label.grid(row=0, column=0, padx=20, pady=(10, 10), sticky="nw")
 
+        controls_frame = ctk.CTkFrame(self, fg_color="transparent")
+        controls_frame.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="ew")
+        self.view_mode_button = ctk.CTkButton(
+            controls_frame, text="Moderation Queue", command=self._toggle_view_mode,
+            fg_color=ADMIN_SECONDARY_ACCENT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, text_color=ADMIN_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=150
+        )
+        self.view_mode_button.pack(side="left")
+        self.sort_var = ctk.StringVar(value=REVIEW_SORT_OPTIONS[0])
+        self.sort_menu = ctk.CTkOptionMenu(
+            controls_frame,
+            variable=self.sort_var,
+            values=REVIEW_SORT_OPTIONS,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
+            dropdown_font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
+            command=self._on_sort_change,
+            fg_color=ADMIN_BUTTON_FG_COLOR,
+            button_color=ADMIN_BUTTON_FG_COLOR,
+            button_hover_color=ADMIN_BUTTON_HOVER_COLOR,
+            text_color_disabled=ADMIN_TEXT_COLOR
+        )
+        self.sort_menu.pack(side="left", padx=(10, 0))
+        self.sentiment_button = ctk.CTkButton(
+            controls_frame, text="Score Sentiment", command=self._run_sentiment_backfill,
+            fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=140
+        )
+        self.sentiment_button.pack(side="left", padx=(10, 0))
+        self.bulk_button = ctk.CTkButton(
+            controls_frame, text="Bulk Moderate...", command=self._open_bulk_moderation_dialog,
+            fg_color=ADMIN_SECONDARY_ACCENT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, text_color=ADMIN_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=140
+        )
+        self.bulk_button.pack(side="left", padx=(10, 0))
+        self.scan_button = ctk.CTkButton(
+            controls_frame, text="Run Spam Scan", command=self._run_spam_scan,
+            fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=150
+        )
+        self.scan_button.pack(side="left", padx=(10, 0))
+        self.status_label = ctk.CTkLabel(controls_frame, text="", font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE - 1),
+                                         text_color=ADMIN_TEXT_COLOR)
+        self.status_label.pack(side="left", padx=(15, 0))
+
         self.table_frame = ctk.CTkFrame(self, fg_color=ADMIN_FRAME_FG_COLOR, corner_radius=10)
-        self.table_frame.grid(row=1, column=0, padx=20, pady=(0,20), sticky="nsew")
+        self.table_frame.grid(row=2, column=0, padx=20, pady=(0,20), sticky="nsew")
         self.table_frame.grid_columnconfigure(0, weight=1)
         self.table_frame.grid_rowconfigure(0, weight=1)
 
+        # Pager for the sentiment sorts; hidden for the other views
+        self.pager_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.pager_frame.grid(row=3, column=0, padx=20, pady=(0, 15), sticky="e")
+        self.prev_page_button = ctk.CTkButton(
+            self.pager_frame, text="< Previous", command=self._show_previous_page,
+            fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=110
+        )
+        self.prev_page_button.pack(side="left", padx=(0,10))
+        self.page_label = ctk.CTkLabel(self.pager_frame, text="Page 1", font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE), text_color=ADMIN_TEXT_COLOR)
+        self.page_label.pack(side="left", padx=(0,10))
+        self.next_page_button = ctk.CTkButton(
+            self.pager_frame, text="Next >", command=self._show_next_page,
+            fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=110
+        )
+        self.next_page_button.pack(side="left")
+        self.pager_frame.grid_remove()
+
         self.reviews_table = None
         self._load_and_display_reviews()
         logger.info("AdminReviewsScreen initialized and reviews loaded.")
 
+    def _toggle_view_mode(self):
+        self.view_mode = "queue" if self.view_mode == "all" else "all"
+        self.view_mode_button.configure(text="All Reviews" if self.view_mode == "queue" else "Moderation Queue")
+        self._refresh_view()
+
+    def _on_sort_change(self, choice):
+        self.sentiment_page_cursors = [None]
+        if self.view_mode == "queue":
+            self._toggle_view_mode()
+        else:
+            self._load_and_display_reviews()
+
+    def refresh_data(self):
+        self._refresh_view()
+
+    def _refresh_view(self):
+        if self.view_mode == "queue":
+            self._load_and_display_queue()
+        else:
+            self._load_and_display_reviews()
+
+    def _show_next_page(self):
+        if self.sentiment_next_cursor is None or self.loader.is_loading("table"):
+            return
+        self.sentiment_page_cursors.append(self.sentiment_next_cursor)
+        self._load_and_display_reviews()
+
+    def _show_previous_page(self):
+        if len(self.sentiment_page_cursors) <= 1 or self.loader.is_loading("table"):
+            return
+        self.sentiment_page_cursors.pop()
+        self._load_and_display_reviews()
+
+    def _update_pager(self, sort_choice):
+        if sort_choice == REVIEW_SORT_OPTIONS[0]:
+            self.pager_frame.grid_remove()
+            return
+        self.pager_frame.grid()
+        self.page_label.configure(text=f"Page {len(self.sentiment_page_cursors)}")
+        self.prev_page_button.configure(state="normal" if len(self.sentiment_page_cursors) > 1 else "disabled")
+        self.next_page_button.configure(state="normal" if self.sentiment_next_cursor is not None else "disabled")
+
     def _load_and_display_reviews(self):
+        sort_choice = self.sort_var.get()
+        after = self.sentiment_page_cursors[-1]
+
+        def fetch():
+            if sort_choice == "Most Negative":
+                return Review.get_reviews_by_sentiment(most_negative_first=True, after=after)
+            if sort_choice == "Most Positive":
+                return Review.get_reviews_by_sentiment(most_negative_first=False, after=after)
+            if sort_choice == "5-Star, Negative Text":
+                return Review.get_rating_mismatches(after=after)
+            return Review.get_all_reviews(), None
+
+        self.loader.load("table", fetch, lambda result: self._display_reviews(*result, sort_choice=sort_choice),
+                         spinner_parent=self.table_frame, spinner_text="Loading reviews...")
+
+    def _display_reviews(self, all_reviews, next_cursor, sort_choice):
+        if not all_reviews and len(self.sentiment_page_cursors) > 1:
+            # The page emptied out (e.g. its reviews were deleted); step back one page
+            self.sentiment_page_cursors.pop()
+            self._load_and_display_reviews()
+            return
+        self.sentiment_next_cursor = next_cursor
+        self._update_pager(sort_choice)
         for widget in self.table_frame.winfo_children():
             widget.destroy()
-
-        all_reviews = Review.get_all_reviews()
+        self.status_label.configure(text="")
+        if sort_choice != REVIEW_SORT_OPTIONS[0]:
+            self.status_label.configure(text="Scored reviews only; use Score Sentiment for older reviews.")
         self.current_reviews = all_reviews
 
-        headers = ["ID", "Restaurant", "User", "Rating", "Comment", "Date", "Actions"]
+        headers = ["ID", "Restaurant", "User", "Rating", "Comment", "Date", "Sentiment", "Actions"]
         table_data = [headers]
         for review in all_reviews:
             date_str = review.review_date.strftime('%Y-%m-%d %H:%M') if hasattr(review.review_date, 'strftime') else str(review.review_date)
@@ -54,9 +209,10 @@ class AdminReviewsScreen(ctk.CTkFrame):
                 review.review_id,
                 review.restaurant_name,
                 review.username,
-                f"{review.rating}/5",
+                f"{review.rating}/5" + (" (hidden)" if review.is_hidden else ""),
                 comment_short,
                 date_str,
+                f"{review.sentiment:+.2f}" if review.sentiment is not None else "-",
                 "Delete"
             ])
 
@@ -83,7 +239,7 @@ class AdminReviewsScreen(ctk.CTkFrame):
             wraplength=180
         )
         self.reviews_table.pack(expand=True, fill="both", padx=10, pady=10)
-        self.actions_column_index = 6
+        self.actions_column_index = 7
 
     def _on_cell_click(self, event_data):
         row_clicked = event_data["row"]
@@ -97,6 +253,303 @@ class AdminReviewsScreen(ctk.CTkFrame):
         if column_clicked == self.actions_column_index:
             self._confirm_delete_review(review.review_id)
 
+    def _load_and_display_queue(self):
+        self.loader.load("table", lambda: get_moderation_queue(limit=MODERATION_QUEUE_DISPLAY_LIMIT), self._display_queue,
+                         spinner_parent=self.table_frame, spinner_text="Loading moderation queue...")
+
+    def _display_queue(self, queue_entries):
+        self.pager_frame.grid_remove()
+        for widget in self.table_frame.winfo_children():
+            widget.destroy()
+
+        self.queue_entries = queue_entries
+        self.status_label.configure(text=f"Showing the top {len(self.queue_entries)} flagged review(s)" if self.queue_entries else "")
+
+        headers = ["ID", "Score", "Group", "Restaurant", "User", "Rating", "Comment", "Reason", "Delete", "Dismiss"]
+        table_data = [headers]
+        for entry in self.queue_entries:
+            comment = entry['comment'] or ""
+            comment_short = (comment[:40] + '...') if len(comment) > 43 else comment
+            table_data.append([
+                entry['review_id'],
+                f"{entry['score']:.0f}",
+                entry['cluster_id'] if entry['cluster_id'] is not None else "-",
+                entry['restaurant_name'] or "-",
+                entry['username'],
+                f"{entry['rating']}/5",
+                comment_short,
+                entry['reason'],
+                "Delete",
+                "Dismiss"
+            ])
+
+        if len(table_data) == 1:
+            ctk.CTkLabel(self.table_frame, text="The moderation queue is empty. Run a spam scan to fill it.",
+                         font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
+                         text_color=ADMIN_TEXT_COLOR).pack(expand=True, anchor="center", padx=20, pady=20)
+            return
+
+        cell_font = ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE - 1)
+        queue_table = CTkTable(
+            master=self.table_frame,
+            values=table_data,
+            font=cell_font,
+            header_color=ADMIN_TABLE_HEADER_BG_COLOR,
+            text_color=ADMIN_TABLE_TEXT_COLOR,
+            hover_color=ADMIN_PRIMARY_ACCENT_COLOR,
+            colors=[ADMIN_TABLE_ROW_LIGHT_COLOR, ADMIN_TABLE_ROW_DARK_COLOR],
+            corner_radius=8,
+            border_width=1,
+            border_color=ADMIN_TABLE_BORDER_COLOR,
+            command=self._on_queue_cell_click,
+            wraplength=160
+        )
+        queue_table.pack(expand=True, fill="both", padx=10, pady=10)
+
+    def _on_queue_cell_click(self, event_data):
+        row_clicked = event_data["row"]
+        if row_clicked == 0 or not (0 <= row_clicked - 1 < len(self.queue_entries)):
+            return
+        entry = self.queue_entries[row_clicked - 1]
+        if event_data["column"] == 8:
+            self._confirm_delete_review(entry['review_id'])
+        elif event_data["column"] == 9:
+            dismiss_from_queue([entry['review_id']])
+            logger.info(f"Admin '{self.loggedInUser.username if self.loggedInUser else 'unknown'}' dismissed review {entry['review_id']} from the moderation queue.")
+            self._load_and_display_queue()
+
+    def _run_spam_scan(self):
+        """Runs scan_reviews_for_spam on a worker thread, showing how many reviews have been read, then opens the queue."""
+        progress = {"read": 0, "result": None, "error": None}
+
+        def worker():
+            try:
+                progress["result"] = scan_reviews_for_spam(progress_callback=lambda read: progress.update(read=read))
+            except Exception as e:
+                progress["error"] = e
+
+        self.scan_button.configure(state="disabled")
+        self.status_label.configure(text="Scanning reviews...")
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+
+        def poll():
+            if not self.winfo_exists():
+                return
+            if thread.is_alive():
+                self.status_label.configure(text=f"Scanning reviews... {progress['read']} read")
+                self.after(200, poll)
+                return
+            self.scan_button.configure(state="normal")
+            summary = progress["result"]
+            if progress["error"] is not None or summary is None:
+                logger.error(f"Review spam scan failed: {progress['error']}")
+                self.status_label.configure(text="")
+                messagebox.showerror("Error", "Spam scan failed. Check logs.")
+                return
+            messagebox.showinfo("Spam Scan",
+                                f"Scanned {summary['reviews']} review(s) in {summary['seconds']:.1f}s.\n"
+                                f"{summary['groups']} near-duplicate group(s), {summary['burst_reviews']} burst review(s).\n"
+                                f"{summary['flagged']} review(s) queued for moderation.")
+            if self.view_mode != "queue":
+                self._toggle_view_mode()
+            else:
+                self._load_and_display_queue()
+        self.after(200, poll)
+
+    def _run_sentiment_backfill(self):
+        """Scores every review that has no sentiment yet on a worker thread, then reloads the table."""
+        progress = {"report": None, "result": None, "error": None}
+
+        def worker():
+            try:
+                progress["result"] = backfill_review_sentiment(progress_callback=lambda report: progress.update(report=dict(report)))
+            except Exception as e:
+                progress["error"] = e
+
+        self.sentiment_button.configure(state="disabled")
+        self.status_label.configure(text="Scoring review sentiment...")
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+
+        def poll():
+            if not self.winfo_exists():
+                return
+            if thread.is_alive():
+                if progress["report"]:
+                    self.status_label.configure(text=f"Scoring review sentiment... {progress['report']['scored']} scored")
+                self.after(200, poll)
+                return
+            self.sentiment_button.configure(state="normal")
+            if progress["error"] is not None:
+                logger.error(f"Sentiment backfill failed: {progress['error']}")
+                messagebox.showerror("Error", "Sentiment scoring failed. Check logs.")
+                return
+            result = progress["result"]
+            messagebox.showinfo("Sentiment", f"Scored {result['scored']} review(s) in {result['seconds']:.1f}s "
+                                             f"({result['reviews_per_second']:.0f}/s).")
+            self._refresh_view()
+        self.after(200, poll)
+
+    def _open_bulk_moderation_dialog(self):
+        if hasattr(self, 'bulk_dialog') and self.bulk_dialog.winfo_exists():
+            safe_focus(self.bulk_dialog)
+            return
+
+        self.bulk_dialog = ctk.CTkToplevel(self)
+        self.bulk_dialog.title("Swigato - Bulk Review Moderation")
+        set_swigato_icon(self.bulk_dialog)
+        center_window(self.bulk_dialog, 460, 560)
+        self.bulk_dialog.configure(fg_color=ADMIN_FRAME_FG_COLOR)
+        self.bulk_dialog.transient(self.master)
+        self.bulk_dialog.grab_set()
+
+        form = ctk.CTkFrame(self.bulk_dialog, fg_color=ADMIN_FRAME_FG_COLOR)
+        form.pack(expand=True, fill="both", padx=20, pady=20)
+        form.grid_columnconfigure(1, weight=1)
+        label_font = ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE)
+
+        def add_row(row, text, widget):
+            ctk.CTkLabel(form, text=text, font=label_font, text_color=ADMIN_TEXT_COLOR).grid(row=row, column=0, sticky="w", pady=4, padx=(0, 10))
+            widget.grid(row=row, column=1, sticky="ew", pady=4)
+            return widget
+
+        def entry(placeholder=""):
+            return ctk.CTkEntry(form, placeholder_text=placeholder, font=label_font, text_color=ADMIN_TEXT_COLOR,
+                                fg_color=ADMIN_TABLE_ROW_LIGHT_COLOR, border_color=ADMIN_TABLE_BORDER_COLOR)
+
+        def option_menu(values):
+            variable = ctk.StringVar(value=values[0])
+            menu = ctk.CTkOptionMenu(form, variable=variable, values=values, font=label_font, dropdown_font=label_font,
+                                     fg_color=ADMIN_BUTTON_FG_COLOR, button_color=ADMIN_BUTTON_FG_COLOR,
+                                     button_hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color_disabled=ADMIN_TEXT_COLOR)
+            return menu, variable
+
+        self.bulk_restaurant_ids = {f"{r.name} (#{r.restaurant_id})": r.restaurant_id for r in Restaurant.get_all()}
+        ratings = ["Any", "1", "2", "3", "4", "5"]
+        self.bulk_username_entry = add_row(0, "Username:", entry("any user"))
+        restaurant_menu, self.bulk_restaurant_var = option_menu(["Any"] + list(self.bulk_restaurant_ids))
+        add_row(1, "Restaurant:", restaurant_menu)
+        self.bulk_start_entry = add_row(2, "From date:", entry("YYYY-MM-DD"))
+        self.bulk_end_entry = add_row(3, "To date:", entry("YYYY-MM-DD"))
+        min_menu, self.bulk_min_rating_var = option_menu(ratings)
+        add_row(4, "Min rating:", min_menu)
+        max_menu, self.bulk_max_rating_var = option_menu(ratings)
+        add_row(5, "Max rating:", max_menu)
+        self.bulk_text_entry = add_row(6, "Comment contains:", entry("any text"))
+        visibility_menu, self.bulk_visibility_var = option_menu(list(BULK_REVIEW_VISIBILITY))
+        add_row(7, "Include:", visibility_menu)
+        action_menu, self.bulk_action_var = option_menu(list(BULK_REVIEW_ACTIONS))
+        add_row(8, "Action:", action_menu)
+
+        self.bulk_result_label = ctk.CTkLabel(form, text="", font=label_font, text_color=ADMIN_TEXT_COLOR, wraplength=400, justify="left")
+        self.bulk_result_label.grid(row=9, column=0, columnspan=2, sticky="w", pady=(10, 0))
+
+        buttons_frame = ctk.CTkFrame(form, fg_color="transparent")
+        buttons_frame.grid(row=10, column=0, columnspan=2, sticky="e", pady=(15, 0))
+        self.bulk_apply_button = ctk.CTkButton(
+            buttons_frame, text="Apply", command=self._apply_bulk_moderation,
+            fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=100
+        )
+        self.bulk_apply_button.pack(side="right", padx=(10, 0))
+        ctk.CTkButton(
+            buttons_frame, text="Count Matches", command=self._count_bulk_matches,
+            fg_color=ADMIN_SECONDARY_ACCENT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, text_color=ADMIN_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=120
+        ).pack(side="right", padx=(10, 0))
+        ctk.CTkButton(
+            buttons_frame, text="Cancel", command=self.bulk_dialog.destroy,
+            fg_color=ADMIN_SECONDARY_ACCENT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, text_color=ADMIN_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=90
+        ).pack(side="right")
+        safe_focus(self.bulk_username_entry)
+
+    def _collect_bulk_filters(self):
+        """Reads the bulk moderation form into a filters dict for reviews.bulk_actions."""
+        def rating(variable):
+            return None if variable.get() == "Any" else int(variable.get())
+        return {
+            "username": self.bulk_username_entry.get().strip() or None,
+            "restaurant_id": self.bulk_restaurant_ids.get(self.bulk_restaurant_var.get()),
+            "start_date": self.bulk_start_entry.get().strip() or None,
+            "end_date": self.bulk_end_entry.get().strip() or None,
+            "min_rating": rating(self.bulk_min_rating_var),
+            "max_rating": rating(self.bulk_max_rating_var),
+            "text": self.bulk_text_entry.get().strip() or None,
+            "hidden": BULK_REVIEW_VISIBILITY[self.bulk_visibility_var.get()],
+        }
+
+    def _count_bulk_matches(self):
+        """Dry run: shows how many reviews the current filters match."""
+        filters = self._collect_bulk_filters()
+        all_reviews = not has_review_filters(filters)
+        counts = count_matching_reviews(filters, all_reviews=all_reviews)
+        if counts is None:
+            self.bulk_result_label.configure(text="Invalid filters (dates must be YYYY-MM-DD).", text_color=ERROR_COLOR)
+            return None
+        self.bulk_result_label.configure(
+            text=("No filters set: ALL reviews are selected. " if all_reviews else "")
+            + f"{counts['matching']} review(s) match across {counts['restaurants']} restaurant(s); {counts['hidden']} already hidden.",
+            text_color=ERROR_COLOR if all_reviews else ADMIN_TEXT_COLOR)
+        return counts
+
+    def _apply_bulk_moderation(self):
+        """Confirms with the dry-run count, then runs bulk_moderate_reviews on a worker thread."""
+        counts = self._count_bulk_matches()
+        if not counts or counts['matching'] == 0:
+            return
+        action = self.bulk_action_var.get()
+        mode = BULK_REVIEW_ACTIONS[action]
+        filters = self._collect_bulk_filters()
+        all_reviews = not has_review_filters(filters)
+        # With no filters the action hits the whole table; that needs its own, separate confirmation
+        if all_reviews and not messagebox.askyesno(
+                "Select All Reviews",
+                f"No filters are set, so this selects EVERY review ({counts['matching']}).\nReally apply '{action}' to all reviews?",
+                icon="warning", parent=self.bulk_dialog):
+            return
+        if not messagebox.askyesno("Confirm Bulk Moderation", f"{action} {counts['matching']} matching review(s)?"
+                                   + ("\nDeleted reviews cannot be restored." if mode == "delete" else ""), parent=self.bulk_dialog):
+            return
+        progress = {"report": None, "result": None, "error": None}
+
+        def worker():
+            try:
+                progress["result"] = bulk_moderate_reviews(filters, mode=mode, all_reviews=all_reviews,
+                                                           progress_callback=lambda report: progress.update(report=dict(report)))
+            except Exception as e:
+                progress["error"] = e
+
+        self.bulk_apply_button.configure(state="disabled")
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+
+        def poll():
+            if not self.winfo_exists():
+                return
+            dialog_open = self.bulk_dialog.winfo_exists()
+            if thread.is_alive():
+                if dialog_open and progress["report"]:
+                    report = progress["report"]
+                    self.bulk_result_label.configure(text=f"{action}: {report['processed']}/{report['matching']} review(s)...")
+                self.after(100, poll)
+                return
+            result = progress["result"]
+            if progress["error"] is not None or result is None:
+                logger.error(f"Bulk review {mode} failed: {progress['error']}")
+                messagebox.showerror("Error", f"Bulk {action.lower()} failed. Check logs.")
+            else:
+                logger.info(f"Admin '{self.loggedInUser.username if self.loggedInUser else 'unknown'}' bulk {mode}: {result['changed']} review(s) changed ({filters}).")
+                summary = f"{result['changed']} of {result['matching']} matching review(s) changed."
+                if result['failed']:
+                    summary += f"\n{len(result['failed'])} chunk(s) failed; check logs."
+                messagebox.showinfo(f"Bulk {action}", summary)
+            if dialog_open:
+                self.bulk_dialog.destroy()
+            self._refresh_view()
+        self.after(100, poll)
+
     def _confirm_delete_review(self, review_id):
         confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this review?")
         if not confirm:
@@ -104,6 +557,6 @@ class AdminReviewsScreen(ctk.CTkFrame):
         success = Review.delete_review(review_id)
         if success:
             messagebox.showinfo("Success", "Review deleted successfully.")
-            self._load_and_display_reviews()
+            self._refresh_view()
         else:
             messagebox.showerror("Error", "Failed to delete review. It may not exist.")
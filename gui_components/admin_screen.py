@@ -15,7 +15,6 @@ from gui_constants import (
     set_swigato_icon, safe_focus, center_window # Utility functions
 )
 from users.models import User # Import the User model
-from utils.database import get_db_connection # For direct DB operations if needed, though User model should handle most
 
 logger = logging.getLogger("swigato_app.admin_users_screen") # Updated logger name
 
@@ -340,19 +339,13 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         self.error_label_edit_user.configure(text="")
 
         update_success = True
+        # Update username through the model so the user cache is invalidated too
         if user_to_update_obj.username != new_username:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            try:
-                cursor.execute("UPDATE users SET username = ? WHERE user_id = ?", (new_username, user_to_update_obj.user_id))
-                conn.commit()
-                user_to_update_obj.username = new_username
+            if user_to_update_obj.update_username(new_username):
                 logger.info(f"Username for user ID {user_to_update_obj.user_id} updated to '{new_username}'.")
-            except Exception as e:
-                logger.error(f"Error updating username for user ID {user_to_update_obj.user_id}: {e}")
+            else:
+                logger.error(f"Error updating username for user ID {user_to_update_obj.user_id}.")
                 update_success = False
-            finally:
-                conn.close()
 
         if user_to_update_obj.address != new_address:
             if not user_to_update_obj.update_address(new_address):
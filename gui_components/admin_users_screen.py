@@ -17,14 +17,22 @@ from gui_constants import (
     set_swigato_icon, safe_focus, center_window # Added utilities
 )
 from users.models import User # Import the User model
-from utils.database import get_db_connection # For direct DB operations if needed, though User model should handle most
+from users.auth_pool import hash_password_async
+from users.bulk_actions import bulk_update_users
+import threading
+from gui_components.screen_loader import ScreenLoader
 
 logger = logging.getLogger("swigato_app.admin_users_screen") # Updated logger name
 
 # Define icon path - ensure swigato_icon.ico is in the root of the project
 ICON_PATH = "swigato_icon.ico"
 
+# Users shown per page of the table
+USERS_PAGE_SIZE = 50
+
 class AdminUsersScreen(ctk.CTkFrame): # Renamed class
+    DATA_TABLES = ("users",)
+
     def __init__(self, master, app_callbacks, user, **kwargs): # Removed users_data_list
         super().__init__(master, fg_color=ADMIN_BACKGROUND_COLOR, **kwargs)
         self.app_callbacks = app_callbacks
@@ -39,6 +47,9 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         self.admin_column_index = 2 # Column index for "Admin?"
         self.actions_column_index = 4 # Combined actions column
         self.current_edit_user_id = None # Will store the ID of the user being edited
+        self.select_mode = False # Multi-select mode: clicks toggle rows for bulk actions instead of opening the editor
+        self.selected_user_ids = set()
+        self.loader = ScreenLoader(self, spinner_color=ADMIN_TEXT_COLOR)
 
         # Title
         title_label = ctk.CTkLabel(self, text="User Management", font=ctk.CTkFont(family=FONT_FAMILY, size=HEADING_FONT_SIZE, weight="bold"), text_color=ADMIN_TEXT_COLOR)
@@ -103,7 +114,19 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
             font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE),
             corner_radius=8
         )
-        self.add_user_button.pack(pady=5)
+        self.add_user_button.pack(side="right", pady=5)
+
+        self.select_mode_button = ctk.CTkButton(
+            right_controls_subframe,
+            text="Select Multiple",
+            command=self._toggle_select_mode,
+            fg_color=ADMIN_SECONDARY_ACCENT_COLOR,
+            hover_color=ADMIN_PRIMARY_ACCENT_COLOR,
+            text_color=ADMIN_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE),
+            corner_radius=8
+        )
+        self.select_mode_button.pack(side="right", padx=(0,10), pady=5)
 
         # Frame for the table
         self.table_frame = ctk.CTkFrame(self, fg_color=ADMIN_FRAME_FG_COLOR, corner_radius=10)
@@ -111,18 +134,198 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         self.table_frame.grid_columnconfigure(0, weight=1)
         self.table_frame.grid_rowconfigure(0, weight=1)
 
+        # Bottom bar: bulk selection actions on the left (select mode only), pager on the right
+        self.grid_rowconfigure(3, weight=0)
+        bottom_bar = ctk.CTkFrame(self, fg_color="transparent")
+        bottom_bar.grid(row=3, column=0, columnspan=2, padx=20, pady=(0,15), sticky="ew")
+
+        # Pager: users are loaded one page at a time via User.search (keyset on user_id)
+        pager_frame = ctk.CTkFrame(bottom_bar, fg_color="transparent")
+        pager_frame.pack(side="right")
+        self.prev_page_button = ctk.CTkButton(
+            pager_frame, text="< Previous", command=self._show_previous_page,
+            fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=110
+        )
+        self.prev_page_button.pack(side="left", padx=(0,10))
+        self.page_label = ctk.CTkLabel(pager_frame, text="Page 1", font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE), text_color=ADMIN_TEXT_COLOR)
+        self.page_label.pack(side="left", padx=(0,10))
+        self.next_page_button = ctk.CTkButton(
+            pager_frame, text="Next >", command=self._show_next_page,
+            fg_color=ADMIN_BUTTON_FG_COLOR, hover_color=ADMIN_BUTTON_HOVER_COLOR, text_color=ADMIN_BUTTON_TEXT_COLOR,
+            font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=110
+        )
+        self.next_page_button.pack(side="left")
+
+        self.selection_frame = ctk.CTkFrame(bottom_bar, fg_color="transparent") # Packed only while in select mode
+        self.selection_label = ctk.CTkLabel(self.selection_frame, text="0 selected", font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE), text_color=ADMIN_TEXT_COLOR)
+        self.selection_label.pack(side="left", padx=(0,10))
+        for text, command in (("Select Page", self._select_current_page),
+                              ("Select All Matching", self._select_all_matching),
+                              ("Clear", self._clear_selection)):
+            ctk.CTkButton(
+                self.selection_frame, text=text, command=command,
+                fg_color=ADMIN_SECONDARY_ACCENT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, text_color=ADMIN_TEXT_COLOR,
+                font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=90
+            ).pack(side="left", padx=(0,6))
+        self.bulk_action_buttons = []
+        for text, mode, color in (("Deactivate", "deactivate", ADMIN_BUTTON_FG_COLOR),
+                                  ("Reactivate", "reactivate", ADMIN_BUTTON_FG_COLOR),
+                                  ("Delete", "delete", ERROR_COLOR)):
+            button = ctk.CTkButton(
+                self.selection_frame, text=text, command=lambda m=mode: self._confirm_bulk_action(m),
+                fg_color=color, hover_color=ADMIN_BUTTON_HOVER_COLOR if mode != "delete" else "#C00000", text_color=ADMIN_BUTTON_TEXT_COLOR,
+                font=ctk.CTkFont(family=FONT_FAMILY, size=BUTTON_FONT_SIZE), corner_radius=8, width=90
+            )
+            button.pack(side="left", padx=(6,0))
+            self.bulk_action_buttons.append(button)
+
+        self.page_cursors = [None] # after_id for each page visited so far; the last is the current page
+        self.next_page_cursor = None
+
         self.user_table = None
         self._load_and_display_users() # Initial load
 
     def _apply_filters_and_refresh_table(self):
         logger.debug("Applying filters and refreshing table.")
+        self.page_cursors = [None]
         self._load_and_display_users()
 
     def _clear_filters_and_refresh_table(self):
         logger.debug("Clearing filters and refreshing table.")
         self.search_entry.delete(0, "end")
         self.admin_filter_var.set("All")
+        self.page_cursors = [None]
+        self._load_and_display_users()
+
+    def _show_next_page(self):
+        if self.next_page_cursor is None or self.loader.is_loading("users"):
+            return
+        self.page_cursors.append(self.next_page_cursor)
         self._load_and_display_users()
+
+    def _show_previous_page(self):
+        if len(self.page_cursors) <= 1 or self.loader.is_loading("users"):
+            return
+        self.page_cursors.pop()
+        self._load_and_display_users()
+
+    def _update_pager(self):
+        self.page_label.configure(text=f"Page {len(self.page_cursors)}")
+        self.prev_page_button.configure(state="normal" if len(self.page_cursors) > 1 else "disabled")
+        self.next_page_button.configure(state="normal" if self.next_page_cursor is not None else "disabled")
+
+    def _toggle_select_mode(self):
+        self.select_mode = not self.select_mode
+        self.selected_user_ids.clear()
+        if self.select_mode:
+            self.select_mode_button.configure(text="Done Selecting")
+            self.selection_frame.pack(side="left")
+        else:
+            self.select_mode_button.configure(text="Select Multiple")
+            self.selection_frame.pack_forget()
+        self._update_selection_label()
+        self._load_and_display_users()
+
+    def _update_selection_label(self):
+        self.selection_label.configure(text=f"{len(self.selected_user_ids)} selected")
+        state = "normal" if self.selected_user_ids else "disabled"
+        for button in self.bulk_action_buttons:
+            button.configure(state=state)
+
+    def _select_current_page(self):
+        self.selected_user_ids.update(user_item['id'] for user_item in self.current_view_users)
+        self._update_selection_label()
+        self._load_and_display_users()
+
+    def _select_all_matching(self):
+        # Every user matching the current search/filter, not just the visible page
+        search_term = self.search_entry.get().strip()
+        admin_filter_status = self.admin_filter_var.get()
+
+        def render(matching_ids):
+            self.selected_user_ids.update(matching_ids)
+            logger.info(f"Selected {len(matching_ids)} users matching search '{search_term}', filter '{admin_filter_status}'.")
+            self._update_selection_label()
+            self._load_and_display_users()
+
+        self.loader.load("select_all", lambda: User.search_ids(search_term, admin_filter_status), render,
+                         spinner_parent=self.table_frame, spinner_text="Selecting users...")
+
+    def _clear_selection(self):
+        self.selected_user_ids.clear()
+        self._update_selection_label()
+        self._load_and_display_users()
+
+    def _confirm_bulk_action(self, mode):
+        if not self.selected_user_ids:
+            return
+        count = len(self.selected_user_ids)
+        own_id = self.loggedInUser.user_id if self.loggedInUser else None
+        note = "\n\nYour own account is selected and will be skipped." if own_id in self.selected_user_ids else ""
+        if mode == "delete":
+            message = f"Permanently delete {count} user(s) and all of their reviews?{note}"
+        elif mode == "deactivate":
+            message = f"Deactivate {count} user(s)? They will be logged out and unable to log in.{note}"
+        else:
+            message = f"Reactivate {count} user(s)?{note}"
+        if not messagebox.askyesno(f"Confirm {mode.capitalize()}", message):
+            return
+        # Same question the CLI asks: deactivation is reversible, deleting reviews is not
+        delete_reviews = mode == "deactivate" and messagebox.askyesno(
+            "Delete Reviews", f"Also permanently delete the reviews of these {count} user(s)?")
+        if mode == "reactivate":
+            self._run_bulk_action(mode)
+        else:
+            # Destructive bulk actions need the same admin password check as a single deletion
+            self._prompt_admin_password_for_delete(None, f"{count} selected users",
+                                                   on_verified=lambda: self._run_bulk_action(mode, delete_reviews),
+                                                   action_text=f"{mode} {count} selected user(s)")
+
+    def _run_bulk_action(self, mode, delete_reviews=False):
+        """Runs bulk_update_users on a worker thread and shows chunk progress until it finishes."""
+        user_ids = list(self.selected_user_ids)
+        own_id = self.loggedInUser.user_id if self.loggedInUser else None
+        progress = {"report": None, "result": None, "error": None}
+
+        def worker():
+            try:
+                progress["result"] = bulk_update_users(
+                    user_ids, mode=mode, delete_reviews=delete_reviews, protected_user_ids=[own_id] if own_id is not None else [],
+                    progress_callback=lambda report: progress.update(report=dict(report)))
+            except Exception as e:
+                progress["error"] = e
+
+        for button in self.bulk_action_buttons:
+            button.configure(state="disabled")
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+
+        def poll():
+            if not self.winfo_exists():
+                return
+            if thread.is_alive():
+                report = progress["report"]
+                if report:
+                    self.selection_label.configure(text=f"{mode.capitalize()}: {report['processed']}/{report['requested']} users...")
+                self.after(100, poll)
+                return
+            if progress["error"] is not None:
+                logger.error(f"Bulk {mode} failed: {progress['error']}")
+                messagebox.showerror("Error", f"Bulk {mode} failed. Check logs.")
+            else:
+                result = progress["result"]
+                logger.info(f"Admin '{self.loggedInUser.username if self.loggedInUser else 'unknown'}' bulk {mode}: {result['changed']} user(s) changed, {result['reviews_deleted']} review(s) deleted.")
+                summary = f"{result['changed']} user(s) {mode}d, {result['reviews_deleted']} review(s) deleted."
+                if result['skipped']:
+                    summary += f"\n{len(result['skipped'])} protected account(s) skipped."
+                if result['failed']:
+                    summary += f"\n{len(result['failed'])} chunk(s) failed; check logs."
+                messagebox.showinfo(f"Bulk {mode.capitalize()}", summary)
+            self.selected_user_ids.clear()
+            self._update_selection_label()
+            self._load_and_display_users()
+        self.after(100, poll)
     
     def _open_add_user_dialog(self):
         if hasattr(self, 'add_user_dialog') and self.add_user_dialog.winfo_exists():
@@ -370,7 +573,7 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         # Call the new method to prompt for admin password
         self._prompt_admin_password_for_delete(user_id_to_delete, username_for_dialog)
 
-    def _prompt_admin_password_for_delete(self, user_id_to_delete, username_for_dialog):
+    def _prompt_admin_password_for_delete(self, user_id_to_delete, username_for_dialog, on_verified=None, action_text=None):
         if hasattr(self, 'admin_password_prompt_dialog') and self.admin_password_prompt_dialog.winfo_exists():
             safe_focus(self.admin_password_prompt_dialog)
             return
@@ -386,7 +589,8 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         prompt_main_frame = ctk.CTkFrame(self.admin_password_prompt_dialog, fg_color=ADMIN_FRAME_FG_COLOR) # Use ADMIN_FRAME_FG_COLOR
         prompt_main_frame.pack(expand=True, fill="both", padx=20, pady=20)
 
-        ctk.CTkLabel(prompt_main_frame, text=f"Enter your admin password to authorize deletion of user '{username_for_dialog}':",
+        action_text = action_text or f"deletion of user '{username_for_dialog}'"
+        ctk.CTkLabel(prompt_main_frame, text=f"Enter your admin password to authorize {action_text}:",
                      font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
                      text_color=ADMIN_TEXT_COLOR, wraplength=360).pack(pady=(0,15))
 
@@ -415,7 +619,10 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
                 if hasattr(self, 'admin_password_prompt_dialog') and self.admin_password_prompt_dialog.winfo_exists():
                     self.admin_password_prompt_dialog.destroy()
                 
-                self._delete_user(user_id_to_delete, username_for_dialog) # Proceed with actual deletion
+                if on_verified:
+                    on_verified() # Bulk actions pass their own continuation
+                else:
+                    self._delete_user(user_id_to_delete, username_for_dialog) # Proceed with actual deletion
                 
                 if hasattr(self, 'edit_user_dialog') and self.edit_user_dialog.winfo_exists():
                     self.edit_user_dialog.destroy() # Ensure edit dialog is closed
@@ -501,25 +708,43 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         
         self.error_label_edit_user.configure(text="")
 
+        if not new_password:
+            self._apply_user_edits(user_to_update_obj, new_username, None, new_address, new_is_admin)
+            return
+
+        # Hash the new password on the auth pool so the dialog stays responsive, then apply all edits
+        self.save_button_edit_dialog.configure(state="disabled", text="Saving...")
+        hash_future = hash_password_async(new_password)
+
+        def wait_for_hash():
+            if not (hasattr(self, 'edit_user_dialog') and self.edit_user_dialog.winfo_exists()):
+                return
+            if not hash_future.done():
+                self.after(50, wait_for_hash)
+                return
+            self.save_button_edit_dialog.configure(state="normal", text="Save Changes")
+            try:
+                new_password_hash = hash_future.result()
+            except Exception as e:
+                logger.error(f"Error hashing new password for user {user_to_update_obj.username}: {e}")
+                self.error_label_edit_user.configure(text="Failed to save some changes. Check logs.")
+                return
+            self._apply_user_edits(user_to_update_obj, new_username, new_password_hash, new_address, new_is_admin)
+        self.after(50, wait_for_hash)
+
+    def _apply_user_edits(self, user_to_update_obj, new_username, new_password_hash, new_address, new_is_admin):
         update_success = True
-        # Update username (conditionally, using direct DB for now as User model doesn't have a direct method)
+        # Update username through the model so the user cache is invalidated too
         if user_to_update_obj.username != new_username:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            try:
-                cursor.execute("UPDATE users SET username = ? WHERE user_id = ?", (new_username, user_to_update_obj.user_id))
-                conn.commit()
-                user_to_update_obj.username = new_username # Update object in memory
+            if user_to_update_obj.update_username(new_username):
                 logger.info(f"Username for user ID {user_to_update_obj.user_id} updated to '{new_username}'.")
-            except Exception as e:
-                logger.error(f"Error updating username for user ID {user_to_update_obj.user_id}: {e}")
+            else:
+                logger.error(f"Error updating username for user ID {user_to_update_obj.user_id}.")
                 update_success = False
-            finally:
-                conn.close()
 
         # Update password (only if a new password was provided)
-        if new_password: # Only update if a new password was entered
-            if not user_to_update_obj.update_password(new_password):
+        if new_password_hash: # Only update if a new password was entered
+            if not user_to_update_obj.set_password_hash(new_password_hash):
                 update_success = False
                 logger.error(f"Failed to update password for user {user_to_update_obj.username}")
 
@@ -560,6 +785,16 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         user_id = user_dict['id']
         username = user_dict['username']
 
+        if self.select_mode:
+            # Any cell toggles the row in select mode
+            if user_id in self.selected_user_ids:
+                self.selected_user_ids.discard(user_id)
+            else:
+                self.selected_user_ids.add(user_id)
+            self._update_selection_label()
+            self._load_and_display_users()
+            return
+
         if column_clicked == self.actions_column_index:
             logger.info(f"Actions column clicked for user ID {user_id}. Opening edit dialog as default.")
             self._open_edit_user_dialog(user_id)
@@ -606,65 +841,41 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
             self._load_and_display_users()
 
     def _load_and_display_users(self):
-        search_term = self.search_entry.get().lower() if hasattr(self, 'search_entry') and self.search_entry.winfo_exists() else ""
+        search_term = self.search_entry.get().strip() if hasattr(self, 'search_entry') and self.search_entry.winfo_exists() else ""
         admin_filter_status = self.admin_filter_var.get() if hasattr(self, 'admin_filter_var') else "All"
-        
-        logger.debug(f"Loading users from DB. Search: '{search_term}', Filter: '{admin_filter_status}'")
 
-        all_users_from_db = User.get_all_users()
-        
-        self.users_data = []
-        if all_users_from_db:
-            for user_obj in all_users_from_db:
-                self.users_data.append({
-                    'id': user_obj.user_id,
-                    'username': user_obj.username,
-                    'is_admin': user_obj.is_admin,
-                    'address': user_obj.address if user_obj.address else ""
-                })
-
-        filtered_user_list = []
-        source_users = self.users_data
-
-        for user_item in source_users:
-            passes_admin_filter = False
-            if admin_filter_status == "All":
-                passes_admin_filter = True
-            elif admin_filter_status == "Admin" and user_item['is_admin']:
-                passes_admin_filter = True
-            elif admin_filter_status == "Non-Admin" and not user_item['is_admin']:
-                passes_admin_filter = True
-
-            if not passes_admin_filter:
-                continue
-
-            passes_search_filter = False
-            if not search_term: 
-                passes_search_filter = True
-            else:
-                if search_term in str(user_item['id']).lower():
-                    passes_search_filter = True
-                elif search_term in user_item['username'].lower():
-                    passes_search_filter = True
-                elif 'address' in user_item and user_item['address'] and search_term in user_item['address'].lower():
-                    passes_search_filter = True
-            
-            if not passes_search_filter:
-                continue
-            
-            filtered_user_list.append(user_item)
-
-        self.current_view_users = filtered_user_list 
-        logger.debug(f"Displaying {len(self.current_view_users)} users after filtering.")
+        # Reloads stay on the current page; filter changes reset the cursor stack first
+        after_id = self.page_cursors[-1]
+        logger.debug(f"Loading users page {len(self.page_cursors)} from DB. Search: '{search_term}', Filter: '{admin_filter_status}', after ID {after_id}")
+
+        self.loader.load("users", lambda: User.search(search_term, admin_filter_status, after_id=after_id, limit=USERS_PAGE_SIZE),
+                         lambda result: self._display_users(*result, search_term=search_term, admin_filter_status=admin_filter_status),
+                         spinner_parent=self.table_frame, spinner_text="Loading users...")
+
+    def _display_users(self, page_users, next_page_cursor, search_term="", admin_filter_status="All"):
+        self.next_page_cursor = next_page_cursor
+        if not page_users and len(self.page_cursors) > 1:
+            # The page emptied out (e.g. its last user was deleted); step back one page
+            self.page_cursors.pop()
+            self._load_and_display_users()
+            return
+
+        self.current_view_users = page_users
+        logger.debug(f"Displaying {len(self.current_view_users)} users on page {len(self.page_cursors)}.")
+        self._update_pager()
 
         table_values = [["User ID", "Username", "Admin?", "Address", "Actions"]]
         for user_item_view in self.current_view_users: 
+            if self.select_mode:
+                action_text = "[x] Selected" if user_item_view['id'] in self.selected_user_ids else "[ ] Select"
+            else:
+                action_text = "Edit / Delete"
             table_values.append([
                 user_item_view['id'],
-                user_item_view['username'],
+                user_item_view['username'] + ("" if user_item_view.get('is_active', True) else " (deactivated)"),
                 "Yes" if user_item_view['is_admin'] else "No",
                 user_item_view.get('address', 'N/A'), 
-                "Edit / Delete"
+                action_text
             ])
 
         if self.user_table:
@@ -676,8 +887,8 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
         
         if len(table_values) == 1 and (search_term or admin_filter_status != "All"):
              logger.info("No users match current filter criteria. Table will be empty or show header only.")
-        elif not source_users:
-             logger.info("No users in the master list. Table will be empty or show header only.")
+        elif len(table_values) == 1:
+             logger.info("No users in the database. Table will be empty or show header only.")
 
         self.user_table = CTkTable(
             master=self.table_frame,
@@ -697,6 +908,8 @@ class AdminUsersScreen(ctk.CTkFrame): # Renamed class
 
         for i in range(1, len(table_values)): 
             current_bg_color = ADMIN_TABLE_ROW_LIGHT_COLOR if i % 2 != 0 else ADMIN_TABLE_ROW_DARK_COLOR
+            if self.select_mode and self.current_view_users[i-1]['id'] in self.selected_user_ids:
+                current_bg_color = ADMIN_SECONDARY_ACCENT_COLOR
             self.user_table.edit_row(i, fg_color=current_bg_color, text_color=ADMIN_TABLE_TEXT_COLOR, hover_color=ADMIN_PRIMARY_ACCENT_COLOR, font=cell_font)
 
     def refresh_data(self):
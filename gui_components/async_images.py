@@ -0,0 +1,143 @@
+import time
+import queue
+import logging
+from utils.image_loader import image_cache, image_cache_key, decode_for_cache, cache_decoded, get_image_decode_pool
+from utils import metrics
+
+logger = logging.getLogger("swigato_app.async_images")
+
+# How often finished decodes are picked up, and how many images are swapped in per pass so a
+# burst of results can't stall the event loop
+IMAGE_POLL_MS = 30
+IMAGE_SWAPS_PER_POLL = 12
+
+class AsyncImageLoader:
+    """
+    Loads images for one screen on the shared decode pool and hands them back on the Tk thread.
+
+    request() answers from image_cache straight away when it can; otherwise the card shows its
+    placeholder while a worker decodes and scales the file. Finished decodes go onto a queue
+    that is drained with after(), where the CTkImage is built, cached and passed to the
+    request's on_ready. Requests are tracked per target widget: a newer request for the same
+    target (a recycled card) supersedes the older one, cancel()/cancel_all() drop them, and
+    nothing is delivered to a widget that has been destroyed. Several targets asking for the
+    same file at the same size share one decode.
+    """
+    def __init__(self, widget, poll_ms=IMAGE_POLL_MS):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._results = queue.Queue()  # (key, future) as decodes finish, filled from worker threads
+        self._waiting = {}             # key -> [(target, ticket, on_ready)]
+        self._futures = {}             # key -> Future of its decode
+        self._tickets = {}             # target -> ticket of its current request
+        self._next_ticket = 0
+        self._poll_scheduled = False
+
+    def request(self, target, image_path, size, on_ready, keep_aspect=False):
+        """
+        Asks for image_path at `size` for `target`; on_ready(ctk_image) runs on the Tk thread
+        with the CTkImage, or None if it can't be loaded. Returns True when on_ready already ran
+        (cache hit or missing file), False when the image is being decoded.
+        """
+        self.cancel(target)
+        try:
+            key = image_cache_key(image_path, size, keep_aspect)
+        except OSError as e:
+            logger.error(f"Error reading image {image_path}: {e}")
+            key = None
+        if key is None:
+            on_ready(None)
+            return True
+        ctk_image = image_cache.get(key)
+        if ctk_image is not None:
+            on_ready(ctk_image)
+            return True
+
+        self._next_ticket += 1
+        self._tickets[target] = self._next_ticket
+        waiters = self._waiting.get(key)
+        if waiters is None:
+            waiters = self._waiting[key] = []
+            future = get_image_decode_pool().submit(self._decode, key)
+            self._futures[key] = future
+            future.add_done_callback(lambda done, key=key: self._results.put((key, done)))
+        waiters.append((target, self._next_ticket, on_ready))
+        self._schedule_poll()
+        return False
+
+    def cancel(self, target):
+        """Drops target's pending request; its decode is cancelled too if nobody else is waiting for it."""
+        if self._tickets.pop(target, None) is None:
+            return
+        for key in list(self._waiting):
+            waiters = [waiter for waiter in self._waiting[key] if waiter[0] is not target]
+            if waiters:
+                self._waiting[key] = waiters
+            else:
+                self._drop(key)
+
+    def cancel_all(self):
+        """Drops every pending request, e.g. before the screen rebuilds its cards."""
+        for key in list(self._waiting):
+            self._drop(key)
+        self._tickets.clear()
+
+    def _drop(self, key):
+        del self._waiting[key]
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()  # Only stops decodes that haven't started; a running one finishes into the cache
+
+    def _decode(self, key):
+        # Worker thread: only reads _waiting, so a request dropped while queued isn't decoded
+        if key not in self._waiting:
+            return None
+        start = time.perf_counter()
+        img = decode_for_cache(key)
+        metrics.record_timing("images.decode", time.perf_counter() - start)
+        return img
+
+    def _schedule_poll(self):
+        if not self._poll_scheduled:
+            self._poll_scheduled = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_scheduled = False
+        if not self.widget.winfo_exists():
+            self.cancel_all()
+            return
+        for _ in range(IMAGE_SWAPS_PER_POLL):
+            try:
+                key, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(key, future)
+        if self._waiting or not self._results.empty():
+            self._schedule_poll()
+
+    def _deliver(self, key, future):
+        current = self._futures.get(key) is future
+        waiters = self._waiting.pop(key, []) if current else []
+        if current:
+            del self._futures[key]
+        if future.cancelled():
+            return
+        try:
+            img = future.result()
+            ctk_image = cache_decoded(key, img) if img is not None else None
+        except Exception as e:
+            logger.error(f"Error decoding image {key[0]}: {e}")
+            ctk_image = None
+        if ctk_image is not None:
+            metrics.increment("images.async_loaded")
+        for target, ticket, on_ready in waiters:
+            if self._tickets.get(target) != ticket:
+                continue  # Superseded by a newer request for the same widget
+            del self._tickets[target]
+            try:
+                alive = target.winfo_exists()
+            except Exception:
+                alive = False
+            if alive:
+                on_ready(ctk_image)
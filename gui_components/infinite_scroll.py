@@ -0,0 +1,31 @@
+import logging
+
+logger = logging.getLogger("swigato_app.infinite_scroll")
+
+def bind_infinite_scroll(scrollable_frame, load_more, threshold=0.85):
+    """
+    Calls load_more() (on the Tk event loop) whenever the bottom of the visible area of a
+    CTkScrollableFrame passes `threshold` of its content height.
+
+    The frame's canvas reports every scroll and resize through its yscrollcommand, so this
+    wraps that callback instead of polling. load_more may be called repeatedly while the view
+    stays near the bottom (including when the content is shorter than the view), so it must
+    return early when a page is already loading or there is nothing left to load.
+    """
+    canvas = scrollable_frame._parent_canvas
+    scrollbar = scrollable_frame._scrollbar
+    pending = [False]
+
+    def run_load_more():
+        pending[0] = False
+        if scrollable_frame.winfo_exists():
+            load_more()
+
+    def on_yscroll(first, last):
+        scrollbar.set(first, last)
+        if float(last) >= threshold and not pending[0]:
+            pending[0] = True
+            scrollable_frame.after_idle(run_load_more)
+
+    canvas.configure(yscrollcommand=on_yscroll)
+    logger.debug(f"Infinite scroll bound (threshold {threshold}).")
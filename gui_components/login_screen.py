@@ -1,8 +1,9 @@
 import customtkinter as ctk
-from PIL import Image
 import os
 import json  # Added for remember me
-from users.auth import log_in
+from users.auth import log_in_async
+from utils.image_loader import load_image
+from users.throttle import LoginThrottledError
 from gui_constants import PRIMARY_COLOR, BACKGROUND_COLOR, ENTRY_BG_COLOR, TEXT_COLOR, BUTTON_HOVER_COLOR, SUCCESS_COLOR, DISABLED_BUTTON_COLOR
 
 class LoginScreen(ctk.CTkFrame):
@@ -20,7 +21,9 @@ class LoginScreen(ctk.CTkFrame):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         image_path = os.path.join(current_dir, "..", "swigato_icon.png") 
         try:
-            self.swigato_image = ctk.CTkImage(light_image=Image.open(image_path), size=(100, 100))
+            self.swigato_image = load_image(image_path, size=(100, 100))  # Pre-scaled thumbnail, not the 1.3 MB original
+            if self.swigato_image is None:
+                raise FileNotFoundError(image_path)
             self.swigato_image_label = ctk.CTkLabel(self, image=self.swigato_image, text="")
             self.swigato_image_label.grid(row=1, column=0, pady=(20, 5), sticky="s")
         except Exception as e:
@@ -82,6 +85,10 @@ class LoginScreen(ctk.CTkFrame):
         self.status_label = ctk.CTkLabel(form_frame, text="", font=ctk.CTkFont(size=12))
         self.status_label.grid(row=7, column=0, columnspan=2, pady=(0, 10), sticky="nwe")
 
+        # Shown in place of the status text while the password check runs on the auth pool
+        self.login_spinner = ctk.CTkProgressBar(form_frame, mode="indeterminate", height=6,
+                                                progress_color=PRIMARY_COLOR, fg_color=ENTRY_BG_COLOR)
+
         signup_prompt_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
         signup_prompt_frame.grid(row=8, column=0, columnspan=2, pady=(5, 0), sticky="nwe")
         signup_prompt_frame.grid_columnconfigure(0, weight=1)  # Center the content
@@ -116,13 +123,36 @@ class LoginScreen(ctk.CTkFrame):
         password = self.password_entry.get()
         remember_me = self.remember_me_checkbox.get() == 1  # Get checkbox state
 
+        if not username or not password:
+            self.status_label.configure(text="Username and Password are required.", text_color=PRIMARY_COLOR)
+            self.login_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
+            return
+
+        self.status_label.grid_remove()
+        self.login_spinner.grid(row=7, column=0, columnspan=2, pady=(8, 14), sticky="we")
+        self.login_spinner.start()
+        login_future = log_in_async(username, password)
+
         def process_login_attempt():
-            if not username or not password:
-                self.status_label.configure(text="Username and Password are required.", text_color=PRIMARY_COLOR)
-                self.login_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
+            if not self.winfo_exists():
                 return
-
-            user = log_in(username, password)
+            if not login_future.done():
+                self.after(50, process_login_attempt)
+                return
+            self.login_spinner.stop()
+            self.login_spinner.grid_remove()
+            self.status_label.grid()
+
+            try:
+                user = login_future.result()
+            except LoginThrottledError as e:
+                self.status_label.configure(text=str(e), text_color=PRIMARY_COLOR)
+                if self.login_button.winfo_exists():
+                    self.login_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
+                return
+            except Exception as e:
+                print(f"Error during login: {e}")
+                user = None
             if user:
                 if remember_me:
                     self._save_remembered_user(username)
@@ -137,7 +167,7 @@ class LoginScreen(ctk.CTkFrame):
                 if self.login_button.winfo_exists():
                     self.login_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
 
-        self.after(100, process_login_attempt)
+        self.after(50, process_login_attempt)
 
     def _load_remembered_user(self):
         try:
@@ -2,11 +2,17 @@ import customtkinter as ctk
 import os
 from PIL import Image, ImageTk
 from gui_constants import BACKGROUND_COLOR, TEXT_COLOR, PRIMARY_COLOR, BUTTON_HOVER_COLOR, FRAME_BORDER_COLOR, FRAME_FG_COLOR, SECONDARY_COLOR
-from utils.image_loader import load_image
 from utils.logger import log
 from orders.models import get_orders_by_user_id
+from restaurants.leaderboard import get_leaderboard
+from gui_components.virtual_list import VirtualCardList, LOADING_ITEM
+from gui_components.async_images import AsyncImageLoader
+from gui_components.screen_loader import ScreenLoader
 
 class MainAppScreen(ctk.CTkFrame):
+    # Tables the restaurant list reads
+    DATA_TABLES = ("restaurants", "reviews")
+
     def __init__(self, app_ref, user, show_menu_callback, show_cart_callback, logout_callback):
         super().__init__(app_ref, fg_color=BACKGROUND_COLOR)
         self.app_ref = app_ref # Store reference to the main SwigatoApp instance
@@ -14,7 +20,7 @@ class MainAppScreen(ctk.CTkFrame):
         self.show_menu_callback = show_menu_callback
         self.show_cart_callback = show_cart_callback
         self.logout_callback = logout_callback
-        self.restaurants = []
+        self.restaurant_ids = []
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
@@ -63,10 +69,37 @@ class MainAppScreen(ctk.CTkFrame):
                                                  font=ctk.CTkFont(weight="bold"))
             order_history_button.grid(row=0, column=3, padx=(10,0), sticky="e")
 
-        # --- Restaurant List Scrollable Frame ---
-        self.restaurant_scroll_frame = ctk.CTkScrollableFrame(self, fg_color=BACKGROUND_COLOR, border_width=0)
-        self.restaurant_scroll_frame.grid(row=1, column=0, padx=20, pady=(10,80), sticky="nsew")
-        self.restaurant_scroll_frame.grid_columnconfigure(0, weight=1)
+        # Sort / cuisine filter; "Top rated" order comes from the leaderboard index
+        sort_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
+        sort_frame.grid(row=1, column=0, columnspan=4, pady=(10, 0), sticky="w")
+        ctk.CTkLabel(sort_frame, text="Sort by:", text_color=TEXT_COLOR).pack(side="left", padx=(0, 5))
+        self.sort_var = ctk.StringVar(value="Default")
+        ctk.CTkOptionMenu(sort_frame, variable=self.sort_var, values=["Default", "Top rated"],
+                          command=lambda choice: self.load_restaurants(),
+                          fg_color=SECONDARY_COLOR, button_color=SECONDARY_COLOR,
+                          button_hover_color=BUTTON_HOVER_COLOR, text_color=TEXT_COLOR).pack(side="left", padx=(0, 15))
+        ctk.CTkLabel(sort_frame, text="Cuisine:", text_color=TEXT_COLOR).pack(side="left", padx=(0, 5))
+        self.cuisine_var = ctk.StringVar(value="All cuisines")
+        ctk.CTkOptionMenu(sort_frame, variable=self.cuisine_var, values=["All cuisines"] + get_leaderboard().cuisines(),
+                          command=lambda choice: self.load_restaurants(),
+                          fg_color=SECONDARY_COLOR, button_color=SECONDARY_COLOR,
+                          button_hover_color=BUTTON_HOVER_COLOR, text_color=TEXT_COLOR).pack(side="left")
+
+        # --- Restaurant List (virtualized: only the visible cards exist, and they are reused on scroll) ---
+        self.name_font = ctk.CTkFont(size=18, weight="bold")
+        self.detail_font = ctk.CTkFont(size=12)
+        self.card_button_font = ctk.CTkFont(weight="bold")
+        self.image_loader = AsyncImageLoader(self)
+        self.loader = ScreenLoader(self, spinner_color=PRIMARY_COLOR)
+        self.restaurant_list = VirtualCardList(self, row_height=150,
+                                               create_card=self._create_restaurant_card,
+                                               bind_card=self._bind_restaurant_card,
+                                               fetch_page=self._fetch_restaurant_page,
+                                               loader=self.loader,
+                                               fg_color=BACKGROUND_COLOR,
+                                               empty_text="No restaurants available at the moment.",
+                                               text_color=TEXT_COLOR)
+        self.restaurant_list.grid(row=1, column=0, padx=20, pady=(10,80), sticky="nsew")
 
         # --- Sticky Bottom Bar for Logout (use .place() to avoid grid/pack conflict) ---
         self.bottom_bar = ctk.CTkFrame(self, fg_color="#fef2f2", height=60, corner_radius=0)
@@ -91,80 +124,110 @@ class MainAppScreen(ctk.CTkFrame):
 
         self.load_restaurants()
 
-    def load_restaurants(self):
+    def load_restaurants(self, keep_position=False):
         log("MainAppScreen.load_restaurants called")
-        # Clear existing restaurant widgets
-        for widget in self.restaurant_scroll_frame.winfo_children():
-            widget.destroy()
-
-        # Fetch restaurants (assuming a method in SwigatoApp or a direct model call)
-        # For now, using the restaurant model directly as per previous structure
+        # Only the ids are loaded up front (on a worker); the list fetches the restaurants a page at a time
         from restaurants.models import Restaurant # Local import to avoid circular dependency issues at module level
-        self.restaurants = Restaurant.get_all()
-        log(f"Loaded {len(self.restaurants)} restaurants.")
-
-        if not self.restaurants:
-            no_restaurants_label = ctk.CTkLabel(self.restaurant_scroll_frame,
-                                                text="No restaurants available at the moment.",
-                                                text_color=TEXT_COLOR,
-                                                font=ctk.CTkFont(size=16))
-            no_restaurants_label.grid(row=0, column=0, pady=20)
-            return
+        cuisine = self.cuisine_var.get() if self.cuisine_var.get() != "All cuisines" else None
+        top_rated = self.sort_var.get() == "Top rated"
+
+        def fetch():
+            return get_leaderboard().ranked_ids(cuisine) if top_rated else Restaurant.get_ids(cuisine)
+
+        def render(restaurant_ids):
+            if keep_position and restaurant_ids == self.restaurant_ids:
+                self.restaurant_list.reload_items()  # Same rows; rebind them with fresh ratings etc.
+                return
+            self.restaurant_ids = restaurant_ids
+            log(f"Listing {len(self.restaurant_ids)} restaurants.")
+            self.restaurant_list.set_count(len(self.restaurant_ids))
+
+        self.loader.load("restaurants", fetch, render,
+                         spinner_parent=None if keep_position else self.restaurant_list)
+
+    def refresh_data(self):
+        """Called by App's screen cache when restaurants or reviews changed while this screen was hidden."""
+        self.load_restaurants(keep_position=True)
 
-        for i, restaurant in enumerate(self.restaurants):
-            restaurant_card = ctk.CTkFrame(self.restaurant_scroll_frame,
-                                           fg_color=FRAME_FG_COLOR,
-                                           border_color=FRAME_BORDER_COLOR,
-                                           border_width=1,
-                                           corner_radius=8)
-            restaurant_card.grid(row=i, column=0, pady=(0, 10), sticky="ew")
-            restaurant_card.grid_columnconfigure(0, weight=0) # Image
-            restaurant_card.grid_columnconfigure(1, weight=1) # Details
-            restaurant_card.grid_columnconfigure(2, weight=0) # Button
-
-            image_label = None
-            if restaurant.image_filename:
-                project_root = self.app_ref.project_root # Use app_ref
-                image_path = os.path.join(project_root, "assets", "restaurants", restaurant.image_filename)
-                log(f"Attempting to load restaurant image from: {image_path}")
-                ctk_image = load_image(image_path, size=(120, 120))
-                if ctk_image:
-                    image_label = ctk.CTkLabel(restaurant_card, image=ctk_image, text="")
-                    image_label.grid(row=0, column=0, rowspan=3, padx=10, pady=10, sticky="ns")
-            
-            if not image_label: # Fallback if image loading fails or no image_filename
-                image_label = ctk.CTkLabel(restaurant_card, text="No Image", width=120, height=120, fg_color="gray", text_color="white")
-                image_label.grid(row=0, column=0, rowspan=3, padx=10, pady=10, sticky="ns")
-
-            details_frame = ctk.CTkFrame(restaurant_card, fg_color="transparent")
-            details_frame.grid(row=0, column=1, rowspan=3, padx=(0,10), pady=10, sticky="nsew")
-            details_frame.grid_columnconfigure(0, weight=1)
-
-            name_label = ctk.CTkLabel(details_frame, text=restaurant.name,
-                                      font=ctk.CTkFont(size=18, weight="bold"),
-                                      text_color=TEXT_COLOR, anchor="w")
-            name_label.grid(row=0, column=0, pady=(0, 2), sticky="ew")
-
-            cuisine_text = f"Cuisine: {restaurant.cuisine_type}"
-            cuisine_label = ctk.CTkLabel(details_frame, text=cuisine_text,
-                                         font=ctk.CTkFont(size=12),
-                                         text_color=TEXT_COLOR, anchor="w")
-            cuisine_label.grid(row=1, column=0, pady=(0, 2), sticky="ew")
+    def _fetch_restaurant_page(self, start, count):
+        from restaurants.models import Restaurant
+        return Restaurant.get_by_ids(self.restaurant_ids[start:start + count])
 
+    def _create_restaurant_card(self, parent):
+        card = ctk.CTkFrame(parent,
+                            fg_color=FRAME_FG_COLOR,
+                            border_color=FRAME_BORDER_COLOR,
+                            border_width=1,
+                            corner_radius=8)
+        card.grid_columnconfigure(0, weight=0) # Image
+        card.grid_columnconfigure(1, weight=1) # Details
+        card.grid_columnconfigure(2, weight=0) # Button
+
+        card.image_label = ctk.CTkLabel(card, text="")
+        card.no_image_label = ctk.CTkLabel(card, text="No Image", width=120, height=120, fg_color="gray", text_color="white")
+        for label in (card.image_label, card.no_image_label):
+            label.grid(row=0, column=0, rowspan=3, padx=10, pady=10, sticky="ns")
+
+        details_frame = ctk.CTkFrame(card, fg_color="transparent")
+        details_frame.grid(row=0, column=1, rowspan=3, padx=(0,10), pady=10, sticky="nsew")
+        details_frame.grid_columnconfigure(0, weight=1)
+        card.name_label = ctk.CTkLabel(details_frame, text="", font=self.name_font, text_color=TEXT_COLOR, anchor="w")
+        card.name_label.grid(row=0, column=0, pady=(0, 2), sticky="ew")
+        card.cuisine_label = ctk.CTkLabel(details_frame, text="", font=self.detail_font, text_color=TEXT_COLOR, anchor="w")
+        card.cuisine_label.grid(row=1, column=0, pady=(0, 2), sticky="ew")
+        card.rating_label = ctk.CTkLabel(details_frame, text="", font=self.detail_font, text_color=TEXT_COLOR, anchor="w")
+        card.rating_label.grid(row=2, column=0, pady=(0, 5), sticky="ew")
+
+        card.view_menu_button = ctk.CTkButton(card, text="View Menu",
+                                              fg_color=PRIMARY_COLOR,
+                                              hover_color=BUTTON_HOVER_COLOR,
+                                              text_color=TEXT_COLOR,
+                                              font=self.card_button_font,
+                                              width=100)
+        card.view_menu_button.grid(row=0, column=2, rowspan=3, padx=15, pady=10, sticky="e")
+        return card
+
+    def _bind_restaurant_card(self, card, restaurant):
+        if restaurant is LOADING_ITEM or restaurant is None: # Page still on its way; or removed since the list was loaded, or unfetchable
+            card.name_label.configure(text="Loading..." if restaurant is LOADING_ITEM else "Restaurant unavailable")
+            for label in (card.cuisine_label, card.rating_label):
+                label.configure(text="")
+            self.image_loader.cancel(card)
+            self._show_card_image(card, None)
+            card.view_menu_button.configure(state="disabled")
+            return
+
+        card.name_label.configure(text=restaurant.name)
+        card.cuisine_label.configure(text=f"Cuisine: {restaurant.cuisine_type}")
+        # Review counts and averages come from the leaderboard's stats instead of two queries per card
+        stats = get_leaderboard().entry(restaurant.restaurant_id)
+        if stats:
+            rating_text = f"Rating: {stats['average_rating']:.1f}/5.0 ({stats['review_count']} reviews)"
+        else:
             rating_text = f"Rating: {restaurant.rating:.1f}/5.0 ({restaurant.get_review_count()} reviews)"
-            rating_label = ctk.CTkLabel(details_frame, text=rating_text,
-                                        font=ctk.CTkFont(size=12),
-                                        text_color=TEXT_COLOR, anchor="w")
-            rating_label.grid(row=2, column=0, pady=(0, 5), sticky="ew")
-
-            view_menu_button = ctk.CTkButton(restaurant_card, text="View Menu",
-                                             fg_color=PRIMARY_COLOR,
-                                             hover_color=BUTTON_HOVER_COLOR,
-                                             text_color=TEXT_COLOR,
-                                             font=ctk.CTkFont(weight="bold"),
-                                             width=100,
-                                             command=lambda r=restaurant: self.show_menu_callback(r))
-            view_menu_button.grid(row=0, column=2, rowspan=3, padx=15, pady=10, sticky="e")
+        card.rating_label.configure(text=rating_text)
+
+        if restaurant.image_filename:
+            # Decoded off the Tk thread (or straight from the shared cache); the placeholder shows until then
+            image_path = os.path.join(self.app_ref.project_root, "assets", "restaurants", restaurant.image_filename)
+            card.no_image_label.configure(text="Loading...")
+            card.image_label.grid_remove()
+            card.no_image_label.grid()
+            self.image_loader.request(card, image_path, (120, 120), lambda ctk_image, c=card: self._show_card_image(c, ctk_image))
+        else:
+            self.image_loader.cancel(card)
+            self._show_card_image(card, None)
+        card.view_menu_button.configure(state="normal", command=lambda r=restaurant: self.show_menu_callback(r))
+
+    def _show_card_image(self, card, ctk_image):
+        if ctk_image: # Fallback label if image loading fails or no image_filename
+            card.image_label.configure(image=ctk_image)
+            card.image_label.grid()
+            card.no_image_label.grid_remove()
+        else:
+            card.no_image_label.configure(text="No Image")
+            card.image_label.grid_remove()
+            card.no_image_label.grid()
 
     def update_user_info(self, user):
         self.user = user
@@ -198,8 +261,7 @@ class MainAppScreen(ctk.CTkFrame):
         )
         heading_label.grid(row=0, column=0, pady=(18, 0), padx=20, sticky="n")
 
-        orders = get_orders_by_user_id(self.user.user_id)
-        orders = orders[:20]
+        orders = get_orders_by_user_id(self.user.user_id, include_archived=True, limit=20)
 
         # --- Scrollable Frame for Table ---
         scroll_frame = ctk.CTkScrollableFrame(self.order_history_window, fg_color=FRAME_FG_COLOR, corner_radius=14, border_width=1, border_color=FRAME_BORDER_COLOR)
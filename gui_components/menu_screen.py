@@ -2,20 +2,25 @@ import customtkinter as ctk
 import os
 from PIL import Image
 from gui_constants import BACKGROUND_COLOR, TEXT_COLOR, PRIMARY_COLOR, BUTTON_HOVER_COLOR, FRAME_BORDER_COLOR, FRAME_FG_COLOR, SECONDARY_COLOR, SUCCESS_COLOR, ERROR_COLOR
-from restaurants.models import MenuItem
-from utils.image_loader import load_image
+from restaurants.models import MenuItem, Restaurant
+from gui_components.async_images import AsyncImageLoader
 from utils.logger import log
-from reviews.models import get_reviews_for_restaurant, add_review
+from reviews.models import get_reviews_page, add_review
+from gui_components.infinite_scroll import bind_infinite_scroll
 from users.models import User
 from tkinter import messagebox
 
 class MenuScreen(ctk.CTkFrame):
+    # Tables the header, menu and review feed read
+    DATA_TABLES = ("restaurants", "menu_items", "reviews")
+
     def __init__(self, app_ref, user, restaurant, show_cart_callback):
         super().__init__(app_ref, fg_color=BACKGROUND_COLOR)
         self.app_ref = app_ref
         self.user = user
         self.restaurant = restaurant
         self.show_cart_callback = show_cart_callback
+        self.image_loader = AsyncImageLoader(self)
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=0)  # Header Frame
@@ -30,6 +35,11 @@ class MenuScreen(ctk.CTkFrame):
         self.write_review_button_widget = None
         self.inline_review_form_actual_frame = None
 
+        # Review feed paging state; more reviews are loaded as the user scrolls down
+        self.reviews_next_cursor = None
+        self.reviews_next_row = 0
+        self.reviews_loading = False
+
         # --- Header Frame ---
         header_frame = ctk.CTkFrame(self, fg_color="transparent")
         header_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
@@ -45,17 +55,17 @@ class MenuScreen(ctk.CTkFrame):
         back_button.grid(row=0, column=0, rowspan=2, sticky="w")
 
         restaurant_name_text = self.restaurant.name if self.restaurant else "Menu"
-        restaurant_name_label = ctk.CTkLabel(header_frame, text=restaurant_name_text,
-                                             text_color=PRIMARY_COLOR,
-                                             font=ctk.CTkFont(size=24, weight="bold"))
-        restaurant_name_label.grid(row=0, column=1, padx=(20, 0), sticky="w")
-
-        if self.restaurant and hasattr(self.restaurant, 'description') and self.restaurant.description:
-            restaurant_desc_label = ctk.CTkLabel(header_frame, text=self.restaurant.description,
-                                                 text_color=TEXT_COLOR,
-                                                 font=ctk.CTkFont(size=12),
-                                                 wraplength=400, anchor="w")
-            restaurant_desc_label.grid(row=1, column=1, padx=(20, 0), pady=(0, 5), sticky="w")
+        self.restaurant_name_label = ctk.CTkLabel(header_frame, text=restaurant_name_text,
+                                                  text_color=PRIMARY_COLOR,
+                                                  font=ctk.CTkFont(size=24, weight="bold"))
+        self.restaurant_name_label.grid(row=0, column=1, padx=(20, 0), sticky="w")
+
+        self.restaurant_desc_label = ctk.CTkLabel(header_frame, text="",
+                                                  text_color=TEXT_COLOR,
+                                                  font=ctk.CTkFont(size=12),
+                                                  wraplength=400, anchor="w")
+        self.restaurant_desc_label.grid(row=1, column=1, padx=(20, 0), pady=(0, 5), sticky="w")
+        self._update_header()
 
         view_cart_button = ctk.CTkButton(header_frame, text="View Cart",
                                          command=self.show_cart_callback,
@@ -67,6 +77,7 @@ class MenuScreen(ctk.CTkFrame):
         self.main_scroll_frame = ctk.CTkScrollableFrame(self, fg_color=BACKGROUND_COLOR, border_width=0)
         self.main_scroll_frame.grid(row=1, column=0, padx=20, pady=10, sticky="nsew")
         self.main_scroll_frame.grid_columnconfigure(0, weight=1)
+        bind_infinite_scroll(self.main_scroll_frame, self._load_more_reviews)
         
         self._populate_main_scroll_content()
 
@@ -74,13 +85,24 @@ class MenuScreen(ctk.CTkFrame):
         self.status_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12), text_color=SUCCESS_COLOR)
         self.status_label.grid(row=2, column=0, pady=(5, 10), sticky="ew")
 
+    def _update_header(self):
+        self.restaurant_name_label.configure(text=self.restaurant.name if self.restaurant else "Menu")
+        description = getattr(self.restaurant, 'description', None) if self.restaurant else None
+        if description:
+            self.restaurant_desc_label.configure(text=description)
+            self.restaurant_desc_label.grid()
+        else:
+            self.restaurant_desc_label.grid_remove()
+
     def _clear_main_scroll_content(self):
+        self.image_loader.cancel_all() # Nothing left to swap images into
         for widget in self.main_scroll_frame.winfo_children():
             widget.destroy()
         self.write_review_button_widget = None
         self.inline_review_form_actual_frame = None
         self.comment_textbox_widget = None
         self.star_button_widgets = []
+        self.reviews_next_cursor = None
 
     def _populate_main_scroll_content(self):
         log("MenuScreen._populate_main_scroll_content called")
@@ -131,18 +153,15 @@ class MenuScreen(ctk.CTkFrame):
                 item_card.grid_columnconfigure(1, weight=1)
                 item_card.grid_columnconfigure(2, weight=0)
 
-                image_label = None
+                # Placeholder first; the image is decoded off the Tk thread and swapped in when ready
+                image_label = ctk.CTkLabel(item_card, text="Loading..." if item.image_filename else "No Image",
+                                           width=100, height=100, fg_color="gray", text_color="white")
+                image_label.grid(row=0, column=0, rowspan=3, padx=10, pady=10, sticky="ns")
                 if item.image_filename:
                     project_root = self.app_ref.project_root
                     image_path = os.path.join(project_root, "assets", "menu_items", item.image_filename)
-                    ctk_image = load_image(image_path, size=(100, 100))
-                    if ctk_image:
-                        image_label = ctk.CTkLabel(item_card, image=ctk_image, text="")
-                        image_label.grid(row=0, column=0, rowspan=3, padx=10, pady=10, sticky="ns")
-
-                if not image_label:
-                    image_label = ctk.CTkLabel(item_card, text="No Image", width=100, height=100, fg_color="gray", text_color="white")
-                    image_label.grid(row=0, column=0, rowspan=3, padx=10, pady=10, sticky="ns")
+                    self.image_loader.request(image_label, image_path, (100, 100),
+                                              lambda ctk_image, label=image_label: self._show_item_image(label, ctk_image))
 
                 details_frame = ctk.CTkFrame(item_card, fg_color="transparent")
                 details_frame.grid(row=0, column=1, rowspan=3, padx=(0, 10), pady=10, sticky="nsew")
@@ -171,6 +190,12 @@ class MenuScreen(ctk.CTkFrame):
                 current_row += 1
         return current_row
 
+    def _show_item_image(self, image_label, ctk_image):
+        if ctk_image:
+            image_label.configure(image=ctk_image, text="", fg_color="transparent")
+        else:
+            image_label.configure(text="No Image")
+
     def _build_review_section_with_form_container(self, parent_frame, start_row):
         current_row = start_row
         log("_build_review_section_with_form_container called")
@@ -325,8 +350,8 @@ class MenuScreen(ctk.CTkFrame):
             no_restaurant_label.grid(row=current_row, column=0, pady=20, sticky="ew")
             return current_row + 1
 
-        reviews = get_reviews_for_restaurant(self.restaurant.restaurant_id)
-        log(f"Found {len(reviews)} reviews for restaurant ID {self.restaurant.restaurant_id}")
+        reviews, self.reviews_next_cursor = get_reviews_page(self.restaurant.restaurant_id)
+        log(f"Loaded first page of {len(reviews)} reviews for restaurant ID {self.restaurant.restaurant_id}")
 
         if not reviews:
             no_reviews_label = ctk.CTkLabel(parent_frame,
@@ -335,6 +360,24 @@ class MenuScreen(ctk.CTkFrame):
             no_reviews_label.grid(row=current_row, column=0, pady=20, sticky="ew")
             return current_row + 1
 
+        current_row = self._add_review_cards(parent_frame, reviews, current_row)
+        self.reviews_next_row = current_row
+        return current_row
+
+    def _load_more_reviews(self):
+        """Appends the next page of reviews; called by the infinite scroll binding near the bottom."""
+        if self.reviews_loading or self.reviews_next_cursor is None or not self.restaurant:
+            return
+        self.reviews_loading = True
+        try:
+            reviews, self.reviews_next_cursor = get_reviews_page(self.restaurant.restaurant_id, before_id=self.reviews_next_cursor)
+            log(f"Loaded {len(reviews)} more reviews for restaurant ID {self.restaurant.restaurant_id}")
+            self.reviews_next_row = self._add_review_cards(self.main_scroll_frame, reviews, self.reviews_next_row)
+        finally:
+            self.reviews_loading = False
+
+    def _add_review_cards(self, parent_frame, reviews, start_row):
+        current_row = start_row
         for review_data in reviews:
             review_card = ctk.CTkFrame(parent_frame, fg_color=FRAME_FG_COLOR,
                                      border_color=FRAME_BORDER_COLOR, border_width=1, corner_radius=8)
@@ -403,6 +446,18 @@ class MenuScreen(ctk.CTkFrame):
 
         self.refresh_reviews()
 
+    def refresh_data(self):
+        log("MenuScreen.refresh_data called, restaurant, menu or reviews changed while the screen was hidden.")
+        if self.restaurant:
+            # Re-read the restaurant itself so a rename or new description shows too
+            refreshed = Restaurant.get_by_id(self.restaurant.restaurant_id)
+            if refreshed:
+                self.restaurant = refreshed
+                self._update_header()
+            else:
+                log(f"Restaurant ID {self.restaurant.restaurant_id} no longer exists; keeping the cached header.")
+        self._populate_main_scroll_content()
+
     def refresh_reviews(self):
         log("MenuScreen.refresh_reviews called, will repopulate main scroll content.")
         self._populate_main_scroll_content()
@@ -1,7 +1,6 @@
 import customtkinter as ctk
 import logging
 from tkinter import filedialog
-from PIL import Image, ImageTk # For image handling
 import os
 import shutil
 
@@ -16,8 +15,14 @@ from gui_constants import (
 from restaurants.models import Restaurant, MenuItem
 from CTkTable import CTkTable
 from tkinter import messagebox
-from reviews.models import get_reviews_for_restaurant, Review
+from reviews.models import get_reviews_page, Review
+from gui_components.infinite_scroll import bind_infinite_scroll
+from gui_components.sparkline import RatingSparkline
+from gui_components.screen_loader import ScreenLoader
+from restaurants.rating_trends import get_rating_trend, summarize_trend, RATING_TREND_WEEKS, SLIPPING_RECENT_WEEKS
 import datetime
+from utils.image_loader import load_image
+from utils.thumbnails import build_thumbnails_async
 
 # Setup logger for this module
 logger = logging.getLogger("swigato_app.restaurant_management_screen")
@@ -43,6 +48,7 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
         self.menu_table = None
         self.current_edit_item_image_path = None
         self.current_add_item_image_path = None
+        self.loader = ScreenLoader(self, spinner_color=ADMIN_TEXT_COLOR)
 
         self.configure(fg_color=ADMIN_BACKGROUND_COLOR)
 
@@ -201,6 +207,7 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
     def _load_menu_items(self):
         if not self.restaurant_id:
             logger.info("Cannot load menu items: restaurant_id is None (new restaurant).")
+            self.loader.cancel("menu_items")
             if self.menu_table:
                 self.menu_table.destroy()
                 self.menu_table = None
@@ -214,7 +221,11 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
             return
 
         logger.info(f"Loading menu items for restaurant ID: {self.restaurant_id}")
-        
+        restaurant_id = self.restaurant_id
+        self.loader.load("menu_items", lambda: MenuItem.get_for_restaurant(restaurant_id), self._display_menu_items,
+                         spinner_parent=self.menu_table_frame, spinner_text="Loading menu...")
+
+    def _display_menu_items(self, menu_items_from_db):
         if self.menu_table and isinstance(self.menu_table, ctk.CTkFrame):
             self.menu_table.destroy()
         elif self.menu_table:
@@ -223,7 +234,6 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
         for widget in self.menu_table_frame.winfo_children():
             widget.destroy()
 
-        menu_items_from_db = MenuItem.get_for_restaurant(self.restaurant_id)
         logger.info(f"Found {len(menu_items_from_db)} menu items for restaurant ID: {self.restaurant_id}")
         self.menu_items_in_table = []
 
@@ -425,6 +435,7 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
                 
                 shutil.copy(self.current_add_item_image_path, target_path)
                 logger.info(f"New menu item image '{img_basename}' copied to '{target_path}'.")
+                build_thumbnails_async(target_path)
                 final_image_filename = img_basename
             except Exception as e:
                 logger.error(f"Error copying new menu item image '{self.current_add_item_image_path}' to '{target_path}': {e}")
@@ -508,6 +519,7 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
                     if norm_current_selected_path != os.path.normpath(target_path):
                          shutil.copy(self.current_edit_item_image_path, target_path)
                          logger.info(f"Menu item image '{img_basename}' copied/updated to '{target_path}'.")
+                         build_thumbnails_async(target_path)
                     else:
                          logger.info(f"Menu item image '{img_basename}' is already at target '{target_path}'. No copy needed.")
                     final_image_filename = img_basename
@@ -669,16 +681,33 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
         tab_frame.grid_columnconfigure(0, weight=1)
         tab_frame.grid_rowconfigure(1, weight=1)
 
-        self.reviews_table_frame = ctk.CTkFrame(tab_frame, fg_color="transparent")
+        # Weekly rating trend from restaurant_rating_weekly, above the reviews table
+        trend_frame = ctk.CTkFrame(tab_frame, fg_color="transparent")
+        trend_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 0))
+        ctk.CTkLabel(trend_frame, text=f"Last {RATING_TREND_WEEKS} weeks:", font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE),
+                     text_color=ADMIN_TEXT_COLOR).pack(side="left", padx=(0, 10))
+        self.rating_sparkline = RatingSparkline(trend_frame)
+        self.rating_sparkline.pack(side="left")
+        self.trend_summary_label = ctk.CTkLabel(trend_frame, text="", font=ctk.CTkFont(family=FONT_FAMILY, size=BODY_FONT_SIZE - 1),
+                                                text_color=ADMIN_TEXT_COLOR, justify="left")
+        self.trend_summary_label.pack(side="left", padx=(10, 0))
+
+        # Scrollable so further pages of reviews can be appended as the admin scrolls down
+        self.reviews_table_frame = ctk.CTkScrollableFrame(tab_frame, fg_color="transparent")
         self.reviews_table_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
         self.reviews_table_frame.grid_columnconfigure(0, weight=1)
-        self.reviews_table_frame.grid_rowconfigure(0, weight=1)
+        self.reviews_table = None
+        self.reviews_in_table = []
+        self.reviews_next_cursor = None
+        self.reviews_loading = False
+        bind_infinite_scroll(self.reviews_table_frame, self._load_more_reviews)
 
         self._load_reviews()
 
     def _load_reviews(self):
         for widget in self.reviews_table_frame.winfo_children():
             widget.destroy()
+        self._load_rating_trend()
 
         if not self.restaurant_id:
             ctk.CTkLabel(self.reviews_table_frame, text="Save the restaurant details first to manage reviews.",
@@ -686,22 +715,13 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
                          text_color=ADMIN_TEXT_COLOR).pack(expand=True, anchor="center", padx=20, pady=20)
             return
 
-        reviews = get_reviews_for_restaurant(self.restaurant_id)
-        self.reviews_in_table = reviews
+        # Newest reviews first, one page at a time; _load_more_reviews appends the rest on scroll
+        reviews, self.reviews_next_cursor = get_reviews_page(self.restaurant_id)
+        self.reviews_in_table = list(reviews)
+        self.reviews_table = None
 
         headers = ["ID", "User", "Rating", "Comment", "Date", "Actions"]
-        table_data = [headers]
-        for review in reviews:
-            date_str = review.review_date.strftime('%Y-%m-%d %H:%M') if isinstance(review.review_date, datetime.datetime) else str(review.review_date)
-            comment_short = (review.comment[:40] + '...') if review.comment and len(review.comment) > 43 else (review.comment or "")
-            table_data.append([
-                review.review_id,
-                review.username,
-                f"{review.rating}/5",
-                comment_short,
-                date_str,
-                "Delete"
-            ])
+        table_data = [headers] + [self._review_row_values(review) for review in reviews]
 
         if len(table_data) == 1:
             ctk.CTkLabel(self.reviews_table_frame, text="No reviews found for this restaurant.",
@@ -724,6 +744,48 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
                                       wraplength=150)
         self.reviews_table.pack(expand=True, fill="both", padx=5, pady=5)
 
+    def _load_rating_trend(self):
+        if not self.restaurant_id:
+            self.rating_sparkline.set_trend([])
+            self.trend_summary_label.configure(text="")
+            return
+        trend = get_rating_trend(self.restaurant_id)
+        self.rating_sparkline.set_trend(trend)
+        summary = summarize_trend(trend)
+        if not summary["reviews"]:
+            self.trend_summary_label.configure(text="No reviews in this period.")
+            return
+        text = f"{summary['reviews']} reviews, avg {summary['average_rating']:.2f}"
+        if summary["change"] is not None:
+            text += f"\nLast {SLIPPING_RECENT_WEEKS} weeks: {summary['recent_average']:.2f} ({summary['change']:+.2f})"
+        self.trend_summary_label.configure(text=text)
+
+    def _review_row_values(self, review):
+        date_str = review.review_date.strftime('%Y-%m-%d %H:%M') if isinstance(review.review_date, datetime.datetime) else str(review.review_date)
+        comment_short = (review.comment[:40] + '...') if review.comment and len(review.comment) > 43 else (review.comment or "")
+        return [
+            review.review_id,
+            review.username,
+            f"{review.rating}/5",
+            comment_short,
+            date_str,
+            "Delete"
+        ]
+
+    def _load_more_reviews(self):
+        """Appends the next page of reviews to the table; called by the infinite scroll binding."""
+        if self.reviews_loading or self.reviews_next_cursor is None or self.reviews_table is None:
+            return
+        self.reviews_loading = True
+        try:
+            reviews, self.reviews_next_cursor = get_reviews_page(self.restaurant_id, before_id=self.reviews_next_cursor)
+            for review in reviews:
+                self.reviews_table.add_row(self._review_row_values(review))
+                self.reviews_in_table.append(review)
+            logger.debug(f"Appended {len(reviews)} reviews for restaurant {self.restaurant_id}; {len(self.reviews_in_table)} shown.")
+        finally:
+            self.reviews_loading = False
+
     def _on_review_table_cell_click(self, event_data):
         row_clicked = event_data["row"]
         column_clicked = event_data["column"]
@@ -793,9 +855,9 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
                     image_label_widget.image = None 
                     return
 
-            img = Image.open(effective_image_path)
-            img.thumbnail(target_size) 
-            ctk_image = ctk.CTkImage(light_image=img, dark_image=img, size=(img.width, img.height))
+            ctk_image = load_image(effective_image_path, size=target_size, keep_aspect=True)
+            if ctk_image is None:
+                raise ValueError("image could not be decoded")
             image_label_widget.configure(image=ctk_image, text="")
             image_label_widget.image = ctk_image 
         except Exception as e:
@@ -830,6 +892,7 @@ class RestaurantManagementScreen(ctk.CTkToplevel):
                         import shutil
                         shutil.copy(self.restaurant_image_path, target_path)
                         logger.info(f"Image {img_basename} copied to {target_path} for restaurant.")
+                        build_thumbnails_async(target_path)
                     else:
                         logger.info(f"Image {img_basename} already in target directory; skipping copy.")
                     final_image_filename = img_basename
@@ -0,0 +1,173 @@
+import os
+import logging
+from collections import OrderedDict
+from utils.database import get_data_versions
+from utils import metrics
+
+logger = logging.getLogger("swigato_app.screen_cache")
+
+# Most screens kept alive (the one on display included) before the least recently used hidden one is destroyed
+SCREEN_CACHE_SIZE = int(os.environ.get('SWIGATO_SCREEN_CACHE_SIZE', '6'))
+# Memory budget for hidden screens, counted in Tk widgets (each CTk widget is one to three of them)
+SCREEN_CACHE_MAX_WIDGETS = int(os.environ.get('SWIGATO_SCREEN_CACHE_MAX_WIDGETS', '15000'))
+
+def count_widgets(widget):
+    """Number of Tk widgets in widget's tree, itself included."""
+    count = 0
+    stack = [widget]
+    while stack:
+        current = stack.pop()
+        count += 1
+        stack.extend(current.winfo_children())
+    return count
+
+class ScreenCache:
+    """
+    Keeps built screens alive while they are hidden so navigating back to one is instant.
+
+    acquire(key, factory) returns the cached screen for key, or builds one with factory(); the
+    caller lays it out. release(key) is called after the caller has un-laid it (pack_forget /
+    grid_forget): the screen stays cached and the least recently used hidden screens are
+    destroyed while there are more than max_screens, or while the hidden ones hold more than
+    max_widgets widgets. The screen on display is never evicted.
+
+    Screens opt in to refreshing by declaring DATA_TABLES (table names from
+    utils.database.DATA_VERSION_TABLES) and a refresh_data() method. The data versions of
+    those tables are remembered when the screen is built; on acquire they are read again (one
+    small query) and refresh_data() runs only if one of them moved. Optional on_screen_hidden()
+    / on_screen_shown() hooks let a screen pause and resume its own timers. The same contract
+    holds for App's cache of top-level screens and AdminDashboard's cache of its sub-screens.
+    """
+    def __init__(self, name, max_screens=SCREEN_CACHE_SIZE, max_widgets=SCREEN_CACHE_MAX_WIDGETS):
+        self.name = name
+        self.max_screens = max_screens
+        self.max_widgets = max_widgets
+        self._entries = OrderedDict()  # key -> {"screen", "versions", "widgets"}; LRU order
+        self._shown_key = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def acquire(self, key, factory):
+        """The screen for key (refreshed first if its data changed), building it on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and not entry["screen"].winfo_exists():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            metrics.increment(f"screen_cache.{self.name}.misses")
+            # Read before building, so a change that lands mid-load is caught (as one extra refresh) next time
+            versions = get_data_versions()
+            screen = factory()
+            tables = getattr(screen, "DATA_TABLES", ())
+            entry = {"screen": screen, "versions": {table: versions.get(table, 0) for table in tables}, "widgets": 0}
+            self._entries[key] = entry
+        else:
+            self.hits += 1
+            metrics.increment(f"screen_cache.{self.name}.hits")
+            self._entries.move_to_end(key)
+            self.refresh_if_stale(key)
+            self._call_hook(entry["screen"], "on_screen_shown")
+        self._shown_key = key
+        return entry["screen"]
+
+    def release(self, key):
+        """Marks key's screen hidden (the caller has already un-laid it) and trims the cache."""
+        entry = self._entries.get(key)
+        if self._shown_key == key:
+            self._shown_key = None
+        if entry is None or not entry["screen"].winfo_exists():
+            self._entries.pop(key, None)
+            return
+        self._call_hook(entry["screen"], "on_screen_hidden")
+        entry["widgets"] = count_widgets(entry["screen"])
+        self._trim()
+        self.stats()
+
+    def refresh_if_stale(self, key):
+        """Calls the screen's refresh_data() if a table it reads changed since it last loaded. Returns True if it did."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        screen = entry["screen"]
+        versions = self._versions(screen)
+        if not versions or versions == entry["versions"]:
+            return False
+        entry["versions"] = versions
+        if not callable(getattr(screen, "refresh_data", None)):
+            return False
+        self.refreshes += 1
+        metrics.increment(f"screen_cache.{self.name}.refreshes")
+        logger.info(f"{type(screen).__name__} data changed while hidden; refreshing.")
+        try:
+            screen.refresh_data()
+        except Exception as e:
+            logger.error(f"Error refreshing cached {type(screen).__name__}: {e}")
+        return True
+
+    def discard(self, key):
+        """Destroys and forgets key's screen, e.g. when what it shows no longer exists."""
+        entry = self._entries.pop(key, None)
+        if self._shown_key == key:
+            self._shown_key = None
+        if entry is not None:
+            self._destroy(entry["screen"])
+
+    def clear(self):
+        """Destroys every cached screen, the one on display included."""
+        for key in list(self._entries):
+            self.discard(key)
+
+    def get(self, key):
+        """The cached screen for key without touching the LRU order, or None."""
+        entry = self._entries.get(key)
+        return entry["screen"] if entry is not None else None
+
+    def _versions(self, screen):
+        tables = getattr(screen, "DATA_TABLES", ())
+        return get_data_versions(tables) if tables else {}
+
+    def _trim(self):
+        hidden = [key for key in self._entries if key != self._shown_key]  # Oldest first
+        hidden_widgets = sum(self._entries[key]["widgets"] for key in hidden)
+        while hidden and (len(self._entries) > self.max_screens or hidden_widgets > self.max_widgets):
+            key = hidden.pop(0)
+            entry = self._entries.pop(key)
+            hidden_widgets -= entry["widgets"]
+            self.evictions += 1
+            metrics.increment(f"screen_cache.{self.name}.evictions")
+            logger.info(f"Evicting cached {type(entry['screen']).__name__} ({entry['widgets']} widgets).")
+            self._destroy(entry["screen"])
+
+    def _call_hook(self, screen, hook_name):
+        hook = getattr(screen, hook_name, None)
+        if callable(hook):
+            try:
+                hook()
+            except Exception as e:
+                logger.error(f"Error in {type(screen).__name__}.{hook_name}: {e}")
+
+    def _destroy(self, screen):
+        try:
+            if screen.winfo_exists():
+                screen.destroy()
+        except Exception as e:
+            logger.error(f"Error destroying cached {type(screen).__name__}: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            "screens": len(self._entries),
+            "hidden_widgets": sum(entry["widgets"] for key, entry in self._entries.items() if key != self._shown_key),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+        metrics.set_gauge(f"screen_cache.{self.name}.screens", stats["screens"])
+        metrics.set_gauge(f"screen_cache.{self.name}.hidden_widgets", stats["hidden_widgets"])
+        metrics.set_gauge(f"screen_cache.{self.name}.hit_rate_pct", round(stats["hit_rate"] * 100, 1))
+        return stats
@@ -0,0 +1,146 @@
+import os
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import customtkinter as ctk
+from utils import metrics
+
+logger = logging.getLogger("swigato_app.screen_loader")
+
+# Worker threads shared by every screen's data loads; each load opens its own DB connection
+SCREEN_LOADER_WORKERS = int(os.environ.get('SWIGATO_SCREEN_LOADER_WORKERS', '2'))
+# How often finished loads are picked up on the Tk thread
+SCREEN_LOADER_POLL_MS = 40
+SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+SPINNER_FRAME_MS = 80
+
+_loader_pool = None
+_loader_pool_lock = threading.Lock()
+
+def get_screen_loader_pool():
+    """Returns the shared screen-loading executor, creating it on first use."""
+    global _loader_pool
+    with _loader_pool_lock:
+        if _loader_pool is None:
+            _loader_pool = ThreadPoolExecutor(max_workers=SCREEN_LOADER_WORKERS, thread_name_prefix="swigato-loader")
+        return _loader_pool
+
+class LoadingSpinner(ctk.CTkLabel):
+    """An animated 'Loading...' label placed over the middle of its parent while a load is running."""
+    def __init__(self, master, text="Loading...", text_color=None, **kwargs):
+        super().__init__(master, text="", text_color=text_color, fg_color="transparent", **kwargs)
+        self.message = text
+        self._frame = 0
+        self._job = None
+
+    def start(self, text=None):
+        if text is not None:
+            self.message = text
+        self.place(relx=0.5, rely=0.5, anchor="center")
+        self.lift()
+        if self._job is None:
+            self._spin()
+
+    def stop(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        self.place_forget()
+
+    def _spin(self):
+        self.configure(text=f"{SPINNER_FRAMES[self._frame % len(SPINNER_FRAMES)]}  {self.message}")
+        self._frame += 1
+        self._job = self.after(SPINNER_FRAME_MS, self._spin)
+
+    def destroy(self):
+        self.stop()
+        super().destroy()
+
+class ScreenLoader:
+    """
+    Runs a screen's data queries on a worker thread and renders the results on the Tk thread.
+
+    load(slot, fetch, render) calls fetch() on the shared pool; its result is put on a queue
+    that the screen drains with after(), and render(result) runs there. Each slot (say
+    "table") keeps a generation number: starting a new load, or cancel(), makes every earlier
+    load in that slot stale, and stale results are dropped instead of rendered. So a filter
+    changed twice in quick succession only ever shows the second answer. Results for a destroyed
+    screen are dropped too. If spinner_parent is given, a LoadingSpinner covers it until the
+    newest load of the slot finishes.
+    """
+    def __init__(self, screen, spinner_color=None, poll_ms=SCREEN_LOADER_POLL_MS):
+        self.screen = screen
+        self.spinner_color = spinner_color
+        self.poll_ms = poll_ms
+        self._results = queue.Queue()  # (slot, generation, future, render, on_error), filled from workers
+        self._generations = {}         # slot -> generation of its newest load
+        self._pending = set()          # (slot, generation) not yet picked up
+        self._spinners = {}            # slot -> LoadingSpinner
+        self._poll_job = None
+
+    def load(self, slot, fetch, render, spinner_parent=None, spinner_text="Loading...", on_error=None):
+        """
+        Starts fetch() for `slot` and returns its generation. render(result) runs on the Tk
+        thread if this is still the slot's newest load; if fetch raises, on_error(exception)
+        runs instead (the error is logged when there is no on_error).
+        """
+        generation = self._generations.get(slot, 0) + 1
+        self._generations[slot] = generation
+        self._pending.add((slot, generation))
+        if spinner_parent is not None:
+            self._spinner(slot, spinner_parent).start(spinner_text)
+        future = get_screen_loader_pool().submit(fetch)
+        future.add_done_callback(lambda done: self._results.put((slot, generation, done, render, on_error)))
+        if self._poll_job is None:
+            self._poll_job = self.screen.after(self.poll_ms, self._poll)
+        return generation
+
+    def cancel(self, slot):
+        """Makes any running load of `slot` stale so its result is never rendered."""
+        self._generations[slot] = self._generations.get(slot, 0) + 1
+        self._stop_spinner(slot)
+
+    def is_loading(self, slot):
+        return (slot, self._generations.get(slot, 0)) in self._pending
+
+    def _spinner(self, slot, parent):
+        spinner = self._spinners.get(slot)
+        if spinner is None or not spinner.winfo_exists() or spinner.master is not parent:
+            spinner = self._spinners[slot] = LoadingSpinner(parent, text_color=self.spinner_color,
+                                                            font=ctk.CTkFont(size=14, weight="bold"))
+        return spinner
+
+    def _stop_spinner(self, slot):
+        spinner = self._spinners.get(slot)
+        if spinner is not None and spinner.winfo_exists():
+            spinner.stop()
+
+    def _poll(self):
+        self._poll_job = None
+        if not self.screen.winfo_exists():
+            return
+        while True:
+            try:
+                slot, generation, future, render, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard((slot, generation))
+            if generation != self._generations.get(slot):
+                metrics.increment("screen_loader.stale_results")
+                continue
+            self._stop_spinner(slot)
+            try:
+                result = future.result()
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+                else:
+                    logger.error(f"Error loading '{slot}' for {type(self.screen).__name__}: {e}")
+                continue
+            try:
+                render(result)
+            except Exception as e:
+                logger.error(f"Error rendering '{slot}' for {type(self.screen).__name__}: {e}")
+        if self._pending:
+            self._poll_job = self.screen.after(self.poll_ms, self._poll)
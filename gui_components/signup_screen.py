@@ -1,7 +1,7 @@
 import customtkinter as ctk
-from PIL import Image
 import os
-from users.auth import sign_up
+from users.auth import sign_up_async
+from utils.image_loader import load_image
 from gui_constants import PRIMARY_COLOR, BACKGROUND_COLOR, ENTRY_BG_COLOR, TEXT_COLOR, BUTTON_HOVER_COLOR, SUCCESS_COLOR, DISABLED_BUTTON_COLOR, ERROR_COLOR
 from utils.validation import is_valid_password
 
@@ -16,7 +16,9 @@ class SignupScreen(ctk.CTkFrame):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         image_path = os.path.join(current_dir, "..", "swigato_icon.png")
         try:
-            self.swigato_image = ctk.CTkImage(light_image=Image.open(image_path), size=(100, 100))
+            self.swigato_image = load_image(image_path, size=(100, 100))  # Pre-scaled thumbnail, not the 1.3 MB original
+            if self.swigato_image is None:
+                raise FileNotFoundError(image_path)
             self.swigato_image_label = ctk.CTkLabel(self, image=self.swigato_image, text="")
             self.swigato_image_label.grid(row=1, column=0, pady=(20, 5), sticky="s")
         except Exception as e:
@@ -92,6 +94,10 @@ class SignupScreen(ctk.CTkFrame):
         self.status_label = ctk.CTkLabel(form_frame, text="", font=ctk.CTkFont(size=12))
         self.status_label.grid(row=6, column=0, columnspan=2, pady=(0,10), sticky="nwe")
 
+        # Shown in place of the status text while the password is hashed on the auth pool
+        self.signup_spinner = ctk.CTkProgressBar(form_frame, mode="indeterminate", height=6,
+                                                 progress_color=PRIMARY_COLOR, fg_color=ENTRY_BG_COLOR)
+
         login_link_button = ctk.CTkButton(self, text="Already have an account? Login", fg_color="transparent",
                                           text_color=PRIMARY_COLOR, hover_color=BACKGROUND_COLOR,
                                           command=self._go_to_login, font=ctk.CTkFont(size=12, underline=True))
@@ -141,14 +147,28 @@ class SignupScreen(ctk.CTkFrame):
             self.signup_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
             return
 
+        if not username:
+            self.status_label.configure(text="Username is required.", text_color=ERROR_COLOR)
+            self.signup_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
+            return
+
+        self.status_label.grid_remove()
+        self.signup_spinner.grid(row=6, column=0, columnspan=2, pady=(8, 14), sticky="we")
+        self.signup_spinner.start()
+        signup_future = sign_up_async(username, password)
+
         def process_signup_attempt():
-            if not username:
-                self.status_label.configure(text="Username is required.", text_color=ERROR_COLOR)
-                self.signup_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
+            if not self.winfo_exists():
+                return
+            if not signup_future.done():
+                self.after(50, process_signup_attempt)
                 return
+            self.signup_spinner.stop()
+            self.signup_spinner.grid_remove()
+            self.status_label.grid()
 
             try:
-                success = sign_up(username, password)
+                success = signup_future.result()
 
                 if success:
                     self.status_label.configure(text="Account created successfully! Redirecting to login...", text_color=SUCCESS_COLOR)
@@ -166,7 +186,7 @@ class SignupScreen(ctk.CTkFrame):
                     self.status_label.configure(text=f"An error occurred: {error_message}", text_color=ERROR_COLOR)
                 self.signup_button.configure(state="normal", text=original_button_text, fg_color=PRIMARY_COLOR)
 
-        self.after(100, process_signup_attempt)
+        self.after(50, process_signup_attempt)
 
     def _go_to_login(self):
         self.show_login_callback()
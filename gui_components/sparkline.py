@@ -0,0 +1,44 @@
+import customtkinter as ctk
+from gui_constants import ADMIN_FRAME_FG_COLOR, ADMIN_PRIMARY_COLOR, ADMIN_SECONDARY_ACCENT_COLOR, ERROR_COLOR
+
+class RatingSparkline(ctk.CTkCanvas):
+    """
+    A small weekly rating chart: review volume as faint bars along the bottom and the average
+    rating as a line on a fixed 1-5 scale, so a slipping restaurant looks like a falling line
+    whatever its absolute rating. Feed it a restaurants.rating_trends.get_rating_trend series.
+    """
+    def __init__(self, master, width=320, height=56, **kwargs):
+        super().__init__(master, width=width, height=height, bg=ADMIN_FRAME_FG_COLOR, highlightthickness=0, **kwargs)
+        self.trend = []
+        self.bind("<Configure>", lambda event: self._draw())
+
+    def set_trend(self, trend):
+        self.trend = list(trend)
+        self._draw()
+
+    def _draw(self):
+        self.delete("all")
+        if not self.trend:
+            return
+        width, height, pad = self.winfo_width(), self.winfo_height(), 4
+        if width <= 1:  # Not laid out yet; <Configure> will redraw
+            width, height = int(self.cget("width")), int(self.cget("height"))
+        step = (width - 2 * pad) / len(self.trend)
+        max_count = max(entry["review_count"] for entry in self.trend) or 1
+
+        for i, entry in enumerate(self.trend):
+            if entry["review_count"]:
+                bar_height = entry["review_count"] / max_count * (height - 2 * pad) * 0.4
+                x0 = pad + i * step + step * 0.15
+                self.create_rectangle(x0, height - pad - bar_height, x0 + step * 0.7, height - pad,
+                                      fill=ADMIN_SECONDARY_ACCENT_COLOR, outline="")
+
+        points = [(pad + (i + 0.5) * step, height - pad - (entry["average_rating"] - 1) / 4 * (height - 2 * pad))
+                  for i, entry in enumerate(self.trend) if entry["average_rating"] is not None]
+        if len(points) > 1:
+            self.create_line(*[coordinate for point in points for coordinate in point], fill=ADMIN_PRIMARY_COLOR, width=2)
+        if points:
+            x, y = points[-1]
+            falling = len(points) > 1 and y > points[-2][1]
+            color = ERROR_COLOR if falling else ADMIN_PRIMARY_COLOR
+            self.create_oval(x - 3, y - 3, x + 3, y + 3, fill=color, outline=color)
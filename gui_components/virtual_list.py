@@ -0,0 +1,207 @@
+import tkinter
+import logging
+import customtkinter as ctk
+
+logger = logging.getLogger("swigato_app.virtual_list")
+
+# Items fetched per fetch_page call, and how many fetched pages are kept
+VIRTUAL_LIST_PAGE_SIZE = 50
+VIRTUAL_LIST_CACHED_PAGES = 8
+# Cards kept bound above and below the visible area so short scrolls don't show blanks
+VIRTUAL_LIST_OVERSCAN = 3
+
+# Passed to bind_card in place of an item whose page is still being fetched
+LOADING_ITEM = object()
+
+# Live lists; a single bind_all handler per Tk root hands wheel events to them, and destroy()
+# takes a list out again, so a destroyed list is never kept reachable by its binding
+_wheel_lists = set()
+_wheel_bound_roots = set()
+
+def _dispatch_mouse_wheel(event):
+    for virtual_list in list(_wheel_lists):
+        virtual_list._on_mouse_wheel(event)
+
+class VirtualCardList(ctk.CTkFrame):
+    """
+    A vertically scrolling list of fixed-height cards that only builds widgets for the rows in
+    view (plus `overscan` either side), however many items it holds.
+
+    The rows are windows on a plain Canvas whose scrollregion is count * row_height tall. On
+    every scroll or resize the visible index range is recomputed; cards that scrolled out are
+    moved to the newly visible rows and rebound instead of being destroyed. Items come from
+    fetch_page(start, count) a page at a time, run through `loader` (a ScreenLoader) so the
+    query never blocks the Tk thread, and only the most recent pages are cached.
+
+    create_card(parent) builds one empty card; bind_card(card, item) fills it for an item.
+    item is LOADING_ITEM while its page is on its way (the card is bound again when it
+    arrives) and None if the page couldn't be fetched. Call set_count() whenever the
+    underlying list changes.
+    """
+    def __init__(self, master, row_height, create_card, bind_card, fetch_page, loader, fg_color,
+                 page_size=VIRTUAL_LIST_PAGE_SIZE, overscan=VIRTUAL_LIST_OVERSCAN, row_gap=10,
+                 empty_text="", text_color=None, **kwargs):
+        super().__init__(master, fg_color=fg_color, **kwargs)
+        self.row_height = row_height
+        self.row_gap = row_gap
+        self.create_card = create_card
+        self.bind_card = bind_card
+        self.fetch_page = fetch_page
+        self.loader = loader
+        self.page_size = page_size
+        self.overscan = overscan
+        self.count = 0
+        self.pages = {}     # page number -> list of items, oldest first (a small LRU)
+        self._fetching = set()  # page numbers with a fetch in flight
+        self.slots = []     # {"card", "window", "index"}; index None when the card is parked
+        self._refresh_pending = False
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.canvas = tkinter.Canvas(self, bg=fg_color, highlightthickness=0, bd=0,
+                                     yscrollincrement=max(1, row_height // 4))
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self._on_canvas_scrolled)
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.empty_label = ctk.CTkLabel(self, text=empty_text, text_color=text_color, font=ctk.CTkFont(size=16))
+
+        # Cards are children of the canvas, so wheel events arrive on them; bind_all and filter by widget path
+        root = self._root()
+        if root not in _wheel_bound_roots:
+            _wheel_bound_roots.add(root)
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.bind_all(sequence, _dispatch_mouse_wheel, add="+")
+        _wheel_lists.add(self)
+
+    def destroy(self):
+        _wheel_lists.discard(self)
+        super().destroy()
+
+    def set_count(self, count):
+        """Points the list at a new set of `count` items and scrolls back to the top."""
+        self.count = count
+        self._drop_pages()
+        for slot in self.slots:
+            slot["index"] = None
+        self._update_scrollregion()
+        self.canvas.yview_moveto(0)
+        if count:
+            self.empty_label.place_forget()
+        else:
+            self.empty_label.place(relx=0.5, y=20, anchor="n")
+        self._refresh()
+
+    def reload_items(self):
+        """Re-fetches and rebinds the visible rows, keeping the scroll position (and the old cards until then)."""
+        self._drop_pages()
+        for page in sorted({slot["index"] // self.page_size for slot in self.slots if slot["index"] is not None}):
+            self._request_page(page)
+
+    def _drop_pages(self):
+        for page in self._fetching:
+            self.loader.cancel(self._page_slot(page))
+        self._fetching.clear()
+        self.pages.clear()
+
+    def _page_slot(self, page):
+        return f"{self}:page {page}"
+
+    def _update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self.count * self.row_height))
+
+    def _on_canvas_configure(self, event):
+        for slot in self.slots:
+            self.canvas.itemconfigure(slot["window"], width=event.width)
+        self._update_scrollregion()
+        self._schedule_refresh()
+
+    def _on_canvas_scrolled(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_refresh()
+
+    def _on_mouse_wheel(self, event):
+        if not self.canvas.winfo_exists() or not str(event.widget).startswith(str(self.canvas)):
+            return
+        if event.num == 4:
+            units = -1
+        elif event.num == 5:
+            units = 1
+        elif abs(event.delta) >= 120:
+            units = -event.delta // 120  # Windows: multiples of 120
+        else:
+            units = -event.delta         # macOS: small raw deltas
+        self.canvas.yview_scroll(units, "units")
+
+    def _schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+
+    def _item(self, index):
+        page = index // self.page_size
+        items = self.pages.pop(page, None)
+        if items is None:
+            self._request_page(page)
+            return LOADING_ITEM
+        self.pages[page] = items
+        offset = index % self.page_size
+        return items[offset] if offset < len(items) else None
+
+    def _request_page(self, page):
+        if page in self._fetching:
+            return
+        self._fetching.add(page)
+        start = page * self.page_size
+        count = min(self.page_size, self.count - start)
+
+        def on_error(e):
+            logger.error(f"Error fetching virtual list page {page}: {e}")
+            self._store_page(page, [])
+
+        self.loader.load(self._page_slot(page), lambda: self.fetch_page(start, count),
+                         lambda items: self._store_page(page, items), on_error=on_error)
+
+    def _store_page(self, page, items):
+        self._fetching.discard(page)
+        if not self.winfo_exists():
+            return
+        self.pages.pop(page, None)
+        while len(self.pages) >= VIRTUAL_LIST_CACHED_PAGES:
+            del self.pages[next(iter(self.pages))]
+        self.pages[page] = items
+        for slot in self.slots:
+            if slot["index"] is not None and slot["index"] // self.page_size == page:
+                offset = slot["index"] % self.page_size
+                self.bind_card(slot["card"], items[offset] if offset < len(items) else None)
+
+    def _refresh(self):
+        self._refresh_pending = False
+        if not self.winfo_exists():
+            return
+        view_height = max(self.canvas.winfo_height(), self.row_height)
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // self.row_height) - self.overscan)
+        last = min(self.count, int((top + view_height) // self.row_height) + 1 + self.overscan)
+        wanted = set(range(first, last))
+
+        bound = {slot["index"] for slot in self.slots if slot["index"] in wanted}
+        free = [slot for slot in self.slots if slot["index"] not in wanted]
+        missing = sorted(wanted - bound)
+        while len(free) < len(missing):
+            card = self.create_card(self.canvas)
+            window = self.canvas.create_window(0, 0, window=card, anchor="nw", width=self.canvas.winfo_width(),
+                                               height=self.row_height - self.row_gap)
+            slot = {"card": card, "window": window, "index": None}
+            self.slots.append(slot)
+            free.append(slot)
+        for index in missing:
+            slot = free.pop()
+            self.bind_card(slot["card"], self._item(index))
+            self.canvas.coords(slot["window"], 0, index * self.row_height)
+            self.canvas.itemconfigure(slot["window"], state="normal")
+            slot["index"] = index
+        for slot in free:  # Cards not needed for this view are parked, ready for reuse
+            self.canvas.itemconfigure(slot["window"], state="hidden")
+            slot["index"] = None
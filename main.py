@@ -14,7 +14,11 @@ from admin.actions import (
     view_all_users, view_all_orders, delete_user_by_admin, 
     view_all_restaurants_admin, add_restaurant_admin, 
     edit_restaurant_admin, delete_restaurant_admin,
-    manage_restaurant_menu_items_admin, update_order_status_admin, delete_review_admin # Added new imports
+    manage_restaurant_menu_items_admin, update_order_status_admin, delete_review_admin, # Added new imports
+    archive_orders_admin, view_sales_report_admin, order_analytics_admin,
+    export_orders_admin, view_system_metrics_admin, calibrate_bcrypt_cost_admin,
+    bulk_import_users_admin, bulk_manage_users_admin, review_moderation_queue_admin,
+    review_sentiment_admin, bulk_moderate_reviews_admin, rating_trends_admin
 )
 
 active_cart = Cart()  # Initialize a global cart for the session
@@ -274,7 +278,7 @@ def view_order_history():
 
     console.print()  # Added line break
     log(f"Fetching order history for {current_user.username}...")
-    user_orders = get_orders_by_user_id(current_user.user_id)
+    user_orders = get_orders_by_user_id(current_user.user_id, include_archived=True)
 
     if not user_orders:
         console.print("[yellow]You have no past orders.[/yellow]")
@@ -311,48 +315,72 @@ def admin_menu(user):
         view_all_users, view_all_orders, delete_user_by_admin, 
         view_all_restaurants_admin, add_restaurant_admin, 
         edit_restaurant_admin, delete_restaurant_admin,
-        manage_restaurant_menu_items_admin, update_order_status_admin, delete_review_admin
+        manage_restaurant_menu_items_admin, update_order_status_admin, delete_review_admin,
+        archive_orders_admin, view_sales_report_admin, order_analytics_admin,
+        export_orders_admin, view_system_metrics_admin, calibrate_bcrypt_cost_admin,
+        bulk_import_users_admin, bulk_manage_users_admin, review_moderation_queue_admin,
+        review_sentiment_admin, bulk_moderate_reviews_admin, rating_trends_admin
     )
 
+    # Entries are numbered in display order, so a new action never breaks the sequence
+    menu_sections = [
+        (None, [
+            ("View All Users", lambda: view_all_users(user)),
+            ("Bulk Import Users (CSV/JSONL)", lambda: bulk_import_users_admin(user)),
+            ("Bulk Delete / Deactivate Users", lambda: bulk_manage_users_admin(user)),
+            ("View All Orders", lambda: view_all_orders(user)),
+            ("Update Order Status", update_order_status_admin),
+        ]),
+        ("Restaurant Management", [
+            ("Add New Restaurant", lambda: add_restaurant_admin(user)),
+            ("Edit Restaurant", lambda: edit_restaurant_admin(user)),
+            ("Delete Restaurant", lambda: delete_restaurant_admin(user)),
+            ("Manage Menu Items for a Restaurant", lambda: manage_restaurant_menu_items_admin(user)),
+        ]),
+        ("Review Management", [
+            ("Delete Review", delete_review_admin),
+            ("Review Moderation Queue (spam scan)", lambda: review_moderation_queue_admin(user)),
+            ("Review Sentiment", lambda: review_sentiment_admin(user)),
+            ("Bulk Hide / Delete Reviews by Filter", lambda: bulk_moderate_reviews_admin(user)),
+        ]),
+        ("Maintenance", [
+            ("Archive Old Orders", lambda: archive_orders_admin(user)),
+        ]),
+        ("Analytics", [
+            ("Sales Report", lambda: view_sales_report_admin(user)),
+            ("Order Analytics", lambda: order_analytics_admin(user)),
+            ("Export Orders (CSV/JSONL)", lambda: export_orders_admin(user)),
+            ("Rating Trends (slipping restaurants)", lambda: rating_trends_admin(user)),
+        ]),
+        ("System", [
+            ("System Metrics", lambda: view_system_metrics_admin(user)),
+            ("Calibrate Password Hashing Cost", lambda: calibrate_bcrypt_cost_admin(user)),
+        ]),
+    ]
+
     while True:
         console.print()  # Added line break
         console.print("[bold cyan]Admin Panel[/bold cyan]")
-        console.print("1. View All Users")
-        console.print("2. View All Orders")
-        console.print("3. Update Order Status")
-        console.print("--- Restaurant Management ---")
-        console.print("4. Add New Restaurant")
-        console.print("5. Edit Restaurant")
-        console.print("6. Delete Restaurant")
-        console.print("7. Manage Menu Items for a Restaurant")
-        console.print("--- Review Management ---")
-        console.print("8. Delete Review")
-        console.print("9. Back to Main Menu")
+        actions = {}
+        for section_title, entries in menu_sections:
+            if section_title:
+                console.print(f"--- {section_title} ---")
+            for label, action in entries:
+                number = str(len(actions) + 1)
+                actions[number] = action
+                console.print(f"{number}. {label}")
+        console.print("0. Back to Main Menu")
 
         admin_choice = get_validated_input(
             prompt="Enter your choice: ",
             validation_type="choice",
-            options={"choices": ['1', '2', '3', '4', '5', '6', '7', '8', '9']}
+            options={"choices": list(actions) + ['0']}
         )
 
-        if admin_choice == '1':
-            view_all_users(user)
-        elif admin_choice == '2':
-            view_all_orders(user)
-        elif admin_choice == '3':
-            update_order_status_admin()
-        elif admin_choice == '4':
-            add_restaurant_admin(user)
-        elif admin_choice == '5':
-            edit_restaurant_admin(user)
-        elif admin_choice == '6':
-            delete_restaurant_admin(user)
-        elif admin_choice == '7':
-            manage_restaurant_menu_items_admin(user)
-        elif admin_choice == '8':
-            delete_review_admin()
-        elif admin_choice == '9':
+        if admin_choice == '0':
             break
+        elif admin_choice in actions:
+            actions[admin_choice]()
         else:
             console.print("[red]Invalid choice. Please try again.[/red]")
 
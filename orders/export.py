@@ -0,0 +1,128 @@
+import csv
+import datetime
+import gzip
+import json
+import os
+from utils.logger import log
+from utils.database import get_db_connection, attach_archive_database, archive_database_exists, DATABASE_DIR
+
+# Rows pulled from SQLite per fetchmany() call; memory use is bounded by this, not by the date range
+EXPORT_FETCH_ROWS = 1000
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# One exported row per order line item; orders without items get a single row with empty item fields
+EXPORT_COLUMNS = [
+    "order_id", "order_date", "user_id", "customer_username", "restaurant_id", "restaurant_name",
+    "status", "delivery_address", "order_total",
+    "order_item_id", "item_id", "item_name", "quantity", "unit_price", "line_total",
+]
+
+def _export_query(schema):
+    # Orders are read in (order_date, order_id) order straight off the order_date index, and items
+    # are joined by index, so SQLite never has to sort or buffer the whole range.
+    return f"""
+        SELECT o.order_id, o.order_date, o.user_id, COALESCE(u.username, 'Guest') AS customer_username,
+               o.restaurant_id, o.restaurant_name, o.status, o.delivery_address, o.total_amount AS order_total,
+               oi.order_item_id, oi.item_id, oi.name AS item_name, oi.quantity, oi.price AS unit_price,
+               oi.quantity * oi.price AS line_total
+        FROM {schema}.orders o
+        LEFT JOIN main.users u ON u.user_id = o.user_id
+        LEFT JOIN {schema}.order_items oi ON oi.order_id = o.order_id
+        WHERE o.order_date >= ? AND o.order_date < ?
+        ORDER BY o.order_date, o.order_id, oi.order_item_id
+    """
+
+def _date_bounds(start_date, end_date):
+    """Turns inclusive 'YYYY-MM-DD' dates (either may be None) into [lower, upper) order_date bounds."""
+    lower = start_date or "0000-00-00"
+    if end_date:
+        upper = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+    else:
+        upper = "9999-12-31"
+    return lower, upper
+
+def iter_order_export_rows(start_date=None, end_date=None, include_archived=True, chunk_size=EXPORT_FETCH_ROWS):
+    """
+    Generator yielding one tuple per order line (columns as EXPORT_COLUMNS) for orders placed
+    between start_date and end_date inclusive. Rows are streamed from the cursor with fetchmany(),
+    so at most `chunk_size` rows are held at a time. Archived orders (the oldest) come first.
+    """
+    lower, upper = _date_bounds(start_date, end_date)
+    conn = get_db_connection()
+    try:
+        schemas = []
+        if include_archived and archive_database_exists():
+            attach_archive_database(conn)
+            schemas.append("archive")
+        schemas.append("main")
+        for schema in schemas:
+            cursor = conn.cursor()
+            cursor.execute(_export_query(schema), (lower, upper))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield tuple(row)
+            cursor.close()
+    finally:
+        conn.close()
+
+def _open_export_file(path, compress):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+def export_orders(path, start_date=None, end_date=None, fmt=None, compress=None,
+                  include_archived=True, progress_callback=None):
+    """
+    Streams orders and their line items to `path` as CSV or JSONL, optionally gzip-compressed.
+    fmt/compress default from the file name (e.g. 'orders.jsonl.gz'). Rows are written as they are
+    read, so memory use stays flat regardless of the date range. progress_callback(rows_written) is
+    called every EXPORT_FETCH_ROWS rows. Returns (orders_exported, rows_written), or None on failure.
+    """
+    name = path.lower()
+    if compress is None:
+        compress = name.endswith(".gz")
+    if fmt is None:
+        fmt = "jsonl" if name.removesuffix(".gz").endswith((".jsonl", ".json")) else "csv"
+    if fmt not in EXPORT_FORMATS:
+        log(f"Order export failed: unsupported format '{fmt}'.")
+        return None
+
+    rows_written = 0
+    orders_exported = 0
+    last_order_id = None
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _open_export_file(path, compress) as f:
+            writer = None
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(EXPORT_COLUMNS)
+            for row in iter_order_export_rows(start_date, end_date, include_archived):
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    f.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str))
+                    f.write("\n")
+                rows_written += 1
+                if row[0] != last_order_id:
+                    orders_exported += 1
+                    last_order_id = row[0]
+                if progress_callback and rows_written % EXPORT_FETCH_ROWS == 0:
+                    progress_callback(rows_written)
+        log(f"Exported {orders_exported} order(s) / {rows_written} row(s) ({start_date or 'start'} to {end_date or 'today'}) to {path}.")
+        return orders_exported, rows_written
+    except Exception as e:
+        log(f"Error exporting orders to {path}: {e}")
+        return None
+
+def default_export_path(start_date=None, end_date=None, fmt="csv", compress=False):
+    """Suggested file name under data/exports for an export of the given range."""
+    start = start_date or "all"
+    end = end_date or datetime.date.today().isoformat()
+    file_name = f"orders_{start}_to_{end}.{fmt}" + (".gz" if compress else "")
+    return os.path.join(DATABASE_DIR, "exports", file_name)
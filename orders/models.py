@@ -1,8 +1,18 @@
 import datetime
+import os
 from utils.logger import log
-from utils.database import get_db_connection
+from utils.database import get_db_connection, attach_archive_database, archive_database_exists
+from analytics.rollups import refresh_sales_rollups, SALES_WATERMARK
 import sqlite3
 
+# Finished orders older than this many days are moved to the archive database by archive_old_orders()
+ARCHIVE_AFTER_DAYS = int(os.environ.get('SWIGATO_ARCHIVE_AFTER_DAYS', '90'))
+ARCHIVABLE_ORDER_STATUSES = ("Delivered", "Cancelled")
+# Delete tombstones in the change feed are kept this long; a poller further behind should reload
+ORDER_TOMBSTONE_RETENTION_HOURS = int(os.environ.get('SWIGATO_ORDER_TOMBSTONE_RETENTION_HOURS', '24'))
+_ORDER_COLUMNS = "order_id, user_id, restaurant_id, restaurant_name, total_amount, status, order_date, delivery_address"
+_ORDER_ITEM_COLUMNS = "order_item_id, order_id, item_id, name, quantity, price"
+
 class OrderItem:
     """Represents an item within an order, capturing details at the time of order."""
     def __init__(self, item_id, name, price, quantity, order_item_id=None, order_id=None):
@@ -28,8 +38,9 @@ class OrderItem:
 
 class Order:
     def __init__(self, user_id, restaurant_id, restaurant_name, total_amount, delivery_address, 
-                 order_id=None, order_date=None, status=None, items=None):
+                 order_id=None, order_date=None, status=None, items=None, change_seq=None):
         self.order_id = order_id # Database primary key
+        self.change_seq = change_seq # Position in the orders change feed, see Order.changes_since
         self.user_id = user_id # Can be None for guest orders if DB schema allows
         self.restaurant_id = restaurant_id
         self.restaurant_name = restaurant_name # Denormalized for easy display
@@ -64,19 +75,24 @@ class Order:
             return Order(order_id=row['order_id'], user_id=row['user_id'], restaurant_id=row['restaurant_id'],
                          restaurant_name=row['restaurant_name'], total_amount=row['total_amount'],
                          delivery_address=row['delivery_address'], order_date=row['order_date'],
-                         status=row['status'])
+                         status=row['status'],
+                         change_seq=row['change_seq'] if 'change_seq' in row.keys() else None)
         return None
 
     @staticmethod
-    def get_all_orders():
-        """Retrieves all orders from the database, ordered by date descending."""
+    def get_all_orders(include_archived=False):
+        """
+        Retrieves all orders from the database, ordered by date descending.
+        With include_archived=True, orders moved to the archive database are merged in
+        (marked order.archived, with their items already loaded).
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         orders = []
         try:
             cursor.execute("""
                 SELECT o.order_id, o.user_id, o.restaurant_id, o.restaurant_name, 
-                       o.total_amount, o.status, o.order_date, o.delivery_address,
+                       o.total_amount, o.status, o.order_date, o.delivery_address, o.change_seq,
                        u.username AS customer_username  -- Fetch username from users table
                 FROM orders o
                 LEFT JOIN users u ON o.user_id = u.user_id -- Join with users table
@@ -84,20 +100,10 @@ class Order:
             """)
             rows = cursor.fetchall()
             for row_data in rows:
-                row_dict = dict(row_data)
-                order = Order(
-                    order_id=row_dict['order_id'],
-                    user_id=row_dict['user_id'],
-                    restaurant_id=row_dict['restaurant_id'],
-                    restaurant_name=row_dict['restaurant_name'],
-                    total_amount=row_dict['total_amount'],
-                    items=[], # Pass empty list as we don't fetch items here
-                    status=row_dict['status'],
-                    order_date=row_dict['order_date'],
-                    delivery_address=row_dict['delivery_address']
-                )
-                order.customer_username = row_dict['customer_username'] if row_dict['customer_username'] else 'Guest'
-                orders.append(order)
+                orders.append(Order._from_joined_row(row_data))
+            if include_archived:
+                orders.extend(get_archived_orders())
+                orders.sort(key=lambda o: o.order_date, reverse=True)
             return orders
         except Exception as e:
             log(f"Error fetching all orders: {e}")
@@ -105,6 +111,107 @@ class Order:
         finally:
             conn.close()
 
+    @staticmethod
+    def count_orders(include_archived=True):
+        """Returns the number of orders without loading them; archived orders count too unless include_archived=False."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM orders")
+            count = cursor.fetchone()[0]
+            if include_archived and archive_database_exists():
+                attach_archive_database(conn)
+                cursor.execute("SELECT COUNT(*) FROM archive.orders")
+                count += cursor.fetchone()[0]
+            return count
+        except Exception as e:
+            log(f"Error counting orders: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _from_joined_row(row_data):
+        """Builds an Order from a row that also carries customer_username (orders LEFT JOIN users)."""
+        row_dict = dict(row_data)
+        order = Order(
+            order_id=row_dict['order_id'],
+            user_id=row_dict['user_id'],
+            restaurant_id=row_dict['restaurant_id'],
+            restaurant_name=row_dict['restaurant_name'],
+            total_amount=row_dict['total_amount'],
+            items=[], # Pass empty list as we don't fetch items here
+            status=row_dict['status'],
+            order_date=row_dict['order_date'],
+            delivery_address=row_dict['delivery_address'],
+            change_seq=row_dict.get('change_seq')
+        )
+        order.customer_username = row_dict['customer_username'] if row_dict['customer_username'] else 'Guest'
+        return order
+
+    @staticmethod
+    def current_change_seq():
+        """Returns the latest sequence number handed out by the orders change feed (0 if none)."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT seq FROM change_sequences WHERE name = 'orders'")
+            row = cursor.fetchone()
+            return row['seq'] if row else 0
+        except Exception as e:
+            log(f"Error reading orders change sequence: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def changes_since(seq, limit=500):
+        """
+        Returns (orders, deleted_order_ids, latest_seq) for orders inserted, updated or deleted
+        after the given sequence number.
+
+        Only rows with change_seq > seq are read (via idx_orders_change_seq and the order_deletions
+        primary key), so a poller pays for the number of changes rather than the number of orders.
+        Orders come back in change order with customer_username and items loaded; deleted_order_ids
+        are the orders removed since (deleted, or moved to the archive). If more than `limit`
+        changes are pending, the returned latest_seq points at the last one included and the
+        caller can simply poll again.
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT o.order_id, o.user_id, o.restaurant_id, o.restaurant_name,
+                       o.total_amount, o.status, o.order_date, o.delivery_address, o.change_seq,
+                       u.username AS customer_username
+                FROM orders o
+                LEFT JOIN users u ON o.user_id = u.user_id
+                WHERE o.change_seq > ?
+                ORDER BY o.change_seq ASC
+                LIMIT ?
+            """, (seq, limit))
+            orders = [Order._from_joined_row(row) for row in cursor.fetchall()]
+            cursor.execute("SELECT change_seq, order_id FROM order_deletions WHERE change_seq > ? ORDER BY change_seq ASC LIMIT ?",
+                           (seq, limit))
+            deletions = cursor.fetchall()
+            # A stream that filled its limit may have more after its last row; stop both streams there
+            full_streams = [stream[-1] for stream in (orders, deletions) if len(stream) == limit]
+            if full_streams:
+                cutoff = min(entry.change_seq if isinstance(entry, Order) else entry['change_seq'] for entry in full_streams)
+                orders = [o for o in orders if o.change_seq <= cutoff]
+                deletions = [row for row in deletions if row['change_seq'] <= cutoff]
+            latest_seq = max([seq] + [o.change_seq for o in orders] + [row['change_seq'] for row in deletions])
+            if orders:
+                items_by_order = get_order_items_for_orders([o.order_id for o in orders])
+                for order in orders:
+                    order.items = items_by_order.get(order.order_id, [])
+            return orders, [row['order_id'] for row in deletions], latest_seq
+        except Exception as e:
+            log(f"Error fetching order changes since seq {seq}: {e}")
+            return [], [], seq
+        finally:
+            conn.close()
+
     @staticmethod
     def update_status(order_id, new_status):
         """Updates the status of an order in the database."""
@@ -199,18 +306,53 @@ def get_order_items_for_order(order_id):
     finally:
         conn.close()
 
-def get_orders_by_user_id(user_id):
+def get_order_items_for_orders(order_ids):
+    """Fetches the items of several orders in one query. Returns a dict of order_id -> [OrderItem]."""
+    items_by_order = {}
+    if not order_ids:
+        return items_by_order
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Chunk the IN list to stay under SQLite's bound-parameter limit
+        for start in range(0, len(order_ids), 500):
+            chunk = order_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(f"SELECT * FROM order_items WHERE order_id IN ({placeholders}) ORDER BY order_item_id ASC", tuple(chunk))
+            for row in cursor.fetchall():
+                items_by_order.setdefault(row['order_id'], []).append(OrderItem._from_row(row))
+        return items_by_order
+    except Exception as e:
+        log(f"Error fetching items for orders {order_ids[:5]}...: {e}")
+        return items_by_order
+    finally:
+        conn.close()
+
+def get_orders_by_user_id(user_id, include_archived=False, limit=None):
+    """
+    A user's orders, newest first. With `limit`, at most that many are returned; the limit is
+    applied in SQL to both the hot table and the archive before the two are merged.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     orders = []
     try:
-        cursor.execute("SELECT * FROM orders WHERE user_id = ? ORDER BY order_date DESC", (user_id,))
+        limit_clause = " LIMIT ?" if limit is not None else ""
+        parameters = (user_id, limit) if limit is not None else (user_id,)
+        cursor.execute(f"SELECT * FROM orders WHERE user_id = ? ORDER BY order_date DESC{limit_clause}", parameters)
         rows = cursor.fetchall()
         for row in rows:
             order = Order._from_row(row)
             if order:
-                order.items = get_order_items_for_order(order.order_id) # Load items for each order
                 orders.append(order)
+        items_by_order = get_order_items_for_orders([order.order_id for order in orders])
+        for order in orders:
+            order.items = items_by_order.get(order.order_id, [])
+        if include_archived:
+            orders.extend(get_archived_orders(user_id=user_id, limit=limit))
+            orders.sort(key=lambda o: o.order_date, reverse=True)
+            if limit is not None:
+                orders = orders[:limit]
         return orders
     except Exception as e:
         log(f"Error fetching orders for user ID {user_id}: {e}")
@@ -227,6 +369,9 @@ def get_order_by_id(order_id):
         order = Order._from_row(row)
         if order:
             order.items = get_order_items_for_order(order.order_id) # Load items
+        else:
+            archived = get_archived_orders(order_id=order_id)
+            order = archived[0] if archived else None
         return order
     except Exception as e:
         log(f"Error fetching order ID {order_id}: {e}")
@@ -234,4 +379,118 @@ def get_order_by_id(order_id):
     finally:
         conn.close()
 
+def archive_old_orders(older_than_days=None, statuses=ARCHIVABLE_ORDER_STATUSES, batch_size=500):
+    """
+    Moves finished orders (and their items) older than `older_than_days` into the archive database.
+
+    Work is done in batches of `batch_size` orders; each batch is copied and deleted in a single
+    transaction spanning both databases, so an interrupted run never loses or duplicates an order.
+    The sales rollups are refreshed first and only orders at or below their watermark are moved,
+    so no order leaves the hot tables before it has been counted.
+    Returns the number of orders archived.
+    """
+    refresh_sales_rollups()
+    if older_than_days is None:
+        older_than_days = ARCHIVE_AFTER_DAYS
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+    status_placeholders = ", ".join("?" for _ in statuses)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    archived_count = 0
+    try:
+        cursor.execute("DELETE FROM order_deletions WHERE deleted_at < datetime('now', ?)",
+                       (f"-{ORDER_TOMBSTONE_RETENTION_HOURS} hours",))
+        conn.commit()
+        cursor.execute("SELECT last_order_id FROM rollup_watermarks WHERE name = ?", (SALES_WATERMARK,))
+        row = cursor.fetchone()
+        rolled_up_to = row['last_order_id'] if row else 0
+        attach_archive_database(conn)
+        while True:
+            cursor.execute(f"""
+                SELECT order_id FROM orders
+                WHERE status IN ({status_placeholders}) AND order_date < ? AND order_id <= ?
+                ORDER BY order_id ASC
+                LIMIT ?
+            """, (*statuses, cutoff, rolled_up_to, batch_size))
+            order_ids = [row['order_id'] for row in cursor.fetchall()]
+            if not order_ids:
+                break
+            id_placeholders = ", ".join("?" for _ in order_ids)
+            archived_at = datetime.datetime.now()
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO archive.orders ({_ORDER_COLUMNS}, archive_month, archived_at)
+                SELECT {_ORDER_COLUMNS}, SUBSTR(order_date, 1, 7), ? FROM orders WHERE order_id IN ({id_placeholders})
+            """, (archived_at, *order_ids))
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO archive.order_items ({_ORDER_ITEM_COLUMNS})
+                SELECT {_ORDER_ITEM_COLUMNS} FROM order_items WHERE order_id IN ({id_placeholders})
+            """, tuple(order_ids))
+            cursor.execute(f"DELETE FROM order_items WHERE order_id IN ({id_placeholders})", tuple(order_ids))
+            cursor.execute(f"DELETE FROM orders WHERE order_id IN ({id_placeholders})", tuple(order_ids))
+            conn.commit()
+            archived_count += len(order_ids)
+            log(f"Archived batch of {len(order_ids)} orders (total so far: {archived_count}).")
+        log(f"Order archival complete: {archived_count} order(s) older than {older_than_days} days archived.")
+        return archived_count
+    except Exception as e:
+        log(f"Error archiving orders: {e}")
+        conn.rollback()
+        return archived_count
+    finally:
+        conn.close()
+
+def get_archived_orders(user_id=None, order_id=None, load_items=True, limit=None):
+    """
+    Reads orders back from the archive database, newest first. Filters by user_id or order_id
+    when given, and returns at most `limit` orders if set. Returned orders have archived=True and customer_username set. Returns [] when
+    nothing has been archived yet.
+    """
+    if not archive_database_exists():
+        return []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        attach_archive_database(conn)
+        conditions = []
+        parameters = []
+        if user_id is not None:
+            conditions.append("o.user_id = ?")
+            parameters.append(user_id)
+        if order_id is not None:
+            conditions.append("o.order_id = ?")
+            parameters.append(order_id)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor.execute(f"""
+            SELECT o.order_id, o.user_id, o.restaurant_id, o.restaurant_name,
+                   o.total_amount, o.status, o.order_date, o.delivery_address,
+                   u.username AS customer_username
+            FROM archive.orders o
+            LEFT JOIN main.users u ON o.user_id = u.user_id
+            {where_clause}
+            ORDER BY o.order_date DESC
+            {"LIMIT ?" if limit is not None else ""}
+        """, tuple(parameters) + ((limit,) if limit is not None else ()))
+        orders = []
+        for row in cursor.fetchall():
+            order = Order._from_joined_row(row)
+            order.archived = True
+            orders.append(order)
+        if load_items and orders:
+            order_ids = [o.order_id for o in orders]
+            items_by_order = {}
+            for start in range(0, len(order_ids), 500):
+                chunk = order_ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"SELECT {_ORDER_ITEM_COLUMNS} FROM archive.order_items WHERE order_id IN ({placeholders}) ORDER BY order_item_id ASC", tuple(chunk))
+                for item_row in cursor.fetchall():
+                    items_by_order.setdefault(item_row['order_id'], []).append(OrderItem._from_row(item_row))
+            for order in orders:
+                order.items = items_by_order.get(order.order_id, [])
+        return orders
+    except Exception as e:
+        log(f"Error fetching archived orders (user_id={user_id}, order_id={order_id}): {e}")
+        return []
+    finally:
+        conn.close()
+
 # No sample data population for orders as they are transactional and user-specific.
@@ -0,0 +1,160 @@
+import os
+import bisect
+import threading
+from utils.database import get_db_connection
+from utils.logger import log
+from utils import metrics
+
+# Bayesian average: a restaurant's score is its mean rating pulled towards the global mean as if
+# it had LEADERBOARD_PRIOR_WEIGHT extra reviews at that mean, so two 5-star reviews don't
+# outrank two hundred 4.8-star ones.
+LEADERBOARD_PRIOR_WEIGHT = float(os.environ.get('SWIGATO_LEADERBOARD_PRIOR_WEIGHT', '5'))
+# Global mean used before there are any reviews at all
+LEADERBOARD_DEFAULT_PRIOR = 3.0
+# Scores use a snapshot of the global mean; the index is re-sorted once the live mean drifts this far from it
+LEADERBOARD_PRIOR_DRIFT = float(os.environ.get('SWIGATO_LEADERBOARD_PRIOR_DRIFT', '0.05'))
+
+class RatingLeaderboard:
+    """
+    Restaurants ranked by Bayesian-weighted rating, overall and per cuisine_type.
+
+    Each ranking is a list kept sorted by (-score, -review_count, restaurant_id), so top(k) is a
+    slice of the first k entries. A new or deleted review re-scores one restaurant and moves its
+    key with bisect, without touching the database. The counts are loaded once from
+    restaurant_rating_stats (kept exact by triggers); invalidate() drops everything so changes
+    made outside add_review / Review.delete_review (bulk deletes, restaurant edits) are picked up
+    on the next read.
+    """
+    def __init__(self, prior_weight=LEADERBOARD_PRIOR_WEIGHT, prior_drift=LEADERBOARD_PRIOR_DRIFT):
+        self.prior_weight = prior_weight
+        self.prior_drift = prior_drift
+        self.prior_mean = LEADERBOARD_DEFAULT_PRIOR
+        self._stats = {}       # restaurant_id -> [review_count, rating_sum, cuisine_type]
+        self._keys = {}        # restaurant_id -> its current sort key
+        self._overall = []
+        self._by_cuisine = {}  # cuisine_type -> sorted keys
+        self._total_count = 0
+        self._total_sum = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _score(self, review_count, rating_sum):
+        return (self.prior_weight * self.prior_mean + rating_sum) / (self.prior_weight + review_count)
+
+    def _key(self, restaurant_id):
+        review_count, rating_sum, _ = self._stats[restaurant_id]
+        return (-self._score(review_count, rating_sum), -review_count, restaurant_id)
+
+    def _load(self):
+        conn = get_db_connection()
+        try:
+            rows = conn.execute("""
+                SELECT r.restaurant_id, r.cuisine_type, COALESCE(s.review_count, 0) AS review_count,
+                       COALESCE(s.rating_sum, 0) AS rating_sum
+                FROM restaurants r
+                LEFT JOIN restaurant_rating_stats s ON s.restaurant_id = r.restaurant_id
+            """).fetchall()
+        except Exception as e:
+            log(f"Error loading restaurant rating stats for the leaderboard: {e}")
+            rows = []
+        finally:
+            conn.close()
+        self._stats = {row['restaurant_id']: [row['review_count'], row['rating_sum'], row['cuisine_type']] for row in rows}
+        self._total_count = sum(stat[0] for stat in self._stats.values())
+        self._total_sum = sum(stat[1] for stat in self._stats.values())
+        self._rebuild()
+        self._loaded = True
+        log(f"Leaderboard loaded for {len(self._stats)} restaurants (prior mean {self.prior_mean:.2f}).")
+
+    def _rebuild(self):
+        """Re-snapshots the global mean and re-sorts every ranking. O(n log n) in restaurants."""
+        self.prior_mean = self._total_sum / self._total_count if self._total_count else LEADERBOARD_DEFAULT_PRIOR
+        self._keys = {restaurant_id: self._key(restaurant_id) for restaurant_id in self._stats}
+        self._overall = sorted(self._keys.values())
+        self._by_cuisine = {}
+        for key in self._overall:
+            self._by_cuisine.setdefault(self._stats[key[2]][2], []).append(key)
+        metrics.increment("leaderboard.rebuilds")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._load()
+
+    def _move(self, restaurant_id):
+        """Re-keys one restaurant in the overall and cuisine rankings."""
+        old_key = self._keys.get(restaurant_id)
+        new_key = self._key(restaurant_id)
+        cuisine_ranking = self._by_cuisine.setdefault(self._stats[restaurant_id][2], [])
+        for ranking in (self._overall, cuisine_ranking):
+            if old_key is not None:
+                index = bisect.bisect_left(ranking, old_key)
+                if index < len(ranking) and ranking[index] == old_key:
+                    del ranking[index]
+            bisect.insort(ranking, new_key)
+        self._keys[restaurant_id] = new_key
+
+    def apply_review(self, restaurant_id, rating, delta=1):
+        """Records a review being added (delta=1) or removed (delta=-1)."""
+        with self._lock:
+            if not self._loaded:
+                return  # The first read loads the counts, which already include this review
+            stat = self._stats.get(restaurant_id)
+            if stat is None:
+                # Restaurant created since the load; its cuisine isn't known here
+                self.invalidate()
+                return
+            stat[0] += delta
+            stat[1] += delta * rating
+            self._total_count += delta
+            self._total_sum += delta * rating
+            live_mean = self._total_sum / self._total_count if self._total_count else LEADERBOARD_DEFAULT_PRIOR
+            if abs(live_mean - self.prior_mean) > self.prior_drift:
+                self._rebuild()
+            else:
+                self._move(restaurant_id)
+
+    def invalidate(self):
+        """Forgets the loaded rankings; the next read reloads them from restaurant_rating_stats."""
+        with self._lock:
+            self._loaded = False
+            self._stats, self._keys, self._overall, self._by_cuisine = {}, {}, [], {}
+
+    def _entry(self, key):
+        review_count, rating_sum, cuisine_type = self._stats[key[2]]
+        return {"restaurant_id": key[2], "score": -key[0], "review_count": review_count,
+                "average_rating": rating_sum / review_count if review_count else 0.0,
+                "cuisine_type": cuisine_type}
+
+    def entry(self, restaurant_id):
+        """One restaurant's leaderboard dict (as in top()), or None if it isn't known."""
+        with self._lock:
+            self._ensure_loaded()
+            key = self._keys.get(restaurant_id)
+            return self._entry(key) if key is not None else None
+
+    def top(self, k=10, cuisine_type=None):
+        """
+        Returns the k best restaurants (all of them if k is None), overall or within one
+        cuisine_type, as dicts: restaurant_id, score, review_count, average_rating, cuisine_type.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            ranking = self._overall if cuisine_type is None else self._by_cuisine.get(cuisine_type, [])
+            return [self._entry(key) for key in (ranking if k is None else ranking[:k])]
+
+    def ranked_ids(self, cuisine_type=None):
+        """Restaurant ids in leaderboard order, for sorting an already-loaded list of restaurants."""
+        with self._lock:
+            self._ensure_loaded()
+            ranking = self._overall if cuisine_type is None else self._by_cuisine.get(cuisine_type, [])
+            return [key[2] for key in ranking]
+
+    def cuisines(self):
+        with self._lock:
+            self._ensure_loaded()
+            return sorted(cuisine for cuisine, ranking in self._by_cuisine.items() if ranking and cuisine)
+
+_leaderboard = RatingLeaderboard()
+
+def get_leaderboard():
+    return _leaderboard
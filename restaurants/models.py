@@ -1,5 +1,6 @@
 from utils.database import get_db_connection
 from utils.logger import log
+from restaurants.leaderboard import get_leaderboard
 from rich.table import Table
 from rich.text import Text
 import sqlite3
@@ -185,7 +186,7 @@ class Restaurant:
         conn = get_db_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("SELECT AVG(rating) FROM reviews WHERE restaurant_id = ?", (self.restaurant_id,))
+            cursor.execute("SELECT AVG(rating) FROM reviews WHERE restaurant_id = ? AND is_hidden = 0", (self.restaurant_id,))
             result = cursor.fetchone()
             return result[0] if result and result[0] is not None else 0.0
         except Exception as e:
@@ -198,7 +199,7 @@ class Restaurant:
         conn = get_db_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("SELECT COUNT(*) FROM reviews WHERE restaurant_id = ?", (self.restaurant_id,))
+            cursor.execute("SELECT COUNT(*) FROM reviews WHERE restaurant_id = ? AND is_hidden = 0", (self.restaurant_id,))
             result = cursor.fetchone()
             return result[0] if result else 0
         except Exception as e:
@@ -296,6 +297,8 @@ class Restaurant:
             sql = f"UPDATE restaurants SET {', '.join(fields_to_update)} WHERE restaurant_id = ?"
             cursor.execute(sql, tuple(parameters))
             conn.commit()
+            if cuisine_type:
+                get_leaderboard().invalidate() # Restaurant moves to another cuisine ranking
             log(f"Restaurant ID {self.restaurant_id} updated successfully. Changed fields: {fields_to_update}")
             if name: self.name = name
             if cuisine_type: self.cuisine_type = cuisine_type
@@ -328,6 +331,7 @@ class Restaurant:
             
             cursor.execute("DELETE FROM restaurants WHERE restaurant_id = ?", (self.restaurant_id,))
             conn.commit()
+            get_leaderboard().invalidate()
             log(f"Restaurant ID {self.restaurant_id} and its associated data deleted successfully.")
             return True
         except Exception as e:
@@ -348,6 +352,7 @@ class Restaurant:
             """, (name, cuisine_type, address, description, image_filename))
             conn.commit()
             restaurant_id = cursor.lastrowid
+            get_leaderboard().invalidate()
             log(f"Restaurant '{name}' created with ID {restaurant_id}, description: {description}, image: {image_filename}.")
             return Restaurant.get_by_id(restaurant_id)
         except sqlite3.Error as e:
@@ -385,6 +390,20 @@ class Restaurant:
         finally:
             conn.close()
 
+    @staticmethod
+    def count_restaurants():
+        """Returns the total number of restaurants without loading them."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM restaurants")
+            return cursor.fetchone()[0]
+        except Exception as e:
+            log(f"Error counting restaurants: {e}")
+            return 0
+        finally:
+            conn.close()
+
     @staticmethod
     def get_all():
         conn = get_db_connection()
@@ -409,6 +428,47 @@ class Restaurant:
         finally:
             conn.close()
 
+    @staticmethod
+    def get_ids(cuisine_type=None):
+        """Restaurant ids in restaurant_id order, optionally for one cuisine_type; cheap enough to hold for thousands of restaurants."""
+        conn = get_db_connection()
+        try:
+            if cuisine_type is None:
+                rows = conn.execute("SELECT restaurant_id FROM restaurants ORDER BY restaurant_id ASC").fetchall()
+            else:
+                rows = conn.execute("SELECT restaurant_id FROM restaurants WHERE cuisine_type = ? ORDER BY restaurant_id ASC",
+                                    (cuisine_type,)).fetchall()
+            return [row[0] for row in rows]
+        except Exception as e:
+            log(f"Error fetching restaurant ids (cuisine {cuisine_type}): {e}")
+            return []
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_by_ids(restaurant_ids):
+        """
+        Fetches restaurants by id, returned in the order of restaurant_ids. A missing id (say, a
+        restaurant deleted since the ids were read) gives None in its position, so the result
+        always lines up with restaurant_ids.
+        """
+        restaurant_ids = list(restaurant_ids)
+        conn = get_db_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            by_id = {}
+            for start in range(0, len(restaurant_ids), 500):
+                chunk = restaurant_ids[start:start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                for row in conn.execute(f"SELECT * FROM restaurants WHERE restaurant_id IN ({placeholders})", chunk):
+                    by_id[row['restaurant_id']] = Restaurant(**dict(row))
+            return [by_id.get(restaurant_id) for restaurant_id in restaurant_ids]
+        except Exception as e:
+            log(f"Error fetching restaurants by ids: {e}")
+            return []
+        finally:
+            conn.close()
+
 def populate_sample_restaurant_data():
     log("Attempting to populate sample restaurant data...")
     
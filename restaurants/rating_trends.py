@@ -0,0 +1,123 @@
+import os
+import datetime
+from utils.database import get_db_connection
+from utils.logger import log
+
+# Weeks shown by default in rating trend charts
+RATING_TREND_WEEKS = int(os.environ.get('SWIGATO_RATING_TREND_WEEKS', '12'))
+# find_slipping_restaurants compares the last SLIPPING_RECENT_WEEKS against the
+# SLIPPING_BASELINE_WEEKS before them
+SLIPPING_RECENT_WEEKS = 4
+SLIPPING_BASELINE_WEEKS = 12
+
+_SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def week_start(day=None):
+    """The Monday on or before `day` (a date or datetime; today by default), matching restaurant_rating_weekly.week_start."""
+    day = day or datetime.date.today()
+    if isinstance(day, datetime.datetime):
+        day = day.date()
+    return day - datetime.timedelta(days=day.weekday())
+
+def _week_range(weeks, end_date):
+    last_week = week_start(end_date)
+    first_week = last_week - datetime.timedelta(weeks=weeks - 1)
+    return first_week, last_week
+
+def get_rating_trend(restaurant_id, weeks=RATING_TREND_WEEKS, end_date=None):
+    """
+    A restaurant's weekly rating series, oldest week first, for the `weeks` weeks ending with
+    the week of end_date (today by default). Weeks without reviews are included with
+    review_count 0 and average_rating None, so the list always has `weeks` entries: dicts with
+    week_start ('YYYY-MM-DD'), review_count, average_rating. One primary-key range read of
+    restaurant_rating_weekly; returns [] on error.
+    """
+    first_week, last_week = _week_range(weeks, end_date)
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("""
+            SELECT week_start, review_count, rating_sum FROM restaurant_rating_weekly
+            WHERE restaurant_id = ? AND week_start BETWEEN ? AND ?
+        """, (restaurant_id, first_week.isoformat(), last_week.isoformat())).fetchall()
+    except Exception as e:
+        log(f"Error fetching rating trend for restaurant {restaurant_id}: {e}")
+        return []
+    finally:
+        conn.close()
+    by_week = {row['week_start']: row for row in rows}
+    trend = []
+    for i in range(weeks):
+        week = (first_week + datetime.timedelta(weeks=i)).isoformat()
+        row = by_week.get(week)
+        count = row['review_count'] if row else 0
+        trend.append({"week_start": week, "review_count": count,
+                      "average_rating": row['rating_sum'] / count if count else None})
+    return trend
+
+def summarize_trend(trend, recent_weeks=SLIPPING_RECENT_WEEKS):
+    """
+    Totals for a get_rating_trend series: reviews, average_rating over the whole series,
+    recent_average over its last recent_weeks and change (recent minus the earlier weeks;
+    None when either side has no reviews).
+    """
+    def average(entries):
+        count = sum(entry["review_count"] for entry in entries)
+        total = sum(entry["average_rating"] * entry["review_count"] for entry in entries if entry["review_count"])
+        return (total / count if count else None), count
+    overall, reviews = average(trend)
+    recent, _ = average(trend[-recent_weeks:])
+    earlier, _ = average(trend[:-recent_weeks])
+    return {"reviews": reviews, "average_rating": overall, "recent_average": recent,
+            "change": recent - earlier if recent is not None and earlier is not None else None}
+
+def sparkline(values):
+    """Unicode block sparkline for a list of numbers (None for gaps, drawn as a space)."""
+    present = [value for value in values if value is not None]
+    if not present:
+        return ""
+    low, high = min(present), max(present)
+    span = (high - low) or 1
+    return "".join(" " if value is None else _SPARK_CHARS[int((value - low) / span * (len(_SPARK_CHARS) - 1))]
+                   for value in values)
+
+def find_slipping_restaurants(recent_weeks=SLIPPING_RECENT_WEEKS, baseline_weeks=SLIPPING_BASELINE_WEEKS,
+                              min_reviews=5, min_drop=0.3, end_date=None):
+    """
+    Restaurants whose average rating over the last recent_weeks is at least min_drop below
+    their average over the baseline_weeks before that, biggest drop first. Both windows need
+    min_reviews reviews. Returns dicts: restaurant_id, restaurant_name, baseline_average,
+    baseline_reviews, recent_average, recent_reviews, drop.
+    """
+    first_recent, last_week = _week_range(recent_weeks, end_date)
+    first_baseline = first_recent - datetime.timedelta(weeks=baseline_weeks)
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("""
+            SELECT w.restaurant_id, r.name AS restaurant_name,
+                   SUM(CASE WHEN w.week_start < :recent THEN w.review_count ELSE 0 END) AS baseline_reviews,
+                   SUM(CASE WHEN w.week_start < :recent THEN w.rating_sum ELSE 0 END) AS baseline_sum,
+                   SUM(CASE WHEN w.week_start >= :recent THEN w.review_count ELSE 0 END) AS recent_reviews,
+                   SUM(CASE WHEN w.week_start >= :recent THEN w.rating_sum ELSE 0 END) AS recent_sum
+            FROM restaurant_rating_weekly w
+            LEFT JOIN restaurants r ON r.restaurant_id = w.restaurant_id
+            WHERE w.week_start BETWEEN :first AND :last
+            GROUP BY w.restaurant_id
+            HAVING baseline_reviews >= :min_reviews AND recent_reviews >= :min_reviews
+        """, {"recent": first_recent.isoformat(), "first": first_baseline.isoformat(),
+              "last": last_week.isoformat(), "min_reviews": min_reviews}).fetchall()
+    except Exception as e:
+        log(f"Error finding restaurants with slipping ratings: {e}")
+        return []
+    finally:
+        conn.close()
+    slipping = []
+    for row in rows:
+        baseline = row['baseline_sum'] / row['baseline_reviews']
+        recent = row['recent_sum'] / row['recent_reviews']
+        if baseline - recent >= min_drop:
+            slipping.append({"restaurant_id": row['restaurant_id'], "restaurant_name": row['restaurant_name'],
+                             "baseline_average": baseline, "baseline_reviews": row['baseline_reviews'],
+                             "recent_average": recent, "recent_reviews": row['recent_reviews'],
+                             "drop": baseline - recent})
+    slipping.sort(key=lambda entry: entry["drop"], reverse=True)
+    return slipping
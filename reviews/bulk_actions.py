@@ -0,0 +1,160 @@
+import os
+import datetime
+from utils.database import get_db_connection
+from utils.logger import log
+from utils import metrics
+from restaurants.leaderboard import get_leaderboard
+
+# Reviews changed per transaction; also keeps each IN (...) list well under SQLite's variable limit
+BULK_REVIEW_CHUNK_SIZE = int(os.environ.get('SWIGATO_BULK_REVIEW_CHUNK_SIZE', '500'))
+
+# "delete" removes the reviews; "hide" keeps them for the record but takes them out of the
+# restaurant feeds, ratings and aggregates; "unhide" puts hidden reviews back.
+BULK_REVIEW_MODES = ("delete", "hide", "unhide")
+
+# Keys accepted in a filters dict; any of them may be missing or None
+REVIEW_FILTER_KEYS = ("user_id", "username", "restaurant_id", "start_date", "end_date",
+                      "min_rating", "max_rating", "text", "hidden")
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _set_filters(filters):
+    return {key: value for key, value in (filters or {}).items() if value not in (None, "")}
+
+def has_review_filters(filters):
+    """True if at least one filter is set, i.e. the filters don't select every review."""
+    return bool(_set_filters(filters))
+
+def build_review_filter(filters, all_reviews=False):
+    """
+    Turns a filters dict into (where_sql, params) over reviews.
+
+    user_id, username and restaurant_id match exactly; start_date / end_date are inclusive
+    'YYYY-MM-DD' days; min_rating / max_rating bound the star rating; text matches anywhere in
+    the comment, case-insensitively; hidden=True / False limits to hidden / visible reviews.
+    Raises ValueError for unknown keys or malformed dates, and for empty filters (which would
+    match the whole table) unless all_reviews is True.
+    """
+    filters = _set_filters(filters)
+    if not filters and not all_reviews:
+        raise ValueError("No review filters given; pass all_reviews=True to select every review.")
+    unknown = set(filters) - set(REVIEW_FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown review filter(s): {', '.join(sorted(unknown))}")
+    conditions, params = [], []
+    for key, column in (("user_id", "user_id"), ("username", "username"), ("restaurant_id", "restaurant_id")):
+        if key in filters:
+            conditions.append(f"{column} = ?")
+            params.append(filters[key])
+    if "start_date" in filters:
+        conditions.append("review_date >= ?")
+        params.append(datetime.date.fromisoformat(filters["start_date"]).isoformat())
+    if "end_date" in filters:
+        conditions.append("review_date < ?")
+        params.append((datetime.date.fromisoformat(filters["end_date"]) + datetime.timedelta(days=1)).isoformat())
+    if "min_rating" in filters:
+        conditions.append("rating >= ?")
+        params.append(int(filters["min_rating"]))
+    if "max_rating" in filters:
+        conditions.append("rating <= ?")
+        params.append(int(filters["max_rating"]))
+    if "text" in filters:
+        conditions.append("comment LIKE ? ESCAPE '\\'")
+        params.append(f"%{_escape_like(filters['text'])}%")
+    if "hidden" in filters:
+        conditions.append("is_hidden = ?")
+        params.append(1 if filters["hidden"] else 0)
+    return (" AND ".join(conditions) if conditions else "1 = 1"), params
+
+def count_matching_reviews(filters, all_reviews=False):
+    """
+    Dry run for bulk_moderate_reviews: how many reviews match, how many of those are already
+    hidden and how many restaurants they belong to. Returns None on error (including empty
+    filters without all_reviews).
+    """
+    conn = get_db_connection()
+    try:
+        where_sql, params = build_review_filter(filters, all_reviews)
+        row = conn.execute(f"""
+            SELECT COUNT(*) AS matching, COALESCE(SUM(is_hidden), 0) AS hidden,
+                   COUNT(DISTINCT restaurant_id) AS restaurants
+            FROM reviews WHERE {where_sql}
+        """, params).fetchone()
+        return dict(row)
+    except Exception as e:
+        log(f"Error counting reviews for bulk moderation ({filters}): {e}")
+        return None
+    finally:
+        conn.close()
+
+def _matching_review_ids(filters, all_reviews):
+    conn = get_db_connection()
+    try:
+        where_sql, params = build_review_filter(filters, all_reviews)
+        return [row[0] for row in conn.execute(f"SELECT review_id FROM reviews WHERE {where_sql} ORDER BY review_id", params)]
+    finally:
+        conn.close()
+
+def _apply_chunk(cursor, chunk, mode):
+    """Applies `mode` to one chunk of review ids inside the caller's transaction. Returns the rows changed."""
+    placeholders = ",".join("?" for _ in chunk)
+    if mode == "delete":
+        cursor.execute(f"DELETE FROM reviews WHERE review_id IN ({placeholders})", chunk)
+    elif mode == "hide":
+        cursor.execute(f"UPDATE reviews SET is_hidden = 1 WHERE review_id IN ({placeholders}) AND is_hidden = 0", chunk)
+    else:
+        cursor.execute(f"UPDATE reviews SET is_hidden = 0 WHERE review_id IN ({placeholders}) AND is_hidden = 1", chunk)
+    return cursor.rowcount
+
+def bulk_moderate_reviews(filters, mode="hide", dry_run=False, all_reviews=False, chunk_size=BULK_REVIEW_CHUNK_SIZE,
+                          progress_callback=None):
+    """
+    Deletes, hides or unhides every review matching `filters` (see build_review_filter).
+
+    The matching ids are read once, then changed in chunks of `chunk_size`, each in its own
+    transaction with a single DELETE / UPDATE ... WHERE review_id IN (...). The triggers on
+    reviews keep restaurant_rating_stats and restaurant_sentiment_stats exact chunk by chunk,
+    and the leaderboard is reloaded from them afterwards. With dry_run nothing is changed and
+    the report only carries the match count. progress_callback(report) runs after every chunk.
+    Empty filters are refused unless all_reviews is True, so acting on the whole table is
+    always an explicit choice.
+
+    Returns a report dict: mode, dry_run, matching, processed, changed, failed
+    [(first_id, last_id, error)]; None if the filters are invalid or the ids can't be read.
+    """
+    if mode not in BULK_REVIEW_MODES:
+        raise ValueError(f"Unknown bulk review mode '{mode}'. Expected one of {BULK_REVIEW_MODES}.")
+    try:
+        ids = _matching_review_ids(filters, all_reviews)
+    except Exception as e:
+        log(f"Error selecting reviews for bulk {mode} ({filters}): {e}")
+        return None
+    report = {"mode": mode, "dry_run": dry_run, "matching": len(ids), "processed": 0, "changed": 0, "failed": []}
+    if dry_run:
+        return report
+
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            report["changed"] += _apply_chunk(cursor, chunk, mode)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            log(f"Error in bulk {mode} of review IDs {chunk[0]}-{chunk[-1]}: {e}")
+            report["failed"].append((chunk[0], chunk[-1], str(e)))
+        finally:
+            conn.close()
+        report["processed"] += len(chunk)
+        if progress_callback:
+            progress_callback(report)
+
+    if report["changed"]:
+        get_leaderboard().invalidate()
+    metrics.increment(f"reviews.bulk_{mode}", report["changed"])
+    log(f"Bulk review {mode}: {report['changed']} of {report['matching']} matching review(s) changed "
+        f"({filters}), {len(report['failed'])} chunk(s) failed.")
+    return report
@@ -1,10 +1,15 @@
 import datetime
 from utils.logger import log
 from utils.database import get_db_connection
+from restaurants.leaderboard import get_leaderboard
+from reviews.sentiment import score_comment, SENTIMENT_NEGATIVE_THRESHOLD
 import sqlite3
 
+# Reviews fetched per page by get_reviews_page (the review feeds load more as the user scrolls)
+REVIEW_PAGE_SIZE = 20
+
 class Review:
-    def __init__(self, user_id, username, restaurant_id, rating, comment="", review_id=None, review_date=None, restaurant_name=None): # Added restaurant_name
+    def __init__(self, user_id, username, restaurant_id, rating, comment="", review_id=None, review_date=None, restaurant_name=None, sentiment=None, is_hidden=False): # Added restaurant_name
         self.review_id = review_id
         self.user_id = user_id
         self.username = username # Store username for easier display
@@ -14,6 +19,8 @@ class Review:
             raise ValueError("Rating must be between 1 and 5.")
         self.rating = rating
         self.comment = comment
+        self.sentiment = sentiment # Lexicon score in [-1, 1]; None until scored
+        self.is_hidden = bool(is_hidden) # Hidden by a moderator: kept, but out of feeds and ratings
         
         if isinstance(review_date, str):
             try:
@@ -31,6 +38,20 @@ class Review:
     def __repr__(self):
         return f"<Review ID: {self.review_id} - Restaurant: {self.restaurant_name} - User: {self.username} - Rating: {self.rating}>"
 
+    @staticmethod
+    def count_reviews():
+        """Returns the total number of reviews without loading them."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM reviews")
+            return cursor.fetchone()[0]
+        except Exception as e:
+            log(f"Error counting reviews: {e}")
+            return 0
+        finally:
+            conn.close()
+
     @staticmethod
     def get_all_reviews():
         """Fetches all reviews from the database including restaurant name, ordered by review_id ASC."""
@@ -40,7 +61,7 @@ class Review:
         try:
             cursor.execute("""
                 SELECT r.review_id, r.user_id, r.username, r.restaurant_id, res.name AS restaurant_name,
-                       r.rating, r.comment, r.review_date 
+                       r.rating, r.comment, r.review_date, r.sentiment, r.is_hidden
                 FROM reviews r
                 JOIN restaurants res ON r.restaurant_id = res.restaurant_id
                 ORDER BY r.review_id ASC
@@ -55,6 +76,59 @@ class Review:
         finally:
             conn.close()
 
+    @staticmethod
+    def get_reviews_by_sentiment(most_negative_first=True, min_rating=None,
+                                 max_sentiment=None, after=None, limit=REVIEW_PAGE_SIZE):
+        """
+        One page of scored reviews ordered by sentiment via idx_reviews_sentiment, as
+        (reviews, next_cursor). min_rating / max_sentiment narrow it down, e.g. min_rating=5,
+        max_sentiment=SENTIMENT_NEGATIVE_THRESHOLD finds 5-star reviews whose text reads
+        negative. Unscored reviews are left out.
+
+        The order is (sentiment, review_id), so the cursor is that pair for the page's last
+        review: pass next_cursor back as `after` for the following page. It is None once there
+        are no more.
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            query = """
+                SELECT r.review_id, r.user_id, r.username, r.restaurant_id, res.name AS restaurant_name,
+                       r.rating, r.comment, r.review_date, r.sentiment, r.is_hidden
+                FROM reviews r
+                JOIN restaurants res ON r.restaurant_id = res.restaurant_id
+                WHERE r.sentiment IS NOT NULL
+            """
+            params = []
+            if min_rating is not None:
+                query += " AND r.rating >= ?"
+                params.append(min_rating)
+            if max_sentiment is not None:
+                query += " AND r.sentiment <= ?"
+                params.append(max_sentiment)
+            if after is not None:
+                after_sentiment, after_id = after
+                query += f" AND (r.sentiment {'>' if most_negative_first else '<'} ? OR (r.sentiment = ? AND r.review_id > ?))"
+                params.extend([after_sentiment, after_sentiment, after_id])
+            # One extra row tells us whether another page exists
+            query += f" ORDER BY r.sentiment {'ASC' if most_negative_first else 'DESC'}, r.review_id LIMIT ?"
+            params.append(limit + 1)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            reviews = [Review._from_row(row) for row in rows[:limit]]
+            next_cursor = (reviews[-1].sentiment, reviews[-1].review_id) if len(rows) > limit else None
+            return reviews, next_cursor
+        except Exception as e:
+            log(f"Error fetching reviews by sentiment (after {after}): {e}")
+            return [], None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_rating_mismatches(min_rating=5, max_sentiment=SENTIMENT_NEGATIVE_THRESHOLD, after=None, limit=REVIEW_PAGE_SIZE):
+        """One page of high-rated reviews with negative text, most negative first, as (reviews, next_cursor)."""
+        return Review.get_reviews_by_sentiment(True, min_rating, max_sentiment, after, limit)
+
     @staticmethod
     def _from_row(row):
         """Helper to create a Review object from a database row."""
@@ -68,9 +142,14 @@ class Review:
         conn = get_db_connection()
         try:
             cursor = conn.cursor()
+            # Read what the leaderboard needs before the row is gone
+            cursor.execute("SELECT restaurant_id, rating, is_hidden FROM reviews WHERE review_id = ?", (review_id,))
+            review_row = cursor.fetchone()
             cursor.execute("DELETE FROM reviews WHERE review_id = ?", (review_id,))
             conn.commit()
             if cursor.rowcount > 0:
+                if not review_row['is_hidden']: # Hidden reviews were never in the ratings
+                    get_leaderboard().apply_review(review_row['restaurant_id'], review_row['rating'], -1)
                 log(f"Review {review_id} deleted successfully.")
                 return True
             else:
@@ -92,12 +171,14 @@ def add_review(user_id, username, restaurant_id, rating, comment=""):
             raise ValueError("Rating must be an integer between 1 and 5.")
 
         current_time = datetime.datetime.now()
+        sentiment = score_comment(comment)
         cursor.execute("""
-            INSERT INTO reviews (user_id, username, restaurant_id, rating, comment, review_date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (user_id, username, restaurant_id, rating, comment, current_time))
+            INSERT INTO reviews (user_id, username, restaurant_id, rating, comment, review_date, sentiment)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (user_id, username, restaurant_id, rating, comment, current_time, sentiment))
         conn.commit()
         review_id = cursor.lastrowid
+        get_leaderboard().apply_review(restaurant_id, rating, 1)
         log(f"Review {review_id} added for restaurant {restaurant_id} by user {username}.")
         return Review(
             review_id=review_id, 
@@ -106,7 +187,8 @@ def add_review(user_id, username, restaurant_id, rating, comment=""):
             restaurant_id=restaurant_id, 
             rating=rating, 
             comment=comment, 
-            review_date=current_time
+            review_date=current_time,
+            sentiment=sentiment
         )
     except ValueError as ve: # Catch specific ValueError for rating
         log(f"Error adding review (ValueError): {ve}")
@@ -133,7 +215,7 @@ def get_reviews_for_restaurant(restaurant_id):
                    r.rating, r.comment, r.review_date 
             FROM reviews r
             JOIN restaurants res ON r.restaurant_id = res.restaurant_id
-            WHERE r.restaurant_id = ? 
+            WHERE r.restaurant_id = ? AND r.is_hidden = 0
             ORDER BY r.review_id ASC
         """, (restaurant_id,))
         rows = cursor.fetchall()
@@ -146,6 +228,43 @@ def get_reviews_for_restaurant(restaurant_id):
     finally:
         conn.close()
 
+def get_reviews_page(restaurant_id, before_id=None, limit=REVIEW_PAGE_SIZE):
+    """
+    Returns one page of a restaurant's reviews, newest first, as (reviews, next_cursor).
+
+    Pass next_cursor back as before_id for the following page; it is None once there are no
+    more. review_id is the table's rowid, so idx_reviews_restaurant_id already keeps each
+    restaurant's reviews in id order and a page is a short index range scan, however many
+    reviews the restaurant has.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+            SELECT r.review_id, r.user_id, r.username, r.restaurant_id, res.name AS restaurant_name,
+                   r.rating, r.comment, r.review_date
+            FROM reviews r
+            JOIN restaurants res ON r.restaurant_id = res.restaurant_id
+            WHERE r.restaurant_id = ? AND r.is_hidden = 0
+        """
+        params = [restaurant_id]
+        if before_id is not None:
+            query += " AND r.review_id < ?"
+            params.append(before_id)
+        # One extra row tells us whether another page exists
+        query += " ORDER BY r.review_id DESC LIMIT ?"
+        params.append(limit + 1)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        reviews = [Review._from_row(row) for row in rows[:limit]]
+        next_cursor = reviews[-1].review_id if len(rows) > limit else None
+        return reviews, next_cursor
+    except Exception as e:
+        log(f"Error fetching reviews page for restaurant {restaurant_id} (before {before_id}): {e}")
+        return [], None
+    finally:
+        conn.close()
+
 def populate_sample_reviews():
     log("Attempting to populate sample review data...")
     conn = get_db_connection()
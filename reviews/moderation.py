@@ -0,0 +1,301 @@
+import os
+import re
+import time
+import datetime
+from utils.database import get_db_connection
+from utils.logger import log
+from utils import metrics
+import numpy as np
+
+# Comments are compared as sets of character shingles (overlapping k-character substrings)
+MODERATION_SHINGLE_SIZE = int(os.environ.get('SWIGATO_MODERATION_SHINGLE_SIZE', '5'))
+# MinHash signature length, split into LSH bands. With 32 hashes in 8 bands of 4 rows, pairs
+# above ~0.6 Jaccard similarity almost always share a bucket and pairs below ~0.3 rarely do.
+MODERATION_NUM_PERM = int(os.environ.get('SWIGATO_MODERATION_NUM_PERM', '32'))
+MODERATION_BANDS = int(os.environ.get('SWIGATO_MODERATION_BANDS', '8'))
+# Estimated Jaccard similarity a review needs with its group's first review to stay in the group
+MODERATION_SIMILARITY = float(os.environ.get('SWIGATO_MODERATION_SIMILARITY', '0.6'))
+# A user posting at least this many reviews inside the window is a burst poster
+MODERATION_BURST_MIN_REVIEWS = int(os.environ.get('SWIGATO_MODERATION_BURST_MIN', '5'))
+MODERATION_BURST_WINDOW_SECONDS = int(os.environ.get('SWIGATO_MODERATION_BURST_WINDOW_SECONDS', '3600'))
+MODERATION_BURST_WEIGHT = 5.0
+# Rows per fetchmany() and shingles hashed per vectorised batch (bounds peak memory)
+MODERATION_FETCH_ROWS = 50000
+MODERATION_BATCH_SHINGLES = 200000
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r"[\W_]+")
+
+def _normalise(comment):
+    return _NON_WORD.sub(" ", (comment or "").lower()).strip()
+
+def _hash_params(num_perm):
+    # Fixed seed so signatures (and therefore groups) are stable from one scan to the next
+    rng = np.random.default_rng(20240601)
+    a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def _minhash_batch(texts, a, b, k):
+    """
+    MinHash signatures for a batch of normalised comments.
+
+    All comments are concatenated into one byte array; every k-byte window is hashed at once
+    with a polynomial hash, windows that straddle two comments are dropped, and each hash
+    function's minimum per comment is taken with minimum.reduceat. Returns (doc_indices,
+    signatures) where doc_indices are positions in `texts` that had at least one shingle and
+    signatures has one uint32 row per such comment.
+    """
+    encoded = [text.encode("utf-8") for text in texts]
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    if len(buffer) < k:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(a)), dtype=np.uint32)
+    byte_doc = np.repeat(np.arange(len(texts)), lengths)
+    windows = np.lib.stride_tricks.sliding_window_view(buffer, k).astype(np.uint64)
+    powers = np.array([256 ** (k - 1 - j) for j in range(k)], dtype=np.uint64)
+    shingles = (windows @ powers) % _MERSENNE_PRIME
+    valid = byte_doc[:len(shingles)] == byte_doc[k - 1:]
+    shingles = shingles[valid]
+    shingle_doc = byte_doc[:len(valid)][valid]
+    if len(shingles) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(a)), dtype=np.uint32)
+    starts = np.flatnonzero(np.r_[True, shingle_doc[1:] != shingle_doc[:-1]])
+    hashed = (a[:, None] * shingles[None, :] + b[:, None]) % _MERSENNE_PRIME
+    signatures = np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32)
+    return shingle_doc[starts], signatures
+
+def _band_keys(signatures, bands):
+    """One uint64 bucket key per (band, comment): the band's rows folded into a single hash."""
+    rows = signatures.shape[1] // bands
+    keys = np.empty((bands, len(signatures)), dtype=np.uint64)
+    for band in range(bands):
+        key = np.zeros(len(signatures), dtype=np.uint64)
+        for column in signatures[:, band * rows:(band + 1) * rows].T.astype(np.uint64):
+            key = key * np.uint64(1000003) ^ column  # Wraps modulo 2**64, which is fine for bucketing
+        keys[band] = key
+    return keys
+
+def _connected_groups(band_keys):
+    """
+    Labels comments that share any LSH bucket with the same group id (the smallest member index).
+    Each pass takes the minimum label within every bucket of every band, then follows label
+    pointers until they settle; a few passes are enough even for long chains.
+    """
+    count = band_keys.shape[1]
+    labels = np.arange(count)
+    orders = [np.argsort(keys, kind="stable") for keys in band_keys]
+    bucket_starts = []
+    for keys, order in zip(band_keys, orders):
+        sorted_keys = keys[order]
+        bucket_starts.append(np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]))
+    while True:
+        previous = labels.copy()
+        for order, starts in zip(orders, bucket_starts):
+            if len(starts) == count:
+                continue  # Every bucket in this band is a singleton
+            bucket_min = np.minimum.reduceat(labels[order], starts)
+            sizes = np.diff(np.r_[starts, count])
+            labels[order] = np.repeat(bucket_min, sizes)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, previous):
+            return labels
+
+def _burst_mask(user_ids, timestamps, min_reviews, window_seconds):
+    """True for every review that is part of a run of min_reviews reviews by one user within window_seconds."""
+    burst = np.zeros(len(user_ids), dtype=bool)
+    if len(user_ids) < min_reviews or min_reviews < 2:
+        return burst
+    order = np.lexsort((timestamps, user_ids))
+    users, times = user_ids[order], timestamps[order]
+    span = min_reviews - 1
+    run_starts = np.flatnonzero((users[span:] == users[:-span]) & (times[span:] - times[:-span] <= window_seconds))
+    if len(run_starts):
+        # Difference array: +1 where a burst run starts, -1 just after it ends
+        marks = np.zeros(len(order) + 1, dtype=np.int64)
+        np.add.at(marks, run_starts, 1)
+        np.add.at(marks, run_starts + min_reviews, -1)
+        burst[order] = np.cumsum(marks[:-1]) > 0
+    return burst
+
+def _parse_timestamp(value):
+    try:
+        return int(datetime.datetime.fromisoformat(str(value)[:19]).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+def scan_reviews_for_spam(shingle_size=MODERATION_SHINGLE_SIZE, num_perm=MODERATION_NUM_PERM,
+                          bands=MODERATION_BANDS, similarity=MODERATION_SIMILARITY,
+                          burst_min_reviews=MODERATION_BURST_MIN_REVIEWS,
+                          burst_window_seconds=MODERATION_BURST_WINDOW_SECONDS, progress_callback=None):
+    """
+    One pass over every visible review that rebuilds the moderation queue.
+
+    Comments are streamed with fetchmany, shingled and MinHashed in vectorised batches, and
+    bucketed with LSH so near-duplicates are found without comparing every pair. Bucket-mates
+    are merged into groups, and members whose estimated similarity to the group's first review
+    falls below `similarity` are dropped again. Reviews posted in bursts by one user are flagged
+    too. Each flagged review is scored (bigger groups, more distinct posters and bursts rank
+    higher) and review_moderation_queue is replaced in one transaction; reviews a moderator has
+    dismissed are left out. progress_callback(reviews_read) runs after each fetched chunk.
+
+    Returns a summary dict (reviews, signed, groups, flagged, burst_reviews, seconds), or None if
+    the scan fails.
+    """
+    started = time.perf_counter()
+    a, b = _hash_params(num_perm)
+    bands = max(1, min(bands, num_perm))
+
+    review_ids, user_ids, timestamps = [], [], []
+    signed_positions, signature_chunks = [], []
+    batch_texts, batch_positions, batch_shingles = [], [], 0
+
+    def flush():
+        nonlocal batch_texts, batch_positions, batch_shingles
+        if batch_texts:
+            doc_indices, signatures = _minhash_batch(batch_texts, a, b, shingle_size)
+            signed_positions.append(np.asarray(batch_positions, dtype=np.int64)[doc_indices])
+            signature_chunks.append(signatures)
+        batch_texts, batch_positions, batch_shingles = [], [], 0
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT review_id, user_id, comment, review_date FROM reviews WHERE is_hidden = 0 ORDER BY review_id")
+        while True:
+            rows = cursor.fetchmany(MODERATION_FETCH_ROWS)
+            if not rows:
+                break
+            for review_id, user_id, comment, review_date in rows:
+                position = len(review_ids)
+                review_ids.append(review_id)
+                user_ids.append(user_id if user_id is not None else -1)
+                timestamps.append(_parse_timestamp(review_date))
+                text = _normalise(comment)
+                if len(text) >= shingle_size:
+                    batch_texts.append(text)
+                    batch_positions.append(position)
+                    batch_shingles += len(text)
+                    if batch_shingles >= MODERATION_BATCH_SHINGLES:
+                        flush()
+            if progress_callback:
+                progress_callback(len(review_ids))
+        flush()
+        dismissed = {row[0] for row in cursor.execute("SELECT review_id FROM review_moderation_dismissed")}
+    except Exception as e:
+        log(f"Error reading reviews for the spam scan: {e}")
+        conn.close()
+        return None
+
+    review_ids = np.asarray(review_ids, dtype=np.int64)
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    burst = _burst_mask(user_ids, timestamps, burst_min_reviews, burst_window_seconds)
+
+    # Near-duplicate groups over the reviews that had enough text to sign
+    group_of = np.full(len(review_ids), -1, dtype=np.int64)  # group's first review position, -1 if ungrouped
+    group_size = np.zeros(len(review_ids), dtype=np.int64)
+    group_users = np.zeros(len(review_ids), dtype=np.int64)
+    signed = np.concatenate(signed_positions) if signed_positions else np.empty(0, dtype=np.int64)
+    groups_found = 0
+    if len(signed) > 1:
+        signatures = np.concatenate(signature_chunks)
+        labels = _connected_groups(_band_keys(signatures, bands))
+        agreement = (signatures == signatures[labels]).mean(axis=1)
+        labels = np.where(agreement >= similarity, labels, np.arange(len(labels)))
+        _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        in_group = counts[inverse] > 1
+        if in_group.any():
+            grouped_labels = labels[in_group]
+            # Distinct posters per group: count the unique (group, user) pairs of each group
+            pairs = np.unique(np.stack([grouped_labels, user_ids[signed][in_group]]), axis=1)
+            pair_labels, users_per_label = np.unique(pairs[0], return_counts=True)
+            grouped = signed[in_group]
+            group_of[grouped] = signed[grouped_labels]
+            group_size[grouped] = counts[inverse][in_group]
+            group_users[grouped] = users_per_label[np.searchsorted(pair_labels, grouped_labels)]
+            groups_found = int((counts > 1).sum())
+
+    flagged = np.flatnonzero((group_size > 1) | burst)
+    queue_rows = []
+    for position in flagged:
+        review_id = int(review_ids[position])
+        if review_id in dismissed:
+            continue
+        size, users, is_burst = int(group_size[position]), int(group_users[position]), bool(burst[position])
+        score = max(size - 1, 0) + max(users - 1, 0) + (MODERATION_BURST_WEIGHT if is_burst else 0.0)
+        reasons = []
+        if size > 1:
+            reasons.append(f"near-duplicate of {size - 1} other review(s) by {users} user(s)")
+        if is_burst:
+            reasons.append(f"user posted {burst_min_reviews}+ reviews within {burst_window_seconds // 60} min")
+        cluster_id = int(review_ids[group_of[position]]) if group_of[position] >= 0 else None
+        queue_rows.append((review_id, cluster_id, size, users, int(is_burst), score, "; ".join(reasons)))
+
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DELETE FROM review_moderation_queue")
+        cursor.executemany("""
+            INSERT INTO review_moderation_queue (review_id, cluster_id, cluster_size, cluster_users, is_burst, score, reason)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, queue_rows)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        log(f"Error saving the review moderation queue: {e}")
+        return None
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    metrics.record_timing("moderation.spam_scan", seconds)
+    summary = {"reviews": len(review_ids), "signed": len(signed), "groups": groups_found,
+               "flagged": len(queue_rows), "burst_reviews": int(burst.sum()), "seconds": seconds}
+    log(f"Review spam scan: {summary['reviews']} reviews, {summary['groups']} near-duplicate group(s), "
+        f"{summary['burst_reviews']} burst review(s), {summary['flagged']} queued in {seconds:.1f}s.")
+    return summary
+
+def get_moderation_queue(limit=50, offset=0):
+    """Returns queued reviews, highest score first, as dicts ready for display."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT q.review_id, q.cluster_id, q.cluster_size, q.cluster_users, q.is_burst, q.score, q.reason,
+                   r.user_id, r.username, r.rating, r.comment, r.review_date, res.name AS restaurant_name
+            FROM review_moderation_queue q
+            JOIN reviews r ON r.review_id = q.review_id
+            LEFT JOIN restaurants res ON res.restaurant_id = r.restaurant_id
+            ORDER BY q.score DESC, q.cluster_id, q.review_id
+            LIMIT ? OFFSET ?
+        """, (limit, offset))
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log(f"Error fetching the review moderation queue: {e}")
+        return []
+    finally:
+        conn.close()
+
+def dismiss_from_queue(review_ids):
+    """Marks reviews as checked by a moderator: removes them from the queue and keeps later scans from re-queuing them."""
+    review_ids = [int(review_id) for review_id in review_ids]
+    if not review_ids:
+        return 0
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany("INSERT OR IGNORE INTO review_moderation_dismissed (review_id) VALUES (?)", [(r,) for r in review_ids])
+        cursor.executemany("DELETE FROM review_moderation_queue WHERE review_id = ?", [(r,) for r in review_ids])
+        conn.commit()
+        log(f"Dismissed {len(review_ids)} review(s) from the moderation queue.")
+        return len(review_ids)
+    except Exception as e:
+        conn.rollback()
+        log(f"Error dismissing reviews from the moderation queue: {e}")
+        return 0
+    finally:
+        conn.close()
@@ -0,0 +1,227 @@
+import os
+import re
+import math
+import time
+from itertools import chain, repeat
+from utils.database import get_db_connection
+from utils.logger import log
+from utils import metrics
+import numpy as np
+
+# Reviews scored and written per transaction by backfill_review_sentiment
+SENTIMENT_BATCH_SIZE = int(os.environ.get('SWIGATO_SENTIMENT_BATCH_SIZE', '5000'))
+# Scores at or below this count as negative text (same cut-off as the negative_count aggregate)
+SENTIMENT_NEGATIVE_THRESHOLD = -0.05
+# Squashes the raw word sum into (-1, 1): sum / sqrt(sum^2 + SENTIMENT_NORMALISATION)
+SENTIMENT_NORMALISATION = 15.0
+
+# Word valences on a -3..3 scale, aimed at food and delivery reviews
+SENTIMENT_LEXICON = {
+    # positive
+    "good": 1.9, "great": 3.0, "excellent": 3.0, "amazing": 2.8, "awesome": 2.8, "fantastic": 2.9,
+    "delicious": 2.8, "tasty": 2.2, "yummy": 2.2, "love": 3.0, "loved": 2.9, "lovely": 2.6, "best": 3.0,
+    "perfect": 2.9, "perfectly": 2.5, "nice": 1.8, "fresh": 1.8, "hot": 0.8, "crispy": 1.5, "flavourful": 2.3,
+    "flavorful": 2.3, "authentic": 1.6, "friendly": 2.0, "polite": 1.7, "quick": 1.5, "fast": 1.5,
+    "prompt": 1.5, "recommend": 2.0, "recommended": 1.9, "worth": 1.6, "enjoyed": 2.2, "enjoy": 2.1,
+    "happy": 2.5, "satisfied": 2.0, "wonderful": 2.9, "superb": 2.9, "outstanding": 3.0, "generous": 1.9,
+    "clean": 1.6, "cozy": 1.6, "affordable": 1.4, "juicy": 1.6, "tender": 1.5, "rich": 1.2, "fine": 0.8,
+    "okay": 0.4, "ok": 0.4, "decent": 1.0, "pleasant": 1.9, "impressed": 2.3, "favourite": 2.4,
+    "favorite": 2.4, "thanks": 1.6, "thank": 1.5, "like": 1.2, "liked": 1.5, "value": 0.8, "well": 0.7,
+    # negative
+    "bad": -2.5, "terrible": -3.0, "awful": -3.0, "horrible": -3.0, "worst": -3.1, "disgusting": -3.0,
+    "poor": -2.1, "cold": -1.3, "stale": -2.2, "soggy": -1.8, "bland": -1.7, "tasteless": -2.2,
+    "burnt": -1.9, "raw": -1.4, "undercooked": -2.0, "overcooked": -1.7, "oily": -1.3, "greasy": -1.5,
+    "salty": -1.1, "late": -1.6, "delayed": -1.7, "slow": -1.5, "rude": -2.6, "dirty": -2.3,
+    "expensive": -1.2, "overpriced": -2.0, "small": -0.6, "missing": -1.5, "wrong": -1.8, "spilled": -1.6,
+    "disappointed": -2.4, "disappointing": -2.4, "disappointment": -2.4, "hate": -2.9, "hated": -2.9,
+    "sick": -2.4, "waste": -2.3, "wasted": -2.3, "refund": -1.4, "complaint": -1.6,
+    "avoid": -2.2, "mediocre": -1.5, "meh": -1.0, "average": -0.3, "unhygienic": -2.6, "hair": -1.5,
+    "cockroach": -3.0, "inedible": -2.9, "pathetic": -2.8, "useless": -2.4, "unfortunately": -1.3,
+    "sad": -2.0, "angry": -2.5, "ignored": -1.8, "problem": -1.5, "issue": -1.2, "hard": -0.6,
+}
+# A negator within the two words before a sentiment word flips (and damps) it
+SENTIMENT_NEGATORS = frozenset(("not", "no", "never", "nothing", "none", "nor", "neither", "without",
+                                "isnt", "wasnt", "dont", "didnt", "doesnt", "cant", "couldnt", "wont",
+                                "wouldnt", "arent", "werent", "hardly", "barely"))
+SENTIMENT_NEGATION_SCALAR = -0.74
+SENTIMENT_NEGATION_WINDOW = 2
+# Words that strengthen or weaken the word right after them
+SENTIMENT_BOOSTERS = {"very": 1.3, "really": 1.3, "extremely": 1.5, "super": 1.3, "so": 1.2, "too": 1.2,
+                      "absolutely": 1.4, "totally": 1.3, "incredibly": 1.4, "highly": 1.3, "truly": 1.3,
+                      "slightly": 0.7, "somewhat": 0.7, "bit": 0.7, "little": 0.8, "kinda": 0.7, "pretty": 0.9}
+# "good food but slow service": words after "but" count for more, words before it for less
+SENTIMENT_BUT_BEFORE = 0.5
+SENTIMENT_BUT_AFTER = 1.5
+
+_TOKEN = re.compile(r"[a-z]+")
+
+def _build_vocabulary():
+    """
+    Every word the scorer cares about gets an id (0 is "any other word"), with per-id lookup
+    arrays, so a batch needs a single dict lookup per token.
+    """
+    words = sorted(set(SENTIMENT_LEXICON) | SENTIMENT_NEGATORS | set(SENTIMENT_BOOSTERS) | {"but"})
+    vocabulary = {word: i for i, word in enumerate(words, start=1)}
+    valence = np.zeros(len(words) + 1)
+    booster = np.ones(len(words) + 1)
+    negator = np.zeros(len(words) + 1, dtype=bool)
+    for word, i in vocabulary.items():
+        valence[i] = SENTIMENT_LEXICON.get(word, 0.0)
+        booster[i] = SENTIMENT_BOOSTERS.get(word, 1.0)
+        negator[i] = word in SENTIMENT_NEGATORS
+    return vocabulary, valence, booster, negator, vocabulary["but"]
+
+_VOCABULARY, _VALENCE, _BOOSTER, _NEGATOR, _BUT_ID = _build_vocabulary()
+
+def _tokens(comment):
+    # Apostrophes are dropped first so "didn't" becomes the single token "didnt"
+    return _TOKEN.findall((comment or "").lower().replace("'", "").replace("’", ""))
+
+def _normalise(total):
+    return round(total / math.sqrt(total * total + SENTIMENT_NORMALISATION), 4)
+
+def score_comment(comment):
+    """
+    Sentiment of one comment in [-1, 1]; 0.0 for empty or neutral text.
+
+    The per-word rules are the same as score_comments applies to whole batches, so a review
+    scored on insert gets exactly the score a backfill would give it.
+    """
+    tokens = _tokens(comment)
+    has_but = "but" in tokens
+    seen_but = False
+    total = 0.0
+    for i, token in enumerate(tokens):
+        if token == "but":
+            seen_but = True
+        valence = SENTIMENT_LEXICON.get(token)
+        if valence is None:
+            continue
+        if i > 0:
+            valence *= SENTIMENT_BOOSTERS.get(tokens[i - 1], 1.0)
+        if any(tokens[j] in SENTIMENT_NEGATORS for j in range(max(0, i - SENTIMENT_NEGATION_WINDOW), i)):
+            valence *= SENTIMENT_NEGATION_SCALAR
+        if has_but:
+            valence *= SENTIMENT_BUT_AFTER if seen_but else SENTIMENT_BUT_BEFORE
+        total += valence
+    return _normalise(total)
+
+def score_comments(comments):
+    """
+    Scores a batch of comments, returning a list of floats in the same order.
+
+    The batch is tokenised into one flat array of vocabulary ids with a parallel comment-index
+    array; valences, boosters, the negation window and the "but" rule are then applied to the
+    whole array with shifted comparisons, and np.bincount sums each comment's words.
+    score_comment gives the same result for a single comment.
+    """
+    comments = list(comments)
+    if not comments:
+        return []
+    token_lists = [_tokens(comment) for comment in comments]
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    flat = list(chain.from_iterable(token_lists))
+    if not flat:
+        return [0.0] * len(comments)
+    doc = np.repeat(np.arange(len(comments)), lengths)
+    ids = np.fromiter(map(_VOCABULARY.get, flat, repeat(0)), dtype=np.int64, count=len(flat))
+    valence = _VALENCE[ids]
+    booster = _BOOSTER[ids]
+    negator = _NEGATOR[ids]
+    is_but = ids == _BUT_ID
+
+    # Booster on the previous token of the same comment
+    same_doc = doc[1:] == doc[:-1]
+    valence[1:] *= np.where(same_doc, booster[:-1], 1.0)
+    # Any negator among the previous SENTIMENT_NEGATION_WINDOW tokens of the same comment
+    negated = np.zeros(len(flat), dtype=bool)
+    for shift in range(1, SENTIMENT_NEGATION_WINDOW + 1):
+        negated[shift:] |= negator[:-shift] & (doc[shift:] == doc[:-shift])
+    valence[negated] *= SENTIMENT_NEGATION_SCALAR
+    # "but" rule: running count of "but"s within each comment, minus the count before the comment
+    but_seen = np.cumsum(is_but)
+    doc_starts = np.cumsum(lengths) - lengths
+    buts_before_doc = np.concatenate(([0], but_seen))[doc_starts[doc]]
+    but_in_doc = np.bincount(doc, weights=is_but, minlength=len(comments)) > 0
+    after_but = (but_seen - buts_before_doc) > 0
+    valence *= np.where(but_in_doc[doc], np.where(after_but, SENTIMENT_BUT_AFTER, SENTIMENT_BUT_BEFORE), 1.0)
+
+    totals = np.bincount(doc, weights=valence, minlength=len(comments))
+    return np.round(totals / np.sqrt(totals * totals + SENTIMENT_NORMALISATION), 4).tolist()
+
+def backfill_review_sentiment(rescore=False, batch_size=SENTIMENT_BATCH_SIZE, progress_callback=None):
+    """
+    Scores reviews whose sentiment is NULL (every review when rescore is True).
+
+    Works in review_id order, batch_size reviews per transaction: one keyset-paged SELECT, one
+    score_comments call and one executemany UPDATE per batch. The triggers on reviews.sentiment
+    keep restaurant_sentiment_stats in step. progress_callback(report) runs after each batch.
+
+    Returns a report dict: scored, batches, seconds, reviews_per_second.
+    """
+    report = {"scored": 0, "batches": 0, "seconds": 0.0, "reviews_per_second": 0.0}
+    started = time.perf_counter()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    last_id = 0
+    try:
+        if rescore:
+            cursor.execute("UPDATE reviews SET sentiment = NULL WHERE sentiment IS NOT NULL")
+            conn.commit()
+        while True:
+            cursor.execute("""
+                SELECT review_id, comment FROM reviews
+                WHERE sentiment IS NULL AND review_id > ?
+                ORDER BY review_id LIMIT ?
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            scores = score_comments(row['comment'] for row in rows)
+            cursor.executemany("UPDATE reviews SET sentiment = ? WHERE review_id = ?",
+                               [(score, row['review_id']) for score, row in zip(scores, rows)])
+            conn.commit()
+            last_id = rows[-1]['review_id']
+            report["scored"] += len(rows)
+            report["batches"] += 1
+            if progress_callback:
+                progress_callback(report)
+    except Exception as e:
+        conn.rollback()
+        log(f"Error backfilling review sentiment after review {last_id}: {e}")
+    finally:
+        conn.close()
+    report["seconds"] = time.perf_counter() - started
+    report["reviews_per_second"] = report["scored"] / report["seconds"] if report["seconds"] else 0.0
+    metrics.record_timing("sentiment.backfill", report["seconds"])
+    log(f"Sentiment backfill: {report['scored']} review(s) in {report['seconds']:.2f}s "
+        f"({report['reviews_per_second']:.0f}/s).")
+    return report
+
+def get_restaurant_sentiment(restaurant_id=None):
+    """
+    Per-restaurant sentiment aggregates from restaurant_sentiment_stats, most negative first:
+    dicts with restaurant_id, restaurant_name, scored_count, average_sentiment, negative_count.
+    With a restaurant_id, returns that restaurant's dict (or None).
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+            SELECT s.restaurant_id, r.name AS restaurant_name, s.scored_count, s.negative_count,
+                   s.sentiment_sum / s.scored_count AS average_sentiment
+            FROM restaurant_sentiment_stats s
+            LEFT JOIN restaurants r ON r.restaurant_id = s.restaurant_id
+            WHERE s.scored_count > 0
+        """
+        if restaurant_id is not None:
+            cursor.execute(query + " AND s.restaurant_id = ?", (restaurant_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        cursor.execute(query + " ORDER BY average_sentiment ASC")
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log(f"Error fetching restaurant sentiment: {e}")
+        return None if restaurant_id is not None else []
+    finally:
+        conn.close()
@@ -1,14 +1,29 @@
+import time
+from concurrent.futures import Future
 from .models import User
+from .auth_pool import hash_password_async, verify_password_async, chain_future, needs_rehash, hash_rounds, BCRYPT_ROUNDS
+from .sessions import get_session_store
+from .throttle import get_login_throttle, LoginThrottledError, LOGIN_THROTTLE_ENABLED, LOCAL_CLIENT_ID
 from utils.logger import log
+from utils import metrics
 from rich.console import Console
 
 console = Console()
 
-# Global variable to store the currently logged-in user object
-current_user_session = None 
+# Sessions live in users.sessions and are addressed by opaque tokens. The interactive CLI and GUI
+# serve one person per process, so the token of their most recent login is remembered here and
+# used whenever a caller doesn't pass one explicitly.
+default_session_token = None
+
+def _start_session(user):
+    """Opens a session for `user`, records it as the process default and attaches the token to the user."""
+    global default_session_token
+    token = get_session_store().create(user)
+    default_session_token = token
+    user.session_token = token
+    return token
 
 def sign_up(username, password, address=None):
-    global current_user_session
     if User.get_by_username(username):
         console.print(f"[yellow]Username '{username}' already exists.[/yellow]")
         log(f"Sign up failed: Username '{username}' already exists.")
@@ -16,31 +31,151 @@ def sign_up(username, password, address=None):
     
     new_user = User.create(username, password, address)
     if new_user:
-        current_user_session = new_user # Automatically log in after sign up
+        _start_session(new_user) # Automatically log in after sign up
         log(f"User '{username}' (ID: {new_user.user_id}) created and logged in successfully.")
         return new_user
     else:
         log(f"Sign up failed: Could not create user '{username}'.")
         return None
 
-def log_in(username, password):
-    global current_user_session
+def _record_login(started, success):
+    # End-to-end login latency (lookup + bcrypt + any rehash), for the p99 shown in admin metrics
+    metrics.record_timing("auth.login", time.perf_counter() - started)
+    metrics.increment("auth.login_success" if success else "auth.login_failure")
+
+def _check_throttle(username, client_id):
+    """Returns the seconds the caller must wait before another attempt (0 if allowed)."""
+    if not LOGIN_THROTTLE_ENABLED:
+        return 0
+    retry_after = get_login_throttle().check(username, client_id)
+    if retry_after > 0:
+        log(f"Login attempt for '{username}' from client '{client_id}' throttled; retry in {retry_after:.1f}s.")
+    return retry_after
+
+def _record_attempt(username, client_id, success):
+    if LOGIN_THROTTLE_ENABLED:
+        if success:
+            get_login_throttle().record_success(username, client_id)
+        else:
+            get_login_throttle().record_failure(username, client_id)
+
+def log_in(username, password, client_id=LOCAL_CLIENT_ID):
+    """
+    Verifies credentials and opens a session. Returns the User (with .session_token set) or None.
+    Throttled attempts are rejected before the user lookup or any bcrypt work.
+    """
+    retry_after = _check_throttle(username, client_id)
+    if retry_after > 0:
+        console.print(f"[red]{LoginThrottledError(retry_after)}[/red]")
+        return None
+    started = time.perf_counter()
     user = User.get_by_username(username)
+    if user and not user.is_active:
+        # Deactivated accounts fail like a bad password, without spending a bcrypt check
+        log(f"Login refused for '{username}': account is deactivated.")
+        user = None
     if user and user.verify_password(password):
-        current_user_session = user
+        _start_session(user)
+        _record_attempt(username, client_id, True)
+        _record_login(started, True)
         log(f"User '{username}' (ID: {user.user_id}) logged in successfully.")
         return user
+    _record_attempt(username, client_id, False)
+    _record_login(started, False)
     console.print("[red]Invalid username or password.[/red]") # Added this line
     log(f"Login failed for '{username}': Invalid username or password.")
     return None
 
-def log_out():
-    global current_user_session
-    if current_user_session:
-        log(f"User '{current_user_session.username}' logged out.")
-        current_user_session = None
+def _rehash_async(user, password):
+    """
+    rehash_if_needed for the async login: the new hash is computed on the auth pool and stored
+    when it is ready, so the login future doesn't wait for a second bcrypt run.
+    """
+    if not needs_rehash(user.password_hash):
+        return
+    old_rounds = hash_rounds(user.password_hash)
+
+    def store(password_hash):
+        if user.set_password_hash(password_hash, revoke_sessions=False):
+            metrics.increment("auth.rehash")
+            log(f"Rehashed password for user ID {user.user_id} ('{user.username}') from cost {old_rounds} to {BCRYPT_ROUNDS}.")
+
+    def report(done):
+        if done.exception() is not None:
+            log(f"Error rehashing password for user ID {user.user_id}: {done.exception()}")
+    chain_future(hash_password_async(password), store).add_done_callback(report)
+
+def log_in_async(username, password, client_id=LOCAL_CLIENT_ID):
+    """
+    Non-blocking log_in for the GUI. The user lookup runs here; the bcrypt check runs on the
+    auth pool. Returns a Future resolving to the User (with .session_token set) on success or None;
+    a throttled attempt resolves to a LoginThrottledError.
+    """
+    retry_after = _check_throttle(username, client_id)
+    if retry_after > 0:
+        future = Future()
+        future.set_exception(LoginThrottledError(retry_after))
+        return future
+    started = time.perf_counter()
+    user = User.get_by_username(username)
+    if user and not user.is_active:
+        log(f"Login refused for '{username}': account is deactivated.")
+        user = None
+    if not user:
+        _record_attempt(username, client_id, False)
+        _record_login(started, False)
+        log(f"Login failed for '{username}': Invalid username or password.")
+        future = Future()
+        future.set_result(None)
+        return future
+
+    def finish(is_valid):
+        if is_valid:
+            _rehash_async(user, password)
+            _start_session(user)
+            _record_attempt(username, client_id, True)
+            _record_login(started, True)
+            log(f"User '{username}' (ID: {user.user_id}) logged in successfully.")
+            return user
+        _record_attempt(username, client_id, False)
+        _record_login(started, False)
+        log(f"Login failed for '{username}': Invalid username or password.")
+        return None
+    return chain_future(verify_password_async(password, user.password_hash), finish)
+
+def sign_up_async(username, password, address=None):
+    """
+    Non-blocking sign_up for the GUI: hashes on the auth pool, then inserts the user.
+    Returns a Future resolving to the new User, or None if the username is taken or creation fails.
+    """
+    if User.get_by_username(username):
+        log(f"Sign up failed: Username '{username}' already exists.")
+        future = Future()
+        future.set_result(None)
+        return future
+
+    def finish(password_hash):
+        new_user = User.create_with_hash(username, password_hash, address)
+        if new_user:
+            _start_session(new_user)
+            log(f"User '{username}' (ID: {new_user.user_id}) created and logged in successfully.")
+        else:
+            log(f"Sign up failed: Could not create user '{username}'.")
+        return new_user
+    return chain_future(hash_password_async(password), finish)
+
+def log_out(token=None):
+    """Ends the session for `token` (the process default session if None)."""
+    global default_session_token
+    token = token or default_session_token
+    user = get_session_store().get_user(token) if token else None
+    if token and get_session_store().revoke(token):
+        log(f"User '{user.username if user else 'unknown'}' logged out.")
     else:
         log("Logout attempt: No user currently logged in.")
+    if token == default_session_token:
+        default_session_token = None
 
-def get_current_user():
-    return current_user_session
+def get_current_user(token=None):
+    """Returns the User for a live session `token` (the process default session if None), sliding its expiry."""
+    return get_session_store().get_user(token or default_session_token)
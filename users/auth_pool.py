@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+import statistics
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+import bcrypt
+from utils.logger import log
+from utils import metrics
+
+# bcrypt releases the GIL while it hashes, so a thread pool already spreads work across cores
+# without the start-up and pickling cost of processes. 'process' is kept for deployments that
+# want hashing fully isolated from the interpreter running the UI.
+AUTH_POOL_KIND = os.environ.get('SWIGATO_AUTH_POOL', 'thread').lower()
+AUTH_POOL_WORKERS = int(os.environ.get('SWIGATO_AUTH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Target bcrypt cost (log2 rounds) for new hashes. Stored hashes with a different cost are
+# rehashed on the next successful login. Use calibrate_bcrypt_cost() to pick a value per host.
+BCRYPT_ROUNDS = int(os.environ.get('SWIGATO_BCRYPT_ROUNDS', '12'))
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+
+_auth_pool = None
+_auth_pool_lock = threading.Lock()
+
+def _timed_hash(password, rounds):
+    # Runs on a pool worker (possibly another process); returns the CPU time so the caller can record it
+    start = time.thread_time()
+    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    return password_hash, time.thread_time() - start
+
+def _timed_check(password, password_hash):
+    start = time.thread_time()
+    is_valid = bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    return is_valid, time.thread_time() - start
+
+def _record_hash(result):
+    password_hash, cpu_seconds = result
+    metrics.record_timing("auth.bcrypt_hash_cpu", cpu_seconds)
+    return password_hash
+
+def _record_check(result):
+    is_valid, cpu_seconds = result
+    metrics.record_timing("auth.bcrypt_verify_cpu", cpu_seconds)
+    return is_valid
+
+def hash_password(password, rounds=None):
+    """Hashes a plaintext password with a fresh salt at `rounds` (default BCRYPT_ROUNDS). Returns a str."""
+    return _record_hash(_timed_hash(password, rounds or BCRYPT_ROUNDS))
+
+def check_password(password, password_hash):
+    """Checks a plaintext password against a stored hash (runs on the calling thread)."""
+    if not password_hash:
+        return False
+    return _record_check(_timed_check(password, password_hash))
+
+def hash_rounds(password_hash):
+    """Returns the cost encoded in a bcrypt hash ('$2b$12$...' -> 12), or None if it can't be parsed."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def needs_rehash(password_hash):
+    """True if a stored hash was made with a cost other than the configured BCRYPT_ROUNDS."""
+    return hash_rounds(password_hash) != BCRYPT_ROUNDS
+
+def get_auth_pool():
+    """Returns the shared auth executor, creating it on first use."""
+    global _auth_pool
+    with _auth_pool_lock:
+        if _auth_pool is None:
+            if AUTH_POOL_KIND == 'process':
+                _auth_pool = ProcessPoolExecutor(max_workers=AUTH_POOL_WORKERS)
+            else:
+                _auth_pool = ThreadPoolExecutor(max_workers=AUTH_POOL_WORKERS, thread_name_prefix="swigato-auth")
+            log(f"Auth worker pool started ({AUTH_POOL_KIND}, {AUTH_POOL_WORKERS} workers, bcrypt cost {BCRYPT_ROUNDS}).")
+        return _auth_pool
+
+def hash_password_async(password, rounds=None):
+    """Submits a hash to the auth pool. Returns a Future resolving to the hash str."""
+    return chain_future(get_auth_pool().submit(_timed_hash, password, rounds or BCRYPT_ROUNDS), _record_hash)
+
+def verify_password_async(password, password_hash):
+    """Submits a password check to the auth pool. Returns a Future resolving to True/False."""
+    if not password_hash:
+        future = Future()
+        future.set_result(False)
+        return future
+    return chain_future(get_auth_pool().submit(_timed_check, password, password_hash), _record_check)
+
+def chain_future(future, fn):
+    """
+    Returns a new Future resolving to fn(future.result()). fn runs on whichever thread completes
+    `future`, so it must not touch Tk widgets; GUI code should poll the returned future with after().
+    """
+    chained = Future()
+    def _on_done(done):
+        try:
+            chained.set_result(fn(done.result()))
+        except Exception as e:
+            chained.set_exception(e)
+    future.add_done_callback(_on_done)
+    return chained
+
+def shutdown_auth_pool(wait=False):
+    """Stops the auth pool if it was started. Safe to call more than once."""
+    global _auth_pool
+    with _auth_pool_lock:
+        if _auth_pool is not None:
+            _auth_pool.shutdown(wait=wait)
+            _auth_pool = None
+            log("Auth worker pool shut down.")
+
+def calibrate_bcrypt_cost(target_ms=250, min_rounds=10, max_rounds=15, samples=3):
+    """
+    Measures bcrypt hash time on this host for each cost in [min_rounds, max_rounds] (median of
+    `samples` runs) and recommends the highest cost whose median stays within target_ms.
+    Stops early once a cost takes more than twice the target, since each step doubles the time.
+    Returns (measurements, recommended_rounds) where measurements is a list of (rounds, median_ms).
+    """
+    measurements = []
+    recommended = min_rounds
+    for rounds in range(max(min_rounds, BCRYPT_MIN_ROUNDS), min(max_rounds, BCRYPT_MAX_ROUNDS) + 1):
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds))
+            timings.append((time.perf_counter() - start) * 1000)
+        median_ms = statistics.median(timings)
+        measurements.append((rounds, median_ms))
+        if median_ms <= target_ms:
+            recommended = rounds
+        if median_ms > target_ms * 2:
+            break
+    log(f"bcrypt calibration (target {target_ms}ms): "
+        + ", ".join(f"cost {r}={ms:.0f}ms" for r, ms in measurements) + f"; recommended cost {recommended}.")
+    return measurements, recommended
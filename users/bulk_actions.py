@@ -0,0 +1,85 @@
+import os
+from utils.database import get_db_connection
+from utils.logger import log
+from utils import metrics
+from users.cache import user_cache
+from users.sessions import get_session_store
+from restaurants.leaderboard import get_leaderboard
+
+# Users changed per transaction; also keeps each IN (...) list well under SQLite's variable limit
+BULK_USER_CHUNK_SIZE = int(os.environ.get('SWIGATO_BULK_USER_CHUNK_SIZE', '500'))
+
+# "delete" removes the user rows; "deactivate" keeps them (and their orders) but blocks login;
+# "reactivate" undoes a deactivation.
+BULK_USER_MODES = ("delete", "deactivate", "reactivate")
+
+def _apply_chunk(cursor, chunk, mode, delete_reviews):
+    """Applies `mode` to one chunk of user ids inside the caller's transaction. Returns (users_changed, reviews_deleted)."""
+    placeholders = ",".join("?" for _ in chunk)
+    reviews_deleted = 0
+    if mode == "delete" or (mode == "deactivate" and delete_reviews):
+        cursor.execute(f"DELETE FROM reviews WHERE user_id IN ({placeholders})", chunk)
+        reviews_deleted = cursor.rowcount
+    if mode == "delete":
+        cursor.execute(f"DELETE FROM users WHERE user_id IN ({placeholders})", chunk)
+    elif mode == "deactivate":
+        cursor.execute(f"UPDATE users SET is_active = 0 WHERE user_id IN ({placeholders}) AND COALESCE(is_active, 1) = 1", chunk)
+    else:
+        cursor.execute(f"UPDATE users SET is_active = 1 WHERE user_id IN ({placeholders}) AND is_active = 0", chunk)
+    return cursor.rowcount, reviews_deleted
+
+def bulk_update_users(user_ids, mode="deactivate", delete_reviews=False, protected_user_ids=(),
+                      chunk_size=BULK_USER_CHUNK_SIZE, progress_callback=None):
+    """
+    Deletes, deactivates or reactivates many users at once.
+
+    Ids are processed in chunks of `chunk_size`, each in its own transaction: one statement
+    removes the chunk's reviews and one deletes or flags the users, instead of a lookup and two
+    deletes per user. Deleting always removes the users' reviews; deactivating is reversible and
+    keeps them unless the caller opts in with delete_reviews=True. Ids in protected_user_ids (e.g. the acting admin) are skipped.
+    Sessions and cache entries of changed users are dropped after each chunk commits.
+    progress_callback(report) runs after every chunk.
+
+    Returns a report dict: mode, requested, processed, changed, reviews_deleted, skipped (protected
+    ids), failed [(first_id, last_id, error)].
+    """
+    if mode not in BULK_USER_MODES:
+        raise ValueError(f"Unknown bulk user mode '{mode}'. Expected one of {BULK_USER_MODES}.")
+    requested_ids = {int(user_id) for user_id in user_ids}
+    protected = {int(user_id) for user_id in protected_user_ids or ()}
+    ids = sorted(requested_ids - protected)
+    report = {"mode": mode, "requested": len(requested_ids), "processed": 0, "changed": 0,
+              "reviews_deleted": 0, "skipped": sorted(requested_ids & protected), "failed": []}
+
+    session_store = get_session_store()
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            changed, reviews_deleted = _apply_chunk(cursor, chunk, mode, delete_reviews)
+            conn.commit()
+            report["changed"] += changed
+            report["reviews_deleted"] += reviews_deleted
+            for user_id in chunk:
+                user_cache.invalidate(user_id)
+                if mode != "reactivate":
+                    session_store.revoke_user(user_id)
+        except Exception as e:
+            conn.rollback()
+            log(f"Error in bulk {mode} of user IDs {chunk[0]}-{chunk[-1]}: {e}")
+            report["failed"].append((chunk[0], chunk[-1], str(e)))
+        finally:
+            conn.close()
+        report["processed"] += len(chunk)
+        if progress_callback:
+            progress_callback(report)
+
+    if report["reviews_deleted"]:
+        get_leaderboard().invalidate()
+    metrics.increment(f"users.bulk_{mode}", report["changed"])
+    log(f"Bulk {mode}: {report['changed']} of {report['requested']} user(s) changed, "
+        f"{report['reviews_deleted']} review(s) deleted, {len(report['skipped'])} protected, "
+        f"{len(report['failed'])} chunk(s) failed.")
+    return report
@@ -0,0 +1,177 @@
+import os
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from utils.database import get_db_connection
+from utils.logger import log
+from users.auth_pool import BCRYPT_ROUNDS
+from users.cache import user_cache
+
+# Users hashed and inserted per transaction
+IMPORT_BATCH_SIZE = int(os.environ.get('SWIGATO_IMPORT_BATCH_SIZE', '1000'))
+IMPORT_WORKERS = int(os.environ.get('SWIGATO_IMPORT_WORKERS', str(os.cpu_count() or 1)))
+# bcrypt only looks at the first 72 bytes of a password, and newer bcrypt releases reject longer ones
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+def _hash_for_import(password, rounds):
+    # Module-level so it can be pickled into the worker processes
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y")
+
+def iter_user_records(path):
+    """
+    Yields (line_number, record_dict) from a CSV (header row required) or JSONL file.
+    Recognised fields: username, password or password_hash (an existing bcrypt hash), address, is_admin.
+    """
+    if path.lower().endswith((".jsonl", ".json")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, {"_error": f"invalid JSON: {e}"}
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, row
+
+def _existing_usernames(cursor, usernames):
+    existing = set()
+    for start in range(0, len(usernames), 500):
+        chunk = usernames[start:start + 500]
+        placeholders = ",".join("?" for _ in chunk)
+        cursor.execute(f"SELECT username FROM users WHERE username IN ({placeholders})", chunk)
+        existing.update(row['username'] for row in cursor.fetchall())
+    return existing
+
+def _validate_record(line_number, record):
+    """Returns (import_record, None) for a usable record, or (None, reason) for a bad one."""
+    if not isinstance(record, dict):
+        return None, f"expected an object, got {type(record).__name__}"
+    if "_error" in record:
+        return None, record["_error"]
+    username = str(record.get("username") or "").strip()
+    password = record.get("password") or None
+    password_hash = record.get("password_hash") or None
+    address = record.get("address") or None
+    if not username:
+        return None, "missing username"
+    if password is None and password_hash is None:
+        return None, f"no password for '{username}'"
+    if password is not None and not isinstance(password, str):
+        return None, f"password for '{username}' is not a string"
+    if password is not None and len(password.encode('utf-8')) > BCRYPT_MAX_PASSWORD_BYTES:
+        return None, f"password for '{username}' is longer than {BCRYPT_MAX_PASSWORD_BYTES} bytes"
+    if password_hash is not None and not (isinstance(password_hash, str) and password_hash.startswith("$2")):
+        return None, f"password_hash for '{username}' is not a bcrypt hash"
+    if address is not None and not isinstance(address, str):
+        return None, f"address for '{username}' is not a string"
+    return {"line": line_number, "username": username, "password": password, "password_hash": password_hash,
+            "address": address, "is_admin": _parse_bool(record.get("is_admin"))}, None
+
+def _flush_batch(batch, pool, report, rounds):
+    """Drops usernames already taken, hashes the remaining plaintext passwords across the pool, then inserts the batch in one transaction."""
+    # Checked before hashing so no bcrypt time is spent on rows that would be rejected anyway
+    conn = get_db_connection()
+    try:
+        existing = _existing_usernames(conn.cursor(), [rec["username"] for rec in batch])
+    except Exception as e:
+        log(f"Error checking existing usernames for bulk import batch starting at line {batch[0]['line']}: {e}")
+        existing = set()  # The check inside the insert transaction still catches them
+    finally:
+        conn.close()
+    for rec in batch:
+        if rec["username"] in existing:
+            report["duplicates_existing"].append((rec["line"], rec["username"]))
+    batch = [rec for rec in batch if rec["username"] not in existing]
+    if not batch:
+        return
+
+    to_hash = [i for i, rec in enumerate(batch) if rec["password_hash"] is None]
+    if to_hash:
+        hashes = pool.map(_hash_for_import, [batch[i]["password"] for i in to_hash],
+                          [rounds] * len(to_hash), chunksize=max(1, len(to_hash) // (IMPORT_WORKERS * 4)))
+        for i, password_hash in zip(to_hash, hashes):
+            batch[i]["password_hash"] = password_hash
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Take the write lock before re-checking usernames so nothing can sneak in between the
+        # check and the insert; duplicates are reported per row instead of aborting the batch.
+        cursor.execute("BEGIN IMMEDIATE")
+        existing = _existing_usernames(cursor, [rec["username"] for rec in batch])
+        rows = []
+        for rec in batch:
+            if rec["username"] in existing:
+                report["duplicates_existing"].append((rec["line"], rec["username"]))
+            else:
+                rows.append((rec["username"], rec["password_hash"], rec["address"], rec["is_admin"]))
+        cursor.executemany("INSERT INTO users (username, password_hash, address, is_admin) VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+        report["imported"] += len(rows)
+        for username, _, _, _ in rows:
+            user_cache.invalidate(username=username) # Drop any cached "no such user"
+    except Exception as e:
+        conn.rollback()
+        log(f"Error inserting bulk import batch starting at line {batch[0]['line']}: {e}")
+        report["failed"].extend((rec["line"], rec["username"], str(e)) for rec in batch)
+    finally:
+        conn.close()
+
+def bulk_import_users(path, batch_size=IMPORT_BATCH_SIZE, workers=IMPORT_WORKERS, rounds=None, progress_callback=None):
+    """
+    Imports users from a CSV or JSONL file.
+
+    Records are read in batches of `batch_size`. Plaintext passwords in a batch are bcrypt-hashed
+    across `workers` processes, then the batch is inserted with a single executemany in one
+    transaction. Malformed records (not an object, non-string or over-long passwords, ...) and
+    usernames repeated in the file or already in the database are reported and skipped before
+    any hashing; the rest of the batch still goes in. progress_callback(report) runs after each batch.
+
+    Returns a report dict: total, imported, invalid [(line, reason)], duplicates_in_file
+    [(line, username)], duplicates_existing [(line, username)], failed [(line, username, error)].
+    """
+    rounds = rounds or BCRYPT_ROUNDS
+    report = {"total": 0, "imported": 0, "invalid": [], "duplicates_in_file": [],
+              "duplicates_existing": [], "failed": []}
+    seen_usernames = set()
+    batch = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for line_number, record in iter_user_records(path):
+                report["total"] += 1
+                rec, reason = _validate_record(line_number, record)
+                if rec is None:
+                    report["invalid"].append((line_number, reason))
+                    continue
+                if rec["username"] in seen_usernames:
+                    report["duplicates_in_file"].append((line_number, rec["username"]))
+                    continue
+                seen_usernames.add(rec["username"])
+                batch.append(rec)
+                if len(batch) >= batch_size:
+                    _flush_batch(batch, pool, report, rounds)
+                    batch = []
+                    if progress_callback:
+                        progress_callback(report)
+            if batch:
+                _flush_batch(batch, pool, report, rounds)
+                if progress_callback:
+                    progress_callback(report)
+    except FileNotFoundError:
+        log(f"Bulk import failed: file not found: {path}")
+        report["invalid"].append((0, f"file not found: {path}"))
+        return report
+    log(f"Bulk import from {path}: {report['imported']} imported of {report['total']} record(s); "
+        f"{len(report['duplicates_in_file']) + len(report['duplicates_existing'])} duplicate(s), "
+        f"{len(report['invalid'])} invalid, {len(report['failed'])} failed.")
+    return report
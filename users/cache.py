@@ -0,0 +1,143 @@
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+from utils import metrics
+
+# Bounded LRU of User objects used by User.get_by_id / get_by_username
+USER_CACHE_SIZE = int(os.environ.get('SWIGATO_USER_CACHE_SIZE', '10000'))
+# Entries are re-read after this long so changes made by another process show up eventually
+USER_CACHE_TTL_SECONDS = float(os.environ.get('SWIGATO_USER_CACHE_TTL_SECONDS', '300'))
+# Misses are remembered for a shorter time; a sign-up in this process clears them immediately
+USER_NEGATIVE_TTL_SECONDS = float(os.environ.get('SWIGATO_USER_NEGATIVE_TTL_SECONDS', '30'))
+
+class UserCache:
+    """
+    LRU cache of User objects addressable by user_id and by username, with negative caching.
+
+    Entries live in one OrderedDict keyed by user_id (its order is the LRU order) plus a
+    username -> user_id index. Callers always get a copy, so mutating a returned User can never
+    change the cached one; model methods that write to the users table call invalidate().
+    """
+    def __init__(self, max_size=USER_CACHE_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS,
+                 negative_ttl_seconds=USER_NEGATIVE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._by_id = OrderedDict()      # user_id -> (User, cached_at)
+        self._id_by_username = {}
+        self._negative = OrderedDict()   # ("id", user_id) / ("username", name) -> cached_at
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, user_id, now):
+        entry = self._by_id.get(user_id)
+        if entry is None:
+            return None
+        user, cached_at = entry
+        if now - cached_at > self.ttl_seconds:
+            self._drop(user_id)
+            return None
+        self._by_id.move_to_end(user_id)
+        return user
+
+    def _drop(self, user_id):
+        entry = self._by_id.pop(user_id, None)
+        if entry is not None:
+            self._id_by_username.pop(entry[0].username, None)
+
+    def _negative_hit(self, key, now):
+        cached_at = self._negative.get(key)
+        if cached_at is None:
+            return False
+        if now - cached_at > self.negative_ttl_seconds:
+            del self._negative[key]
+            return False
+        return True
+
+    def get(self, user_id=None, username=None):
+        """
+        Returns (found, user): found is True for a hit (user may be None for a cached miss),
+        False when the caller has to go to the database.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if user_id is None:
+                user_id = self._id_by_username.get(username)
+                negative_key = ("username", username)
+            else:
+                negative_key = ("id", user_id)
+            user = self._lookup(user_id, now) if user_id is not None else None
+            if user is not None:
+                self.hits += 1
+                return True, copy.copy(user)
+            if self._negative_hit(negative_key, now):
+                self.negative_hits += 1
+                return True, None
+            self.misses += 1
+            return False, None
+
+    def put(self, user):
+        now = time.monotonic()
+        with self._lock:
+            self._drop(user.user_id)
+            self._by_id[user.user_id] = (copy.copy(user), now)
+            self._id_by_username[user.username] = user.user_id
+            self._negative.pop(("id", user.user_id), None)
+            self._negative.pop(("username", user.username), None)
+            while len(self._by_id) > self.max_size:
+                oldest_id = next(iter(self._by_id))
+                self._drop(oldest_id)
+                self.evictions += 1
+
+    def put_missing(self, user_id=None, username=None):
+        """Remembers that no user exists with this id or username."""
+        key = ("id", user_id) if user_id is not None else ("username", username)
+        with self._lock:
+            self._negative[key] = time.monotonic()
+            self._negative.move_to_end(key)
+            while len(self._negative) > self.max_size:
+                self._negative.popitem(last=False)
+
+    def invalidate(self, user_id=None, username=None):
+        """Forgets everything cached for a user id and/or username, including cached misses."""
+        with self._lock:
+            if user_id is None and username is not None:
+                user_id = self._id_by_username.get(username)
+            if user_id is not None:
+                self._drop(user_id)
+                self._negative.pop(("id", user_id), None)
+            if username is not None:
+                self._id_by_username.pop(username, None)
+                self._negative.pop(("username", username), None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._id_by_username.clear()
+            self._negative.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            stats = {
+                "entries": len(self._by_id),
+                "negative_entries": len(self._negative),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            }
+        metrics.set_gauge("user_cache.entries", stats["entries"])
+        metrics.set_gauge("user_cache.hit_rate_pct", round(stats["hit_rate"] * 100, 1))
+        return stats
+
+user_cache = UserCache()
@@ -1,16 +1,43 @@
-import bcrypt
 import sqlite3 # Import sqlite3 for exception handling
 from utils.database import get_db_connection
 from utils.logger import log
+from users.auth_pool import hash_password, check_password, needs_rehash, hash_rounds, BCRYPT_ROUNDS
+from users.cache import user_cache
+from restaurants.leaderboard import get_leaderboard
+from utils import metrics
+
+# Rows per page returned by User.search
+USER_SEARCH_PAGE_SIZE = 50
+
+_users_fts = None
+
+def _session_store():
+    from users.sessions import get_session_store # Local import: sessions loads User lazily from this module
+    return get_session_store()
+
+def _users_fts_available():
+    """True if the users_fts trigram index exists. Re-checked until it is found, then remembered."""
+    global _users_fts
+    if not _users_fts:
+        conn = get_db_connection()
+        try:
+            _users_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'").fetchone() is not None
+        except Exception as e:
+            log(f"Error checking for the user search index: {e}")
+            _users_fts = False
+        finally:
+            conn.close()
+    return _users_fts
 
 class User:
-    def __init__(self, user_id, username, password_hash, address=None, created_at=None, is_admin=False): # Added is_admin
+    def __init__(self, user_id, username, password_hash, address=None, created_at=None, is_admin=False, is_active=True): # Added is_admin
         self.user_id = user_id
         self.username = username
         self.password_hash = password_hash
         self.address = address
         self.created_at = created_at # Should be set by DB or on creation
         self.is_admin = is_admin # Added is_admin
+        self.is_active = is_active # False once soft-deactivated; such users cannot log in
 
     def __repr__(self):
         return f"<User {self.username} (ID: {self.user_id}) Admin: {self.is_admin}>" # Updated repr
@@ -22,6 +49,8 @@ class User:
             cursor.execute("UPDATE users SET address = ? WHERE user_id = ?", (new_address, self.user_id))
             conn.commit()
             self.address = new_address
+            user_cache.invalidate(self.user_id)
+            _session_store().reload_user(self.user_id)
             log(f"Address updated for user ID {self.user_id} in DB.")
             return True
         except Exception as e:
@@ -38,6 +67,8 @@ class User:
             cursor.execute("UPDATE users SET is_admin = ? WHERE user_id = ?", (new_admin_status, self.user_id))
             conn.commit()
             self.is_admin = new_admin_status # Update the instance attribute as well
+            user_cache.invalidate(self.user_id)
+            _session_store().reload_user(self.user_id) # Live sessions pick up the new rights on their next request
             log(f"Admin status for user ID {self.user_id} ('{self.username}') updated to {new_admin_status} in DB.") # Corrected f-string
             return True
         except Exception as e:
@@ -52,14 +83,23 @@ class User:
             log(f"Password update for user ID {self.user_id} ('{self.username}') skipped: new password is empty.")
             return False # Or raise an error
 
-        new_password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
+        return self.set_password_hash(hash_password(new_password))
+
+    def set_password_hash(self, new_password_hash, revoke_sessions=True):
+        """
+        Stores an already computed bcrypt hash (e.g. from users.auth_pool.hash_password_async) and
+        ends the user's other sessions. A rehash of the same password passes revoke_sessions=False.
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         try:
             cursor.execute("UPDATE users SET password_hash = ? WHERE user_id = ?", 
-                           (new_password_hash.decode('utf-8'), self.user_id))
+                           (new_password_hash, self.user_id))
             conn.commit()
-            self.password_hash = new_password_hash.decode('utf-8') # Update instance attribute
+            self.password_hash = new_password_hash # Update instance attribute
+            user_cache.invalidate(self.user_id)
+            if revoke_sessions:
+                _session_store().revoke_user(self.user_id)
             log(f"Password for user ID {self.user_id} ('{self.username}') updated successfully.")
             return True
         except Exception as e:
@@ -68,21 +108,52 @@ class User:
         finally:
             conn.close()
 
+    def update_username(self, new_username):
+        """Renames the user. Returns False if the name is taken or the update fails."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        old_username = self.username
+        try:
+            cursor.execute("UPDATE users SET username = ? WHERE user_id = ?", (new_username, self.user_id))
+            conn.commit()
+            self.username = new_username
+            user_cache.invalidate(self.user_id, old_username)
+            user_cache.invalidate(username=new_username) # Drops a cached "no such user" for the new name
+            _session_store().reload_user(self.user_id)
+            log(f"Username for user ID {self.user_id} changed from '{old_username}' to '{new_username}'.")
+            return True
+        except sqlite3.IntegrityError:
+            log(f"Cannot rename user ID {self.user_id} to '{new_username}': username already exists.")
+            return False
+        except Exception as e:
+            log(f"Error updating username for user ID {self.user_id}: {e}")
+            return False
+        finally:
+            conn.close()
+
     @staticmethod
     def create(username, password, address=None, is_admin=False): # Added is_admin
         """Creates a new user in the database."""
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        return User.create_with_hash(username, hash_password(password), address, is_admin)
+
+    @staticmethod
+    def create_with_hash(username, password_hash, address=None, is_admin=False):
+        """Creates a new user from an already computed bcrypt hash."""
         conn = get_db_connection()
         cursor = conn.cursor()
         try:
             cursor.execute("INSERT INTO users (username, password_hash, address, is_admin) VALUES (?, ?, ?, ?)", # Added is_admin
-                           (username, password_hash.decode('utf-8'), address, is_admin)) # Added is_admin
+                           (username, password_hash, address, is_admin)) # Added is_admin
             conn.commit()
             user_id = cursor.lastrowid
             log(f"User '{username}' created with ID {user_id}, Admin status: {is_admin}.")
-            # Fetch the created_at timestamp from the DB for the new User object
-            new_user_data = User.get_by_id(user_id) # Re-fetch to get all fields like created_at and is_admin
-            return new_user_data
+            # Only created_at is filled in by the DB; read it on this connection instead of a full re-fetch
+            cursor.execute("SELECT created_at FROM users WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+            new_user = User(user_id=user_id, username=username, password_hash=password_hash, address=address,
+                            created_at=row['created_at'] if row else None, is_admin=is_admin)
+            user_cache.put(new_user) # Also clears the cached miss left by the sign-up availability check
+            return new_user
         except sqlite3.IntegrityError: # Handles unique username constraint
             log(f"Username '{username}' already exists.")
             return None
@@ -94,16 +165,23 @@ class User:
 
     @staticmethod
     def get_by_username(username):
-        """Retrieves a user by username from the database."""
+        """Retrieves a user by username, from the user cache when possible."""
+        found, cached_user = user_cache.get(username=username)
+        if found:
+            return cached_user
         conn = get_db_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("SELECT user_id, username, password_hash, address, created_at, is_admin FROM users WHERE username = ?", (username,)) # Added is_admin
+            cursor.execute("SELECT user_id, username, password_hash, address, created_at, is_admin, COALESCE(is_active, 1) AS is_active FROM users WHERE username = ?", (username,)) # Added is_admin
             row = cursor.fetchone()
             if row:
-                return User(user_id=row['user_id'], username=row['username'], 
+                user = User(user_id=row['user_id'], username=row['username'], 
                             password_hash=row['password_hash'], address=row['address'], 
-                            created_at=row['created_at'], is_admin=row['is_admin']) # Added is_admin
+                            created_at=row['created_at'], is_admin=row['is_admin'],
+                            is_active=bool(row['is_active'])) # Added is_admin
+                user_cache.put(user)
+                return user
+            user_cache.put_missing(username=username)
             return None
         except Exception as e:
             log(f"Error fetching user '{username}': {e}")
@@ -113,16 +191,23 @@ class User:
 
     @staticmethod
     def get_by_id(user_id):
-        """Retrieves a user by user_id from the database."""
+        """Retrieves a user by user_id, from the user cache when possible."""
+        found, cached_user = user_cache.get(user_id=user_id)
+        if found:
+            return cached_user
         conn = get_db_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("SELECT user_id, username, password_hash, address, created_at, is_admin FROM users WHERE user_id = ?", (user_id,)) # Added is_admin
+            cursor.execute("SELECT user_id, username, password_hash, address, created_at, is_admin, COALESCE(is_active, 1) AS is_active FROM users WHERE user_id = ?", (user_id,)) # Added is_admin
             row = cursor.fetchone()
             if row:
-                return User(user_id=row['user_id'], username=row['username'], 
+                user = User(user_id=row['user_id'], username=row['username'], 
                             password_hash=row['password_hash'], address=row['address'], 
-                            created_at=row['created_at'], is_admin=row['is_admin']) # Added is_admin
+                            created_at=row['created_at'], is_admin=row['is_admin'],
+                            is_active=bool(row['is_active'])) # Added is_admin
+                user_cache.put(user)
+                return user
+            user_cache.put_missing(user_id=user_id)
             return None
         except Exception as e:
             log(f"Error fetching user ID {user_id}: {e}")
@@ -138,12 +223,13 @@ class User:
         users = []
         try:
             # Modified SQL query to order by user_id ASC
-            cursor.execute("SELECT user_id, username, password_hash, address, created_at, is_admin FROM users ORDER BY user_id ASC")
+            cursor.execute("SELECT user_id, username, password_hash, address, created_at, is_admin, COALESCE(is_active, 1) AS is_active FROM users ORDER BY user_id ASC")
             rows = cursor.fetchall()
             for row in rows:
                 users.append(User(user_id=row['user_id'], username=row['username'],
                                   password_hash=row['password_hash'], address=row['address'],
-                                  created_at=row['created_at'], is_admin=row['is_admin']))
+                                  created_at=row['created_at'], is_admin=row['is_admin'],
+                                  is_active=bool(row['is_active'])))
             return users
         except Exception as e:
             log(f"Error fetching all users: {e}")
@@ -151,10 +237,127 @@ class User:
         finally:
             conn.close()
 
+    @staticmethod
+    def _search_conditions(term, admin_filter):
+        """Builds the WHERE conditions and parameters shared by search() and search_ids()."""
+        conditions = []
+        params = []
+        if admin_filter == "Admin":
+            conditions.append("u.is_admin = 1")
+        elif admin_filter == "Non-Admin":
+            conditions.append("(u.is_admin = 0 OR u.is_admin IS NULL)")
+
+        term = (term or "").strip()
+        if term:
+            id_match = ""
+            id_params = []
+            if term.isdigit():
+                id_match = "u.user_id = ? OR "
+                id_params.append(int(term))
+            if len(term) >= 3 and _users_fts_available():
+                # Quoted so FTS treats the whole term as one substring rather than query syntax
+                conditions.append(f"({id_match}u.user_id IN (SELECT rowid FROM users_fts WHERE users_fts MATCH ?))")
+                params.extend(id_params + ['"' + term.replace('"', '""') + '"'])
+            else:
+                like_term = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append(f"({id_match}u.username LIKE ? ESCAPE '\\' OR u.address LIKE ? ESCAPE '\\')")
+                params.extend(id_params + [like_term, like_term])
+        return conditions, params
+
+    @staticmethod
+    def search(term=None, admin_filter="All", after_id=None, offset=0, limit=USER_SEARCH_PAGE_SIZE):
+        """
+        Returns one page of users matching `term` as (rows, next_cursor).
+
+        Only the display columns are read: each row is a dict with 'id', 'username', 'is_admin',
+        'is_active' and 'address'. Pages are ordered by user_id; pass the returned next_cursor as
+        after_id to get the following page (None means this was the last one). `offset` is only
+        used when after_id is not given. admin_filter is "All", "Admin" or "Non-Admin". A numeric
+        term also matches that user id; terms of 3+ characters go through the users_fts trigram index.
+        """
+        conditions, params = User._search_conditions(term, admin_filter)
+        if after_id is not None:
+            conditions.append("u.user_id > ?")
+            params.append(after_id)
+
+        query = "SELECT u.user_id, u.username, u.address, u.is_admin, COALESCE(u.is_active, 1) AS is_active FROM users u"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # One extra row tells us whether there is a next page without a COUNT(*)
+        query += " ORDER BY u.user_id ASC LIMIT ?"
+        params.append(limit + 1)
+        if after_id is None and offset:
+            query += " OFFSET ?"
+            params.append(offset)
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            page = [{'id': row['user_id'], 'username': row['username'], 'is_admin': bool(row['is_admin']),
+                     'is_active': bool(row['is_active']), 'address': row['address'] if row['address'] else ""}
+                    for row in rows[:limit]]
+            next_cursor = page[-1]['id'] if len(rows) > limit else None
+            return page, next_cursor
+        except Exception as e:
+            log(f"Error searching users (term '{term}', filter '{admin_filter}'): {e}")
+            return [], None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def search_ids(term=None, admin_filter="All"):
+        """Returns the ids of every user matching the same filter as search(), in id order."""
+        conditions, params = User._search_conditions(term, admin_filter)
+        query = "SELECT u.user_id FROM users u"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY u.user_id ASC"
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            log(f"Error collecting user ids (term '{term}', filter '{admin_filter}'): {e}")
+            return []
+        finally:
+            conn.close()
+
+    @staticmethod
+    def count_users():
+        """Returns the total number of users without loading them."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM users")
+            return cursor.fetchone()[0]
+        except Exception as e:
+            log(f"Error counting users: {e}")
+            return 0
+        finally:
+            conn.close()
+
     def verify_password(self, password):
-        """Verifies the given password against the stored hash."""
-        if self.password_hash:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """Verifies the given password against the stored hash, upgrading the hash's cost on success if needed."""
+        is_valid = check_password(password, self.password_hash)
+        if is_valid:
+            self.rehash_if_needed(password)
+        return is_valid
+
+    def rehash_if_needed(self, password):
+        """
+        Re-hashes a just-verified password when its stored hash uses a cost other than BCRYPT_ROUNDS.
+        Only call this after the password has been verified. Returns True if the hash was replaced.
+        """
+        if not needs_rehash(self.password_hash):
+            return False
+        old_rounds = hash_rounds(self.password_hash)
+        if self.set_password_hash(hash_password(password), revoke_sessions=False):
+            metrics.increment("auth.rehash")
+            log(f"Rehashed password for user ID {self.user_id} ('{self.username}') from cost {old_rounds} to {BCRYPT_ROUNDS}.")
+            return True
         return False
 
     @staticmethod
@@ -173,11 +376,16 @@ class User:
 
             # Optional: Delete associated reviews (if reviews table has user_id FK)
             cursor.execute("DELETE FROM reviews WHERE user_id = ?", (user_id_to_delete,))
+            reviews_deleted = cursor.rowcount
             log(f"Deleted reviews associated with user ID {user_id_to_delete} ('{username}').")
 
             # Now delete the user
             cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id_to_delete,))
             conn.commit()
+            user_cache.invalidate(user_id_to_delete, username)
+            if reviews_deleted:
+                get_leaderboard().invalidate()
+            _session_store().revoke_user(user_id_to_delete)
             log(f"User '{username}' (ID: {user_id_to_delete}) deleted successfully.")
             return True
         except sqlite3.Error as e:
@@ -0,0 +1,240 @@
+import os
+import time
+import sqlite3
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from utils import database
+from utils.logger import log
+from utils import metrics
+
+# Sliding session lifetime: a session expires this long after its last use
+SESSION_TTL_SECONDS = int(os.environ.get('SWIGATO_SESSION_TTL_SECONDS', '3600'))
+# Expiry granularity of the timing wheel; sessions are reaped within one tick of expiring
+SESSION_WHEEL_TICK_SECONDS = int(os.environ.get('SWIGATO_SESSION_TICK_SECONDS', '30'))
+# Memory cap; past this the least recently used session is evicted
+SESSION_MAX_SESSIONS = int(os.environ.get('SWIGATO_SESSION_MAX', '100000'))
+# Set to 1 to keep sessions in the sessions table so they survive a restart
+SESSION_PERSIST = os.environ.get('SWIGATO_SESSION_PERSIST', '0') == '1'
+
+def _hash_token(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+class Session:
+    __slots__ = ("token_hash", "user_id", "user", "created_at", "last_seen", "expires_at", "slot", "persisted_at")
+
+    def __init__(self, token_hash, user_id, user, created_at, last_seen, expires_at):
+        self.token_hash = token_hash
+        self.user_id = user_id
+        self.user = user  # Cached User object; reloaded lazily for sessions restored from the DB
+        self.created_at = created_at
+        self.last_seen = last_seen
+        self.expires_at = expires_at
+        self.slot = None
+        self.persisted_at = last_seen
+
+class SessionStore:
+    """
+    In-memory session store with opaque tokens.
+
+    Sessions are kept in an OrderedDict keyed by the token's SHA-256, so lookup is O(1) and the
+    dict order doubles as LRU order for the memory cap. Sliding expiry uses a timing wheel: each
+    session sits in the bucket of the tick it expires in, touching it moves it to a later bucket,
+    and expiring only visits the buckets for ticks that have passed, never the whole store.
+    """
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS, tick_seconds=SESSION_WHEEL_TICK_SECONDS,
+                 max_sessions=SESSION_MAX_SESSIONS, persist=SESSION_PERSIST):
+        self.ttl_seconds = ttl_seconds
+        self.tick_seconds = max(1, tick_seconds)
+        self.max_sessions = max_sessions
+        self.persist = persist
+        # One bucket per tick over a full TTL (+1 so a fresh session never lands in the current bucket)
+        self.wheel_size = ttl_seconds // self.tick_seconds + 2
+        self._wheel = [set() for _ in range(self.wheel_size)]
+        self._sessions = OrderedDict()
+        self._by_user = {}  # user_id -> set of token hashes, so revoke_user doesn't scan every session
+        self._last_tick = self._tick(time.time())
+        self._lock = threading.RLock()
+        self._db = None
+        if self.persist:
+            self._load_persisted()
+
+    # --- timing wheel ---
+
+    def _tick(self, timestamp):
+        return int(timestamp // self.tick_seconds)
+
+    def _place(self, session):
+        slot = self._tick(session.expires_at) % self.wheel_size
+        if session.slot == slot:
+            return
+        if session.slot is not None:
+            self._wheel[session.slot].discard(session.token_hash)
+        self._wheel[slot].add(session.token_hash)
+        session.slot = slot
+
+    def _advance(self, now):
+        """Expires sessions in the buckets of every tick that has fully passed since the last call."""
+        current_tick = self._tick(now)
+        if current_tick <= self._last_tick:
+            return
+        expired = []
+        for tick in range(self._last_tick, min(current_tick, self._last_tick + self.wheel_size)):
+            bucket = self._wheel[tick % self.wheel_size]
+            for token_hash in list(bucket):
+                session = self._sessions.get(token_hash)
+                if session is None or session.expires_at <= now:
+                    bucket.discard(token_hash)
+                    if session is not None:
+                        expired.append(session)
+        self._last_tick = current_tick
+        for session in expired:
+            self._remove(session)
+        if expired:
+            metrics.increment("sessions.expired", len(expired))
+
+    def _remove(self, session):
+        self._sessions.pop(session.token_hash, None)
+        user_tokens = self._by_user.get(session.user_id)
+        if user_tokens is not None:
+            user_tokens.discard(session.token_hash)
+            if not user_tokens:
+                del self._by_user[session.user_id]
+        if session.slot is not None:
+            self._wheel[session.slot].discard(session.token_hash)
+        if self.persist:
+            self._db_execute("DELETE FROM sessions WHERE token_hash = ?", (session.token_hash,))
+
+    # --- public API ---
+
+    def create(self, user):
+        """Starts a session for `user` and returns its token. The token is only ever returned here."""
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        with self._lock:
+            self._advance(now)
+            while len(self._sessions) >= self.max_sessions:
+                # Front of the OrderedDict is the least recently used session
+                self._remove(next(iter(self._sessions.values())))
+                metrics.increment("sessions.evicted")
+            session = Session(_hash_token(token), user.user_id, user, now, now, now + self.ttl_seconds)
+            self._sessions[session.token_hash] = session
+            self._by_user.setdefault(session.user_id, set()).add(session.token_hash)
+            self._place(session)
+            if self.persist:
+                self._db_execute("INSERT OR REPLACE INTO sessions (token_hash, user_id, created_at, last_seen, expires_at) VALUES (?, ?, ?, ?, ?)",
+                                 (session.token_hash, session.user_id, session.created_at, session.last_seen, session.expires_at))
+            metrics.set_gauge("sessions.active", len(self._sessions))
+        return token
+
+    def get(self, token):
+        """Returns the live Session for a token and slides its expiry, or None if unknown or expired."""
+        if not token:
+            return None
+        now = time.time()
+        with self._lock:
+            self._advance(now)
+            session = self._sessions.get(_hash_token(token))
+            if session is None:
+                return None
+            if session.expires_at <= now:
+                self._remove(session)
+                return None
+            session.last_seen = now
+            session.expires_at = now + self.ttl_seconds
+            self._place(session)
+            self._sessions.move_to_end(session.token_hash)
+            # Sliding expiry is written back at most once per tick to keep hot sessions off the disk
+            if self.persist and now - session.persisted_at >= self.tick_seconds:
+                self._db_execute("UPDATE sessions SET last_seen = ?, expires_at = ? WHERE token_hash = ?",
+                                 (session.last_seen, session.expires_at, session.token_hash))
+                session.persisted_at = now
+            return session
+
+    def get_user(self, token):
+        """Returns the User for a live session token, or None."""
+        session = self.get(token)
+        if session is None:
+            return None
+        if session.user is None:
+            from users.models import User  # Local import: users.models does not depend on sessions
+            session.user = User.get_by_id(session.user_id)
+        return session.user
+
+    def revoke(self, token):
+        """Ends a session. Returns True if it existed."""
+        with self._lock:
+            session = self._sessions.get(_hash_token(token)) if token else None
+            if session is None:
+                return False
+            self._remove(session)
+            metrics.set_gauge("sessions.active", len(self._sessions))
+            return True
+
+    def revoke_user(self, user_id):
+        """Ends every session belonging to user_id (e.g. after a password change or deletion)."""
+        with self._lock:
+            doomed = [self._sessions[h] for h in self._by_user.get(user_id, ())]
+            for session in doomed:
+                self._remove(session)
+            if self.persist:
+                self._db_execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+            metrics.set_gauge("sessions.active", len(self._sessions))
+            return len(doomed)
+
+    def reload_user(self, user_id):
+        """Drops the User cached on user_id's sessions so the next get_user reads it fresh (e.g. after an admin status change)."""
+        with self._lock:
+            for token_hash in self._by_user.get(user_id, ()):
+                self._sessions[token_hash].user = None
+
+    def expire_now(self):
+        """Runs expiry for the current time; useful from a periodic timer in long-running servers."""
+        with self._lock:
+            self._advance(time.time())
+            metrics.set_gauge("sessions.active", len(self._sessions))
+
+    def __len__(self):
+        return len(self._sessions)
+
+    # --- optional SQLite persistence ---
+
+    def _db_execute(self, query, params):
+        try:
+            if self._db is None:
+                self._db = sqlite3.connect(database.DATABASE_NAME, check_same_thread=False)
+            self._db.execute(query, params)
+            self._db.commit()
+        except Exception as e:
+            log(f"Error persisting session state: {e}")
+
+    def _load_persisted(self):
+        now = time.time()
+        try:
+            self._db_execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            # Keep the most recently used sessions when there are more than the cap
+            rows = self._db.execute(
+                "SELECT token_hash, user_id, created_at, last_seen, expires_at FROM sessions "
+                "WHERE expires_at > ? ORDER BY last_seen DESC LIMIT ?",
+                (now, self.max_sessions)).fetchall()
+        except Exception as e:
+            log(f"Error loading persisted sessions: {e}")
+            return
+        for token_hash, user_id, created_at, last_seen, expires_at in reversed(rows):  # Oldest first, as the LRU expects
+            session = Session(token_hash, user_id, None, created_at, last_seen, min(expires_at, now + self.ttl_seconds))
+            self._sessions[token_hash] = session
+            self._by_user.setdefault(user_id, set()).add(token_hash)
+            self._place(session)
+        log(f"Restored {len(rows)} persisted session(s).")
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+def get_session_store():
+    """Returns the process-wide SessionStore, creating it on first use."""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = SessionStore()
+        return _session_store
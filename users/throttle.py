@@ -0,0 +1,146 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from utils import metrics
+
+# Login throttling runs before any user lookup or bcrypt work, so a burst of bad logins costs
+# a dict lookup per attempt instead of a full password hash.
+LOGIN_THROTTLE_ENABLED = os.environ.get('SWIGATO_LOGIN_THROTTLE', '1') == '1'
+LOGIN_WINDOW_SECONDS = int(os.environ.get('SWIGATO_LOGIN_WINDOW_SECONDS', '300'))
+LOGIN_MAX_FAILURES_PER_USER = int(os.environ.get('SWIGATO_LOGIN_MAX_PER_USER', '5'))
+LOGIN_MAX_FAILURES_PER_CLIENT = int(os.environ.get('SWIGATO_LOGIN_MAX_PER_CLIENT', '20'))
+# Consecutive failures allowed before progressive delay starts; each further failure doubles the wait
+LOGIN_FREE_FAILURES = int(os.environ.get('SWIGATO_LOGIN_FREE_FAILURES', '3'))
+LOGIN_DELAY_BASE_SECONDS = float(os.environ.get('SWIGATO_LOGIN_DELAY_BASE_SECONDS', '1'))
+LOGIN_DELAY_MAX_SECONDS = float(os.environ.get('SWIGATO_LOGIN_DELAY_MAX_SECONDS', '60'))
+# Upper bound on tracked usernames/clients; the least recently seen are dropped first
+LOGIN_THROTTLE_MAX_KEYS = int(os.environ.get('SWIGATO_LOGIN_THROTTLE_MAX_KEYS', '100000'))
+
+# Every login from the desktop app shares this client id. It has no client limit of its own:
+# one person's typos must not lock out every account on the machine, so only the username limits apply
+LOCAL_CLIENT_ID = "local"
+
+class LoginThrottledError(Exception):
+    """Raised (or returned through a Future) when a login attempt is rejected by the throttle."""
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Too many failed login attempts. Try again in {int(retry_after) + 1} seconds.")
+
+class LoginThrottle:
+    """
+    Per-username and per-client failure limits using sliding-window counters. The progressive
+    delay after consecutive failures applies to usernames only; a client (a remote address)
+    just has its window limit, and LOCAL_CLIENT_ID has none.
+
+    Each key keeps a compact 5-slot list [window_index, previous_count, current_count,
+    consecutive_failures, last_failure_at]. The sliding count is the current fixed window plus
+    the previous window weighted by how much of it still overlaps the sliding window, which gives
+    a close approximation of a true sliding log in constant memory per key.
+    """
+    def __init__(self, window_seconds=LOGIN_WINDOW_SECONDS, max_per_user=LOGIN_MAX_FAILURES_PER_USER,
+                 max_per_client=LOGIN_MAX_FAILURES_PER_CLIENT, free_failures=LOGIN_FREE_FAILURES,
+                 delay_base=LOGIN_DELAY_BASE_SECONDS, delay_max=LOGIN_DELAY_MAX_SECONDS,
+                 max_keys=LOGIN_THROTTLE_MAX_KEYS):
+        self.window_seconds = window_seconds
+        self.max_per_user = max_per_user
+        self.max_per_client = max_per_client
+        self.free_failures = free_failures
+        self.delay_base = delay_base
+        self.delay_max = delay_max
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, key, now, create=False, touch=True):
+        entry = self._entries.get(key)
+        window = int(now // self.window_seconds)
+        if entry is None:
+            if not create:
+                return None
+            entry = [window, 0, 0, 0, 0.0]
+            self._entries[key] = entry
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        elif touch:
+            self._entries.move_to_end(key)
+        # Roll the fixed windows forward
+        if entry[0] != window:
+            entry[1] = entry[2] if window - entry[0] == 1 else 0
+            entry[2] = 0
+            entry[0] = window
+        return entry
+
+    def _retry_after(self, entry, limit, now):
+        """Seconds until the key behind `entry` may try again (0 if allowed now)."""
+        if entry is None:
+            return 0.0
+        wait = 0.0
+        offset = now % self.window_seconds
+        previous, current = entry[1], entry[2]
+        if current + previous * (1.0 - offset / self.window_seconds) >= limit:
+            if current >= limit or previous == 0:
+                wait = self.window_seconds - offset  # Only the next fixed window will have room
+            else:
+                # Wait until the previous window's weight has decayed below the remaining allowance
+                wait = self.window_seconds * (1.0 - (limit - current) / previous) - offset
+        excess = entry[3] - self.free_failures
+        if excess >= 0:
+            delay = min(self.delay_max, self.delay_base * (2 ** excess))
+            wait = max(wait, entry[4] + delay - now)
+        return max(0.0, wait)
+
+    def _user_key(self, username):
+        return f"user:{(username or '').lower()}"
+
+    def _client_key(self, client_id):
+        return None if client_id == LOCAL_CLIENT_ID else f"client:{client_id}"
+
+    def check(self, username, client_id=LOCAL_CLIENT_ID):
+        """Returns 0 if an attempt may proceed, otherwise the number of seconds to wait."""
+        now = time.time()
+        client_key = self._client_key(client_id)
+        with self._lock:
+            wait = self._retry_after(self._entry(self._user_key(username), now), self.max_per_user, now)
+            if client_key is not None:
+                wait = max(wait, self._retry_after(self._entry(client_key, now), self.max_per_client, now))
+        if wait > 0:
+            metrics.increment("auth.throttled")
+        return wait
+
+    def record_failure(self, username, client_id=LOCAL_CLIENT_ID):
+        now = time.time()
+        client_key = self._client_key(client_id)
+        with self._lock:
+            entry = self._entry(self._user_key(username), now, create=True)
+            entry[2] += 1
+            entry[3] += 1
+            entry[4] = now
+            if client_key is not None:
+                # Window count only: consecutive failures (and so the delay) are tracked per username
+                self._entry(client_key, now, create=True)[2] += 1
+            metrics.set_gauge("auth.throttle_tracked_keys", len(self._entries))
+
+    def record_success(self, username, client_id=LOCAL_CLIENT_ID):
+        """Clears the consecutive-failure delay for the username; window counts are kept."""
+        now = time.time()
+        with self._lock:
+            entry = self._entry(self._user_key(username), now)
+            if entry is not None:
+                entry[3] = 0
+
+    def stats(self):
+        """Tracked key count and how many keys are currently blocked, for admin metrics."""
+        now = time.time()
+        with self._lock:
+            blocked = 0
+            for key in list(self._entries.keys()):
+                limit = self.max_per_user if key.startswith("user:") else self.max_per_client
+                if self._retry_after(self._entry(key, now, touch=False), limit, now) > 0:
+                    blocked += 1
+            return {"tracked_keys": len(self._entries), "blocked_keys": blocked}
+
+_login_throttle = LoginThrottle()
+
+def get_login_throttle():
+    return _login_throttle
@@ -4,6 +4,7 @@ from .logger import log
 
 DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
 DATABASE_NAME = os.path.join(DATABASE_DIR, 'swigato.db')
+ARCHIVE_DATABASE_NAME = os.path.join(DATABASE_DIR, 'swigato_archive.db')
 
 def get_db_connection():
     """Establishes a connection to the SQLite database."""
@@ -15,6 +16,48 @@ def get_db_connection():
     log(f"Database connection established to {DATABASE_NAME}")
     return conn
 
+def archive_database_exists():
+    """Returns True if the cold-storage order archive has been created."""
+    return os.path.exists(ARCHIVE_DATABASE_NAME)
+
+def attach_archive_database(conn):
+    """
+    Attaches the cold-storage order archive to an open connection as schema 'archive'
+    and makes sure its tables exist. Archived rows keep their original ids and carry
+    an archive_month (YYYY-MM of order_date) used to partition and prune the archive.
+    """
+    cursor = conn.cursor()
+    cursor.execute("ATTACH DATABASE ? AS archive", (ARCHIVE_DATABASE_NAME,))
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive.orders (
+            order_id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            restaurant_id INTEGER NOT NULL,
+            restaurant_name TEXT,
+            total_amount REAL NOT NULL,
+            status TEXT,
+            order_date TIMESTAMP,
+            delivery_address TEXT,
+            archive_month TEXT NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive.order_items (
+            order_item_id INTEGER PRIMARY KEY,
+            order_id INTEGER NOT NULL,
+            item_id INTEGER,
+            name TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            price REAL NOT NULL
+        )
+    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS archive.idx_archive_orders_user_id ON orders (user_id);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS archive.idx_archive_orders_month ON orders (archive_month);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS archive.idx_archive_orders_order_date ON orders (order_date);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS archive.idx_archive_order_items_order_id ON order_items (order_id);''')
+    log(f"Order archive attached from {ARCHIVE_DATABASE_NAME}")
+
 def initialize_database():
     """Initializes all tables in the database if they don't exist."""
     log("Initializing database tables...")
@@ -24,6 +67,9 @@ def initialize_database():
     init_reviews_table()
     init_orders_table()
     init_order_items_table()
+    init_sales_rollup_tables()
+    init_sessions_table()
+    init_data_versions()
     log("Database initialization complete.")
 
     # Create a default admin user if one doesn't exist
@@ -43,10 +89,59 @@ def init_users_table():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Soft-deactivated users keep their row (and orders) but can no longer log in
+    add_column_if_missing(cursor, "users", "is_active", "BOOLEAN DEFAULT 1")
+    # Lets the admin filter page through users by id without scanning the whole table
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_users_is_admin ON users (is_admin, user_id);''')
+    init_users_search_index(cursor)
     conn.commit()
     conn.close()
     log("Users table initialized.")
 
+def init_users_search_index(cursor):
+    """
+    Sets up users_fts, a trigram full-text index over username and address.
+
+    It is an external-content FTS5 table, so the text is stored once (in users) and triggers
+    keep the index in step with inserts, updates and deletes. Trigram tokens let substring
+    searches of 3+ characters use the index instead of a LIKE '%term%' scan. If this SQLite
+    build has no FTS5 or trigram tokenizer the table is skipped and User.search falls back to LIKE.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'")
+    is_new = cursor.fetchone() is None
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+                username, address, content='users', content_rowid='user_id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        log(f"User search index not available ({e}); user search will use LIKE scans.")
+        return
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_insert AFTER INSERT ON users
+        BEGIN
+            INSERT INTO users_fts (rowid, username, address) VALUES (NEW.user_id, NEW.username, NEW.address);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_delete AFTER DELETE ON users
+        BEGIN
+            INSERT INTO users_fts (users_fts, rowid, username, address) VALUES ('delete', OLD.user_id, OLD.username, OLD.address);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_update AFTER UPDATE OF username, address ON users
+        BEGIN
+            INSERT INTO users_fts (users_fts, rowid, username, address) VALUES ('delete', OLD.user_id, OLD.username, OLD.address);
+            INSERT INTO users_fts (rowid, username, address) VALUES (NEW.user_id, NEW.username, NEW.address);
+        END
+    ''')
+    if is_new:
+        # Index the users that existed before the search table did
+        cursor.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+        log("Built user search index.")
+
 def init_restaurants_table():
     """Initializes the restaurants table."""
     conn = get_db_connection()
@@ -111,10 +206,101 @@ def init_reviews_table():
     # Add indexes
     cursor.execute('''CREATE INDEX IF NOT EXISTS idx_reviews_user_id ON reviews (user_id);''')
     cursor.execute('''CREATE INDEX IF NOT EXISTS idx_reviews_restaurant_id ON reviews (restaurant_id);''')
+    # Lexicon sentiment in [-1, 1], written by add_review and reviews.sentiment.backfill_review_sentiment; NULL until scored
+    add_column_if_missing(cursor, "reviews", "sentiment", "REAL")
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_reviews_sentiment ON reviews (sentiment);''')
+    # Hidden reviews (reviews.bulk_actions) stay in the table but leave the public feeds and every aggregate
+    if add_column_if_missing(cursor, "reviews", "is_hidden", "BOOLEAN NOT NULL DEFAULT 0"):
+        # The aggregate triggers predate hidden reviews; drop them so they are recreated hidden-aware below
+        for trigger in ("trg_reviews_stats_insert", "trg_reviews_stats_delete", "trg_reviews_stats_update",
+                        "trg_reviews_sentiment_insert", "trg_reviews_sentiment_delete", "trg_reviews_sentiment_update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    init_restaurant_rating_stats(cursor)
+    init_restaurant_sentiment_stats(cursor)
+    init_restaurant_rating_weekly(cursor)
+    init_review_moderation_tables(cursor)
     conn.commit()
     conn.close()
     log("Reviews table initialized.")
 
+def init_review_moderation_tables(cursor):
+    """Tables written by reviews.moderation: the ranked spam queue and the reviews moderators have cleared."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS review_moderation_queue (
+            review_id INTEGER PRIMARY KEY,
+            cluster_id INTEGER, -- review_id of the first review in its near-duplicate group
+            cluster_size INTEGER NOT NULL DEFAULT 1,
+            cluster_users INTEGER NOT NULL DEFAULT 1,
+            is_burst BOOLEAN NOT NULL DEFAULT 0,
+            score REAL NOT NULL,
+            reason TEXT,
+            flagged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_review_moderation_queue_score ON review_moderation_queue (score DESC);''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS review_moderation_dismissed (
+            review_id INTEGER PRIMARY KEY,
+            dismissed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_moderation_delete AFTER DELETE ON reviews BEGIN
+            DELETE FROM review_moderation_queue WHERE review_id = old.review_id;
+            DELETE FROM review_moderation_dismissed WHERE review_id = old.review_id;
+        END
+    ''')
+
+def init_restaurant_rating_stats(cursor):
+    """
+    Sets up restaurant_rating_stats: review count and rating sum per restaurant.
+
+    Triggers on reviews keep it exact for every insert, delete, rating change and (un)hide,
+    including bulk deletes, so a restaurant's average (and the leaderboard built on it) never
+    needs an AVG over all of its reviews. Hidden reviews are not counted.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'restaurant_rating_stats'")
+    is_new = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS restaurant_rating_stats (
+            restaurant_id INTEGER PRIMARY KEY,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    if is_new:
+        cursor.execute('''
+            INSERT INTO restaurant_rating_stats (restaurant_id, review_count, rating_sum)
+            SELECT restaurant_id, COUNT(*), SUM(rating) FROM reviews WHERE is_hidden = 0 GROUP BY restaurant_id
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_insert AFTER INSERT ON reviews
+        WHEN NEW.is_hidden = 0
+        BEGIN
+            INSERT INTO restaurant_rating_stats (restaurant_id, review_count, rating_sum)
+            VALUES (NEW.restaurant_id, 1, NEW.rating)
+            ON CONFLICT (restaurant_id) DO UPDATE SET review_count = review_count + 1, rating_sum = rating_sum + NEW.rating;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_delete AFTER DELETE ON reviews
+        WHEN OLD.is_hidden = 0
+        BEGIN
+            UPDATE restaurant_rating_stats SET review_count = review_count - 1, rating_sum = rating_sum - OLD.rating
+            WHERE restaurant_id = OLD.restaurant_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_update AFTER UPDATE OF rating, restaurant_id, is_hidden ON reviews
+        BEGIN
+            UPDATE restaurant_rating_stats SET review_count = review_count - 1, rating_sum = rating_sum - OLD.rating
+            WHERE restaurant_id = OLD.restaurant_id AND OLD.is_hidden = 0;
+            INSERT INTO restaurant_rating_stats (restaurant_id, review_count, rating_sum)
+            SELECT NEW.restaurant_id, 1, NEW.rating WHERE NEW.is_hidden = 0
+            ON CONFLICT (restaurant_id) DO UPDATE SET review_count = review_count + 1, rating_sum = rating_sum + NEW.rating;
+        END
+    ''')
+
 def init_orders_table():
     """Initializes the orders table."""
     conn = get_db_connection()
@@ -129,6 +315,7 @@ def init_orders_table():
             status TEXT DEFAULT 'Pending',
             order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             delivery_address TEXT,
+            change_seq INTEGER, -- Stamped by trigger on every insert/update, see init_order_change_feed
             FOREIGN KEY (user_id) REFERENCES users (user_id),
             FOREIGN KEY (restaurant_id) REFERENCES restaurants (restaurant_id) 
         )
@@ -136,10 +323,190 @@ def init_orders_table():
     # Add indexes
     cursor.execute('''CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders (user_id);''')
     cursor.execute('''CREATE INDEX IF NOT EXISTS idx_orders_restaurant_id ON orders (restaurant_id);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders (order_date);''')
+    init_order_change_feed(cursor)
     conn.commit()
     conn.close()
     log("Orders table initialized.")
 
+def init_restaurant_rating_weekly(cursor):
+    """
+    Sets up restaurant_rating_weekly: review count and rating sum per restaurant per week
+    (week_start is the Monday, 'YYYY-MM-DD'), for rating trend charts without scanning reviews.
+    Triggers keep it exact as visible reviews are inserted, deleted, edited or (un)hidden.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'restaurant_rating_weekly'")
+    is_new = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS restaurant_rating_weekly (
+            restaurant_id INTEGER NOT NULL,
+            week_start TEXT NOT NULL,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (restaurant_id, week_start)
+        ) WITHOUT ROWID
+    ''')
+    # date(d, '-6 days', 'weekday 1') is the Monday on or before d
+    if is_new:
+        cursor.execute('''
+            INSERT INTO restaurant_rating_weekly (restaurant_id, week_start, review_count, rating_sum)
+            SELECT restaurant_id, date(review_date, '-6 days', 'weekday 1') AS week_start, COUNT(*), SUM(rating)
+            FROM reviews WHERE is_hidden = 0 AND date(review_date) IS NOT NULL
+            GROUP BY restaurant_id, week_start
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_weekly_insert AFTER INSERT ON reviews
+        WHEN NEW.is_hidden = 0 AND date(NEW.review_date) IS NOT NULL
+        BEGIN
+            INSERT INTO restaurant_rating_weekly (restaurant_id, week_start, review_count, rating_sum)
+            VALUES (NEW.restaurant_id, date(NEW.review_date, '-6 days', 'weekday 1'), 1, NEW.rating)
+            ON CONFLICT (restaurant_id, week_start) DO UPDATE SET review_count = review_count + 1, rating_sum = rating_sum + NEW.rating;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_weekly_delete AFTER DELETE ON reviews
+        WHEN OLD.is_hidden = 0 AND date(OLD.review_date) IS NOT NULL
+        BEGIN
+            UPDATE restaurant_rating_weekly SET review_count = review_count - 1, rating_sum = rating_sum - OLD.rating
+            WHERE restaurant_id = OLD.restaurant_id AND week_start = date(OLD.review_date, '-6 days', 'weekday 1');
+            DELETE FROM restaurant_rating_weekly
+            WHERE restaurant_id = OLD.restaurant_id AND week_start = date(OLD.review_date, '-6 days', 'weekday 1') AND review_count <= 0;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_weekly_update AFTER UPDATE OF rating, restaurant_id, review_date, is_hidden ON reviews
+        BEGIN
+            UPDATE restaurant_rating_weekly SET review_count = review_count - 1, rating_sum = rating_sum - OLD.rating
+            WHERE restaurant_id = OLD.restaurant_id AND week_start = date(OLD.review_date, '-6 days', 'weekday 1')
+              AND OLD.is_hidden = 0;
+            DELETE FROM restaurant_rating_weekly
+            WHERE restaurant_id = OLD.restaurant_id AND week_start = date(OLD.review_date, '-6 days', 'weekday 1') AND review_count <= 0;
+            INSERT INTO restaurant_rating_weekly (restaurant_id, week_start, review_count, rating_sum)
+            SELECT NEW.restaurant_id, date(NEW.review_date, '-6 days', 'weekday 1'), 1, NEW.rating
+            WHERE NEW.is_hidden = 0 AND date(NEW.review_date) IS NOT NULL
+            ON CONFLICT (restaurant_id, week_start) DO UPDATE SET review_count = review_count + 1, rating_sum = rating_sum + NEW.rating;
+        END
+    ''')
+
+def init_restaurant_sentiment_stats(cursor):
+    """
+    Sets up restaurant_sentiment_stats: how many of a restaurant's reviews have a sentiment
+    score, their sum, and how many are negative (<= -0.05, reviews.sentiment's negative cut-off).
+    Triggers keep it exact as reviews are inserted, deleted, moved, (re)scored or (un)hidden;
+    hidden reviews are not counted.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'restaurant_sentiment_stats'")
+    is_new = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS restaurant_sentiment_stats (
+            restaurant_id INTEGER PRIMARY KEY,
+            scored_count INTEGER NOT NULL DEFAULT 0,
+            sentiment_sum REAL NOT NULL DEFAULT 0,
+            negative_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    if is_new:
+        cursor.execute('''
+            INSERT INTO restaurant_sentiment_stats (restaurant_id, scored_count, sentiment_sum, negative_count)
+            SELECT restaurant_id, COUNT(*), SUM(sentiment), SUM(sentiment <= -0.05) FROM reviews
+            WHERE sentiment IS NOT NULL AND is_hidden = 0 GROUP BY restaurant_id
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_sentiment_insert AFTER INSERT ON reviews
+        WHEN NEW.sentiment IS NOT NULL AND NEW.is_hidden = 0
+        BEGIN
+            INSERT INTO restaurant_sentiment_stats (restaurant_id, scored_count, sentiment_sum, negative_count)
+            VALUES (NEW.restaurant_id, 1, NEW.sentiment, NEW.sentiment <= -0.05)
+            ON CONFLICT (restaurant_id) DO UPDATE SET scored_count = scored_count + 1,
+                sentiment_sum = sentiment_sum + NEW.sentiment, negative_count = negative_count + (NEW.sentiment <= -0.05);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_sentiment_delete AFTER DELETE ON reviews
+        WHEN OLD.sentiment IS NOT NULL AND OLD.is_hidden = 0
+        BEGIN
+            UPDATE restaurant_sentiment_stats SET scored_count = scored_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment, negative_count = negative_count - (OLD.sentiment <= -0.05)
+            WHERE restaurant_id = OLD.restaurant_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_sentiment_update AFTER UPDATE OF sentiment, restaurant_id, is_hidden ON reviews
+        BEGIN
+            UPDATE restaurant_sentiment_stats SET scored_count = scored_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment, negative_count = negative_count - (OLD.sentiment <= -0.05)
+            WHERE restaurant_id = OLD.restaurant_id AND OLD.sentiment IS NOT NULL AND OLD.is_hidden = 0;
+            INSERT INTO restaurant_sentiment_stats (restaurant_id, scored_count, sentiment_sum, negative_count)
+            SELECT NEW.restaurant_id, 1, NEW.sentiment, NEW.sentiment <= -0.05 WHERE NEW.sentiment IS NOT NULL AND NEW.is_hidden = 0
+            ON CONFLICT (restaurant_id) DO UPDATE SET scored_count = scored_count + 1,
+                sentiment_sum = sentiment_sum + NEW.sentiment, negative_count = negative_count + (NEW.sentiment <= -0.05);
+        END
+    ''')
+
+def add_column_if_missing(cursor, table_name, column_name, column_definition):
+    """Adds a column to an existing table if it is not there yet. Returns True if the column was added."""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = [column[1] for column in cursor.fetchall()]
+    if column_name in columns:
+        return False
+    cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}")
+    log(f"Added '{column_name}' column to '{table_name}' table.")
+    return True
+
+def init_order_change_feed(cursor):
+    """
+    Sets up the monotonic change sequence on orders.
+
+    Every insert or update of an order bumps a shared counter in change_sequences and
+    stamps the new value into orders.change_seq, so pollers can ask for "everything
+    after seq N" through idx_orders_change_seq instead of re-reading the whole table.
+    A delete (including archive_old_orders moving an order out) bumps the same counter and
+    leaves a tombstone in order_deletions, so pollers see removals too.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_sequences (
+            name TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    if add_column_if_missing(cursor, "orders", "change_seq", "INTEGER"):
+        # Existing orders get a sequence in insertion order so the first poll sees them all
+        cursor.execute("UPDATE orders SET change_seq = order_id WHERE change_seq IS NULL")
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_orders_change_seq ON orders (change_seq);''')
+    cursor.execute("INSERT OR IGNORE INTO change_sequences (name, seq) SELECT 'orders', COALESCE(MAX(change_seq), 0) FROM orders")
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_change_seq_insert AFTER INSERT ON orders
+        BEGIN
+            UPDATE change_sequences SET seq = seq + 1 WHERE name = 'orders';
+            UPDATE orders SET change_seq = (SELECT seq FROM change_sequences WHERE name = 'orders')
+            WHERE order_id = NEW.order_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_deletions (
+            change_seq INTEGER PRIMARY KEY,
+            order_id INTEGER NOT NULL,
+            deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP -- Old tombstones are pruned by archive_old_orders
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_change_seq_delete AFTER DELETE ON orders
+        BEGIN
+            UPDATE change_sequences SET seq = seq + 1 WHERE name = 'orders';
+            INSERT INTO order_deletions (change_seq, order_id)
+            SELECT seq, OLD.order_id FROM change_sequences WHERE name = 'orders';
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_change_seq_update
+        AFTER UPDATE OF status, total_amount, delivery_address, restaurant_name ON orders
+        BEGIN
+            UPDATE change_sequences SET seq = seq + 1 WHERE name = 'orders';
+            UPDATE orders SET change_seq = (SELECT seq FROM change_sequences WHERE name = 'orders')
+            WHERE order_id = NEW.order_id;
+        END
+    ''')
+
 def init_order_items_table():
     """Initializes the order_items table to store items for each order."""
     conn = get_db_connection()
@@ -162,6 +529,154 @@ def init_order_items_table():
     conn.close()
     log("Order items table initialized.")
 
+# Orders in these statuses are left out of the sales rollups (they earned nothing)
+ROLLUP_EXCLUDED_STATUSES = ("Cancelled", "Failed")
+
+def init_sales_rollup_tables():
+    """
+    Initializes the precomputed sales rollup tables used by admin analytics.
+    They are filled incrementally by analytics.rollups.refresh_sales_rollups() from the
+    order_id watermark in rollup_watermarks, never by rescanning all orders.
+
+    An order moving into or out of ROLLUP_EXCLUDED_STATUSES is queued in
+    sales_rollup_adjustments by trigger (-1 to take it out of the rollups, +1 to put it back),
+    and the next refresh applies the queue to orders already folded in.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    excluded = ", ".join(f"'{status}'" for status in ROLLUP_EXCLUDED_STATUSES)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            name TEXT PRIMARY KEY,
+            last_order_id INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_daily_restaurant (
+            day TEXT NOT NULL, -- YYYY-MM-DD of order_date
+            restaurant_id INTEGER NOT NULL,
+            restaurant_name TEXT,
+            order_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            items_sold INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, restaurant_id)
+        )
+    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_sales_daily_restaurant_id ON sales_daily_restaurant (restaurant_id, day);''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_hourly (
+            hour TEXT PRIMARY KEY, -- YYYY-MM-DD HH of order_date
+            order_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_item_units (
+            restaurant_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL DEFAULT 0, -- 0 when the order item had no menu item id
+            name TEXT NOT NULL,
+            units_sold INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (restaurant_id, item_id, name)
+        )
+    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_sales_item_units_units ON sales_item_units (units_sold DESC);''')
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sales_rollup_adjustments'")
+    adjustments_existed = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_rollup_adjustments (
+            adjustment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            sign INTEGER NOT NULL -- -1 takes the order out of the rollups, +1 puts it back
+        )
+    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_sales_rollup_adjustments_order_id ON sales_rollup_adjustments (order_id);''')
+    if not adjustments_existed:
+        # Rollups built before adjustments existed counted excluded orders too; queue them out once
+        cursor.execute(f'''
+            INSERT INTO sales_rollup_adjustments (order_id, sign)
+            SELECT order_id, -1 FROM orders
+            WHERE status IN ({excluded})
+              AND order_id <= COALESCE((SELECT last_order_id FROM rollup_watermarks WHERE name = 'sales'), 0)
+        ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_status AFTER UPDATE OF status ON orders
+        WHEN (COALESCE(OLD.status, '') IN ({excluded})) <> (COALESCE(NEW.status, '') IN ({excluded}))
+        BEGIN
+            INSERT INTO sales_rollup_adjustments (order_id, sign)
+            VALUES (NEW.order_id, CASE WHEN NEW.status IN ({excluded}) THEN -1 ELSE 1 END);
+        END
+    ''')
+    conn.commit()
+    conn.close()
+    log("Sales rollup tables initialized.")
+
+def init_sessions_table():
+    """
+    Initializes the sessions table used when users.sessions persistence is enabled.
+    Only a SHA-256 of each token is stored, never the token itself.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            token_hash TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at REAL NOT NULL, -- Unix timestamps
+            last_seen REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id);''')
+    conn.commit()
+    conn.close()
+
+# Tables whose writes bump data_versions; cached GUI screens compare these to decide whether to refresh
+DATA_VERSION_TABLES = ("users", "restaurants", "menu_items", "reviews", "orders", "order_items")
+
+def init_data_versions():
+    """
+    Initializes data_versions: one counter per table in DATA_VERSION_TABLES, bumped by
+    triggers on every insert, update and delete. Readers only compare the numbers, so the
+    cost to writers is one primary-key UPDATE per changed row.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in DATA_VERSION_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_data_version_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+    conn.commit()
+    conn.close()
+    log("Data version counters initialized.")
+
+def get_data_versions(tables=DATA_VERSION_TABLES):
+    """Current {table_name: version} for the given tables (missing ones read as 0). Returns {} on error."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("SELECT table_name, version FROM data_versions").fetchall()
+        versions = {row[0]: row[1] for row in rows}
+        return {table: versions.get(table, 0) for table in tables}
+    except Exception as e:
+        log(f"Error reading data versions: {e}")
+        return {}
+    finally:
+        conn.close()
+
 def create_default_admin_user():
     """Creates a default admin user if no admin users exist."""
     from users.models import User # Local import to avoid circular dependency if User model imports from database directly
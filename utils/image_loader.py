@@ -1,34 +1,159 @@
 # filepath: g:\swigato_project\utils\image_loader.py
-from PIL import Image, ImageTk
 import customtkinter as ctk
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils import metrics
+from utils.logger import log
+from utils.thumbnails import load_thumbnail
 
-def load_image(image_path: str, size: tuple[int, int] = (100, 100)) -> ctk.CTkImage | None:
+# Upper bound on the decoded pixel data kept by the shared image cache (default 64 MB)
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('SWIGATO_IMAGE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# Threads decoding images for the GUI; Pillow releases the GIL while decoding and resizing
+IMAGE_DECODE_WORKERS = int(os.environ.get('SWIGATO_IMAGE_DECODE_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+_decode_pool = None
+_decode_pool_lock = threading.Lock()
+
+class ImageCache:
+    """
+    Process-wide LRU of ready-to-use CTkImages, keyed by (path, mtime, size, keep_aspect).
+
+    Each entry holds an image already scaled to the requested size, so a card showing a
+    120x120 thumbnail keeps 120x120 pixels rather than the full-resolution photo. The cache is
+    bounded by the decoded bytes of its images, not by entry count, because one large banner
+    costs as much as hundreds of thumbnails. Including the file's mtime in the key means an
+    image replaced on disk is simply a new entry; the stale one ages out.
+    """
+    def __init__(self, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (CTkImage, size_in_bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, ctk_image, size_in_bytes):
+        with self._lock:
+            if size_in_bytes > self.max_bytes:
+                return  # Would evict everything else and still not fit
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (ctk_image, size_in_bytes)
+            self._bytes += size_in_bytes
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+        metrics.set_gauge("image_cache.entries", stats["entries"])
+        metrics.set_gauge("image_cache.bytes", stats["bytes"])
+        metrics.set_gauge("image_cache.hit_rate_pct", round(stats["hit_rate"] * 100, 1))
+        return stats
+
+image_cache = ImageCache()
+
+def _resolve_image_path(image_path):
+    if os.path.exists(image_path):
+        return image_path
+    # Try to construct path from project root if it's a relative path like 'assets/image.png'
+    # This assumes 'assets' is a common folder name. Adjust if your structure is different.
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # g:\swigato_project
+    potential_path = os.path.join(base_dir, image_path)
+    if os.path.exists(potential_path):
+        return potential_path
+    print(f"Error: Image not found at path: {image_path} or {potential_path}")
+    return None
+
+def image_cache_key(image_path, size, keep_aspect=False):
+    """The image_cache key for a file at a size, or None if the file can't be found."""
+    resolved_path = _resolve_image_path(image_path)
+    if resolved_path is None:
+        return None
+    resolved_path = os.path.abspath(resolved_path)
+    return (resolved_path, os.stat(resolved_path).st_mtime_ns, tuple(size), keep_aspect)
+
+def decode_for_cache(key):
+    """
+    Decodes and scales the image for an image_cache_key, from the on-disk thumbnail cache when
+    possible (see utils.thumbnails). Returns a PIL image and touches no Tk state, so it is safe
+    to run on a worker thread; pass the result to cache_decoded() back on the Tk thread.
+    """
+    path, _, size, keep_aspect = key
+    return load_thumbnail(path, size, keep_aspect)
+
+def cache_decoded(key, img):
+    """Wraps a decode_for_cache result in a CTkImage, stores it in image_cache and returns it."""
+    ctk_image = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
+    image_cache.put(key, ctk_image, img.width * img.height * len(img.getbands()))
+    return ctk_image
+
+def get_image_decode_pool():
+    """Returns the shared image decode executor, creating it on first use."""
+    global _decode_pool
+    with _decode_pool_lock:
+        if _decode_pool is None:
+            _decode_pool = ThreadPoolExecutor(max_workers=IMAGE_DECODE_WORKERS, thread_name_prefix="swigato-image")
+            log(f"Image decode pool started ({IMAGE_DECODE_WORKERS} workers).")
+        return _decode_pool
+
+def load_image(image_path: str, size: tuple[int, int] = (100, 100), keep_aspect: bool = False) -> ctk.CTkImage | None:
     """
     Loads an image from the given path and returns a CTkImage object.
     If the image cannot be loaded, it returns None.
 
+    Images are scaled once (or read pre-scaled from data/thumbnails) and shared through
+    image_cache, so loading the same file at the same size again (menu_default.jpg on every
+    menu card, say) costs a stat() and a dict lookup.
+    This decodes on the calling thread; screens that show many images use
+    gui_components.async_images.AsyncImageLoader instead.
+
     Args:
         image_path (str): The absolute or relative path to the image file.
         size (tuple[int, int]): The desired size (width, height) for the image.
+        keep_aspect (bool): Fit the image inside `size` keeping its aspect ratio instead of stretching it.
 
     Returns:
         ctk.CTkImage | None: A CTkImage object if successful, None otherwise.
     """
     try:
-        if not os.path.exists(image_path):
-            # Try to construct path from project root if it's a relative path like 'assets/image.png'
-            # This assumes 'assets' is a common folder name. Adjust if your structure is different.
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # g:\swigato_project
-            potential_path = os.path.join(base_dir, image_path)
-            if os.path.exists(potential_path):
-                image_path = potential_path
-            else:
-                print(f"Error: Image not found at path: {image_path} or {potential_path}")
-                return None
-        
-        img = Image.open(image_path)
-        return ctk.CTkImage(light_image=img, dark_image=img, size=size)
+        key = image_cache_key(image_path, size, keep_aspect)
+        if key is None:
+            return None
+        ctk_image = image_cache.get(key)
+        if ctk_image is not None:
+            return ctk_image
+        return cache_decoded(key, decode_for_cache(key))
     except Exception as e:
         print(f"Error loading image {image_path}: {e}")
         return None
@@ -0,0 +1,65 @@
+import threading
+from collections import deque
+
+# Number of most recent samples kept per timer; percentiles are computed over this window
+METRICS_WINDOW = 1000
+
+_lock = threading.Lock()
+_timers = {}
+_timer_totals = {}
+_counters = {}
+
+def record_timing(name, seconds):
+    """Adds one duration sample (in seconds) to the named timer."""
+    with _lock:
+        samples = _timers.get(name)
+        if samples is None:
+            samples = _timers[name] = deque(maxlen=METRICS_WINDOW)
+            _timer_totals[name] = [0, 0.0]
+        samples.append(seconds)
+        totals = _timer_totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def set_gauge(name, value):
+    """Stores a point-in-time value alongside the counters."""
+    with _lock:
+        _counters[name] = value
+
+def _percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(pct / 100.0 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+def get_timer_stats(name):
+    """Returns count/total/avg/p50/p95/p99 (ms) for a timer; percentiles cover the last METRICS_WINDOW samples."""
+    with _lock:
+        samples = sorted(_timers.get(name, ()))
+        count, total = _timer_totals.get(name, (0, 0.0))
+    return {
+        "count": count,
+        "total_ms": total * 1000,
+        "avg_ms": (total / count) * 1000 if count else 0.0,
+        "p50_ms": _percentile(samples, 50) * 1000,
+        "p95_ms": _percentile(samples, 95) * 1000,
+        "p99_ms": _percentile(samples, 99) * 1000,
+    }
+
+def get_metrics_snapshot():
+    """Returns {"timers": {name: stats}, "counters": {name: value}} for everything recorded so far."""
+    with _lock:
+        timer_names = list(_timers.keys())
+        counters = dict(_counters)
+    return {"timers": {name: get_timer_stats(name) for name in sorted(timer_names)},
+            "counters": dict(sorted(counters.items()))}
+
+def reset_metrics():
+    with _lock:
+        _timers.clear()
+        _timer_totals.clear()
+        _counters.clear()
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from PIL import Image
+from utils.logger import log
+from utils import metrics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Pre-resized copies of asset images, one file per (content hash, display size)
+THUMBNAIL_DIR = os.environ.get('SWIGATO_THUMBNAIL_DIR', os.path.join(PROJECT_ROOT, 'data', 'thumbnails'))
+THUMBNAIL_JPEG_QUALITY = 88
+
+# Every (size, keep_aspect) the GUI shows images at, per asset folder (or single file) under the
+# project root. warm_thumbnail_cache() builds all of them, so these must follow the screens.
+THUMBNAIL_SIZES = {
+    os.path.join("assets", "restaurants"): [((120, 120), False),   # MainAppScreen cards
+                                            ((200, 150), True)],   # RestaurantManagementScreen details
+    os.path.join("assets", "menu_items"): [((100, 100), False),    # MenuScreen cards
+                                           ((150, 100), True)],    # RestaurantManagementScreen item dialogs
+    "swigato_icon.png": [((100, 100), False)],                     # Login / signup screens
+}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif")
+
+_INDEX_FILE = "index.json"
+_index = None   # "abspath|mtime_ns|size" -> sha256 of the file's bytes, so unchanged files aren't re-hashed
+_lock = threading.Lock()
+_warmup_thread = None
+
+def decode_scaled(image_path, size, keep_aspect=False):
+    """Decodes image_path straight down to `size` (JPEGs are decoded at reduced scale) and returns the PIL image."""
+    with Image.open(image_path) as img:
+        img.draft(None, size)  # Lets the JPEG decoder skip most of the full-resolution work; no-op for other formats
+        if keep_aspect:
+            img.thumbnail(size)
+            return img.copy()
+        return img.resize(size, Image.LANCZOS)
+
+def _load_index():
+    global _index
+    if _index is None:
+        try:
+            with open(os.path.join(THUMBNAIL_DIR, _INDEX_FILE), "r", encoding="utf-8") as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+def _save_index():
+    try:
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        temp_path = os.path.join(THUMBNAIL_DIR, _INDEX_FILE + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(_index, f)
+        os.replace(temp_path, os.path.join(THUMBNAIL_DIR, _INDEX_FILE))
+    except OSError as e:
+        log(f"Error saving thumbnail index: {e}")
+
+def _index_key(image_path):
+    stat = os.stat(image_path)
+    return f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+def content_hash(image_path, save=True):
+    """sha256 of the file's bytes; remembered per (path, mtime, size) so it is only computed when the file changes."""
+    key = _index_key(image_path)
+    with _lock:
+        digest = _load_index().get(key)
+    if digest is not None:
+        return digest
+    sha = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+    with _lock:
+        _load_index()[key] = digest
+        if save:
+            _save_index()
+    return digest
+
+def _thumbnail_paths(digest, size, keep_aspect):
+    stem = os.path.join(THUMBNAIL_DIR, f"{digest[:40]}_{size[0]}x{size[1]}{'_fit' if keep_aspect else ''}")
+    return stem + ".jpg", stem + ".png"
+
+def _write_thumbnail(img, digest, size, keep_aspect):
+    jpg_path, png_path = _thumbnail_paths(digest, size, keep_aspect)
+    # Photos are re-encoded as JPEG; anything with transparency or a palette stays PNG
+    target = jpg_path if img.mode in ("RGB", "L") else png_path
+    temp_path = f"{target}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        if target == jpg_path:
+            img.save(temp_path, "JPEG", quality=THUMBNAIL_JPEG_QUALITY)
+        else:
+            img.save(temp_path, "PNG")
+        os.replace(temp_path, target)
+        metrics.increment("thumbnails.built")
+    except OSError as e:
+        log(f"Error writing thumbnail {target}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def load_thumbnail(image_path, size, keep_aspect=False, save_index=True):
+    """
+    image_path scaled to `size` as a PIL image, read from the thumbnail cache when it has it.
+    Otherwise the full image is decoded once, and the result is saved for next time.
+    Runs on any thread. Raises the underlying error if the image can't be read.
+    """
+    size = tuple(size)
+    digest = content_hash(image_path, save=save_index)
+    for path in _thumbnail_paths(digest, size, keep_aspect):
+        if os.path.exists(path):
+            try:
+                with Image.open(path) as img:
+                    metrics.increment("thumbnails.hits")
+                    return img.copy()
+            except OSError as e:
+                log(f"Discarding unreadable thumbnail {path}: {e}")
+                os.remove(path)
+    img = decode_scaled(image_path, size, keep_aspect)
+    _write_thumbnail(img, digest, size, keep_aspect)
+    return img
+
+def thumbnail_sizes_for(image_path, project_root=PROJECT_ROOT):
+    """The configured (size, keep_aspect) pairs for an image, going by the asset folder (or file) it lives in."""
+    relative = os.path.relpath(os.path.abspath(image_path), project_root)
+    return THUMBNAIL_SIZES.get(relative) or THUMBNAIL_SIZES.get(os.path.dirname(relative), [])
+
+def _asset_images(project_root):
+    for relative in THUMBNAIL_SIZES:
+        path = os.path.join(project_root, relative)
+        if os.path.isfile(path):
+            yield path
+        elif os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(path, name)
+
+def build_thumbnails(image_path, project_root=PROJECT_ROOT, save_index=True):
+    """Makes sure every configured thumbnail of one image exists. Returns how many had to be built."""
+    built = 0
+    sizes = thumbnail_sizes_for(image_path, project_root)
+    digest = content_hash(image_path, save=save_index) if sizes else None
+    for size, keep_aspect in sizes:
+        if not any(os.path.exists(path) for path in _thumbnail_paths(digest, size, keep_aspect)):
+            load_thumbnail(image_path, size, keep_aspect, save_index=save_index)
+            built += 1
+    return built
+
+def warm_thumbnail_cache(project_root=PROJECT_ROOT):
+    """
+    Builds any missing thumbnails for every image in THUMBNAIL_SIZES and drops index entries
+    and thumbnail files that no current asset refers to. Incremental: images whose
+    thumbnails already exist cost a stat() each. Returns a dict: images, built, removed, failed.
+    """
+    report = {"images": 0, "built": 0, "removed": 0, "failed": 0}
+    started = time.time()
+    live_keys = set()
+    for image_path in _asset_images(project_root):
+        report["images"] += 1
+        try:
+            live_keys.add(_index_key(image_path))
+            report["built"] += build_thumbnails(image_path, project_root, save_index=False)
+        except Exception as e:
+            report["failed"] += 1
+            log(f"Error building thumbnails for {image_path}: {e}")
+
+    with _lock:
+        index = _load_index()
+        for key in [key for key in index if key not in live_keys]:
+            del index[key]
+        live_digests = {digest[:40] for digest in index.values()}
+        _save_index()
+    if os.path.isdir(THUMBNAIL_DIR):
+        for name in os.listdir(THUMBNAIL_DIR):
+            path = os.path.join(THUMBNAIL_DIR, name)
+            if name != _INDEX_FILE and name.split("_", 1)[0] not in live_digests:
+                try:
+                    if os.path.getmtime(path) >= started:
+                        continue  # Written during this pass (an upload, say); the next warm-up judges it
+                    os.remove(path)
+                    report["removed"] += 1
+                except OSError as e:
+                    log(f"Error removing stale thumbnail {name}: {e}")
+    log(f"Thumbnail cache warmed: {report['images']} image(s), {report['built']} thumbnail(s) built, "
+        f"{report['removed']} stale file(s) removed, {report['failed']} failure(s).")
+    return report
+
+def start_thumbnail_warmup(project_root=PROJECT_ROOT):
+    """Runs warm_thumbnail_cache on a daemon thread (once at a time) so startup doesn't wait for it."""
+    global _warmup_thread
+    if _warmup_thread is not None and _warmup_thread.is_alive():
+        return
+    _warmup_thread = threading.Thread(target=warm_thumbnail_cache, args=(project_root,), daemon=True)
+    _warmup_thread.start()
+
+def build_thumbnails_async(image_path, project_root=PROJECT_ROOT):
+    """build_thumbnails on a daemon thread, e.g. right after an image is uploaded."""
+    def run():
+        try:
+            built = build_thumbnails(image_path, project_root)
+            log(f"Built {built} thumbnail(s) for {image_path}.")
+        except Exception as e:
+            log(f"Error building thumbnails for {image_path}: {e}")
+    threading.Thread(target=run, daemon=True).start()